@@ -0,0 +1,87 @@
+"""
+Compares the gzip decompression backends of builder.databases.parsers.decompression.
+
+A synthetic tab-separated file shaped like the STRING protein.links.detailed files is
+compressed once, then read line by line with every available backend, in bytes and in text
+mode.
+
+    python benchmarks/decompression.py --size-mb 4096
+"""
+import os
+import gzip
+import time
+import random
+import tempfile
+import sys
+import click
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from builder.databases.parsers import decompression  # noqa: E402
+
+
+def make_block(n_lines, seed=0):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(n_lines):
+        scores = "\t".join(str(rng.randint(0, 999)) for _ in range(8))
+        lines.append("9606.ENSP%011d\t9606.ENSP%011d\t%s\n" % (
+            rng.randint(0, 10**8), rng.randint(0, 10**8), scores))
+    return "".join(lines).encode('utf-8')
+
+
+def make_file(filepath, size_mb, compresslevel=6):
+    block = make_block(100000)
+    written = 0
+    with gzip.open(filepath, 'wb', compresslevel=compresslevel) as out:
+        while written < size_mb * 1024 * 1024:
+            out.write(block)
+            written += len(block)
+    return written
+
+
+def read_lines(filepath, backend, mode, threads, buffer_size):
+    lines = 0
+    start = time.perf_counter()
+    with decompression.open_gzip(filepath, mode, backend=backend, threads=threads,
+                                 buffer_size=buffer_size) as f:
+        for _ in f:
+            lines += 1
+    return time.perf_counter() - start, lines
+
+
+@click.command(help="Benchmark the gzip decompression backends on a synthetic file.")
+@click.option('--size-mb', default=2048, help="Uncompressed size of the synthetic file (MB).")
+@click.option('--threads', default=4, help="Threads of the external decompressors.")
+@click.option('--buffer-size', default=decompression.DEFAULT_BUFFER_SIZE, help="Read buffer (bytes).")
+@click.option('--file', 'filepath', type=click.Path(), default=None,
+              help="Use this gzip file instead of a synthetic one.")
+@click.option('--keep/--no-keep', default=False, help="Keep the synthetic file.")
+def main(size_mb, threads, buffer_size, filepath, keep):
+    tmp_dir = None
+    if filepath is None:
+        tmp_dir = tempfile.mkdtemp(prefix="decompression-benchmark-")
+        filepath = os.path.join(tmp_dir, "synthetic.links.txt.gz")
+        start = time.perf_counter()
+        size = make_file(filepath, size_mb)
+        click.echo("Synthetic file %s: %.0f MB uncompressed, %.0f MB compressed (%.1f s)" % (
+            filepath, size / 2**20, os.path.getsize(filepath) / 2**20, time.perf_counter() - start))
+        size_mb = size / 2**20
+    else:
+        with gzip.open(filepath, 'rb') as f:
+            size_mb = sum(len(chunk) for chunk in iter(lambda: f.read(2**20), b'')) / 2**20
+
+    click.echo("%-10s %-5s %10s %10s %12s" % ("backend", "mode", "seconds", "MB/s", "lines"))
+    try:
+        for backend in decompression.available_backends():
+            for mode in ('rb', 'rt'):
+                seconds, lines = read_lines(filepath, backend, mode, threads, buffer_size)
+                click.echo("%-10s %-5s %10.2f %10.1f %12d" % (
+                    backend, mode, seconds, size_mb / seconds, lines))
+    finally:
+        if tmp_dir is not None and not keep:
+            os.remove(filepath)
+            os.rmdir(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
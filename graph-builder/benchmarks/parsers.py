@@ -0,0 +1,206 @@
+"""
+Benchmarks every database and ontology parser offline on synthetic inputs.
+
+The inputs of each parser are written by benchmarks/synthetic.py in a temporary folder, with
+the mappings of the databases and ontologies it reads, and the parser runs with download=False
+in a new process, so that its peak memory is its own. The input rows per second, the graph
+rows written and the peak memory are compared with the baselines measured at the same scale,
+and the run fails if a parser is slower or uses more memory than its baseline allows, or if it
+writes no rows (its inputs do not exercise it).
+
+    python benchmarks/parsers.py --scale 20000 UniProt STRING DO
+    python benchmarks/parsers.py --scale 20000 --save-baseline
+"""
+import os
+import sys
+import json
+import glob
+import shutil
+import tempfile
+import multiprocessing
+import click
+
+# The benchmarks run from a checkout, with or without the package installed.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import synthetic  # noqa: E402
+
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+
+def count_rows(directory):
+    """
+    Returns the number of rows (without the headers) of the graph files in a directory.
+    """
+    rows = 0
+    for filepath in glob.glob(os.path.join(directory, '**', '*.tsv'), recursive=True):
+        with open(filepath, 'rb') as f:
+            rows += max(sum(1 for _ in f) - 1, 0)
+    return rows
+
+
+def run_parser(name, database_directory, output_directory):
+    """
+    Runs the parser of a database or an ontology on the files of a database directory.
+
+    :return: Tuple with the profile of the parser (see profiles.ResourceMonitor) and the measures \
+            of its phases, if it has any.
+    """
+    from builder.databases import profiles
+    with profiles.ResourceMonitor(interval=0.05) as monitor:
+        if synthetic.is_ontology(name):
+            from builder.ontologies.ontologies_controller import Ontology
+            config = synthetic.builder_config()["ontology"]["ontologies"]
+            entity = [entity for entity, ontology in config.items() if ontology == name][0]
+            ontology = Ontology(output_directory, database_directory, download=False)
+            stats = ontology.generate_graph_files(ontologies=[entity], rebuild=True)
+            if not stats:
+                raise RuntimeError("Ontology %s wrote no graph files" % name)
+            phases = {}
+        else:
+            from builder.databases.parsers import parsers
+            parser = parsers[name](output_directory, database_directory, download=False)
+            parser.build_stats()
+            phases = parser.phases.report()['phases']
+    return monitor.profile(), phases
+
+
+def _child(name, database_directory, output_directory, queue):
+    import logging
+    logging.getLogger('root').setLevel(logging.WARNING)
+    try:
+        queue.put(run_parser(name, database_directory, output_directory))
+    except Exception as err:
+        queue.put(err)
+
+
+def _measure(name, database_directory, output_directory):
+    shutil.rmtree(output_directory, ignore_errors=True)
+    os.makedirs(output_directory)
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_child, args=(name, database_directory, output_directory, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def benchmark(name, scale, seed=0, runs=3, keep=None):
+    """
+    Generates the synthetic inputs of a parser and measures it in new processes.
+
+    :param str name: database or ontology name.
+    :param int scale: approximate number of rows of the main input file.
+    :param int seed: seed of the generators.
+    :param int runs: number of runs of the parser, the best time and memory are kept.
+    :param str keep: folder where the inputs and outputs are kept, instead of a temporary one.
+    :return: Dictionary with the rows read and written, the time and the peak memory.
+    """
+    directory = keep or tempfile.mkdtemp(prefix='benchmark-%s-' % name)
+    database_directory = os.path.join(directory, 'databases')
+    output_directory = os.path.join(directory, 'imports')
+    try:
+        rows_in = synthetic.generate(name, database_directory, scale, seed)
+        measures = [_measure(name, database_directory, output_directory) for _ in range(runs)]
+        profile, phases = min(measures, key=lambda measure: measure[0]['wall_seconds'])
+        wall_seconds = profile['wall_seconds']
+        rows_out = count_rows(output_directory)
+        if rows_out == 0:
+            raise RuntimeError("%s wrote no rows from %d input rows" % (name, rows_in))
+        return {'scale': scale,
+                'rows_in': rows_in,
+                'rows_out': rows_out,
+                'wall_seconds': wall_seconds,
+                'cpu_seconds': profile['cpu_seconds'],
+                'peak_rss': min(measure[0]['peak_rss'] for measure in measures),
+                'rows_per_second': round(rows_in / wall_seconds, 1) if wall_seconds else None,
+                'phases': phases}
+    finally:
+        if keep is None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def load_baselines(filepath):
+    if not os.path.isfile(filepath):
+        return {}
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+
+def save_baselines(filepath, baselines):
+    with open(filepath, 'w') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def regressions(result, baseline, tolerance):
+    """
+    Returns the measures of a parser worse than its baseline by more than the tolerance.
+
+    :param dict result: measures of the parser (see benchmark).
+    :param dict baseline: measures of the parser at the same scale.
+    :param float tolerance: allowed relative loss (e.g. 0.2 for 20%).
+    """
+    failures = []
+    if baseline.get('rows_per_second') and result['rows_per_second'] is not None \
+            and result['rows_per_second'] < baseline['rows_per_second'] * (1 - tolerance):
+        failures.append("%.0f rows/s, baseline %.0f" % (result['rows_per_second'], baseline['rows_per_second']))
+    if baseline.get('peak_rss') and result['peak_rss'] > baseline['peak_rss'] * (1 + tolerance):
+        failures.append("%.0f MB, baseline %.0f MB" % (result['peak_rss'] / 1024 ** 2, baseline['peak_rss'] / 1024 ** 2))
+    if baseline.get('rows_out') is not None and result['rows_out'] != baseline['rows_out']:
+        failures.append("%d rows written, baseline %d" % (result['rows_out'], baseline['rows_out']))
+    return failures
+
+
+@click.command(help="Benchmark the parsers offline on synthetic inputs.")
+@click.argument('names', nargs=-1)
+@click.option('--scale', default=10000, help="Approximate number of rows of the main file of each source.")
+@click.option('--seed', default=0, help="Seed of the generators.")
+@click.option('--runs', default=3, help="Runs of each parser, the best one is compared with the baseline.")
+@click.option('--baseline', default=BASELINE_FILE, type=click.Path(), help="File of the baselines.")
+@click.option('--save-baseline', is_flag=True, help="Store the measures as the baselines of this scale.")
+@click.option('--tolerance', default=0.3, help="Allowed relative loss of throughput and memory.")
+@click.option('--keep', default=None, type=click.Path(), help="Keep the inputs and outputs in this folder.")
+def main(names, scale, seed, runs, baseline, save_baseline, tolerance, keep):
+    baselines = load_baselines(baseline)
+    scale_baselines = baselines.setdefault(str(scale), {})
+    failures = {}
+    click.echo("%-25s %10s %10s %10s %12s %10s  %s" % ("parser", "rows in", "rows out", "seconds", "rows/s",
+                                                       "peak MB", "baseline"))
+    for name in names or sorted(synthetic.GENERATORS):
+        if name not in synthetic.GENERATORS:
+            raise click.BadParameter("No synthetic inputs for %s" % name)
+        try:
+            result = benchmark(name, scale, seed, runs, keep=os.path.join(keep, name) if keep else None)
+        except Exception as err:
+            failures[name] = ["failed: %s" % err]
+            click.echo("%-25s FAILED: %s" % (name, err))
+            continue
+        reference = scale_baselines.get(name)
+        if reference:
+            issues = regressions(result, reference, tolerance)
+            if issues:
+                failures[name] = issues
+            comparison = "; ".join(issues) or "ok (%.0f rows/s)" % (reference.get('rows_per_second') or 0)
+        else:
+            comparison = "-"
+        click.echo("%-25s %10d %10d %10.2f %12.0f %10.0f  %s" % (
+            name, result['rows_in'], result['rows_out'], result['wall_seconds'], result['rows_per_second'] or 0,
+            result['peak_rss'] / 1024 ** 2, comparison))
+        if save_baseline:
+            scale_baselines[name] = {key: value for key, value in result.items() if key != 'phases'}
+    if save_baseline:
+        save_baselines(baseline, baselines)
+        click.echo("Baselines saved in %s" % baseline)
+    for name, issues in failures.items():
+        click.echo("REGRESSION %s: %s" % (name, "; ".join(issues)), err=True)
+    if failures and not save_baseline:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Measures the startup time of the graph builder command line.
+
+`python -X importtime -c "import builder"` is run several times in fresh interpreters. The
+best total import time is reported with the slowest modules, and the run fails if it
+exceeds --max-ms or if a heavy dependency (pandas, Bio, ...) is imported at startup, so
+that a module importing a parser or a dependency at its top is noticed.
+
+    python benchmarks/startup.py --runs 5 --max-ms 300
+"""
+import os
+import sys
+import time
+import subprocess
+import click
+
+
+# Dependencies only needed once a parser or an ontology runs.
+HEAVY_MODULES = ('pandas', 'numpy', 'Bio', 'lxml', 'obonet', 'networkx', 'requests', 'joblib')
+
+
+def import_times(module):
+    """
+    Imports a module in a new interpreter with -X importtime.
+
+    :param str module: module to import.
+    :return: Dictionary of cumulative import times (microseconds) by module name.
+    """
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import %s' % module],
+                            stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            universal_newlines=True).stderr
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        try:
+            times[name.strip()] = int(cumulative)
+        except ValueError:
+            # Header line.
+            continue
+    return times
+
+
+def command_time(args):
+    """
+    Returns the seconds taken by a command of the builder, e.g. --help.
+    """
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'from builder import knowledge_graph; knowledge_graph()'] + list(args),
+                   stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL, check=True,
+                   cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return time.perf_counter() - start
+
+
+@click.command(help="Benchmark the import time of the graph builder.")
+@click.option('--module', default='builder', help="Module to import.")
+@click.option('--runs', default=5, help="Number of fresh interpreters.")
+@click.option('--top', default=10, help="Number of slowest modules to show.")
+@click.option('--max-ms', type=float, default=None, help="Fail if the best import time is higher (ms).")
+@click.option('--command/--no-command', default=True, help="Also time `graph-builder --help`.")
+def main(module, runs, top, max_ms, command):
+    best = None
+    for _ in range(runs):
+        times = import_times(module)
+        if best is None or times.get(module, 0) < best.get(module, 0):
+            best = times
+    total_ms = best.get(module, 0) / 1000
+
+    click.echo("import %s: %.1f ms (best of %d)" % (module, total_ms, runs))
+    click.echo("%-50s %10s" % ("module", "ms"))
+    for name, cumulative in sorted(best.items(), key=lambda item: -item[1])[1:top + 1]:
+        click.echo("%-50s %10.1f" % (name, cumulative / 1000))
+
+    if command:
+        seconds = min(command_time(['--help']) for _ in range(runs))
+        click.echo("graph-builder --help: %.1f ms (best of %d)" % (seconds * 1000, runs))
+
+    failures = []
+    heavy = sorted(name for name in best if name in HEAVY_MODULES)
+    if heavy:
+        failures.append("heavy dependencies imported at startup: %s" % ", ".join(heavy))
+    if max_ms is not None and total_ms > max_ms:
+        failures.append("import time %.1f ms is higher than %.1f ms" % (total_ms, max_ms))
+    for failure in failures:
+        click.echo("FAILED: %s" % failure, err=True)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,957 @@
+"""
+Deterministic generators of synthetic input files for every database and ontology parser.
+
+Each generator writes, in the folder of a database (or ontology) under a database directory,
+files with the names, the layout and the columns the parser reads from the real downloads,
+filled with identifiers drawn from a shared Universe so that the mappings of the other
+databases match a realistic fraction of the rows. The same name, scale and seed always give
+the same files.
+
+    python benchmarks/synthetic.py --scale 100000 --output /tmp/synthetic UniProt STRING DO
+"""
+import io
+import os
+import gzip
+import random
+import tarfile
+import zipfile
+import sys
+import click
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import builder  # noqa: E402
+
+
+# Generators by database/ontology name, see generator().
+GENERATORS = {}
+
+AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+THREE_LETTERS = ["Ala", "Cys", "Asp", "Glu", "Phe", "Gly", "His", "Ile", "Lys", "Leu",
+                 "Met", "Asn", "Pro", "Gln", "Arg", "Ser", "Thr", "Val", "Trp", "Tyr"]
+
+
+def builder_config():
+    config_dir = os.path.dirname(os.path.abspath(builder.__file__))
+    with open(os.path.join(config_dir, "config.yml"), 'r') as f:
+        return yaml.safe_load(f)
+
+
+class Universe:
+    """
+    Identifiers shared by the generators: the proteins of the UniProt files are the ones
+    targeted by the drugs of DrugBank, found in the pathways of Reactome and so on.
+
+    The number of identifiers grows with the square root of the scale, so that larger
+    inputs have more rows per identifier, as the real files do.
+    """
+
+    def __init__(self, scale, seed=0) -> None:
+        self.scale = scale
+        self.seed = seed
+        n = max(50, int(scale ** 0.5) * 4)
+        self.n = n
+        self.proteins = ["P%05d" % i for i in range(n)]
+        self.genes = ["GENE%d" % i for i in range(n)]
+        self.ensembl_genes = ["ENSG%011d" % i for i in range(n)]
+        self.ensembl_proteins = ["ENSP%011d" % i for i in range(n)]
+        self.drugs = ["DB%05d" % i for i in range(n)]
+        self.chemicals = ["CIDm%08d" % i for i in range(n)]
+        self.metabolites = ["HMDB%07d" % i for i in range(n)]
+        self.foods = ["FOOD%05d" % i for i in range(n)]
+        self.pathways = ["R-HSA-%d" % i for i in range(n)]
+        self.smpdb = ["SMP%07d" % i for i in range(n)]
+        self.pubmed = [str(10000000 + i) for i in range(n * 4)]
+
+    def rng(self, name):
+        """
+        Returns the random generator of a generator, independent of the other generators.
+        """
+        return random.Random("%s-%s-%s" % (self.seed, self.scale, name))
+
+    def ontology_terms(self, ontology, count=None):
+        """
+        Returns the (identifier, name) of the terms of an ontology.
+
+        :param str ontology: ontology acronym (e.g. 'DO').
+        :param int count: number of terms, the shared ones first (default: as many as proteins).
+        """
+        prefixes = {'DO': 'DOID:%d', 'BTO': 'BTO:%07d', 'HPO': 'HP:%07d', 'GO': 'GO:%07d',
+                    'PSI-MS': 'MS:%07d', 'PSI-MOD': 'MOD:%05d', 'PSI-MI': 'MI:%04d',
+                    'EFO': 'EFO:%07d', 'UO': 'UO:%07d', 'ExO': 'ExO:%07d', 'SNOMED-CT': '%d'}
+        names = {'DO': 'disease', 'BTO': 'tissue', 'HPO': 'phenotype', 'GO': 'process',
+                 'PSI-MS': 'instrument', 'PSI-MOD': 'modification', 'PSI-MI': 'interaction',
+                 'EFO': 'factor', 'UO': 'unit', 'ExO': 'exposure', 'SNOMED-CT': 'finding'}
+        start = 100000 if ontology == 'SNOMED-CT' else 1
+        return [(prefixes[ontology] % (start + i), "%s %d" % (names[ontology], i)) for i in range(count or self.n)]
+
+
+def generator(name):
+    """
+    Registers a function writing the input files of a database or an ontology.
+
+    The function is called with the folder of the database directory, the Universe and a
+    random generator, and returns the number of input rows it wrote.
+    """
+    def register(function):
+        GENERATORS[name] = function
+        return function
+    return register
+
+
+def _lines(rows):
+    return "".join("\t".join(str(value) for value in row) + "\n" for row in rows)
+
+
+def _csv_value(value):
+    value = str(value)
+    return '"%s"' % value.replace('"', '""') if ',' in value or '"' in value else value
+
+
+def _csv(rows):
+    return "".join(",".join(_csv_value(value) for value in row) + "\n" for row in rows)
+
+
+def write_text(filepath, text, compress=False):
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    if compress:
+        # Without the time in the gzip header, the same inputs give the same bytes.
+        with open(filepath, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=1, mtime=0) as f:
+            f.write(text.encode('utf-8'))
+    else:
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+def write_tsv(filepath, rows, header=None, compress=False):
+    write_text(filepath, _lines(([header] if header else []) + list(rows)), compress=compress)
+
+
+def write_zip(filepath, members):
+    """
+    :param dict members: content (str) of the files of the archive by name.
+    """
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with zipfile.ZipFile(filepath, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as z:
+        for name, text in members.items():
+            z.writestr(zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0)), text,
+                       compress_type=zipfile.ZIP_DEFLATED)
+
+
+def _protein_variant(rng):
+    return "%s%d%s" % (rng.choice(AMINO_ACIDS), rng.randint(1, 900), rng.choice(AMINO_ACIDS))
+
+
+def _pick_some(rng, values, k=3):
+    return rng.sample(values, rng.randint(1, k))
+
+
+def write_mappings(directory, universe, config=None):
+    """
+    Writes the complete_mapping.tsv of the sources of the entities and of the ontologies, so
+    that a parser runs without the databases and ontologies it depends on.
+
+    :param str directory: database directory.
+    :param Universe universe: shared identifiers.
+    """
+    config = config or builder_config()
+    u = universe
+    entity_aliases = {
+        "Protein": [(p, alias) for i, p in enumerate(u.proteins)
+                    for alias in (p, u.genes[i], u.ensembl_genes[i], u.ensembl_proteins[i])],
+        "Gene": [(g, g.lower()) for g in u.genes],
+        "Drug": [(d, alias) for i, d in enumerate(u.drugs) for alias in (d.lower(), "drug%d" % i, "chembl:chembl%d" % i)],
+        "Metabolite": [(m, alias) for i, m in enumerate(u.metabolites) for alias in (m, str(i), "metabolite %d" % i)],
+        "Food": [(f, alias) for i, f in enumerate(u.foods) for alias in ("food %d" % i, "Food %d" % i)],
+        "Pathway": [(p, p) for p in u.pathways],
+    }
+    for entity, source in config["database"]["sources"].items():
+        if entity in entity_aliases:
+            write_tsv(os.path.join(directory, source, "complete_mapping.tsv"), entity_aliases[entity])
+    for ontology in config["ontology"]["ontologies"].values():
+        rows = []
+        for identifier, name in u.ontology_terms(ontology):
+            rows.append((identifier, "NAME", name))
+            rows.append((identifier, "SYN", name.upper()))
+            if ontology == 'HPO':
+                rows.append((identifier, "UMLS", "C%07d" % int(identifier.split(':')[1])))
+            if ontology == 'DO':
+                rows.append((identifier, "OMIM", "%06d" % int(identifier.split(':')[1])))
+        write_tsv(os.path.join(directory, ontology, "complete_mapping.tsv"), rows)
+
+
+def string_aliases(directory, universe):
+    """
+    Writes the STRING protein aliases, read by STRING and JensenLab.
+    """
+    rows = [(("9606." + e), p, "BLAST_UniProt_AC Ensembl_UniProt_AC")
+            for e, p in zip(universe.ensembl_proteins, universe.proteins)]
+    rows += [(("9606." + e), g, "BioMart_HUGO") for e, g in zip(universe.ensembl_proteins, universe.genes)]
+    write_tsv(os.path.join(directory, "STRING", "9606.protein.aliases.v11.0.txt.gz"), rows,
+              header=["string_protein_id", "alias", "source"], compress=True)
+    return len(rows)
+
+
+def stitch_aliases(directory, universe):
+    """
+    Writes the STITCH chemical aliases, read by STITCH, SIDER and JensenLab, and the UniProt \
+    accessions of the proteins, which STITCH maps its links with.
+    """
+    rows = [(c, c.replace("CIDm", "CIDs"), d, "DrugBank") for c, d in zip(universe.chemicals, universe.drugs)]
+    rows += [("9606." + e, "9606." + e, p, "BLAST_UniProt_AC Ensembl_UniProt_AC")
+             for e, p in zip(universe.ensembl_proteins, universe.proteins)]
+    rows += [(c, c.replace("CIDm", "CIDs"), "chemical %d" % i, "PubChem") for i, c in enumerate(universe.chemicals)]
+    write_tsv(os.path.join(directory, "STITCH", "chemical.aliases.v5.0.tsv.gz"), rows,
+              header=["chemical", "stereo_chemical", "alias", "source"], compress=True)
+    return len(rows)
+
+
+# Databases
+
+@generator("CancerGenomeInterpreter")
+def cancer_genome_interpreter(directory, u, rng):
+    header = ["Alteration", "Alteration type", "Assay type", "Association", "Biomarker", "Curator",
+              "Drug", "Drug family", "Drug full name", "Drug status", "Drug", "Drug status", "Evidence level",
+              "Gene", "Metastatic Tumor Type", "Primary Tumor acronym", "Primary Tumor type",
+              "Source", "TCGI included", "Targeting", "cDNA", "gDNA", "individual_mutation", "info", "region"]
+    diseases = [name for _, name in u.ontology_terms('DO')]
+    rows = []
+    for i in range(u.scale):
+        gene = rng.choice(u.genes)
+        variants = ",".join(_protein_variant(rng) for _ in range(rng.randint(1, 3)))
+        rows.append([gene + ":" + variants, "MUT", "", rng.choice(["Responsive", "Resistant"]), "", "",
+                     "", "", "", "", ";".join("drug%d" % rng.randrange(u.n) for _ in range(rng.randint(1, 2))),
+                     "Approved", rng.choice(["FDA guidelines", "Clinical trials", "Pre-clinical"]), gene, "", "",
+                     ";".join(rng.sample(diseases, rng.randint(1, 2))),
+                     ";".join("PMID:%s" % rng.choice(u.pubmed) for _ in range(2)), "", "", "",
+                     "chr%d:g.%d%s>%s" % (rng.randint(1, 22), rng.randint(1, 10 ** 8), rng.choice("ACGT"), rng.choice("ACGT")),
+                     "ENST%011d:p.%s" % (rng.randrange(u.n), _protein_variant(rng)), "", ""])
+    write_zip(os.path.join(directory, "cgi_biomarkers_20180117.zip"),
+              {"cgi_biomarkers_per_variant.tsv": _lines([header] + rows)})
+    return len(rows)
+
+
+@generator("CORUM")
+def corum(directory, u, rng):
+    header = ["ComplexID", "ComplexName", "Organism", "Synonyms", "Cell line", "subunits(UniProt IDs)",
+              "subunits(Entrez IDs)", "Protein complex purification method", "GO ID", "GO description",
+              "FunCat ID", "FunCat description", "subunits(Gene name)", "Disease comment", "PubMed ID"]
+    go = [identifier for identifier, _ in u.ontology_terms('GO')]
+    rows = []
+    for i in range(u.scale):
+        rows.append([i, "complex %d" % i, rng.choice(["Human", "Human", "Mouse", "Rat"]),
+                     rng.choice(["None", "complex alias %d" % i]), "HeLa",
+                     ";".join(_pick_some(rng, u.proteins, 6)), "", ";".join(["MI:0007", "MI:0096"]),
+                     ";".join(_pick_some(rng, go)), "", "", "", "", "", rng.choice(u.pubmed)])
+    write_zip(os.path.join(directory, "allComplexes.txt.zip"), {"allComplexes.txt": _lines([header] + rows)})
+    return len(rows)
+
+
+@generator("DGIdb")
+def dgidb(directory, u, rng):
+    header = ["gene_name", "gene_claim_name", "entrez_id", "interaction_claim_source", "interaction_types",
+              "drug_claim_name", "drug_claim_primary_name", "drug_name", "drug_concept_id",
+              "interaction_group_score", "PMIDs"]
+    rows = []
+    for i in range(u.scale):
+        drug = rng.randrange(u.n)
+        rows.append([rng.choice(["", rng.choice(u.genes)]), "claim", rng.randint(1, 10 ** 5),
+                     rng.choice(["DrugBank", "ChEMBL", "TTD"]), rng.choice(["", "inhibitor", "agonist"]),
+                     "claim", rng.choice(["", "drug%d" % drug]), rng.choice(["", "DRUG%d" % drug]),
+                     "chembl:CHEMBL%d" % drug, "0.5", rng.choice(u.pubmed)])
+    write_tsv(os.path.join(directory, "interactions.tsv"), rows, header=header)
+    return len(rows)
+
+
+@generator("DisGEnet")
+def disgenet(directory, u, rng):
+    header = ["geneId", "geneSymbol", "DSI", "DPI", "diseaseId", "diseaseName", "diseaseType", "diseaseClass",
+              "diseaseSemanticType", "score", "EI", "YearInitial", "YearFinal", "NofPmids", "NofSnps", "source"]
+    umls = ["C%07d" % i for i in range(u.n)]
+    total = 0
+    for name in ("curated_gene_disease_associations.tsv.gz", "befree_gene_disease_associations.tsv.gz"):
+        rows = []
+        for i in range(u.scale // 2):
+            gene = rng.randrange(u.n)
+            rows.append([gene + 1, u.genes[gene], "0.5", "0.7", rng.choice(umls), "disease", "disease", "C04",
+                         "Neoplastic Process", "0.%02d" % rng.randint(0, 99), "1", "2001", "2019",
+                         rng.randint(0, 99), 0, rng.choice(["CTD_human", "UNIPROT", "BEFREE"])])
+        write_tsv(os.path.join(directory, name), rows, header=header, compress=True)
+        total += len(rows)
+    write_tsv(os.path.join(directory, "mapa_geneid_4_uniprot_crossref.tsv.gz"),
+              [[p, i + 1] for i, p in enumerate(u.proteins)], header=["UniProtKB", "GENEID"], compress=True)
+    write_tsv(os.path.join(directory, "disease_mappings.tsv.gz"),
+              [[c, "disease", vocabulary, c[1:].lstrip('0') or '0', "name"]
+               for c in umls for vocabulary in ("DO", "MSH")],
+              header=["diseaseId", "name", "vocabulary", "code", "vocabularyName"], compress=True)
+    return total
+
+
+def _xml_escape(text):
+    return str(text).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+@generator("DrugBank")
+def drugbank(directory, u, rng):
+    properties = ["Melting Point", "Molecular Weight", "Water Solubility", "logP"]
+    out = io.StringIO()
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n<drugbank xmlns="http://www.drugbank.ca" version="5.1">\n')
+    vocabulary = ["DrugBank ID,Accession Numbers,Common name,CAS,UNII,Synonyms,Standard InChI Key"]
+    n_drugs = max(u.n, u.scale // 20)
+    for i in range(n_drugs):
+        did = "DB%05d" % i
+        out.write('<drug type="small molecule">\n<drugbank-id primary="true">%s</drugbank-id>\n'
+                  '<drugbank-id>APRD%05d</drugbank-id>\n<name>Drug%d</name>\n' % (did, i, i))
+        out.write('<description>Synthetic drug %d &amp; its description.</description>\n' % i)
+        out.write('<groups><group>approved</group></groups>\n')
+        out.write('<indication>Indicated for disease %d.</indication>\n' % rng.randrange(u.n))
+        out.write('<mechanism-of-action>Inhibits %s.</mechanism-of-action>\n' % rng.choice(u.genes))
+        out.write('<classification><kingdom>Organic compounds</kingdom><superclass>Benzenoids</superclass>'
+                  '<class>Benzene</class><subclass>Phenols</subclass></classification>\n')
+        out.write('<general-references><articles><article><pubmed-id>%s</pubmed-id></article></articles>'
+                  '</general-references>\n' % rng.choice(u.pubmed))
+        out.write('<pathways>%s</pathways>\n' % "".join(
+            '<pathway><smpdb-id>%s</smpdb-id><name>pathway</name></pathway>' % p for p in _pick_some(rng, u.smpdb)))
+        out.write('<drug-interactions>%s</drug-interactions>\n' % "".join(
+            '<drug-interaction><drugbank-id>%s</drugbank-id><name>x</name><description>%s</description>'
+            '</drug-interaction>' % (d, "May increase the effect of %s." % d) for d in _pick_some(rng, u.drugs, 10)))
+        out.write('<experimental-properties>%s</experimental-properties>\n' % "".join(
+            '<property><kind>%s</kind><value>%.2f</value><source></source></property>' % (p, rng.random() * 100)
+            for p in properties))
+        out.write('<external-identifiers><external-identifier><resource>ChEBI</resource><identifier>%d</identifier>'
+                  '</external-identifier></external-identifiers>\n' % i)
+        out.write('<targets>%s</targets>\n' % "".join(
+            '<target><id>BE%07d</id><name>target</name><polypeptide id="%s" source="Swiss-Prot">'
+            '<external-identifiers><external-identifier><resource>UniProtKB</resource><identifier>%s</identifier>'
+            '</external-identifier></external-identifiers></polypeptide></target>' % (rng.randrange(10 ** 6), p, p)
+            for p in _pick_some(rng, u.proteins, 4)))
+        out.write('</drug>\n')
+        vocabulary.append("%s,APRD%05d,Drug%d,,,drug %d alias,KEY%d" % (did, i, i, i, i))
+    out.write('</drugbank>\n')
+    write_zip(os.path.join(directory, "drugbank_all_full_database.xml.zip"), {"full database.xml": out.getvalue()})
+    write_zip(os.path.join(directory, "drugbank_all_drugbank_vocabulary.csv.zip"),
+              {"drugbank vocabulary.csv": "\n".join(vocabulary) + "\n"})
+    return n_drugs
+
+
+@generator("ExposomeExplorer")
+def exposome_explorer(directory, u, rng):
+    biomarkers = [["id", "name"] + ["c%d" % i for i in range(2, 11)]]
+    for i in range(u.n):
+        biomarkers.append([i, "biomarker %d" % i] + [""] * 8 + [rng.choice(u.metabolites)])
+    correlations = [["c%d" % i for i in range(38)]]
+    for i in range(u.scale):
+        row = [""] * 38
+        row[0] = rng.randrange(u.n)
+        row[9] = "Food %d" % rng.randrange(u.n)
+        row[14], row[15] = "%.1f" % (rng.random() * 100), "g/d"
+        row[18], row[19] = "Plasma", "HPLC"
+        row[29] = "%.2f" % (rng.random() * 2 - 1)
+        row[30], row[31], row[32] = "0.1", "0.5", "0.01"
+        row[33] = rng.choice(["Yes", "No"])
+        row[37] = rng.choice(u.pubmed)
+        correlations.append(row)
+    write_zip(os.path.join(directory, "biomarkers.csv.zip"), {"biomarkers.csv": _csv(biomarkers)})
+    write_zip(os.path.join(directory, "correlations.csv.zip"), {"correlations.csv": _csv(correlations)})
+    return len(correlations) - 1
+
+
+@generator("FooDB")
+def foodb(directory, u, rng):
+    rows = [["id", "name", "name_scientific", "description"] + ["c%d" % i for i in range(4, 23)]]
+    for i in range(u.scale):
+        row = [i, "Food %d" % i, "Species %d" % i, 'Description of food %d' % i] + [""] * 19
+        row[11], row[12] = rng.choice(["Vegetables", "Fruits", "Herbs"]), "Cabbages"
+        row[22] = "FOOD%05d" % i
+        rows.append(row)
+    members = {"./foodb_2020_04_07_csv/Food.csv": _csv(rows)}
+    filepath = os.path.join(directory, "foodb_2020_4_7_csv.tar.gz")
+    os.makedirs(directory, exist_ok=True)
+    with open(filepath, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=1, mtime=0) as compressed, \
+            tarfile.open(fileobj=compressed, mode='w') as tar:
+        # The parser reads the files in the second member, the folder of the archive.
+        for name in (".", "./foodb_2020_04_07_csv"):
+            info = tarfile.TarInfo(name)
+            info.type = tarfile.DIRTYPE
+            info.mode = 0o755
+            tar.addfile(info)
+        for name, text in members.items():
+            data = text.encode('utf-8')
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return len(rows) - 1
+
+
+@generator("GWASCatalog")
+def gwas_catalog(directory, u, rng):
+    efo = [identifier for identifier, _ in u.ontology_terms('EFO')]
+    rows = []
+    for i in range(u.scale):
+        row = ["g%d" % j for j in range(38)]
+        row[1] = rng.choice(["", rng.choice(u.pubmed)])
+        row[20] = rng.choice(["", "rs%d-A" % rng.randint(1, 10 ** 7), "rs%d" % rng.randint(1, 10 ** 7)])
+        row[35] = rng.choice(["", "http://www.ebi.ac.uk/efo/" + rng.choice(efo).replace(':', '_')])
+        row[36] = "GCST%06d" % rng.randint(1, u.n)
+        rows.append(row)
+    write_tsv(os.path.join(directory, "alternative"), rows, header=["H%d" % i for i in range(38)])
+    return len(rows)
+
+
+@generator("HGNC_MGI")
+def hgnc_mgi(directory, u, rng):
+    hgnc = []
+    for i in range(u.scale):
+        row = [""] * 24
+        row[0], row[1], row[2] = "HGNC:%d" % i, "SYM%d" % i, "gene %d" % i
+        row[5] = rng.choice(["Approved", "Approved", "Entry Withdrawn"])
+        row[12] = "family %d" % rng.randrange(50)
+        row[18], row[19], row[20] = str(i + 1), "ENSG%011d" % i, "uc%06d" % i
+        hgnc.append(row)
+    write_tsv(os.path.join(directory, "hgnc_complete_set.txt"), hgnc, header=["c%d" % i for i in range(24)])
+    mgi_header = ["1. MGI accession id", "2. marker type", "3. marker symbol", "4. marker name", "5. genome build",
+                  "6. Entrez gene id", "7. NCBI gene chromosome", "8. NCBI gene start", "9. NCBI gene end",
+                  "10. NCBI gene strand", "11. Ensembl gene id", "12. Ensembl gene chromosome",
+                  "13. Ensembl gene start", "14. Ensembl gene end", "15. Ensembl gene strand"]
+    mgi = []
+    for i in range(u.scale // 2):
+        start = rng.randint(1, 10 ** 8)
+        mgi.append(["MGI:%d" % i, "Gene", "Sym%d" % i, "gene %d" % i, "GRCm39", rng.choice(["", str(i + 1)]),
+                    rng.randint(1, 19), start, start + 1000, rng.choice("+-"),
+                    rng.choice(["", "ENSMUSG%011d" % i]), "", "", "", ""])
+    write_tsv(os.path.join(directory, "MGI_Gene_Model_Coord.rpt"), mgi, header=mgi_header)
+    return len(hgnc) + len(mgi)
+
+
+@generator("HMDB")
+def hmdb(directory, u, rng):
+    tissues = [name for _, name in u.ontology_terms('BTO')]
+    out = io.StringIO()
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n<hmdb xmlns="http://www.hmdb.ca">\n')
+    n_metabolites = max(u.n, u.scale // 10)
+    for i in range(n_metabolites):
+        out.write('<metabolite>\n<version>5.0</version>\n<accession>HMDB%07d</accession>\n'
+                  '<status>quantified</status>\n<name>Metabolite %d</name>\n' % (i, i))
+        out.write('<description>Synthetic metabolite %d.</description>\n' % i)
+        out.write('<synonyms>%s</synonyms>\n' % "".join(
+            '<synonym>metabolite %d alias %d</synonym>' % (i, j) for j in range(3)))
+        out.write('<chemical_formula>C6H12O6</chemical_formula>\n<average_molecular_weight>180.16'
+                  '</average_molecular_weight>\n<monoisotopic_molecular_weight>180.06</monoisotopic_molecular_weight>\n')
+        out.write('<taxonomy><direct_parent>Hexoses</direct_parent><kingdom>Organic compounds</kingdom>'
+                  '<super_class>Organic oxygen compounds</super_class><class>Carbohydrates</class>'
+                  '<sub_class>Monosaccharides</sub_class></taxonomy>\n')
+        out.write('<cellular_locations>%s</cellular_locations>\n' % "".join(
+            '<cellular_location>%s</cellular_location>' % c for c in _pick_some(rng, ["Cytoplasm", "Membrane", "Nucleus"])))
+        out.write('<biofluid_locations>%s</biofluid_locations>\n' % "".join(
+            '<biofluid>%s</biofluid>' % c for c in _pick_some(rng, ["Blood", "Urine", "Saliva"])))
+        out.write('<tissue_locations>%s</tissue_locations>\n' % "".join(
+            '<tissue>%s</tissue>' % t for t in _pick_some(rng, tissues)))
+        out.write('<pathways>%s</pathways>\n' % "".join(
+            '<pathway><name>pathway</name><smpdb_id>%s</smpdb_id><kegg_map_id></kegg_map_id></pathway>' % p
+            for p in _pick_some(rng, u.smpdb)))
+        out.write('<diseases>%s</diseases>\n' % "".join(
+            '<disease><name>disease</name><omim_id>%06d</omim_id><references><reference><pubmed_id>%s</pubmed_id>'
+            '</reference></references></disease>' % (rng.randint(1, u.n), rng.choice(u.pubmed)) for _ in range(2)))
+        out.write('<general_references>%s</general_references>\n' % "".join(
+            '<reference><reference_text>ref</reference_text><pubmed_id>%s</pubmed_id></reference>' % p
+            for p in _pick_some(rng, u.pubmed, 5)))
+        out.write('<protein_associations>%s</protein_associations>\n' % "".join(
+            '<protein><protein_accession>HMDBP%05d</protein_accession><name>protein</name><uniprot_id>%s</uniprot_id>'
+            '<gene_name>%s</gene_name><protein_type>Enzyme</protein_type></protein>' % (j, p, p)
+            for j, p in enumerate(_pick_some(rng, u.proteins, 5))))
+        out.write('<chebi_id>%d</chebi_id>\n<pubchem_compound_id>%d</pubchem_compound_id>\n</metabolite>\n' % (i, i))
+    out.write('</hmdb>\n')
+    write_zip(os.path.join(directory, "hmdb_metabolites.zip"), {"hmdb_metabolites.xml": out.getvalue()})
+    return n_metabolites
+
+
+@generator("HPA")
+def hpa(directory, u, rng):
+    diseases = [name for _, name in u.ontology_terms('DO')]
+    rows = [["Gene", "Gene name", "Cancer", "High", "Medium", "Low", "Not detected",
+             "prognostic - favorable", "unprognostic - favorable", "prognostic - unfavorable",
+             "unprognostic - unfavorable"]]
+    for i in range(u.scale):
+        gene = rng.randrange(u.n)
+        rows.append([u.ensembl_genes[gene], u.genes[gene], rng.choice(diseases), rng.randint(0, 12),
+                     rng.randint(0, 12), rng.randint(0, 12), rng.randint(0, 12),
+                     rng.choice(["", "%.2e" % rng.random()]), rng.choice(["", "%.2e" % rng.random()]),
+                     rng.choice(["", "%.2e" % rng.random()]), rng.choice(["", "%.2e" % rng.random()])])
+    write_zip(os.path.join(directory, "pathology.tsv.zip"), {"pathology.tsv": _lines(rows)})
+    return len(rows) - 1
+
+
+@generator("IntAct")
+def intact(directory, u, rng):
+    rows = []
+    for i in range(u.scale):
+        rows.append(["uniprotkb:" + rng.choice(u.proteins),
+                     rng.choice(["uniprotkb:" + rng.choice(u.proteins), "chebi:\"CHEBI:%d\"" % rng.randrange(u.n)]),
+                     "-", "-", "-", "-", rng.choice(['psi-mi:"MI:0018"(two hybrid)', 'psi-mi:"MI:0096"(pull down)']),
+                     "author et al. (2001)", "pubmed:%s|imex:IM-%d" % (rng.choice(u.pubmed), i),
+                     rng.choice(["taxid:9606(human)|taxid:9606(Homo sapiens)", "taxid:10090(mouse)"]),
+                     rng.choice(["taxid:9606(human)", "taxid:7227(drome)"]),
+                     rng.choice(['psi-mi:"MI:0915"(physical association)', 'psi-mi:"MI:0407"(direct interaction)']),
+                     'psi-mi:"MI:0469"(IntAct)', "intact:EBI-%d" % i,
+                     "intact-miscore:0.%02d" % rng.randint(0, 99)])
+    write_tsv(os.path.join(directory, "intact.txt"), rows, header=["#ID(s) interactor A"] + ["h%d" % i for i in range(14)])
+    return len(rows)
+
+
+@generator("JensenLab")
+def jensenlab(directory, u, rng):
+    textmining = os.path.join(directory, "textmining")
+    integration = os.path.join(directory, "integration")
+    database_directory = os.path.dirname(directory)
+    string_aliases(database_directory, u)
+    stitch_aliases(database_directory, u)
+    pmc = [["Journal Title", "ISSN", "eISSN", "Year", "Volume", "Issue", "Page", "DOI", "PMCID", "PMID",
+            "Manuscript Id", "Release Date"]]
+    for pubmed in u.pubmed:
+        pmc.append(["Journal %d" % rng.randrange(100), "1234-5678", "", rng.randint(1990, 2020), 1, 2,
+                    "e%d" % rng.randrange(1000), "10.1000/%s" % pubmed, "PMC%s" % pubmed, pubmed, "", "live"])
+    write_text(os.path.join(textmining, "PMC-ids.csv.gz"), _csv(pmc), compress=True)
+    write_tsv(os.path.join(textmining, "organism_textmining_mentions.tsv"),
+              [["9606", " ".join(u.pubmed[::2])], ["10090", " ".join(u.pubmed[1::2])]])
+    entities = {"-26": [i for i, _ in u.ontology_terms('DO')], "-25": [i for i, _ in u.ontology_terms('BTO')],
+                "-23": [i for i, _ in u.ontology_terms('GO')], "9606": u.ensembl_proteins, "-1": u.chemicals}
+    files = {"-26": "disease", "-25": "tissue", "-23": "compartment", "9606": "human", "-1": "chemical"}
+    rows = 0
+    for qtype, name in files.items():
+        mentions = [[e, " ".join(_pick_some(rng, u.pubmed, 8))] for e in entities[qtype]]
+        write_tsv(os.path.join(textmining, "%s_textmining_mentions.tsv" % name), mentions)
+        rows += len(mentions)
+    for qtype in ("-26", "-25", "-23"):
+        pairs = []
+        for i in range(u.scale // 3):
+            protein = rng.randrange(u.n)
+            pairs.append([u.ensembl_proteins[protein], u.genes[protein], rng.choice(entities[qtype]), "name",
+                          "%.3f" % (rng.random() * 5)])
+        write_tsv(os.path.join(integration, "human_%s_integrated_full.tsv" % files[qtype]), pairs)
+        rows += len(pairs)
+    return rows
+
+
+@generator("MutationDs")
+def mutationds(directory, u, rng):
+    rows = []
+    for i in range(u.scale):
+        protein = rng.choice(u.proteins)
+        row = ["EBI-%d" % rng.randrange(u.n), "%s:p.%s%d%s" % (protein, rng.choice(THREE_LETTERS), rng.randint(1, 900),
+                                                           rng.choice(THREE_LETTERS)),
+               "a", "b", "c", rng.choice(["decreasing(MI:0382)", "increasing(MI:0382)"]), "d", "e", "f", "g",
+               rng.choice(["9606 - Homo sapiens", "10090 - Mus musculus"]),
+               "uniprotkb:%s(protein)|uniprotkb:%s(x)" % (protein, rng.choice(u.proteins))]
+        if rng.random() < 0.9:
+            row.append(rng.choice(["MI:0117", ""]))
+        rows.append(row)
+    write_tsv(os.path.join(directory, "mutations.tsv"), rows, header=["h%d" % i for i in range(13)])
+    return len(rows)
+
+
+@generator("OncoKB")
+def oncokb(directory, u, rng):
+    diseases = [name for _, name in u.ontology_terms('DO')]
+    annotated = [["#Isoform", "RefSeq", "Entrez Gene ID", "Hugo Symbol", "Alteration", "Protein Change",
+                  "Oncogenicity", "Mutation Effect", "PMIDs for Mutation Effect"]]
+    actionable = [["Isoform", "RefSeq", "Entrez Gene ID", "Hugo Symbol", "Alteration", "Protein Change",
+                   "Cancer Type", "Level", "Drugs(s)", "PMIDs for drug", "Abstracts for drug"]]
+    annotated = annotated[:1] + [["ENST%011d" % i, "NM_%d" % i, i, rng.choice(u.genes), "", _protein_variant(rng),
+                                  rng.choice(["Oncogenic", "Likely Oncogenic"]), "Gain-of-function", rng.choice(u.pubmed)]
+                                 for i in range(u.scale)]
+    for i in range(u.scale // 4):
+        drugs = ", ".join(" + ".join("drug%d" % rng.randrange(u.n) for _ in range(rng.randint(1, 2)))
+                          for _ in range(rng.randint(1, 3)))
+        actionable.append(["ENST%011d" % i, "NM_%d" % i, i, rng.choice(u.genes), "", _protein_variant(rng),
+                           rng.choice(diseases), rng.choice(["1", "2A", "3A"]), drugs,
+                           ",".join(_pick_some(rng, u.pubmed)), ""])
+    write_tsv(os.path.join(directory, "allAnnotatedVariants.txt"), annotated)
+    write_tsv(os.path.join(directory, "allActionableVariants.txt"), actionable)
+    return len(annotated) + len(actionable) - 2
+
+
+@generator("PathwayCommons")
+def pathway_commons(directory, u, rng):
+    rows = []
+    for i in range(u.scale // 10 or 1):
+        rows.append(["http://pathwaycommons.org/pc2/Pathway_%d" % i,
+                     "name: pathway %d; datasource: %s; organism: %s; idtype: uniprot" % (
+                         i, rng.choice(["reactome", "kegg", "panther"]), rng.choice(["9606", "9606", "10090", "7227"]))]
+                    + _pick_some(rng, u.proteins, 20))
+    write_tsv(os.path.join(directory, "PathwayCommons9.All.uniprot.gmt.gz"), rows, compress=True)
+    return len(rows)
+
+
+@generator("Pfam")
+def pfam(directory, u, rng):
+    out = io.StringIO()
+    # At least 100 families: the parser writes its files by batches of 100 families.
+    n_families = max(150, u.scale // 20)
+    rows = 0
+    for i in range(n_families):
+        out.write("# STOCKHOLM 1.0\n#=GF ID   Family_%d\n#=GF AC   PF%05d.%d\n#=GF DE   Family %d domain\n"
+                  "#=GF RM   %s\n#=GF CC   Synthetic family %d.\n" % (i, i, rng.randint(1, 20), i, rng.choice(u.pubmed), i))
+        for _ in range(20):
+            start = rng.randint(1, 500)
+            protein = rng.choice(u.proteins) + rng.choice(["", ".%d" % rng.randint(1, 3)])
+            out.write("%s/%d-%d    %s\n" % (protein, start, start + 40,
+                                            "".join(rng.choice(AMINO_ACIDS + ".-") for _ in range(40))))
+            rows += 1
+        out.write("//\n")
+    write_text(os.path.join(directory, "Pfam-A.full.uniprot.gz"), out.getvalue(), compress=True)
+    return rows
+
+
+def _psp_header(columns):
+    return ["Synthetic PhosphoSitePlus file", "", "Generated for benchmarks", columns]
+
+
+@generator("PhosphoSitePlus")
+def phosphositeplus(directory, u, rng):
+    modifications = {"Acetylation": "ac", "Methylation": "m1", "Phosphorylation": "p", "Sumoylation": "sm",
+                     "Ubiquitination": "ub", "O-GalNAc": "ga", "O-GlcNAc": "gl"}
+    processes = [name for _, name in u.ontology_terms('GO')]
+    diseases = [name for _, name in u.ontology_terms('DO')]
+    rows = 0
+    for name, modification in modifications.items():
+        lines = _psp_header("GENE\tPROTEIN\tACC_ID\tHU_CHR_LOC\tMOD_RSD\tSITE_GRP_ID\tORGANISM\tMW_kD\tDOMAIN\tSITE_+/-7_AA")
+        for i in range(u.scale // len(modifications)):
+            protein = rng.randrange(u.n)
+            lines.append("\t".join([u.genes[protein], "protein", u.proteins[protein], "1p36",
+                                    "%s%d-%s" % (rng.choice("STYK"), rng.randint(1, 900), modification), str(i),
+                                    rng.choice(["human", "human", "mouse"]), "50", "",
+                                    "".join(rng.choice(AMINO_ACIDS.lower()) for _ in range(15))]))
+        write_text(os.path.join(directory, "%s_site_dataset.gz" % name), "\n".join(lines) + "\n", compress=True)
+        rows += len(lines) - 4
+    kinases = _psp_header("GENE\tKINASE\tKIN_ACC_ID\tKIN_ORGANISM\tSUBSTRATE\tSUB_GENE_ID\tSUB_ACC_ID\tSUB_GENE\t"
+                          "SUB_ORGANISM\tSUB_MOD_RSD")
+    regulatory = _psp_header("\t".join("c%d" % i for i in range(16)))
+    disease = _psp_header("\t".join("c%d" % i for i in range(14)))
+    for i in range(u.scale // 4):
+        organism = rng.choice(["human", "human", "mouse"])
+        site = "%s%d" % (rng.choice("STY"), rng.randint(1, 900))
+        kinases.append("\t".join([rng.choice(u.genes), "kinase", rng.choice(u.proteins), organism, "substrate", "1",
+                                  rng.choice(u.proteins), rng.choice(u.genes), organism, site]))
+        row = [""] * 16
+        row[3], row[6], row[7] = rng.choice(u.proteins), organism, site + "-p"
+        row[11] = "molecular association, regulation"
+        row[12] = "; ".join("%s, %s" % (p, rng.choice(["induced", "inhibited"])) if rng.random() < 0.5 else p
+                            for p in _pick_some(rng, processes))
+        row[15] = rng.choice(u.pubmed)
+        regulatory.append("\t".join(row))
+        row = [""] * 14
+        row[0] = "; ".join(_pick_some(rng, diseases))
+        row[1], row[4], row[8], row[9], row[10] = "altered", rng.choice(u.proteins), organism, str(i), site + "-p"
+        row[13] = rng.choice(u.pubmed)
+        disease.append("\t".join(row))
+    write_text(os.path.join(directory, "Kinase_Substrate_Dataset.gz"), "\n".join(kinases) + "\n", compress=True)
+    write_text(os.path.join(directory, "Regulatory_sites.gz"), "\n".join(regulatory) + "\n", compress=True)
+    write_text(os.path.join(directory, "Disease-associated_sites.gz"), "\n".join(disease) + "\n", compress=True)
+    return rows + 3 * (u.scale // 4)
+
+
+@generator("Reactome")
+def reactome(directory, u, rng):
+    species = ["Homo sapiens", "Mus musculus", "Gallus gallus"]
+    pathways = [[p, "Pathway %s" % p, rng.choice(species)] for p in u.pathways]
+    write_tsv(os.path.join(directory, "ReactomePathways.txt"), pathways)
+    relations = [[rng.choice(u.pathways), rng.choice(u.pathways)] for _ in range(u.scale // 4)]
+    write_tsv(os.path.join(directory, "ReactomePathwaysRelation.txt"), relations)
+    proteins = [[rng.choice(u.proteins), "R-HSA-%d" % rng.randrange(10 ** 6), "%s [cytosol]" % rng.choice(u.genes),
+                 rng.choice(u.pathways), "https://reactome.org", "pathway", rng.choice(["TAS", "IEA"]),
+                 rng.choice(species)] for _ in range(u.scale // 2)]
+    write_tsv(os.path.join(directory, "UniProt2Reactome_PE_Pathway.txt"), proteins)
+    metabolites = [[str(rng.randrange(u.n)), "R-ALL-%d" % rng.randrange(10 ** 6),
+                    "metabolite %d [cytosol]" % rng.randrange(u.n), rng.choice(u.pathways), "https://reactome.org",
+                    "pathway", rng.choice(["TAS", "IEA"]), rng.choice(species)] for _ in range(u.scale // 4)]
+    write_tsv(os.path.join(directory, "ChEBI2Reactome_PE_Pathway.txt"), metabolites)
+    return len(pathways) + len(relations) + len(proteins) + len(metabolites)
+
+
+@generator("RefSeq")
+def refseq(directory, u, rng):
+    rows = []
+    for i in range(u.scale):
+        row = ["c%d" % j for j in range(20)]
+        row[1], row[2] = rng.choice(["mRNA", "CDS", "gene"]), "GCF_000001405.39"
+        row[5] = rng.choice(["", "chr%d" % rng.randint(1, 22)])
+        row[6] = rng.choice(["", "NC_%06d.11" % rng.randint(1, 22)])
+        row[7] = rng.randint(1, 10 ** 8)
+        row[8] = row[7] + rng.randint(100, 10000)
+        row[9] = rng.choice("+-")
+        row[10] = rng.choice(["", "NP_%06d.1" % rng.randrange(u.n)])
+        row[13] = rng.choice(["protein name", 'protein "quoted" name'])
+        row[14] = rng.choice(["", rng.choice(u.genes)])
+        rows.append(row)
+    write_tsv(os.path.join(directory, "GCF_000001405.39_GRCh38.p13_feature_table.txt.gz"), rows,
+              header=["# feature"] + ["c%d" % i for i in range(19)], compress=True)
+    return len(rows)
+
+
+@generator("SIDER")
+def sider(directory, u, rng):
+    database_directory = os.path.dirname(directory)
+    stitch_aliases(database_directory, u)
+    umls = ["C%07d" % int(identifier.split(':')[1]) for identifier, _ in u.ontology_terms('HPO')]
+    side_effects = []
+    for i in range(u.scale):
+        chemical = rng.choice(u.chemicals).replace("CIDm", "CID1")
+        concept = rng.choice(umls)
+        side_effects.append([chemical, chemical.replace("CID1", "CID0"), concept,
+                             rng.choice(["LLT", "PT"]), concept, "side effect"])
+    write_tsv(os.path.join(directory, "meddra_all_se.tsv.gz"), side_effects, compress=True)
+    indications = []
+    for i in range(u.scale // 4):
+        chemical = rng.choice(u.chemicals).replace("CIDm", "CID1")
+        concept = rng.choice(umls)
+        indications.append([chemical, concept, rng.choice(["text_mention", "NLP_indication"]), "indication",
+                            rng.choice(["LLT", "PT"]), concept, "indication"])
+    write_tsv(os.path.join(directory, "meddra_all_indications.tsv.gz"), indications, compress=True)
+    return len(side_effects) + len(indications)
+
+
+@generator("SIGNOR")
+def signor(directory, u, rng):
+    rows = []
+    for i in range(u.scale):
+        row = ["v%d" % j for j in range(28)]
+        row[2], row[6] = rng.choice(u.proteins), rng.choice(u.proteins)
+        row[8] = rng.choice(["up-regulates", "down-regulates activity", "form complex"])
+        row[9] = rng.choice(["phosphorylation", "ubiquitination", "binding"])
+        row[10] = rng.choice(["", "Ser%d" % rng.randint(1, 900), "Tyr%d" % rng.randint(1, 900)])
+        row[11] = "".join(rng.choice(AMINO_ACIDS) for _ in range(15))
+        row[12] = rng.choice(["9606", "9606", "10090", "7227"])
+        row[21] = rng.choice(["", rng.choice(u.pubmed)])
+        rows.append(row)
+    write_tsv(os.path.join(directory, "getLatestRelease.php"), rows, header=["h%d" % i for i in range(28)])
+    return len(rows)
+
+
+@generator("SMPDB")
+def smpdb(directory, u, rng):
+    pathways = [["SMPDB ID", "PW ID", "Name", "Description", "Subject"]]
+    pathways += [[p, "PW%06d" % i, "Pathway %d" % i, "Synthetic pathway %d" % i, "Metabolic"]
+                 for i, p in enumerate(u.smpdb)]
+    proteins = [["SMPDB ID", "Pathway Name", "Pathway Subject", "Uniprot ID", "Protein Name", "HMDBP ID",
+                 "DrugBank ID", "GenBank ID", "Gene Name", "Locus"]]
+    proteins += [[rng.choice(u.smpdb), "pathway", "Metabolic", rng.choice(u.proteins), "protein", "HMDBP00001",
+                  "", "", rng.choice(u.genes), "1p36"] for _ in range(u.scale // 2)]
+    metabolites = [["SMPDB ID", "Pathway Name", "Pathway Subject", "Metabolite ID", "Metabolite Name", "HMDB ID",
+                    "KEGG ID", "ChEBI ID", "DrugBank ID", "CAS", "Formula", "IUPAC", "SMILES", "InChI", "InChI Key"]]
+    metabolites += [[rng.choice(u.smpdb), "pathway", "Metabolic", "PW_C%06d" % i, "metabolite",
+                     rng.choice(u.metabolites), "C00031", "4167", rng.choice(u.drugs), "50-99-7", "C6H12O6",
+                     "glucose", "OC1OC(CO)C(O)C1O", "InChI=1S", "KEY"] for i in range(u.scale // 2)]
+    write_zip(os.path.join(directory, "smpdb_pathways.csv.zip"), {"smpdb_pathways.csv": _csv(pathways)})
+    write_zip(os.path.join(directory, "smpdb_proteins.csv.zip"), {"smpdb_proteins.csv": _csv(proteins)})
+    write_zip(os.path.join(directory, "smpdb_metabolites.csv.zip"), {"smpdb_metabolites.csv": _csv(metabolites)})
+    return len(pathways) + len(proteins) + len(metabolites) - 3
+
+
+@generator("STITCH")
+def stitch(directory, u, rng):
+    database_directory = os.path.dirname(directory)
+    rows = stitch_aliases(database_directory, u)
+    links = ["chemical protein experimental prediction database textmining combined_score"]
+    for i in range(u.scale):
+        scores = [rng.randint(0, 999) for _ in range(4)]
+        links.append("%s 9606.%s %d %d %d %d %d" % (rng.choice(u.chemicals), rng.choice(u.ensembl_proteins),
+                                                    *scores, max(scores)))
+    write_text(os.path.join(directory, "9606.protein_chemical.links.detailed.v5.0.tsv.gz"),
+               "\n".join(links) + "\n", compress=True)
+    actions = ["item_id_a\titem_id_b\tmode\taction\ta_is_acting\tscore"]
+    for i in range(u.scale // 2):
+        actions.append("%s\t9606.%s\t%s\t%s\t%s\t%d" % (
+            rng.choice(u.chemicals), rng.choice(u.ensembl_proteins), rng.choice(["activation", "inhibition", "binding"]),
+            rng.choice(["activation", "inhibition"]), rng.choice(["t", "f"]), rng.randint(150, 999)))
+    write_text(os.path.join(directory, "9606.actions.v5.0.tsv.gz"), "\n".join(actions) + "\n", compress=True)
+    return rows + len(links) + len(actions) - 2
+
+
+@generator("STRING")
+def string(directory, u, rng):
+    database_directory = os.path.dirname(directory)
+    rows = string_aliases(database_directory, u)
+    links = ["protein1 protein2 neighborhood fusion cooccurence coexpression experimental database textmining "
+             "combined_score"]
+    for i in range(u.scale):
+        scores = [rng.choice([0, rng.randint(0, 999)]) for _ in range(7)]
+        links.append("9606.%s 9606.%s %s %d" % (rng.choice(u.ensembl_proteins), rng.choice(u.ensembl_proteins),
+                                                " ".join(map(str, scores)), max(scores)))
+    write_text(os.path.join(directory, "9606.protein.links.detailed.v11.0.txt.gz"), "\n".join(links) + "\n",
+               compress=True)
+    actions = ["item_id_a\titem_id_b\tmode\taction\tis_directional\ta_is_acting\tscore"]
+    for i in range(u.scale // 2):
+        actions.append("9606.%s\t9606.%s\t%s\t%s\t%s\t%s\t%d" % (
+            rng.choice(u.ensembl_proteins), rng.choice(u.ensembl_proteins), rng.choice(["binding", "activation"]),
+            rng.choice(["activation", "inhibition"]), rng.choice(["t", "f"]), rng.choice(["t", "f"]),
+            rng.randint(150, 999)))
+    write_text(os.path.join(directory, "9606.protein.actions.v11.0.txt.gz"), "\n".join(actions) + "\n",
+               compress=True)
+    return rows + len(links) + len(actions) - 2
+
+
+@generator("UniProt")
+def uniprot(directory, u, rng):
+    n_proteins = max(u.n, u.scale // 10)
+    accessions = ["P%05d" % i for i in range(n_proteins)]
+    fasta = io.StringIO()
+    idmapping = io.StringIO()
+    for i, accession in enumerate(accessions):
+        sequence = "".join(rng.choice(AMINO_ACIDS) for _ in range(rng.randint(50, 400)))
+        fasta.write(">sp|%s|PROT%d_HUMAN Protein %d OS=Homo sapiens OX=9606 GN=GENE%d\n" % (accession, i, i, i))
+        for start in range(0, len(sequence), 60):
+            fasta.write(sequence[start:start + 60] + "\n")
+        taxid = "9606" if rng.random() < 0.9 else "10090"
+        idmapping.write("%s\tUniProtKB-ID\tPROT%d_HUMAN\n%s\tGene_Name\tGENE%d\n%s\tNCBI_TaxID\t%s\n"
+                        % (accession, i, accession, i, accession, taxid))
+        for field, value in (("RefSeq", "NP_%06d.1" % i), ("PDB", "%dXY%d" % (i % 10, i % 7)),
+                             ("STRING", "9606.ENSP%011d" % i), ("Ensembl", "ENSG%011d" % i),
+                             ("ChEMBL", "CHEMBL%d" % i), ("GeneID", str(i + 1))):
+            if rng.random() < 0.8:
+                idmapping.write("%s\t%s\t%s\n" % (accession, field, value))
+        for isoform in range(rng.choice([0, 0, 1, 2])):
+            idmapping.write("%s-%d\tUniParc\tUPI%010d\n" % (accession, isoform + 2, i))
+    write_text(os.path.join(directory, "UP000005640_9606.fasta.gz"), fasta.getvalue(), compress=True)
+    write_text(os.path.join(directory, "HUMAN_9606_idmapping.dat.gz"), idmapping.getvalue(), compress=True)
+    variants = ["This file lists the variants of the UniProtKB/Swiss-Prot human entries.", "",
+                "# Gene Name\tAC\tVariant AA Change\tSource DB ID\tConsequence Type\tClinical Significance\t"
+                "Phenotype\tPhenotype Source\tChromosome Coordinate\tGenomic Location\tBeta\tPvalue\tCytogenetic Band\t"
+                "Source",
+                "_" * 40]
+    for i in range(u.scale):
+        protein = rng.randrange(n_proteins)
+        variants.append("\t".join([
+            "GENE%d" % protein, accessions[protein],
+            "p.%s%d%s" % (rng.choice(THREE_LETTERS), rng.randint(1, 900), rng.choice(THREE_LETTERS)),
+            "rs%d" % rng.randint(1, 10 ** 8), rng.choice(["missense variant", "stop gained"]),
+            rng.choice(["Benign", "Pathogenic", "-"]), "-", "-",
+            "%d%s%d.%d" % (rng.randint(1, 22), rng.choice("pq"), rng.randint(1, 40), rng.randint(1, 9)),
+            "NC_%06d.11:g.%d%s>%s" % (rng.randint(1, 22), rng.randint(1, 10 ** 8), rng.choice("ACGT"), rng.choice("ACGT")),
+            "-", "-", "-", rng.choice(["ClinVar", "gnomAD", "TOPMed"])]))
+    write_text(os.path.join(directory, "homo_sapiens_variation.txt.gz"), "\n".join(variants) + "\n", compress=True)
+    for name in ("UP000005640_9606_nonUniquePeptides.tsv", "UP000005640_9606_uniquePeptides.tsv"):
+        peptides = [["Peptide", "Length", "Start", "End", "Missed", "Gene", "Accessions"]]
+        for i in range(u.scale // 4):
+            peptides.append(["".join(rng.choice(AMINO_ACIDS) for _ in range(rng.randint(7, 25))), 10, 1, 10, 0,
+                             "GENE", ",".join(rng.sample(accessions, 2 if "non" in name else 1))])
+        write_tsv(os.path.join(directory, name), peptides)
+    go = [identifier for identifier, _ in u.ontology_terms('GO')]
+    annotations = ["!gaf-version: 2.2", "!generated-by: benchmarks"]
+    for i in range(u.scale):
+        protein = rng.randrange(n_proteins)
+        annotations.append("\t".join(["UniProtKB", accessions[protein], "GENE%d" % protein, "enables",
+                                      rng.choice(go), "PMID:%s" % rng.choice(u.pubmed),
+                                      rng.choice(["IEA", "IDA", "TAS"]), "", rng.choice("FCP"), "protein", "",
+                                      "protein", "taxon:9606", "20200101", "UniProt", "", ""]))
+    write_text(os.path.join(directory, "goa_human.gaf.gz"), "\n".join(annotations) + "\n", compress=True)
+    return n_proteins * 2 + u.scale * 2 + u.scale // 2
+
+
+# Ontologies
+
+def obo(directory, u, rng, ontology, namespaces=None, xrefs=None):
+    """
+    Writes an OBO file with the file name the ontology controller gives to its download.
+    """
+    config = builder_config()["ontology"]
+    url = config["urls"][config["ontology_types"][ontology]][0]
+    file_name = url.split('/')[-1].replace('?', '_').replace('=', '_')
+    terms = u.ontology_terms(ontology, max(u.n, u.scale // 5))
+    out = io.StringIO()
+    out.write("format-version: 1.2\ndata-version: synthetic\nontology: %s\n\n" % ontology.lower())
+    for i, (identifier, name) in enumerate(terms):
+        out.write("[Term]\nid: %s\nname: %s\n" % (identifier, name))
+        if namespaces:
+            out.write("namespace: %s\n" % namespaces[i % len(namespaces)])
+        out.write('def: "Synthetic term %d." [PMID:%s]\n' % (i, rng.choice(u.pubmed)))
+        out.write('synonym: "%s" EXACT []\n' % name.upper())
+        for source in xrefs or []:
+            out.write("xref: %s\n" % (source % rng.randrange(u.n)))
+        if i > 0:
+            for parent in sorted({rng.randrange(i) for _ in range(rng.randint(1, 2))}):
+                out.write("is_a: %s ! %s\n" % terms[parent])
+        out.write("\n")
+    write_text(os.path.join(directory, file_name), out.getvalue())
+    return len(terms)
+
+
+def _register_obo(ontology, namespaces=None, xrefs=None):
+    GENERATORS[ontology] = lambda directory, u, rng: obo(directory, u, rng, ontology, namespaces, xrefs)
+
+
+_register_obo("DO", xrefs=["MESH:D%06d", "OMIM:%06d"])
+_register_obo("BTO")
+_register_obo("HPO", xrefs=["UMLS:C%07d"])
+_register_obo("PSI-MS")
+_register_obo("PSI-MOD")
+_register_obo("PSI-MI")
+_register_obo("GO", namespaces=["biological_process", "molecular_function", "cellular_component"])
+_register_obo("EFO", xrefs=["DOID:%d", "HP:%07d", "SNOMEDCT:%d"])
+_register_obo("UO", namespaces=["unit.ontology"])
+_register_obo("ExO", namespaces=["exposure_event", "exposure_outcome", "exposure_receptor", "exposure_stressor"],
+              xrefs=["DOID:%d"])
+
+
+@generator("SNOMED-CT")
+def snomed(directory, u, rng):
+    terminology = os.path.join(directory, "Full", "Terminology")
+    concepts = [identifier for identifier, _ in u.ontology_terms('SNOMED-CT', max(u.n, u.scale // 5))]
+    version = "INT_20200131"
+    write_tsv(os.path.join(terminology, "sct2_Concept_Full_%s.txt" % version),
+              [[c, "20200131", 1, "900000000000207008", "900000000000074008"] for c in concepts],
+              header=["id", "effectiveTime", "active", "moduleId", "definitionStatusId"])
+    description_header = ["id", "effectiveTime", "active", "moduleId", "conceptId", "languageCode", "typeId",
+                          "term", "caseSignificanceId"]
+    descriptions = [[i, "20200131", rng.choice([1, 1, 0]), "900000000000207008", c, "en", "900000000000013009",
+                     "finding %s" % c, "900000000000448009"] for i, c in enumerate(concepts * 3)]
+    write_tsv(os.path.join(terminology, "sct2_Description_Full-en_%s.txt" % version), descriptions,
+              header=description_header)
+    relationships = [[i, "20200131", rng.choice([1, 1, 0]), "900000000000207008", rng.choice(concepts),
+                      rng.choice(concepts), 0, "116680003", "900000000000011006", "900000000000451002"]
+                     for i in range(u.scale)]
+    write_tsv(os.path.join(terminology, "sct2_Relationship_Full_%s.txt" % version), relationships,
+              header=["id", "effectiveTime", "active", "moduleId", "sourceId", "destinationId", "relationshipGroup",
+                      "typeId", "characteristicTypeId", "modifierId"])
+    definitions = [[i, "20200131", 1, "900000000000207008", c, "en", "900000000000550004",
+                    'Definition of "%s"' % c, "900000000000448009"] for i, c in enumerate(concepts)]
+    write_tsv(os.path.join(terminology, "sct2_TextDefinition_Full-en_%s.txt" % version), definitions,
+              header=description_header)
+    return len(concepts) + len(descriptions) + len(relationships) + len(definitions)
+
+
+def is_ontology(name, config=None):
+    config = config or builder_config()
+    return name in config["ontology"]["ontology_types"]
+
+
+def generate(name, database_directory, scale, seed=0):
+    """
+    Writes the synthetic input files of a database or an ontology, and the mappings of the
+    other databases and ontologies it reads.
+
+    :param str name: database (e.g. 'UniProt') or ontology (e.g. 'DO') name.
+    :param str database_directory: folder of the database/ontology folders.
+    :param int scale: approximate number of rows of the main input file.
+    :param int seed: seed of the random generators.
+    :return: Number of input rows written.
+    """
+    universe = Universe(scale, seed)
+    write_mappings(database_directory, universe)
+    directory = os.path.join(database_directory, name)
+    os.makedirs(directory, exist_ok=True)
+    return GENERATORS[name](directory, universe, universe.rng(name))
+
+
+@click.command(help="Write the synthetic input files of databases and ontologies.")
+@click.argument('names', nargs=-1)
+@click.option('--output', '-o', required=True, type=click.Path(), help="Database directory to write.")
+@click.option('--scale', default=10000, help="Approximate number of rows of the main file of each source.")
+@click.option('--seed', default=0, help="Seed of the random generators.")
+def main(names, output, scale, seed):
+    for name in names or sorted(GENERATORS):
+        rows = generate(name, output, scale, seed)
+        click.echo("%-25s %10d rows" % (name, rows))
+
+
+if __name__ == "__main__":
+    main()
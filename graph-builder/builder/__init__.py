@@ -1,5 +1,7 @@
 import click
 from builder.databases.databases_controller import database
 from builder.ontologies.ontologies_controller import ontology
+from builder.downloads.downloads_controller import downloads
+from builder.pipeline.pipeline_controller import pipeline
 
-knowledge_graph = click.CommandCollection(sources=[database, ontology])
\ No newline at end of file
+knowledge_graph = click.CommandCollection(sources=[database, ontology, downloads, pipeline])
\ No newline at end of file
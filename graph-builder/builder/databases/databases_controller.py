@@ -1,11 +1,13 @@
 import os
+import time
 import logging
+import threading
 import coloredlogs
 import verboselogs
 import click
-from builder.databases import config as config_mod
-from builder.databases.parsers import parsers
-from joblib import Parallel, delayed
+from functools import partial
+from builder.databases import config as config_mod, profiles
+from builder.databases.parsers import parsers, sampling
 
 
 verboselogs.install()
@@ -19,14 +21,61 @@ def database():
 
 
 def _parse_database(import_directory, database_directory, database,
-                    config_file=None, download=True, skip=True):
+                    config_file=None, download=True, skip=True, rebuild=False, sample=None, fraction=None):
+    from builder.databases.parsers import build_cache, instrumentation
+    from builder.databases.parsers.sampling import Sampler
     stats = set()
+    profile = None
+    report = None
     Parser = parsers.get(database, None)
     if Parser:
         parser = Parser(import_directory, database_directory,
                         config_file=config_file, download=download, skip=skip)
-        stats = parser.build_stats()
-    return stats
+        parser.sampler = Sampler(sample, fraction)
+        # Databases whose files, config, parser and mappings did not change keep their graph files.
+        cache = build_cache.BuildCache(import_directory)
+        key = parser.build_fingerprint()
+        cached = None if rebuild else cache.lookup(database, key)
+        if cached is not None:
+            logger.info("Database %s - Inputs unchanged, reuse the graph files" % database)
+            return cached, None, {'status': 'cached', 'rows_out': instrumentation.stats_rows(cached)}
+        cache.invalidate(database)
+        if rebuild:
+            parser.clear_checkpoints()
+        try:
+            with profiles.ResourceMonitor() as monitor:
+                stats = parser.build_stats()
+            profile = monitor.profile()
+        except Exception as err:
+            # Release the parsers waiting for the mapping of this database.
+            parser.abort_mapping(err)
+            raise
+        # The inputs after the build, with the files the parser extracted or downloaded.
+        cache.store(database, parser.build_fingerprint(), stats, parser.output_files())
+        parser.clear_checkpoints()
+        report = parser.phases.report(profile, stats)
+        report['status'] = 'built'
+    return stats, profile, report
+
+
+def _write_report(output_dir, scheduler, start, **run):
+    """
+    Writes the time, memory and rows of every parser and of its phases in build_report.json.
+    """
+    from builder.databases.parsers import instrumentation
+    databases = {}
+    for db, (_, _, report) in scheduler.results.items():
+        databases[db] = dict(report or {}, scheduled_seconds=round(scheduler.durations.get(db, 0), 3))
+    for db, err in scheduler.errors.items():
+        databases[db] = {'status': 'failed', 'error': str(err)}
+    filepath = instrumentation.write_report(output_dir, databases, started_on=time.strftime(
+        '%Y-%m-%d %H:%M:%S', time.localtime(start)), wall_seconds=round(time.time() - start, 3), **run)
+    for db in [db for db in databases if databases[db].get('wall_seconds') is not None]:
+        report = databases[db]
+        logger.info("Database %s - %.1f s, %.1f CPU s, %.2f GB, %d rows (%s rows/s)" % (
+            db, report['wall_seconds'], report['cpu_seconds'], report['peak_rss'] / 1024 ** 3,
+            report['rows_out'], report['rows_per_second']))
+    logger.info("Build report: %s" % filepath)
 
 
 class NotSupportedAction(Exception):
@@ -45,11 +94,24 @@ class NotSupportedAction(Exception):
               help="The config file related with database.")
 @click.option('--database', required=True, type=click.Choice(parsers.keys()),
               help="Which databases (you can specify the --database argument multiple times)?", multiple=True)
-@click.option('--n-jobs', '-n', required=False,
-              help="Hom many jobs?", default=4)
+@click.option('--n-jobs', '-n', required=False, type=int,
+              help="How many jobs at most (default: number of CPUs)?", default=None)
+@click.option('--memory-budget', required=False, type=float, default=None,
+              help="How much memory (GB) the parsers running at the same time may use?")
+@click.option('--n-downloads', required=False,
+              help="How many files are downloaded at the same time (with --download)?", default=4)
 @click.option('--download/--no-download', default=False, help="Whether download the source file(s)?")
 @click.option('--skip/--no-skip', default=True, help="Whether skip the existing file(s)?")
-def parse_database(output_dir, db_dir, database, config, download, n_jobs, skip):
+@click.option('--rebuild/--incremental', default=False,
+              help="Whether parse again the databases whose inputs did not change?")
+@sampling.add_options
+def parse_database(output_dir, db_dir, database, config, download, n_jobs, skip, n_downloads, memory_budget, rebuild,
+                   sample, fraction):
+    # Imported here so that the command line starts without the download and scheduling modules.
+    from builder.databases.parsers import readiness, mapping_cache
+    from builder.databases.scheduler import DagScheduler, estimate_cost
+    from builder.downloads import prefetch
+    start = time.time()
     if config and len(database) > 1:
         raise NotSupportedAction(
             "Cannot support a single config file with several databases.")
@@ -62,11 +124,55 @@ def parse_database(output_dir, db_dir, database, config, download, n_jobs, skip)
     if len(invalid_databases) > 0:
         logger.warn("%s databases (%s) is not valid, skip them.",
                     len(invalid_databases), invalid_databases)
+    # A sampled build writes its graph files, cache and report in a subfolder of its own.
+    graph_dir = sampling.output_directory(output_dir, sample, fraction)
     logger.info("Run jobs with (output_dir: %s, db_dir: %s, databases: %s, config: %s, download: %s, skip: %s)" %
-                (output_dir, db_dir, all_databases, config, download, skip))
-    stats = Parallel(n_jobs=n_jobs)(delayed(_parse_database)(output_dir, db_dir, db,
-                                                             config_file=config, download=download, skip=skip)
-                                    for db in valid_databases)
+                (graph_dir, db_dir, all_databases, config, download, skip))
+    readiness.clear_stale(db_dir)
+    # Compile the indexes of the existing mappings once, the workers then map the same files.
+    builder_config = prefetch.get_builder_config()
+    mapping_cache.warm(db_dir, builder_config)
+    # Each parser starts once the mappings it reads are ready, so that it never holds a
+    # worker while waiting; the parsers with the longest chain of dependent work start first.
+    # Parsers are admitted against the memory they needed in the previous runs.
+    database_config = builder_config["database"]
+    measured = profiles.load(output_dir)
+    budget = profiles.memory_budget(database_config, memory_budget)
+    if budget is not None:
+        logger.info("Memory budget of the parsers: %.1f GB" % (budget / 1024 ** 3))
+    scheduler = DagScheduler(partial(_parse_database, graph_dir, db_dir, config_file=config,
+                                     download=download, skip=skip or download, rebuild=rebuild,
+                                     sample=sample, fraction=fraction),
+                             n_jobs=n_jobs or os.cpu_count() or 4, database_directory=db_dir,
+                             memory_budget=budget)
+    for db in valid_databases:
+        scheduler.add(db, parsers[db].mapping_dependencies(builder_config),
+                      cost=estimate_cost(os.path.join(db_dir, db), measured.get(db)),
+                      memory=profiles.expected_memory(measured.get(db), database_config),
+                      held=download)
+    if download:
+        # Download the files of all databases up front, and release each parser as soon
+        # as its own files are ready. The files exist by then, so the parsers skip them.
+        prefetcher = prefetch.Prefetcher(n_jobs=n_downloads, skip=skip)
+        for db in valid_databases:
+            prefetcher.add(db, prefetch.get_database_targets(
+                db, db_dir, config_file=config))
+        releaser = threading.Thread(target=prefetcher.release_ready, args=(scheduler,), daemon=True)
+        releaser.start()
+    else:
+        prefetcher = None
+    try:
+        results = scheduler.run()
+    finally:
+        if prefetcher is not None:
+            prefetcher.shutdown()
+        # Keep the profiles of the parsers which succeeded, even if another one failed. A
+        # sampled build says nothing of the memory of a full one.
+        if sample is None and fraction is None:
+            profiles.save(output_dir, {db: profile for db, (_, profile, _) in scheduler.results.items() if profile})
+        _write_report(graph_dir, scheduler, start, n_jobs=scheduler.n_jobs, memory_budget=budget,
+                      sample=sample, fraction=fraction)
+    stats = [db_stats for db_stats, _, _ in results.values()]
     allstats = {val if type(sublist) == set else sublist
                 for sublist in stats for val in sublist}
     logger.info("Stats: %s" % allstats)
@@ -1,59 +1,85 @@
-from builder.databases.parsers.cancer_genome_interpreter_parser import CancerGenomeInterpreterParser
-from builder.databases.parsers.drug_bank_parser import DrugBankParser
-from builder.databases.parsers.uniprot_parser import UniProtParser
-from builder.databases.parsers.hgnc_mgi_parser import HGNC_MGI_Parser
-from builder.databases.parsers.hmdb_parser import HMDBParser
-from builder.databases.parsers.reactome_parser import ReactomeParser
-from builder.databases.parsers.foodb_parser import FooDBParser
-from builder.databases.parsers.pathway_commons_parser import PathwayCommonsParser
-from builder.databases.parsers.oncokb_parser import OncoKBParser
-from builder.databases.parsers.pfam_parser import PfamParser
-from builder.databases.parsers.refseq_parser import RefSeqParser
-from builder.databases.parsers.disgenet_parser import DisGEnetParser
-from builder.databases.parsers.stitch_parser import STITCHParser
-from builder.databases.parsers.string_parser import STRINGParser
-from builder.databases.parsers.intact_parser import IntActParser
-from builder.databases.parsers.mutationds_parser import MutationDsParser
-from builder.databases.parsers.jensenlab_parser import JensenLabParser
-from builder.databases.parsers.gwas_catalog_parser import GWASCatalogParser
-from builder.databases.parsers.dgi_db_parser import DGIdbParser
-from builder.databases.parsers.sider_parser import SIDERParser
-from builder.databases.parsers.psp_parser import PhosphoSitePlusParser
-from builder.databases.parsers.signor_parser import SIGNORParser
-from builder.databases.parsers.corum_parser import CORUMParser
-from builder.databases.parsers.exposome_parser import ExposomeExplorerParser
-from builder.databases.parsers.hpa_parser import HPAParser
-from builder.databases.parsers.smpdb_parser import SMPDBParser
-
-
-parsers = {
+import importlib
+from collections.abc import Mapping
+
+
+class ParserRegistry(Mapping):
+    """
+    Parser classes by database name, imported the first time they are used.
+
+    Listing the databases (e.g. for the choices of the command line) does not import the \
+    parsers, nor pandas, BioPython or lxml which they need.
+
+    Usage::
+
+        "UniProt" in parsers
+        Parser = parsers["UniProt"]
+    """
+
+    def __init__(self, paths) -> None:
+        """
+        :param dict paths: "module:Class" strings by database name.
+        """
+        self._paths = dict(paths)
+        self._classes = {}
+
+    def __getitem__(self, name):
+        if name not in self._classes:
+            module, cls = self._paths[name].split(':')
+            self._classes[name] = getattr(importlib.import_module(module), cls)
+        return self._classes[name]
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def path(self, name):
+        """
+        Returns the "module:Class" string of the parser of a database.
+        """
+        return self._paths[name]
+
+
+_parser_paths = {
     # DO is located on ontology part.
 
     # Domain Databases
-    "CancerGenomeInterpreter": CancerGenomeInterpreterParser,
-    "CORUM": CORUMParser,
-    "DGIdb": DGIdbParser,
-    "DisGEnet": DisGEnetParser,
-    "DrugBank": DrugBankParser,
-    "ExposomeExplorer": ExposomeExplorerParser,
-    "FooDB": FooDBParser,
-    "GWASCatalog": GWASCatalogParser,
-    "HGNC_MGI": HGNC_MGI_Parser,
-    "HMDB": HMDBParser,
-    "HPA": HPAParser,
-    "IntAct": IntActParser,
-    "JensenLab": JensenLabParser,
-    "MutationDs": MutationDsParser,
-    "OncoKB": OncoKBParser,
-    "PathwayCommons": PathwayCommonsParser,
-    "Pfam": PfamParser,
-    "PhosphoSitePlus": PhosphoSitePlusParser,
-    "Reactome": ReactomeParser,
-    "RefSeq": RefSeqParser,
-    "SIDER": SIDERParser,
-    "SIGNOR": SIGNORParser,
-    "SMPDB": SMPDBParser,
-    "STITCH": STITCHParser,
-    "STRING": STRINGParser,
-    "UniProt": UniProtParser,
+    "CancerGenomeInterpreter": "builder.databases.parsers.cancer_genome_interpreter_parser:CancerGenomeInterpreterParser",
+    "CORUM": "builder.databases.parsers.corum_parser:CORUMParser",
+    "DGIdb": "builder.databases.parsers.dgi_db_parser:DGIdbParser",
+    "DisGEnet": "builder.databases.parsers.disgenet_parser:DisGEnetParser",
+    "DrugBank": "builder.databases.parsers.drug_bank_parser:DrugBankParser",
+    "ExposomeExplorer": "builder.databases.parsers.exposome_parser:ExposomeExplorerParser",
+    "FooDB": "builder.databases.parsers.foodb_parser:FooDBParser",
+    "GWASCatalog": "builder.databases.parsers.gwas_catalog_parser:GWASCatalogParser",
+    "HGNC_MGI": "builder.databases.parsers.hgnc_mgi_parser:HGNC_MGI_Parser",
+    "HMDB": "builder.databases.parsers.hmdb_parser:HMDBParser",
+    "HPA": "builder.databases.parsers.hpa_parser:HPAParser",
+    "IntAct": "builder.databases.parsers.intact_parser:IntActParser",
+    "JensenLab": "builder.databases.parsers.jensenlab_parser:JensenLabParser",
+    "MutationDs": "builder.databases.parsers.mutationds_parser:MutationDsParser",
+    "OncoKB": "builder.databases.parsers.oncokb_parser:OncoKBParser",
+    "PathwayCommons": "builder.databases.parsers.pathway_commons_parser:PathwayCommonsParser",
+    "Pfam": "builder.databases.parsers.pfam_parser:PfamParser",
+    "PhosphoSitePlus": "builder.databases.parsers.psp_parser:PhosphoSitePlusParser",
+    "Reactome": "builder.databases.parsers.reactome_parser:ReactomeParser",
+    "RefSeq": "builder.databases.parsers.refseq_parser:RefSeqParser",
+    "SIDER": "builder.databases.parsers.sider_parser:SIDERParser",
+    "SIGNOR": "builder.databases.parsers.signor_parser:SIGNORParser",
+    "SMPDB": "builder.databases.parsers.smpdb_parser:SMPDBParser",
+    "STITCH": "builder.databases.parsers.stitch_parser:STITCHParser",
+    "STRING": "builder.databases.parsers.string_parser:STRINGParser",
+    "UniProt": "builder.databases.parsers.uniprot_parser:UniProtParser",
 }
+
+
+parsers = ParserRegistry(_parser_paths)
+
+
+def __getattr__(name):
+    # Keeps "from builder.databases.parsers import UniProtParser" working.
+    for database, path in _parser_paths.items():
+        if path.endswith(':' + name):
+            return parsers[database]
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -1,20 +1,19 @@
 import os
-import yaml
-import requests
-import ftplib
-import gzip
-import wget
-from Bio import SeqIO
 import shutil
 import logging
-import pandas as pd
 import csv
 import datetime
-import collections
-import builder
-import time
+import collections.abc
 import verboselogs
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from builder.downloads import downloader, manifest
+from builder.databases.parsers.tsv_sink import TsvSink
+from builder.databases.parsers import mapping_index, mapping_cache, readiness, decompression, tsv_reader, build_cache, \
+    config_registry
+from builder.databases.parsers.sampling import Sampler
+from builder.databases.parsers.instrumentation import PhaseRecorder, measured
+from builder.databases.parsers.checkpoints import Checkpoints
 
 
 logger = verboselogs.VerboseLogger('root')
@@ -34,12 +33,29 @@ class BaseParser:
           2. Define the schema for each database?
           3. How to split all fields to two parts for building graph and attribute database respectively?
     '''
+    # Labels of the entities (database/sources in builder/config.yml) and of the ontologies
+    # (ontology/ontologies) whose complete_mapping.tsv is read by the parser.
+    entity_mappings = []
+    ontology_mappings = []
+
+    @classmethod
+    def mapping_dependencies(cls, builder_config):
+        """
+        Returns the folders of the databases/ontologies which build the mappings read by the parser.
+
+        :param dict builder_config: content of builder/config.yml.
+        :return: List of database/ontology names (e.g. ['DrugBank', 'DO']).
+        """
+        sources = builder_config["database"]["sources"]
+        ontologies = builder_config["ontology"]["ontologies"]
+        dependencies = [sources[entity] for entity in cls.entity_mappings if entity in sources]
+        dependencies += [ontologies[ontology] for ontology in cls.ontology_mappings if ontology in ontologies]
+        return list(dict.fromkeys(dependencies))
 
     def __init__(self, import_directory, database_directory, config_file=None,
                  download=True, skip=True, organisms=["9606", "10090"]) -> None:
-        config_dir = os.path.dirname(os.path.abspath(builder.__file__))
-        self.builder_config = self.read_yaml(
-            os.path.join(config_dir, "config.yml"))
+        # The configs are parsed once per process and shared, read-only, by all parsers.
+        self.builder_config = config_registry.get_builder_config()
 
         self.database_directory = database_directory
         self.download = download
@@ -49,6 +65,12 @@ class BaseParser:
             self.updated_on = str(datetime.date.today())
         else:
             self.updated_on = None
+        self.source_versions = {}
+        self._checkpoints = None
+        # Time, memory and rows of the download, read, mapping-load and write phases.
+        self.phases = PhaseRecorder()
+        # Records read and graph rows written for partial builds (see sampling.Sampler).
+        self.sampler = Sampler()
 
         self.database_name = self.database_name if self.database_name else None
 
@@ -62,7 +84,9 @@ class BaseParser:
             logger.warn(
                 "CAUTION: Use the customized config file instead of the default config.")
             self.config_fpath = config_file
+            self._custom_config = True
         else:
+            self._custom_config = False
             self.config_fpath = self.config_fpath if self.config_fpath else None
         self.check_obj()
         self.config = self.read_config()
@@ -75,43 +99,20 @@ class BaseParser:
                 'You need to set self.config_fpath and self.database_name.')
 
     def read_yaml(self, yaml_file):
-        content = None
-        with open(yaml_file, 'r') as stream:
-            try:
-                content = yaml.safe_load(stream)
-            except yaml.YAMLError as err:
-                raise yaml.YAMLError(
-                    "The yaml file {} could not be parsed. {}".format(yaml_file, err))
-        return content
+        return config_registry.load(yaml_file)
 
     def read_config(self):
         logger.info("Read config file %s" % self.config_fpath)
         if self.config_fpath and os.path.exists(self.config_fpath):
-            return self.read_yaml(self.config_fpath)
+            return config_registry.load(self.config_fpath, compiled=not self._custom_config)
         else:
             raise InvalidConfigPath(
                 "%s is not valid, you need to set self.config_fpath firstly." % self.config_fpath)
 
+    @measured("download")
     def download_from_ftp(self, ftp_url, user, password, to, file_name):
-        try:
-            domain = ftp_url.split('/')[2]
-            ftp_file = '/'.join(ftp_url.split('/')[3:])
-            with ftplib.FTP(domain) as ftp:
-                ftp.login(user=user, passwd=password)
-                with open(os.path.join(to, file_name), 'wb') as fp:
-                    ftp.retrbinary("RETR " + ftp_file,  fp.write)
-        except ftplib.error_reply as err:
-            raise ftplib.error_reply(
-                "Exception raised when an unexpected reply is received from the server. {}.\nURL:{}".format(err, ftp_url))
-        except ftplib.error_temp as err:
-            raise ftplib.error_temp(
-                "Exception raised when an error code signifying a temporary error. {}.\nURL:{}".format(err, ftp_url))
-        except ftplib.error_perm as err:
-            raise ftplib.error_perm(
-                "Exception raised when an error code signifying a permanent error. {}.\nURL:{}".format(err, ftp_url))
-        except ftplib.error_proto:
-            raise ftplib.error_proto(
-                "Exception raised when a reply is received from the server that does not fit the response specifications of the File Transfer Protocol. {}.\nURL:{}".format(err, ftp_url))
+        downloader.download_from_ftp(ftp_url, user, password, to, file_name,
+                                     download_config=self.builder_config.get("download"))
 
     def check_directory(self, directory):
         """
@@ -122,7 +123,8 @@ class BaseParser:
         if not os.path.exists(directory):
             os.makedirs(directory)
 
-    def download_db(self, database_url, directory, file_name=None, user="", password="", avoid_wget=False):
+    @measured("download")
+    def download_db(self, database_url, directory, file_name=None, user="", password="", avoid_wget=False, checksum=None):
         """
         This function downloads the raw files from a biomedical database server when a link is provided.
 
@@ -134,42 +136,26 @@ class BaseParser:
         :type file_name: str or None
         :param str user: username to access biomedical database server if required.
         :param str password: password to access biomedical database server if required.
+        :param bool avoid_wget: kept for backward compatibility, HTTP downloads are always streamed.
+        :param str checksum: expected digest of the file as "<algorithm>:<hexdigest>".
         """
-        if file_name is None:
-            file_name = database_url.split(
-                '/')[-1].replace('?', '_').replace('=', '_')
+        filepath = downloader.download_file(database_url, directory, file_name=file_name,
+                                            user=user, password=password, skip=self.skip,
+                                            download_config=self.builder_config.get("download"),
+                                            checksum=checksum)
+        self.track_source_version(filepath)
+        return filepath
 
-        header = {
-            'user-agent': 'Mozilla/5.0 (Windows NT 10.0; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/51.0.2704.103 Safari/537.36'}
+    def track_source_version(self, filepath):
+        """
+        Sets updated_on to the latest upstream release date of the downloaded files.
 
-        filepath = os.path.join(directory, file_name)
-        logger.info("Download file from %s into %s" % (database_url, filepath))
-        if os.path.exists(filepath):
-            if self.skip:
-                logger.info("%s exists, don't need to download it." % filepath)
-                return None
-            else:
-                os.remove(filepath)
-        try:
-            if database_url.startswith('ftp:'):
-                self.download_from_ftp(database_url, user,
-                                       password, directory, file_name)
-            else:
-                try:
-                    if not avoid_wget:
-                        wget.download(database_url,
-                                      os.path.join(directory, file_name))
-                    else:
-                        r = requests.get(database_url, headers=header)
-                        with open(os.path.join(directory, file_name), 'wb') as out:
-                            out.write(r.content)
-                except Exception:
-                    r = requests.get(database_url, headers=header)
-                    with open(os.path.join(directory, file_name), 'wb') as out:
-                        out.write(r.content)
-        except Exception as err:
-            raise Exception(
-                "Something went wrong. {}.\nURL:{}".format(err, database_url))
+        :param str filepath: path to a downloaded file.
+        """
+        version = manifest.get_source_version(filepath)
+        if version is not None:
+            self.source_versions[filepath] = version
+            self.updated_on = max(self.source_versions.values())
 
     def list_directory_files(directory):
         """
@@ -213,42 +199,49 @@ class BaseParser:
         else:
             logger.success("Done")
 
-    def write_entities(self, entities, header, outputfile):
+    @measured("write", rows=int)
+    def write_entities(self, entities, header, outputfile, dedupe=False):
         """
         Reads a set of entities and saves them to a file.
 
         :param set entities: set of tuples with entities data: identifier, label, name\
-                            and other attributes.
+                            and other attributes (any iterable of rows, e.g. a generator).
         :param list header: list of column names.
         :param str outputfile: path to file to be saved (including filename and extention).
+        :param bool dedupe: skip duplicated rows.
+        :return: Number of rows written.
         """
         try:
-            df = pd.DataFrame(list(entities), columns=header)
-            df.to_csv(path_or_buf=outputfile, sep='\t',
-                      header=True, index=False, quotechar='"',
-                      line_terminator='\n', escapechar='\\')
+            with TsvSink(outputfile, header, dedupe=dedupe, sampler=self.sampler) as sink:
+                sink.write_rows(entities)
         except csv.Error as err:
             raise csv.Error(
                 "Error writing etities to file: {}.\n {}".format(outputfile, err))
 
-    def write_relationships(self, relationships, header, outputfile):
+        return sink.count
+
+    @measured("write", rows=int)
+    def write_relationships(self, relationships, header, outputfile, dedupe=False):
         """
         Reads a set of relationships and saves them to a file.
 
         :param set relationships: set of tuples with relationship data: source node, target node, \
-                                    relationship type, source and other attributes.
+                                    relationship type, source and other attributes (any iterable \
+                                    of rows, e.g. a generator).
         :param list header: list of column names.
         :param str outputfile: path to file to be saved (including filename and extention).
+        :param bool dedupe: skip duplicated rows.
+        :return: Number of rows written.
         """
         try:
-            df = pd.DataFrame(list(relationships), columns=header)
-            df.to_csv(path_or_buf=outputfile, sep='\t',
-                      header=True, index=False, quotechar='"',
-                      line_terminator='\n', escapechar='\\')
+            with TsvSink(outputfile, header, dedupe=dedupe, sampler=self.sampler) as sink:
+                sink.write_rows(relationships)
         except Exception as err:
             raise csv.Error(
                 "Error writing relationships to file: {}.\n {}".format(outputfile, err))
 
+        return sink.count
+
     def get_current_time(self):
         """
         Returns current date (Year-Month-Day) and time (Hour-Minute-Second).
@@ -291,24 +284,129 @@ class BaseParser:
     def build_stats(self):
         raise NotImplementedError("build_stats method is not implemented.")
 
+    def build_fingerprint(self):
+        """
+        Returns the fingerprint of the inputs of the parser: its raw files, its config file, \
+        its code and the mappings of the other databases/ontologies it reads.
+        """
+        mappings = {}
+        for name in self.mapping_dependencies(self.builder_config):
+            mappings[name] = build_cache.mapping_digest(
+                os.path.join(self.database_directory, name, "complete_mapping.tsv"))
+        inputs = {'files': build_cache.directory_fingerprint(
+                      os.path.join(self.database_directory, self.database_name)),
+                  'config': build_cache.file_content_digest(self.config_fpath),
+                  'code': build_cache.source_digest(type(self), BaseParser),
+                  'organisms': list(self.organisms),
+                  'mappings': mappings,
+                  'sampling': self.sampler.describe()}
+        return build_cache.fingerprint(inputs)
+
+    def output_files(self):
+        """
+        Returns the paths to the files written by the parser: its graph files and its mapping.
+        """
+        outputs = [os.path.join(self.import_directory, f) for f in sorted(os.listdir(self.import_directory))
+                   if not f.startswith('.')]
+        outputs.append(os.path.join(self.database_directory, self.database_name, "complete_mapping.tsv"))
+        return [f for f in outputs if os.path.isfile(f)]
+
+    def get_checkpoints(self):
+        """
+        Returns the steps completed by the previous builds of the parser (see run_step).
+        """
+        if self._checkpoints is None:
+            mapping_file = os.path.join(self.database_directory, self.database_name, "complete_mapping.tsv")
+            self._checkpoints = Checkpoints(self.import_directory, self.build_fingerprint,
+                                            mapping_file=mapping_file)
+        return self._checkpoints
+
+    def clear_checkpoints(self):
+        """
+        Forgets the steps completed by the previous builds, e.g. once a build succeeded.
+        """
+        self.get_checkpoints().clear()
+
+    def run_step(self, name, function, *args, keep_result=False):
+        """
+        Runs a step of a long parser, unless a failed build with the same inputs completed it.
+
+        The files the step writes in self.import_directory go to a staging folder, and replace \
+        the ones of the previous builds once the step succeeds.
+
+        :param str name: name of the step, unique in the parser.
+        :param function: function writing graph files and returning their stats, or returning \
+                        a value used by the next steps (keep_result).
+        :param bool keep_result: keep the value returned by the function for the next builds.
+        :return: Stats of the step, or the value returned by the function if keep_result.
+        """
+        checkpoints = self.get_checkpoints()
+        stats = checkpoints.completed(name)
+        if stats is not None:
+            logger.info("Database %s - Step %s completed by a previous build, skip it" % (self.database_name, name))
+            return checkpoints.result(name) if keep_result else stats
+        import_directory = self.import_directory
+        self.import_directory = checkpoints.start(name)
+        try:
+            with self.phases.phase("step-%s" % name):
+                value = function(*args)
+        finally:
+            self.import_directory = import_directory
+        if keep_result:
+            checkpoints.complete(name, result=value, keep_result=True)
+        else:
+            checkpoints.complete(name, stats=value)
+        return value
+
     def mark_complete_mapping(self):
         """
-        Checks if mapping.tsv file exists and renames it to complete_mapping.tsv.
+        Checks if mapping.tsv file exists, compiles its alias index and renames it to complete_mapping.tsv.
         """
         directory = os.path.join(self.database_directory, self.database_name)
         mapping_file = os.path.join(directory, "mapping.tsv")
         new_mapping_file = os.path.join(directory, "complete_mapping.tsv")
         if os.path.exists(mapping_file):
+            # The index is in place before complete_mapping.tsv, which is what other parsers wait for.
+            mapping_index.compile_index(mapping_file, mapping_index.ALIAS,
+                                        mapping_index.alias_pairs(mapping_file),
+                                        output=mapping_index.index_path(new_mapping_file, mapping_index.ALIAS))
             os.rename(mapping_file, new_mapping_file)
+            readiness.complete(directory)
+        else:
+            readiness.fail(directory, "{} was not written.".format(mapping_file))
 
     def reset_mapping(self):
         """
-        Checks if mapping.tsv file exists and removes it.
+        Checks if mapping.tsv file exists and removes it, and tells the other parsers that \
+        the mapping is being built.
         """
         directory = os.path.join(self.database_directory, self.database_name)
         mapping_file = os.path.join(directory, "complete_mapping.tsv")
         if os.path.exists(mapping_file):
             os.remove(mapping_file)
+        mapping_index.remove_indexes(mapping_file)
+        readiness.start(directory)
+
+    def abort_mapping(self, reason):
+        """
+        Tells the parsers waiting for the mapping of this database that it will not be built.
+
+        :param reason: error which stopped the parser.
+        """
+        directory = os.path.join(self.database_directory, self.database_name)
+        readiness.fail(directory, reason)
+
+    def wait_for_mapping(self, mapping_file, name):
+        """
+        Blocks until the mapping file of another database/ontology is complete.
+
+        :param str mapping_file: path to complete_mapping.tsv.
+        :param str name: database/ontology which builds the mapping.
+        """
+        config = self.builder_config["database"]
+        with self.phases.phase("mapping-wait"):
+            readiness.wait(mapping_file, name, timeout=config.get("mapping_timeout", 21600),
+                           max_interval=config.get("mapping_max_interval", 0.5))
 
     def flatten(self, t):
         """
@@ -320,7 +418,7 @@ class BaseParser:
         [2, 2, 4, 5, 7, 2, 6, 2, 6, 6, 4, 6]
         """
         for x in t:
-            if not isinstance(x, collections.Iterable) or isinstance(x, str):
+            if not isinstance(x, collections.abc.Iterable) or isinstance(x, str):
                 yield x
             else:
                 yield from self.flatten(x)
@@ -333,25 +431,20 @@ class BaseParser:
         :param str ontology: ontology label as defined in ontologies_config.yml.
         :param source: name of the source database for selecting aliases.
         :type source: str or None
-        :return: Dictionary of aliases (keys) and ontology identifiers (values).
+        :return: Read-only dictionary (MappingIndex) of aliases (keys) and ontology identifiers (values).
         """
         mapping = {}
         ont = self.builder_config["ontology"]["ontologies"][ontology]
         dir_file = os.path.join(self.database_directory, ont)
         logger.info("Get mapping from ontology %s in %s" % (ont, dir_file))
         mapping_file = os.path.join(dir_file, "complete_mapping.tsv")
-        max_wait = 0
-        while not os.path.isfile(mapping_file) and max_wait < 5000:
-            logger.warn("No such file %s, please wait a minute or build the %s firstly." % (
-                mapping_file, ont))
-            time.sleep(5)
-            max_wait += 1
+        self.wait_for_mapping(mapping_file, ont)
         try:
-            with open(mapping_file, 'r') as f:
-                for line in f:
-                    data = line.rstrip("\r\n").split("\t")
-                    if data[1] == source or source is None:
-                        mapping[data[2].lower()] = data[0]
+            with self.phases.phase("mapping-load") as phase:
+                mapping = mapping_cache.get(
+                    mapping_file, mapping_index.ontology_variant(source),
+                    lambda: mapping_index.ontology_pairs(mapping_file, source))
+                phase.rows_in += len(mapping)
         except Exception:
             raise Exception(
                 "mapping - No mapping file {} for entity {}".format(mapping_file, ontology))
@@ -364,7 +457,7 @@ class BaseParser:
         to dictionary with aliases as keys and entity identifiers as values.
 
         :param str entity: entity label as defined in databases_config.yml.
-        :return: Dictionary of aliases (keys) and entity identifiers (value).
+        :return: Read-only dictionary (MappingIndex) of aliases (keys) and entity identifiers (value).
         """
         mapping = {}
         sources = self.builder_config["database"]["sources"]
@@ -374,20 +467,13 @@ class BaseParser:
             dir = os.path.join(self.database_directory, source)
             logger.info("Get mapping from entity %s in %s" % (entity, dir))
             mapping_file = os.path.join(dir, "complete_mapping.tsv")
-            max_wait = 0
-            while not os.path.isfile(mapping_file) and max_wait < 5000:
-                time.sleep(15)
-                max_wait += 1
-                logger.warn("No such file %s, please wait a minute or build the %s firstly." % (
-                    mapping_file, source))
+            self.wait_for_mapping(mapping_file, source)
             try:
-                with open(mapping_file, 'r', encoding='utf-8') as mf:
-                    for line in mf:
-                        data = line.rstrip("\r\n").split("\t")
-                        if len(data) > 1:
-                            ident = data[0]
-                            alias = data[1]
-                            mapping[alias] = ident
+                with self.phases.phase("mapping-load") as phase:
+                    mapping = mapping_cache.get(
+                        mapping_file, mapping_index.ALIAS,
+                        lambda: mapping_index.alias_pairs(mapping_file))
+                    phase.rows_in += len(mapping)
             except Exception as err:
                 raise Exception(
                     "mapping - No mapping file {} for entity {}. Error: {}".format(mapping_file, entity, err))
@@ -400,7 +486,8 @@ class BaseParser:
         to dictionary with aliases to other databases as keys and entity identifiers as values.
 
         :param str entity: entity label as defined in databases_config.yml.
-        :return: Dictionary of aliases (keys) and set of unique entity identifiers (values).
+        :return: Read-only dictionary (MappingIndex) of aliases (keys) and frozenset of unique \
+                entity identifiers (values).
         """
         mapping = defaultdict(set)
         sources = self.builder_config["database"]["sources"]
@@ -410,37 +497,102 @@ class BaseParser:
             dir = os.path.join(self.database_directory, source)
             logger.info("Get mapping from entity %s in %s" % (entity, dir))
             mapping_file = os.path.join(dir, "complete_mapping.tsv")
-            max_wait = 0
-            while not os.path.isfile(mapping_file) and max_wait < 5000:
-                time.sleep(5)
-                max_wait += 1
-                logger.warn("No such file %s, please wait a minute or build the %s firstly." % (
-                    mapping_file, source))
+            self.wait_for_mapping(mapping_file, source)
             try:
-                with open(mapping_file, 'r') as mf:
-                    for line in mf:
-                        data = line.rstrip("\r\n").split("\t")
-                        if len(data) > 1:
-                            ident = data[0]
-                            alias = data[1]
-                            mapping[alias].add(ident)
+                with self.phases.phase("mapping-load") as phase:
+                    mapping = mapping_cache.get(
+                        mapping_file, mapping_index.ALIAS,
+                        lambda: mapping_index.alias_pairs(mapping_file), multiple=True)
+                    phase.rows_in += len(mapping)
             except Exception:
                 raise Exception(
                     "mapping - No mapping file {} for entity {}".format(mapping, entity))
 
         return mapping
 
-    def read_gzipped_file(self, filepath):
+    def read_gzipped_file(self, filepath, mode="rt"):
         """
-        Opens an underlying process to access a gzip file through the creation of a new pipe to the child.
+        Opens a gzip file with the decompression backend set in the 'decompression' section of \
+        builder/config.yml (a multi-threaded external decompressor or a faster zlib binding when \
+        available, the gzip module otherwise).
 
         :param str filepath: path to gzip file.
-        :return: A bytes sequence that specifies the standard output.
+        :param str mode: 'rt' for a text stream, 'rb' (or 'r') for a bytes stream.
+        :return: A buffered stream of the decompressed content.
         """
-        handle = gzip.open(filepath, "rt")
+        config = self.builder_config.get("decompression") or {}
+        handle = decompression.open_gzip(filepath, mode,
+                                         backend=config.get("backend", "auto"),
+                                         threads=config.get("threads", 4),
+                                         buffer_size=config.get("buffer_size", decompression.DEFAULT_BUFFER_SIZE))
 
         return handle
 
+    def limited(self, records):
+        """
+        Returns the records of an input file (e.g. its lines) the parser reads: the first ones \
+        in a sampled build, all of them otherwise. Not used for the files building a mapping.
+        """
+        return self.sampler.limit(records)
+
+    def read_tsv_columns(self, filepath, columns, skiprows=0, comment=None, encoding_errors='strict', sample=True):
+        """
+        Reads only the needed columns of a tab separated file (gzipped or not) in large blocks \
+        of lines, instead of splitting every line in Python.
+
+        :param str filepath: path to the file, read with read_gzipped_file if it ends with .gz.
+        :param list columns: positions of the columns to read (negative positions count from \
+                            the last column of the first line).
+        :param int skiprows: number of lines skipped at the start of the file (e.g. 1 for a header).
+        :param comment: prefix (str or tuple of str) of the lines to skip.
+        :param str encoding_errors: how decoding errors are handled, as in open().
+        :param bool sample: read only the first lines in a sampled build (False for mappings).
+        :return: Generator of lists of tuples, one tuple per line with the fields of columns.
+        """
+        block_size = self.builder_config["database"].get("tsv_block_size", tsv_reader.DEFAULT_BLOCK_SIZE)
+        gzipped = filepath.endswith(".gz")
+        ncolumns = None
+        if any(c < 0 for c in columns):
+            if gzipped:
+                with self.read_gzipped_file(filepath, 'rt') as f:
+                    ncolumns = tsv_reader.count_columns(f)
+            else:
+                ncolumns = tsv_reader.count_columns(filepath)
+        handle = self.read_gzipped_file(filepath, 'rb') if gzipped else filepath
+
+        blocks = tsv_reader.read_columns(
+            handle, columns, skiprows=skiprows, comment=comment, block_size=block_size,
+            encoding_errors=encoding_errors, ncolumns=ncolumns)
+        if sample and self.sampler.sample is not None:
+            blocks = tsv_reader.limit_rows(blocks, self.sampler.sample)
+        # Measures the decompression and the splitting of the lines, not their parsing.
+        return self.phases.iterate("read", blocks)
+
+    def map_chunks(self, function, chunks, *args, n_jobs=1):
+        """
+        Yields function(chunk, *args) for each chunk of a file (e.g. the chunks of lines of \
+        tsv_reader.read_chunks), in the order of the chunks, computed by a pool of n_jobs \
+        processes. At most 2 * n_jobs chunks are sent to the pool at a time, so the memory \
+        does not grow with the file.
+
+        :param function: function defined at module level (sent to the worker processes).
+        :param chunks: iterable of chunks.
+        :param int n_jobs: number of worker processes, the chunks are parsed in this process if 1.
+        :return: Generator of the results.
+        """
+        if n_jobs <= 1:
+            for chunk in chunks:
+                yield function(chunk, *args)
+            return
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(function, chunk, *args))
+                if len(pending) >= 2 * n_jobs:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
     def list_ftp_directory(self, ftp_url, user='', password=''):
         """
         Lists all files present in folder from FTP server.
@@ -450,20 +602,8 @@ class BaseParser:
         :param str password: password to access ftp server if required.
         :return: List of files contained in ftp server folder provided with ftp_url.
         """
-        try:
-            domain = ftp_url.split('/')[2]
-            if len(ftp_url.split('/')) > 3:
-                ftp_dir = '/'.join(ftp_url.split('/')[3:])
-            else:
-                ftp_dir = ''
-            with ftplib.FTP(domain) as ftp:
-                ftp.login(user=user, passwd=password)
-                files = ftp.nlst(ftp_dir)
-        except ftplib.error_perm as err:
-            raise Exception(
-                "builder_utils - Problem listing file at {} ftp directory > {}.".format(ftp_dir, err))
-
-        return files
+        return downloader.list_ftp_directory(ftp_url, user=user, password=password,
+                                             download_config=self.builder_config.get("download"))
 
     def _parse_fasta(self, file_handler):
         """
@@ -472,6 +612,7 @@ class BaseParser:
         :param file_handler file_handler: opened fasta file
         :return iterator records: iterator of sequence objects
         """
+        from Bio import SeqIO
         records = SeqIO.parse(file_handler, format="fasta")
 
         return records
@@ -0,0 +1,216 @@
+import os
+import json
+import hashlib
+import inspect
+import verboselogs
+from builder.downloads.manifest import SourceManifest, MANIFEST_FILE
+from builder.databases.parsers import readiness
+
+
+logger = verboselogs.VerboseLogger('root')
+
+# Folder of the output directory with the fingerprint of the last build of each parser.
+CACHE_DIRECTORY = '.build_cache'
+# Suffix of the file next to a mapping with its digest, so that it is hashed once per build.
+DIGEST_SUFFIX = '.sha256'
+
+
+def _is_input(file_name):
+    """
+    Tells if a file of a database/ontology folder is a raw file, and not a mapping, an index, \
+    a marker or a temporary file written by the builder.
+    """
+    if file_name.startswith('.') or file_name.startswith('complete_mapping') or file_name == 'mapping.tsv':
+        return False
+    if file_name in (readiness.BUILDING_MARKER, readiness.FAILED_MARKER):
+        return False
+    return not file_name.endswith(('.idx', '.lock', '.tmp', DIGEST_SUFFIX)) and '.part' not in file_name
+
+
+def file_fingerprint(filepath, entry=None):
+    """
+    Returns what identifies the content of a raw file: its sha256 when the download manifest \
+    still describes it, otherwise its size and modification time.
+
+    :param str filepath: path to the file.
+    :param dict entry: manifest entry of the file, None if not downloaded by the builder.
+    """
+    stat = os.stat(filepath)
+    if entry and entry.get('sha256') and entry.get('size') == stat.st_size and entry.get('mtime') == stat.st_mtime:
+        return {'sha256': entry['sha256']}
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def directory_fingerprint(directory):
+    """
+    Returns the fingerprints of the raw files of a database/ontology folder and its subfolders.
+
+    :param str directory: folder of the downloaded files.
+    :return: Dictionary of fingerprints by relative path.
+    """
+    fingerprints = {}
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        entries = SourceManifest(root).load() if MANIFEST_FILE in files else {}
+        for f in sorted(files):
+            if _is_input(f):
+                filepath = os.path.join(root, f)
+                fingerprints[os.path.relpath(filepath, directory)] = file_fingerprint(filepath, entries.get(f))
+    return fingerprints
+
+
+def mapping_digest(mapping_file):
+    """
+    Returns the sha256 of a mapping file, or None if it does not exist.
+
+    Mappings are rebuilt with the same content by most runs, so their content and not their \
+    modification time identifies them. The digest is kept in '<mapping>.sha256' until the \
+    mapping changes.
+
+    :param str mapping_file: path to complete_mapping.tsv.
+    """
+    try:
+        stat = os.stat(mapping_file)
+    except FileNotFoundError:
+        return None
+    digest_file = mapping_file + DIGEST_SUFFIX
+    try:
+        with open(digest_file, 'r') as f:
+            saved = json.load(f)
+        if saved.get('size') == stat.st_size and saved.get('mtime_ns') == stat.st_mtime_ns:
+            return saved['sha256']
+    except (OSError, ValueError, KeyError):
+        pass
+    from builder.downloads.http_downloader import file_digest
+    digest = file_digest(mapping_file)
+    write_json(digest_file, {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest})
+    return digest
+
+
+def source_digest(*objects):
+    """
+    Returns the sha256 of the source files of modules or classes, standing for the version of a parser.
+    """
+    digest = hashlib.sha256()
+    for obj in objects:
+        with open(inspect.getsourcefile(obj), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def file_content_digest(filepath):
+    """
+    Returns the sha256 of a small file (e.g. a config file), None if it does not exist.
+    """
+    if filepath is None or not os.path.isfile(filepath):
+        return None
+    from builder.downloads.http_downloader import file_digest
+    return file_digest(filepath)
+
+
+def fingerprint(inputs):
+    """
+    Returns the key of a build from the description of all its inputs.
+
+    :param dict inputs: json serializable description of the inputs.
+    """
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def write_json(filepath, content):
+    """
+    Writes content to a json file through a temporary file, so readers never see it half written.
+
+    :param str filepath: path to the json file.
+    :param content: json serializable content.
+    """
+    tmp_path = "%s.%s.tmp" % (filepath, os.getpid())
+    with open(tmp_path, 'w') as f:
+        json.dump(content, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, filepath)
+
+
+def file_states(paths):
+    """
+    Returns the size and modification time of each existing file, to tell later if it changed.
+
+    :param list paths: paths to the files.
+    :return: Dictionary with the path of each existing file as key and [size, mtime_ns] as value.
+    """
+    states = {}
+    for path in paths:
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            states[path] = [stat.st_size, stat.st_mtime_ns]
+    return states
+
+
+class BuildCache:
+    """
+    Remembers the fingerprint of the inputs of the last build of each parser, with its stats \
+    and the state of its output files.
+
+    Usage::
+
+        cache = BuildCache(output_dir)
+        stats = cache.lookup("Pfam", key)
+        if stats is None:
+            stats = parser.build_stats()
+            cache.store("Pfam", key, stats, outputs)
+    """
+
+    def __init__(self, directory) -> None:
+        """
+        :param str directory: output directory of the graph files.
+        """
+        self.directory = os.path.join(directory, CACHE_DIRECTORY)
+
+    def path(self, name):
+        return os.path.join(self.directory, "%s.json" % name)
+
+    def lookup(self, name, key):
+        """
+        Returns the stats of the last build if its inputs had the same fingerprint and its \
+        output files are unchanged, otherwise None.
+
+        :param str name: database/ontology name.
+        :param str key: fingerprint of the inputs (see fingerprint()).
+        """
+        try:
+            with open(self.path(name), 'r') as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as err:
+            logger.warn("Ignore the corrupted build cache of %s: %s" % (name, err))
+            return None
+        if record.get('key') != key:
+            return None
+        outputs = record.get('outputs', {})
+        if file_states(outputs) != outputs:
+            logger.info("The output files of %s changed since its last build" % name)
+            return None
+        return {tuple(row) for row in record.get('stats', [])}
+
+    def store(self, name, key, stats, outputs):
+        """
+        Records a build.
+
+        :param str name: database/ontology name.
+        :param str key: fingerprint of the inputs.
+        :param set stats: stats tuples returned by the build.
+        :param list outputs: paths to the files written by the build.
+        """
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory, exist_ok=True)
+        write_json(self.path(name), {'key': key, 'stats': sorted(stats, key=repr),
+                                     'outputs': file_states(outputs)})
+
+    def invalidate(self, name):
+        """
+        Forgets the last build of a parser, e.g. before building it again.
+        """
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
@@ -12,6 +12,9 @@ logger = verboselogs.VerboseLogger('root')
 
 
 class CancerGenomeInterpreterParser(BaseParser):
+    entity_mappings = ["Drug", "Protein"]
+    ontology_mappings = ["Disease"]
+
     def __init__(self, import_directory, database_directory, config_file=None,
                  download=True, skip=True, organisms=["9606", "10090"]) -> None:
         self.database_name = 'CancerGenomeInterpreter'
@@ -47,7 +50,7 @@ class CancerGenomeInterpreterParser(BaseParser):
             if fileName in z.namelist():
                 with z.open(fileName, 'r') as responses:
                     first = True
-                    for line in responses:
+                    for line in self.limited(responses):
                         if first:
                             first = False
                             continue
@@ -124,11 +127,11 @@ class CancerGenomeInterpreterParser(BaseParser):
         entities, relationships, entities_header, relationships_headers = self.parse()
         entity_outputfile = os_path.join(
             self.import_directory, "cgi_clinically_relevant_variant.tsv")
-        self.write_entities(
+        count = self.write_entities(
             entities, entities_header, entity_outputfile)
         logger.info("Database {} - Number of {} entities: {}".format(self.database_name,
-                    "clinically_relevant_variant", len(entities)))
-        stats.add(self._build_stats(len(entities), "entity", "clinically_relevant_variant",
+                    "clinically_relevant_variant", count))
+        stats.add(self._build_stats(count, "entity", "clinically_relevant_variant",
                                     self.database_name, entity_outputfile, self.updated_on))
         for relationship in relationships:
             cgi_outputfile = os_path.join(
@@ -136,11 +139,10 @@ class CancerGenomeInterpreterParser(BaseParser):
             header = ['START_ID', 'END_ID', 'TYPE']
             if relationship in relationships_headers:
                 header = relationships_headers[relationship]
-            self.write_relationships(
+            count = self.write_relationships(
                 relationships[relationship], header, cgi_outputfile)
             logger.info("Database {} - Number of {} relationships: {}".format(
-                self.database_name, relationship, len(relationships[relationship])))
-            stats.add(self._build_stats(len(
-                relationships[relationship]), "relationships", relationship, self.database_name, cgi_outputfile, self.updated_on))
+                self.database_name, relationship, count))
+            stats.add(self._build_stats(count, "relationships", relationship, self.database_name, cgi_outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
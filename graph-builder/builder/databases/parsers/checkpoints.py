@@ -0,0 +1,159 @@
+import os
+import json
+import shutil
+import pickle
+import verboselogs
+from builder.databases.parsers.build_cache import write_json, file_states
+
+
+logger = verboselogs.VerboseLogger('root')
+
+# File of the import directory of a parser with the steps completed by an unfinished build.
+CHECKPOINTS_FILE = '.checkpoints.json'
+# Folder of the import directory with the results kept by the completed steps.
+RESULTS_DIRECTORY = '.checkpoints'
+# Prefix of the folders where the files of a running step are written.
+STAGING_PREFIX = '.step-'
+
+
+class Checkpoints:
+    """
+    Records the steps of a parser completed by a build, so that a build which failed resumes \
+    from its first incomplete step.
+
+    A step writes its files into a staging folder. Once it succeeds, the files are renamed \
+    into the import directory, replacing the ones of previous builds, and the step is \
+    recorded in .checkpoints.json with its stats and the state of its files. The record also \
+    keeps the fingerprint of the inputs of the parser after the step: if the inputs change \
+    before the next build, all the steps are run again.
+
+    Usage::
+
+        checkpoints = Checkpoints(import_directory, fingerprint)
+        stats = checkpoints.completed("fasta")
+        if stats is None:
+            staging = checkpoints.start("fasta")
+            stats = parse_fasta(staging)
+            checkpoints.complete("fasta", stats)
+    """
+
+    def __init__(self, directory, fingerprint, mapping_file=None) -> None:
+        """
+        :param str directory: import directory of the parser.
+        :param fingerprint: function returning the fingerprint of the inputs of the parser.
+        :param str mapping_file: complete_mapping.tsv built by the parser, recorded with the \
+                                step which writes it.
+        """
+        self.directory = directory
+        self.fingerprint = fingerprint
+        self.mapping_file = mapping_file
+        self.path = os.path.join(directory, CHECKPOINTS_FILE)
+        self.steps = None
+        self._started = {}
+
+    def _load(self):
+        if self.steps is not None:
+            return
+        self.steps = {}
+        try:
+            with open(self.path, 'r') as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as err:
+            logger.warn("Ignore the corrupted checkpoints %s: %s" % (self.path, err))
+            return
+        if record.get('key') != self.fingerprint():
+            logger.info("The inputs changed since the checkpoints of %s, run all the steps" % self.directory)
+            self.clear()
+            return
+        self.steps = record.get('steps', {})
+
+    def completed(self, name):
+        """
+        Returns the stats of a step completed by a previous build whose files are unchanged, \
+        otherwise None.
+
+        :param str name: name of the step.
+        """
+        self._load()
+        step = self.steps.get(name)
+        if step is None:
+            return None
+        if file_states(step['outputs']) != step['outputs']:
+            logger.info("The files of the step %s changed, run it again" % name)
+            del self.steps[name]
+            return None
+        return {tuple(row) for row in step['stats']}
+
+    def result(self, name):
+        """
+        Returns the result kept by a completed step.
+        """
+        with open(self.result_path(name), 'rb') as f:
+            return pickle.load(f)
+
+    def result_path(self, name):
+        return os.path.join(self.directory, RESULTS_DIRECTORY, "%s.pkl" % name)
+
+    def staging_path(self, name):
+        return os.path.join(self.directory, STAGING_PREFIX + name)
+
+    def start(self, name):
+        """
+        Returns an empty staging folder for the files of a step.
+        """
+        self._load()
+        staging = self.staging_path(name)
+        if os.path.exists(staging):
+            shutil.rmtree(staging)
+        os.makedirs(staging)
+        self._started[name] = os.stat(staging).st_mtime_ns
+        return staging
+
+    def complete(self, name, stats=None, result=None, keep_result=False):
+        """
+        Moves the files of a step into the import directory and records the step.
+
+        :param str name: name of the step.
+        :param set stats: stats tuples of the files written by the step.
+        :param result: value kept for the next builds if keep_result.
+        :param bool keep_result: pickle the result of the step.
+        """
+        staging = self.staging_path(name)
+        outputs = []
+        if keep_result:
+            result_path = self.result_path(name)
+            os.makedirs(os.path.dirname(result_path), exist_ok=True)
+            tmp_path = os.path.join(staging, RESULTS_DIRECTORY + '.pkl')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, result_path)
+            outputs.append(result_path)
+        for f in sorted(os.listdir(staging)):
+            filepath = os.path.join(staging, f)
+            if os.path.isfile(filepath):
+                outputs.append(os.path.join(self.directory, f))
+                os.replace(filepath, outputs[-1])
+        shutil.rmtree(staging, ignore_errors=True)
+        if self.mapping_file is not None and os.path.isfile(self.mapping_file) \
+                and os.stat(self.mapping_file).st_mtime_ns >= self._started.pop(name, 0):
+            outputs.append(self.mapping_file)
+        self.steps[name] = {'stats': sorted(stats or [], key=repr), 'outputs': file_states(outputs)}
+        write_json(self.path, {'key': self.fingerprint(), 'steps': self.steps})
+
+    def clear(self):
+        """
+        Forgets the completed steps, e.g. once the whole build succeeded.
+        """
+        self.steps = {}
+        for name in (CHECKPOINTS_FILE, RESULTS_DIRECTORY):
+            path = os.path.join(self.directory, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.exists(path):
+                os.remove(path)
+        if os.path.isdir(self.directory):
+            for f in os.listdir(self.directory):
+                if f.startswith(STAGING_PREFIX):
+                    shutil.rmtree(os.path.join(self.directory, f), ignore_errors=True)
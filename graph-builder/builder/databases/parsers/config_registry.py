@@ -0,0 +1,178 @@
+import os
+import pickle
+import threading
+import yaml
+import builder
+from builder.databases import config as databases_config
+
+
+# Parsed YAML files of this process, by absolute path: ((mtime_ns, size), read-only content).
+# A parser reads builder/config.yml and its own config, and many parsers create other parsers
+# (e.g. JensenLab creates STRINGParser and STITCHParser), so each file is parsed once per
+# process and the parsers share its content.
+_configs = {}
+_lock = threading.Lock()
+
+# Subfolder of the config folders where the parsed files are pickled, like __pycache__.
+CACHE_DIR = '__pycache__'
+CACHE_SUFFIX = '.yml.pickle'
+# Bump when the pickled content changes, so that old pickles are parsed again.
+CACHE_VERSION = 1
+
+
+class ReadOnlyConfig(TypeError):
+    pass
+
+
+def _read_only(*args, **kwargs):
+    raise ReadOnlyConfig("The config is shared by all parsers and read-only, use config_registry.thaw() "
+                         "for a copy you can change.")
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict of a config, still a dict for json and isinstance.
+    """
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    """
+    Read-only list of a config, still a list for pandas, list concatenation and isinstance.
+    """
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+def freeze(content):
+    """
+    Returns a read-only copy of the content of a YAML file.
+    """
+    if isinstance(content, dict):
+        return FrozenDict((key, freeze(value)) for key, value in content.items())
+    if isinstance(content, list):
+        return FrozenList(freeze(value) for value in content)
+    return content
+
+
+def thaw(content):
+    """
+    Returns a copy of a config that can be changed.
+    """
+    if isinstance(content, dict):
+        return {key: thaw(value) for key, value in content.items()}
+    if isinstance(content, list):
+        return [thaw(value) for value in content]
+    return content
+
+
+def cache_path(yaml_file):
+    directory, name = os.path.split(os.path.abspath(yaml_file))
+    return os.path.join(directory, CACHE_DIR, os.path.splitext(name)[0] + CACHE_SUFFIX)
+
+
+def _parse(yaml_file):
+    with open(yaml_file, 'r') as stream:
+        try:
+            return yaml.safe_load(stream)
+        except yaml.YAMLError as err:
+            raise yaml.YAMLError(
+                "The yaml file {} could not be parsed. {}".format(yaml_file, err))
+
+
+def _load_compiled(yaml_file, key):
+    try:
+        with open(cache_path(yaml_file), 'rb') as f:
+            version, cached_key, content = pickle.load(f)
+    except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+    if version != CACHE_VERSION or tuple(cached_key) != key:
+        return None
+    return content
+
+
+def _store_compiled(yaml_file, key, content):
+    """
+    Pickles the parsed content next to the YAML file, if the folder can be written (an installed \
+    package may be read-only, the file is then parsed once per process).
+    """
+    path = cache_path(yaml_file)
+    tmp_path = "%s.%d.tmp" % (path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((CACHE_VERSION, key, content), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load(yaml_file, compiled=True):
+    """
+    Returns the read-only content of a YAML file, parsed once per process and again only if \
+    the file changed.
+
+    :param str yaml_file: path to the YAML file.
+    :param bool compiled: read and write the parsed content as a pickle in the __pycache__ \
+                        folder of the file, keyed by its modification time and size, so that \
+                        new processes skip the parsing too.
+    :return: FrozenDict (or FrozenList) of the content.
+    """
+    path = os.path.abspath(yaml_file)
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    entry = _configs.get(path)
+    if entry is not None and entry[0] == key:
+        return entry[1]
+    with _lock:
+        entry = _configs.get(path)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        content = _load_compiled(path, key) if compiled else None
+        if content is None:
+            content = freeze(_parse(path))
+            if compiled:
+                _store_compiled(path, key, content)
+        _configs[path] = (key, content)
+        return content
+
+
+def builder_config_path():
+    return os.path.join(os.path.dirname(os.path.abspath(builder.__file__)), "config.yml")
+
+
+def database_config_path(database):
+    return os.path.join(os.path.dirname(os.path.abspath(databases_config.__file__)), "%s.yml" % database)
+
+
+def get_builder_config():
+    """
+    Returns the read-only content of builder/config.yml.
+    """
+    return load(builder_config_path())
+
+
+def get_database_config(database, config_file=None):
+    """
+    Returns the read-only config of a database, from builder/databases/config or a custom file \
+    (parsed once per process, but not pickled next to the user's file).
+    """
+    if config_file:
+        return load(config_file, compiled=False)
+    return load(database_config_path(database))
+
+
+def clear():
+    """
+    Forgets the configs read by this process (the pickled files stay).
+    """
+    with _lock:
+        _configs.clear()
@@ -38,7 +38,7 @@ class CORUMParser(BaseParser):
         first = True
         with zipfile.ZipFile(zipped_fileName) as z:
             with z.open(fileName) as f:
-                for line in f:
+                for line in self.limited(f):
                     if first:
                         first = False
                         continue
@@ -77,19 +77,19 @@ class CORUMParser(BaseParser):
         stats = set()
         entities, relationships, entities_header, relationships_headers = self.parse()
         entity_outputfile = os.path.join(self.import_directory, "Complex.tsv")
-        self.write_entities(entities, entities_header, entity_outputfile)
+        count = self.write_entities(entities, entities_header, entity_outputfile)
         logger.info("Database {} - Number of {} entities: {}".format(self.database_name,
-                                                                     "Complex", len(entities)))
-        stats.add(self._build_stats(len(entities), "entity", "Complex",
+                                                                     "Complex", count))
+        stats.add(self._build_stats(count, "entity", "Complex",
                                     self.database_name, entity_outputfile, self.updated_on))
         for entity, relationship in relationships:
             corum_outputfile = os.path.join(self.import_directory,
                                             self.database_name.lower()+"_"+entity.lower()+"_"+relationship.lower()+".tsv")
-            self.write_relationships(relationships[(entity, relationship)],
+            count = self.write_relationships(relationships[(entity, relationship)],
                                      relationships_headers[entity], corum_outputfile)
             logger.info("Database {} - Number of {} relationships: {}".format(self.database_name,
-                                                                              relationship, len(relationships[(entity, relationship)])))
-            stats.add(self._build_stats(len(relationships[(entity, relationship)]), "relationships",
+                                                                              relationship, count))
+            stats.add(self._build_stats(count, "relationships",
                                         relationship, self.database_name, corum_outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
@@ -0,0 +1,143 @@
+import io
+import gzip
+import shutil
+import subprocess
+import verboselogs
+
+
+logger = verboselogs.VerboseLogger('root')
+
+try:
+    from isal import igzip as isal_gzip
+except ImportError:
+    isal_gzip = None
+
+try:
+    from zlib_ng import gzip_ng
+except ImportError:
+    gzip_ng = None
+
+
+# Backends in the order they are tried by the 'auto' backend: multi-threaded external
+# decompressors first, then faster zlib bindings, then the standard library.
+EXTERNAL_COMMANDS = {
+    'pigz': lambda threads: ['pigz', '-d', '-c', '-p', str(threads)],
+    'igzip': lambda threads: ['igzip', '-d', '-c', '-T', str(threads)],
+}
+BACKENDS = ['pigz', 'igzip', 'isal', 'zlib-ng', 'gzip']
+
+DEFAULT_BUFFER_SIZE = 4 * 1024 * 1024
+
+
+class DecompressionError(Exception):
+    pass
+
+
+class _ProcessReader(io.RawIOBase):
+    """
+    Raw stream over the standard output of a decompression process.
+
+    Closing the stream stops the process, and reaching the end of a stream whose process \
+    failed (e.g. a truncated file) raises DecompressionError.
+    """
+
+    def __init__(self, process, filepath) -> None:
+        self.process = process
+        self.filepath = filepath
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self.process.stdout.readinto(buffer)
+        if n == 0:
+            self._check_exit()
+        return n
+
+    def _check_exit(self):
+        returncode = self.process.wait()
+        if returncode != 0:
+            error = self.process.stderr.read().decode('utf-8', 'replace').strip()
+            raise DecompressionError("Cannot decompress {} ({} exited with {}): {}".format(
+                self.filepath, self.process.args[0], returncode, error))
+
+    def close(self):
+        if not self.closed:
+            self.process.stdout.close()
+            if self.process.poll() is None:
+                self.process.terminate()
+            self.process.wait()
+            self.process.stderr.close()
+        super().close()
+
+
+def available_backends():
+    """
+    Returns the backends which can be used on this machine, in order of preference.
+    """
+    backends = []
+    for backend in BACKENDS:
+        if backend in EXTERNAL_COMMANDS:
+            if shutil.which(backend):
+                backends.append(backend)
+        elif backend == 'isal':
+            if isal_gzip is not None:
+                backends.append(backend)
+        elif backend == 'zlib-ng':
+            if gzip_ng is not None:
+                backends.append(backend)
+        else:
+            backends.append(backend)
+    return backends
+
+
+def resolve_backend(backend='auto'):
+    """
+    Returns the backend used for a requested one: the first available backend for 'auto', \
+    or the standard library if the requested backend is not available.
+
+    :param str backend: 'auto', 'pigz', 'igzip', 'isal', 'zlib-ng' or 'gzip'.
+    """
+    available = available_backends()
+    if backend == 'auto':
+        return available[0]
+    if backend not in available:
+        logger.warn("Decompression backend %s is not available, use gzip." % backend)
+        return 'gzip'
+    return backend
+
+
+def _open_binary(filepath, backend, threads, buffer_size):
+    if backend in EXTERNAL_COMMANDS:
+        command = EXTERNAL_COMMANDS[backend](threads) + [filepath]
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   bufsize=buffer_size)
+        return io.BufferedReader(_ProcessReader(process, filepath), buffer_size=buffer_size)
+    if backend == 'isal':
+        handle = isal_gzip.open(filepath, 'rb')
+    elif backend == 'zlib-ng':
+        handle = gzip_ng.open(filepath, 'rb')
+    else:
+        handle = gzip.open(filepath, 'rb')
+    return io.BufferedReader(handle, buffer_size=buffer_size)
+
+
+def open_gzip(filepath, mode='rt', backend='auto', threads=4, buffer_size=DEFAULT_BUFFER_SIZE,
+              encoding=None, errors=None, newline=None):
+    """
+    Opens a gzip file for reading with the fastest available decompressor.
+
+    :param str filepath: path to gzip file.
+    :param str mode: 'rt' for text, 'rb' (or 'r', as in gzip.open) for bytes.
+    :param str backend: 'auto', 'pigz', 'igzip', 'isal', 'zlib-ng' or 'gzip'.
+    :param int threads: number of threads of the external decompressors.
+    :param int buffer_size: size in bytes of the read buffer.
+    :param str encoding: text encoding, as in gzip.open.
+    :return: A buffered binary or text stream.
+    """
+    if mode not in ('r', 'rt', 'rb'):
+        raise ValueError("Invalid mode {} for reading a gzip file.".format(mode))
+    stream = _open_binary(filepath, resolve_backend(backend), threads, buffer_size)
+    if mode in ('r', 'rb'):
+        return stream
+    return io.TextIOWrapper(stream, encoding=encoding, errors=errors, newline=newline)
@@ -10,6 +10,8 @@ logger = verboselogs.VerboseLogger('root')
 
 
 class DGIdbParser(BaseParser):
+    entity_mappings = ["Drug"]
+
     def __init__(self, import_directory, database_directory, config_file=None,
                  download=True, skip=True, organisms=["9606", "10090"]) -> None:
         self.database_name = 'DGIdb'
@@ -33,21 +35,14 @@ class DGIdbParser(BaseParser):
         if self.download:
             self.download_db(url, directory)
 
-        with open(fileName, 'r', encoding='utf-8') as associations:
-            first = True
-            for line in associations:
-                if first:
-                    first = False
-                    continue
-                data = line.rstrip("\r\n").split("\t")
-                gene = data[0]
-                source = data[3]
-                interactionType = data[4] if data[4] != '' else 'unknown'
-                drug = data[8].lower()
+        for rows in self.read_tsv_columns(fileName, [0, 3, 4, 6, 7, 8], skiprows=1):
+            for gene, source, interactionType, drug6, drug7, drug8 in rows:
+                interactionType = interactionType if interactionType != '' else 'unknown'
+                drug = drug8.lower()
                 if drug == "":
-                    drug = data[7]
-                    if drug == "" and data[6] != "":
-                        drug = data[6]
+                    drug = drug7
+                    if drug == "" and drug6 != "":
+                        drug = drug6
                     else:
                         continue
                 if gene != "":
@@ -64,10 +59,10 @@ class DGIdbParser(BaseParser):
         stats = set()
         relationships, header, outputfileName = self.parse()
         outputfile = os.path.join(self.import_directory, outputfileName)
-        self.write_relationships(relationships, header, outputfile)
+        count = self.write_relationships(relationships, header, outputfile)
         logger.info("Database {} - Number of {} relationships: {}".format(self.database_name,
-                                                                          "targets", len(relationships)))
-        stats.add(self._build_stats(len(relationships), "relationships",
+                                                                          "targets", count))
+        stats.add(self._build_stats(count, "relationships",
                                     "targets", self.database_name, outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
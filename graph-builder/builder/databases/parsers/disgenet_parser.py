@@ -1,7 +1,6 @@
 import os.path
 import logging
 import verboselogs
-import gzip
 from collections import defaultdict
 from builder.databases import config
 from builder.databases.parsers.base_parser import BaseParser
@@ -41,8 +40,6 @@ class DisGEnetParser(BaseParser):
         protein_mapping = self.read_disgenet_protein_mapping(directory)
         disease_mapping = self.read_disgenet_disease_mapping(directory)
         for f in files:
-            first = True
-            associations = gzip.open(os.path.join(directory, files[f]), 'r')
             dtype, atype = f.split('_')
             if dtype == 'gene':
                 idType = "Protein"
@@ -50,19 +47,13 @@ class DisGEnetParser(BaseParser):
             if dtype == 'variant':
                 idType = "Transcript"
                 scorePos = 5
-            for line in associations:
-                if first:
-                    first = False
-                    continue
-                try:
-                    data = line.decode('utf-8').rstrip("\r\n").split("\t")
-                    geneId = str(int(data[0]))
+            for rows in self.read_tsv_columns(os.path.join(directory, files[f]), [0, 4, scorePos, 13, -1],
+                                               skiprows=1, encoding_errors='replace'):
+                for geneId, diseaseId, score, pmids, source in rows:
+                    geneId = str(int(geneId))
                     #disease_specificity_index =  data[2]
                     #disease_pleiotropy_index = data[3]
-                    diseaseId = data[4]
-                    score = float(data[scorePos])
-                    pmids = data[13]
-                    source = data[-1]
+                    score = float(score)
                     if geneId in protein_mapping:
                         for identifier in protein_mapping[geneId]:
                             if diseaseId in disease_mapping:
@@ -70,9 +61,6 @@ class DisGEnetParser(BaseParser):
                                     code = "DOID:"+code
                                     relationships[idType].add(
                                         (identifier, code, "ASSOCIATED_WITH", score, atype, "DisGeNet: "+source, pmids))
-                except UnicodeDecodeError:
-                    continue
-            associations.close()
 
         # self.remove_directory(directory)
 
@@ -80,36 +68,23 @@ class DisGEnetParser(BaseParser):
 
     def read_disgenet_protein_mapping(self, directory):
         files = self.config['disgenet_mapping_files']
-        first = True
         mapping = defaultdict(set)
         if "protein_mapping" in files:
             mappingFile = files["protein_mapping"]
-            with gzip.open(os.path.join(directory, mappingFile), 'r') as f:
-                for line in f:
-                    if first:
-                        first = False
-                        continue
-                    data = line.decode('utf-8').rstrip("\r\n").split("\t")
-                    identifier = data[0]
-                    intIdentifier = data[1]
+            for rows in self.read_tsv_columns(os.path.join(directory, mappingFile), [0, 1],
+                                              skiprows=1, encoding_errors='replace', sample=False):
+                for identifier, intIdentifier in rows:
                     mapping[intIdentifier].add(identifier)
         return mapping
 
     def read_disgenet_disease_mapping(self, directory):
         files = self.config['disgenet_mapping_files']
-        first = True
         mapping = defaultdict(set)
         if "disease_mapping" in files:
             mappingFile = files["disease_mapping"]
-            with gzip.open(os.path.join(directory, mappingFile), 'r') as f:
-                for line in f:
-                    if first:
-                        first = False
-                        continue
-                    data = line.decode('utf-8').rstrip("\r\n").split("\t")
-                    identifier = data[0]
-                    vocabulary = data[2]
-                    code = data[3]
+            for rows in self.read_tsv_columns(os.path.join(directory, mappingFile), [0, 2, 3],
+                                              skiprows=1, encoding_errors='replace', sample=False):
+                for identifier, vocabulary, code in rows:
                     if vocabulary == "DO":
                         mapping[identifier].add(code)
         return mapping
@@ -120,10 +95,10 @@ class DisGEnetParser(BaseParser):
         for idType in relationships:
             outputfile = os.path.join(self.import_directory,
                                       idType+"_"+outputfileName)
-            self.write_relationships(relationships[idType], header, outputfile)
+            count = self.write_relationships(relationships[idType], header, outputfile)
             logger.info("Database {} - Number of {} relationships: {}".format(
-                self.database_name, idType, len(relationships[idType])))
-            stats.add(self._build_stats(len(relationships[idType]), "relationships", idType,
+                self.database_name, idType, count))
+            stats.add(self._build_stats(count, "relationships", idType,
                                         self.database_name, outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
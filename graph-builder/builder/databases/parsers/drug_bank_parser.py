@@ -3,10 +3,10 @@ import logging
 import verboselogs
 import zipfile
 from os import path as os_path
-from collections import defaultdict
 from lxml import etree
 from builder.databases import config
 from builder.databases.parsers.base_parser import BaseParser
+from builder.databases.parsers.tsv_sink import TsvSink
 
 
 logger = verboselogs.VerboseLogger('root')
@@ -40,28 +40,49 @@ class DrugBankParser(BaseParser):
         return (entities, relationships, entities_header, relationships_headers)
 
     def build_stats(self):
+        # Each step replaces its files once it succeeds, a failed build resumes from the
+        # first step it did not complete. The drugs extracted from the xml are kept for it.
+        directory = os_path.join(self.database_directory, "DrugBank")
+        self.check_directory(directory)
+        drugs = self.run_step("drugs", self.extract_drugs, directory, keep_result=True)
+        self.run_step("mapping", self.build_drug_bank_dictionary, directory, drugs)
+        return self.run_step("graph_files", self.build_graph_files_stats, drugs)
+
+    def build_graph_files_stats(self, drugs):
         stats = set()
-        entities, relationships, entities_header, relationships_headers = self.parse()
+        relationships = self.build_relationships_from_drug_bank(drugs)
+        entities, attributes = self.build_drug_entity(drugs)
+        entities_header = ['ID'] + attributes
+        relationships_headers = self.config['relationships_headers']
         entity_outputfile = os_path.join(self.import_directory, "Drug.tsv")
-        self.write_entities(
+        count = self.write_entities(
             entities, entities_header, entity_outputfile)
         logger.info(
-            "Database {} - Number of {} entities: {}".format(self.database_name, "Drug", len(entities)))
-        stats.add(self._build_stats(len(entities), "entity",
+            "Database {} - Number of {} entities: {}".format(self.database_name, "Drug", count))
+        stats.add(self._build_stats(count, "entity",
                   "Drug", self.database_name, entity_outputfile, self.updated_on))
-        for relationship in relationships:
-            relationship_outputfile = os_path.join(
-                self.import_directory, relationship+".tsv")
-            header = ['START_ID', 'END_ID', 'TYPE', 'source']
-            if relationship in relationships_headers:
-                header = relationships_headers[relationship]
-            self.write_relationships(relationships[relationship],
-                                     header, relationship_outputfile)
+        # The relationships are streamed to their files as they are built.
+        sinks = {}
+        try:
+            for relationship, row in relationships:
+                if relationship not in sinks:
+                    relationship_outputfile = os_path.join(
+                        self.import_directory, relationship+".tsv")
+                    header = ['START_ID', 'END_ID', 'TYPE', 'source']
+                    if relationship in relationships_headers:
+                        header = relationships_headers[relationship]
+                    sinks[relationship] = TsvSink(
+                        relationship_outputfile, header, sampler=self.sampler)
+                sinks[relationship].write(row)
+        finally:
+            for sink in sinks.values():
+                sink.close()
+        for relationship, sink in sinks.items():
             logger.info("Database {} - Number of {} relationships: {}".format(
-                self.database_name, relationship, len(relationships[relationship])))
-            stats.add(self._build_stats(len(relationships[relationship]),
+                self.database_name, relationship, sink.count))
+            stats.add(self._build_stats(sink.count,
                                         "relationships", relationship, self.database_name,
-                                        relationship_outputfile, self.updated_on))
+                                        sink.outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
 
@@ -144,7 +165,9 @@ class DrugBankParser(BaseParser):
         return vocabulary
 
     def build_relationships_from_drug_bank(self, drugs):
-        relationships = defaultdict(list)
+        """
+        Yields the relationships of the drugs as (relationship type, row) pairs.
+        """
         associations = self.config['DrugBank_associations']
         for did in drugs:
             for ass in associations:
@@ -166,14 +189,10 @@ class DrugBankParser(BaseParser):
                         for partner in partners:
                             rel = (did, partner,
                                    associations[ass][0], "DrugBank")
-                            relationships[ident].append(
-                                tuple(self.flatten(rel)))
+                            yield ident, tuple(self.flatten(rel))
                     else:
                         partner = drugs[did][ass]
-                        relationships[ident].append(
-                            (did, partner, associations[ass][0], "DrugBank"))
-
-        return relationships
+                        yield ident, (did, partner, associations[ass][0], "DrugBank")
 
     def build_drug_entity(self, drugs):
         entities = set()
@@ -14,6 +14,8 @@ logger = verboselogs.VerboseLogger('root')
 
 
 class ExposomeExplorerParser(BaseParser):
+    entity_mappings = ["Food"]
+
     def __init__(self, import_directory, database_directory, config_file=None,
                  download=True, skip=True, organisms=["9606", "10090"]) -> None:
         self.database_name = 'ExposomeExplorer'
@@ -70,7 +72,7 @@ class ExposomeExplorerParser(BaseParser):
         first = True
         with fhandler.open(file_name) as f:
             df = pd.read_csv(f, sep=',', header=None,
-                             low_memory=False)
+                             low_memory=False, nrows=self.sampler.sample)
             first = True
             for index, row in df.iterrows():
                 if first:
@@ -106,11 +108,11 @@ class ExposomeExplorerParser(BaseParser):
         for entity, relationship in relationships:
             ee_outputfile = os.path.join(self.import_directory,
                                          self.database_name.lower()+"_"+entity.lower()+"_"+relationship.lower()+".tsv")
-            self.write_relationships(relationships[(entity, relationship)],
+            count = self.write_relationships(relationships[(entity, relationship)],
                                      header[entity], ee_outputfile)
             logger.info("Database {} - Number of {} relationships: {}".format(self.database_name, relationship,
-                                                                              len(relationships[(entity, relationship)])))
-            stats.add(self._build_stats(len(relationships[(entity, relationship)]), "relationships",
+                                                                              count))
+            stats.add(self._build_stats(count, "relationships",
                                         relationship, self.database_name, ee_outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
@@ -0,0 +1,98 @@
+# Bytes read at once from a FASTA file.
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+# Characters removed from the sequence lines (as Bio.SeqIO does).
+_BLANKS = b'\r\n '
+
+
+def read_records(handle, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Reads the records of a FASTA file in large blocks of bytes, without building a SeqRecord \
+    (and its Seq and str copies) per sequence.
+
+    :param handle: binary stream of the file (e.g. read_gzipped_file(filepath, 'rb')).
+    :param int block_size: bytes read at once.
+    :return: Generator of (identifier, sequence) tuples of bytes, the identifier being the \
+            first word of the header like the id of Bio.SeqIO (e.g. b'sp|P31946|1433B_HUMAN').
+    """
+    # The file is read as if it started with a line break, so that every header follows one.
+    pending = b'\n'
+    while True:
+        block = handle.read(block_size)
+        if not block:
+            break
+        pending += block
+        cut = pending.rfind(b'\n>')
+        if cut <= 0:
+            continue
+        chunk, pending = pending[:cut], pending[cut:]
+        yield from _split_records(chunk)
+    yield from _split_records(pending)
+
+
+def _split_records(chunk):
+    # The first part is the text before the first header of the file, or empty.
+    for record in chunk.split(b'\n>')[1:]:
+        header, _, sequence = record.partition(b'\n')
+        words = header.split(None, 1)
+        yield words[0] if words else b'', sequence.translate(None, _BLANKS)
+
+
+class SequenceSidecar:
+    """
+    Writes sequences to a BGZF file (a gzip file of independent blocks, readable by zcat and \
+    Bio.bgzf) in FASTA format, and returns the virtual offset of each sequence, which \
+    read_sequence uses to read it without decompressing the whole file.
+
+    Usage::
+
+        with SequenceSidecar(filepath) as sidecar:
+            offset = sidecar.write(b'P31946', sequence)
+        sequence = read_sequence(filepath, offset, len(sequence))
+    """
+
+    def __init__(self, filepath, compresslevel=1) -> None:
+        """
+        :param str filepath: path to the file (e.g. Amino_acid_sequence.9606.seq.bgz).
+        :param int compresslevel: zlib compression level of the blocks (protein sequences \
+                                have few repeats, higher levels are slower for little gain).
+        """
+        from Bio import bgzf
+        self.filepath = filepath
+        self._writer = bgzf.BgzfWriter(filepath, 'wb', compresslevel=compresslevel)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, accession, sequence):
+        """
+        Writes a sequence under the header >accession.
+
+        :param bytes accession: key of the sequence.
+        :param bytes sequence: sequence without line breaks.
+        :return: Virtual offset (int) of the sequence.
+        """
+        self._writer.write(b'>' + accession + b'\n')
+        offset = self._writer.tell()
+        self._writer.write(sequence + b'\n')
+        return offset
+
+    def close(self):
+        self._writer.close()
+
+
+def read_sequence(filepath, offset, size):
+    """
+    Reads a sequence of a file written by SequenceSidecar.
+
+    :param str filepath: path to the file.
+    :param int offset: virtual offset of the sequence.
+    :param int size: length of the sequence.
+    :return: The sequence (str).
+    """
+    from Bio import bgzf
+    with bgzf.BgzfReader(filepath, 'rb') as reader:
+        reader.seek(int(offset))
+        return reader.read(int(size)).decode('ascii')
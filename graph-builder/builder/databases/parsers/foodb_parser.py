@@ -78,19 +78,19 @@ class FooDBParser(BaseParser):
         stats = set()
         entities, relationships, entities_header, relationships_headers = self.parse()
         entity_outputfile = os.path.join(self.import_directory, "Food.tsv")
-        self.write_entities(entities, entities_header, entity_outputfile)
+        count = self.write_entities(entities, entities_header, entity_outputfile)
         logger.info("Database {} - Number of {} entities: {}".format(
-            self.database_name, "Food", len(entities)))
-        stats.add(self._build_stats(len(entities), "entity", "Food",
+            self.database_name, "Food", count))
+        stats.add(self._build_stats(count, "entity", "Food",
                   self.database_name, entity_outputfile, self.updated_on))
         for entity, relationship in relationships:
             foodb_outputfile = os.path.join(self.import_directory,
                                             self.database_name.lower()+"_"+entity.lower()+"_"+relationship.lower()+".tsv")
-            self.write_relationships(relationships[(entity, relationship)],
+            count = self.write_relationships(relationships[(entity, relationship)],
                                      relationships_headers[entity], foodb_outputfile)
             logger.info("Database {} - Number of {} relationships: {}".format(
-                self.database_name, relationship, len(relationships[(entity, relationship)])))
-            stats.add(self._build_stats(len(relationships[(entity, relationship)]),
+                self.database_name, relationship, count))
+            stats.add(self._build_stats(count,
                                         "relationships", relationship, self.database_name, foodb_outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
@@ -98,7 +98,7 @@ class FooDBParser(BaseParser):
     def parse_contents(self, fhandler):
         contents = {}
         first = True
-        for line in fhandler:
+        for line in self.limited(fhandler):
             if first:
                 first = False
                 continue
@@ -33,39 +33,27 @@ class GWASCatalogParser(BaseParser):
         fileName = os.path.join(directory, url.split('/')[-1])
         if self.download:
             self.download_db(url, directory)
-        with open(fileName, 'r', encoding="utf-8") as catalog:
-            for line in catalog:
-                data = line.rstrip("\r\n").split("\t")
-                if len(data) > 36:
-                    pubmedid = data[1]
-                    date = data[3]
-                    title = data[6]
-                    sample_size = data[8]
-                    replication_size = data[9]
-                    #chromosome = data[11]
-                    #position = data[12]
-                    #genes_mapped = data[14].split(" - ")
-                    snp_id = data[20].split('-')[0]
-                    freq = data[26]
-                    pval = data[27]
-                    odds_ratio = data[30]
-                    trait = data[34]
-                    exp_factor = data[35]
-                    study = data[36]
-
-                    entities.add((study, "GWAS_study", title, date,
-                                 sample_size, replication_size, trait))
-                    if pubmedid != "":
-                        relationships["published_in_publication"].add((study, pubmedid,
-                                                                       "PUBLISHED_IN", "GWAS Catalog"))
-                    if snp_id != "":
-                        relationships["variant_found_in_gwas"].add((re.sub(r"^\W+|\W+$", "", snp_id), study,
-                                                                    "VARIANT_FOUND_IN_GWAS", freq, pval, odds_ratio, trait, "GWAS Catalog"))
-                    if exp_factor != "":
-                        exp_factor = exp_factor.split('/')[-1]
-                        exp_factor = exp_factor.replace('_', ':')
-                        relationships["studies_trait"].add((study, exp_factor,
-                                                            "STUDIES_TRAIT", "GWAS Catalog"))
+        columns = [1, 3, 6, 8, 9, 20, 26, 27, 30, 34, 35, 36]
+        for rows in self.read_tsv_columns(fileName, columns, skiprows=1):
+            for pubmedid, date, title, sample_size, replication_size, snp_id, freq, pval, odds_ratio, \
+                    trait, exp_factor, study in rows:
+                if study == "":
+                    # Lines with less than 37 fields.
+                    continue
+                snp_id = snp_id.split('-')[0]
+                entities.add((study, "GWAS_study", title, date,
+                             sample_size, replication_size, trait))
+                if pubmedid != "":
+                    relationships["published_in_publication"].add((study, pubmedid,
+                                                                   "PUBLISHED_IN", "GWAS Catalog"))
+                if snp_id != "":
+                    relationships["variant_found_in_gwas"].add((re.sub(r"^\W+|\W+$", "", snp_id), study,
+                                                                "VARIANT_FOUND_IN_GWAS", freq, pval, odds_ratio, trait, "GWAS Catalog"))
+                if exp_factor != "":
+                    exp_factor = exp_factor.split('/')[-1]
+                    exp_factor = exp_factor.replace('_', ':')
+                    relationships["studies_trait"].add((study, exp_factor,
+                                                        "STUDIES_TRAIT", "GWAS Catalog"))
 
         # self.remove_directory(directory)
 
@@ -76,10 +64,10 @@ class GWASCatalogParser(BaseParser):
         entities, relationships, entities_header, relationships_header = self.parse()
         entity_outputfile = os.path.join(self.import_directory,
                                          "GWAS_study.tsv")
-        self.write_entities(entities, entities_header, entity_outputfile)
+        count = self.write_entities(entities, entities_header, entity_outputfile)
         logger.info("Database {} - Number of {} entities: {}".format(self.database_name,
-                                                                     "GWAS_study", len(entities)))
-        stats.add(self._build_stats(len(entities), "entity", "GWAS_study", self.database_name,
+                                                                     "GWAS_study", count))
+        stats.add(self._build_stats(count, "entity", "GWAS_study", self.database_name,
                                     entity_outputfile, self.updated_on))
         for relationship in relationships:
             header = ['START_ID', 'END_ID', 'TYPE', 'source']
@@ -87,11 +75,11 @@ class GWASCatalogParser(BaseParser):
                 header = relationships_header[relationship]
             outputfile = os.path.join(self.import_directory,
                                       "GWAS_study_"+relationship+".tsv")
-            self.write_relationships(relationships[relationship],
+            count = self.write_relationships(relationships[relationship],
                                      header, outputfile)
             logger.info("Database {} - Number of {} relationships: {}".format(self.database_name,
-                                                                              relationship, len(relationships[relationship])))
-            stats.add(self._build_stats(len(relationships[relationship]), "relationships", relationship,
+                                                                              relationship, count))
+            stats.add(self._build_stats(count, "relationships", relationship,
                                         self.database_name, outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
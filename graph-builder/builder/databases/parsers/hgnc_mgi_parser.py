@@ -43,7 +43,7 @@ class HGNC_MGI_Parser(BaseParser):
 
         with open(fileName, 'r', encoding="utf-8") as df:
             first = True
-            for line in df:
+            for line in self.limited(df):
                 if first:
                     first = False
                     continue
@@ -141,10 +141,10 @@ class HGNC_MGI_Parser(BaseParser):
         stats = set()
         entities, header = self.parse()
         outputfile = os.path.join(self.import_directory, "Gene.tsv")
-        self.write_entities(entities, header, outputfile)
+        count = self.write_entities(entities, header, outputfile)
         logger.info("Database {} - Number of {} entities: {}".format(
-            self.database_name, "Gene", len(entities)))
-        stats.add(self._build_stats(len(entities), "entity", "Gene",
+            self.database_name, "Gene", count))
+        stats.add(self._build_stats(count, "entity", "Gene",
                   self.database_name, outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
@@ -3,16 +3,19 @@ import os.path
 import logging
 import zipfile
 import verboselogs
-from collections import defaultdict
+from collections import defaultdict, ChainMap
 from lxml import etree
 from builder.databases import config
 from builder.databases.parsers.base_parser import BaseParser
+from builder.databases.parsers.tsv_sink import TsvSink
 
 
 logger = verboselogs.VerboseLogger('root')
 
 
 class HMDBParser(BaseParser):
+    ontology_mappings = ["Tissue", "Disease"]
+
     def __init__(self, import_directory, database_directory, config_file=None,
                  download=True, skip=True, organisms=["9606", "10090"]) -> None:
         self.database_name = 'HMDB'
@@ -27,10 +30,9 @@ class HMDBParser(BaseParser):
         directory = os.path.join(self.database_directory, "HMDB")
         self.check_directory(directory)
         metabolites = self.extract_metabolites(directory)
-        mapping = self.get_mapping_from_ontology(
-            ontology="Disease", source=self.config['HMDB_DO_source'])
-        mapping.update(self.get_mapping_from_ontology(
-            ontology="Tissue", source=None))
+        # Tissue aliases take precedence over disease aliases.
+        mapping = ChainMap(self.get_mapping_from_ontology(ontology="Tissue", source=None),
+                           self.get_mapping_from_ontology(ontology="Disease", source=self.config['HMDB_DO_source']))
         entities, attributes = self.build_metabolite_entity(
             directory, metabolites)
         relationships = self.build_relationships_from_hmdb(
@@ -47,20 +49,29 @@ class HMDBParser(BaseParser):
         entities, relationships, entities_header, relationships_header = self.parse()
         entity_outputfile = os.path.join(
             self.import_directory, "Metabolite.tsv")
-        self.write_entities(entities, entities_header, entity_outputfile)
+        count = self.write_entities(entities, entities_header, entity_outputfile)
         logger.info("Database {} - Number of {} entities: {}".format(
-            self.database_name, "Metabolite", len(entities)))
-        stats.add(self._build_stats(len(entities), "entity", "Metabolite",
+            self.database_name, "Metabolite", count))
+        stats.add(self._build_stats(count, "entity", "Metabolite",
                   self.database_name, entity_outputfile, self.updated_on))
-        for relationship in relationships:
-            hmdb_outputfile = os.path.join(
-                self.import_directory, relationship+".tsv")
-            self.write_relationships(
-                relationships[relationship], relationships_header, hmdb_outputfile)
+        # The relationships are streamed to their files as they are built.
+        sinks = {}
+        try:
+            for relationship, row in relationships:
+                if relationship not in sinks:
+                    hmdb_outputfile = os.path.join(
+                        self.import_directory, relationship+".tsv")
+                    sinks[relationship] = TsvSink(
+                        hmdb_outputfile, relationships_header, sampler=self.sampler)
+                sinks[relationship].write(row)
+        finally:
+            for sink in sinks.values():
+                sink.close()
+        for relationship, sink in sinks.items():
             logger.info("Database {} - Number of {} relationships: {}".format(
-                self.database_name, relationship, len(relationships[relationship])))
-            stats.add(self._build_stats(len(relationships[relationship]), "relationships",
-                      relationship, self.database_name, hmdb_outputfile, self.updated_on))
+                self.database_name, relationship, sink.count))
+            stats.add(self._build_stats(sink.count, "relationships",
+                      relationship, self.database_name, sink.outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
 
@@ -128,7 +139,9 @@ class HMDBParser(BaseParser):
         return entities, attributes
 
     def build_relationships_from_hmdb(self, metabolites, mapping):
-        relationships = defaultdict(list)
+        """
+        Yields the relationships of the metabolites as (relationship type, row) pairs.
+        """
         associations = self.config['HMDB_associations']
         for metid in metabolites:
             for ass in associations:
@@ -140,16 +153,12 @@ class HMDBParser(BaseParser):
                         for partner in metabolites[metid][ass]:
                             if partner.lower() in mapping:
                                 partner = mapping[partner.lower()]
-                            relationships[ident].append(
-                                (metid, partner, associations[ass][0], "HMDB"))
+                            yield ident, (metid, partner, associations[ass][0], "HMDB")
                     else:
                         partner = metabolites[metid][ass]
                         if metabolites[metid][ass].lower() in mapping:
                             partner = mapping[metabolites[metid][ass].lower()]
-                        relationships[ident].append(
-                            (metid, partner, associations[ass][0], "HMDB"))
-
-        return relationships
+                        yield ident, (metid, partner, associations[ass][0], "HMDB")
 
     def build_hmdb_dictionary(self, directory, metabolites):
         filename = "mapping.tsv"
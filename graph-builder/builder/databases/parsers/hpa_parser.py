@@ -14,6 +14,9 @@ logger = verboselogs.VerboseLogger('root')
 
 
 class HPAParser(BaseParser):
+    entity_mappings = ["Protein"]
+    ontology_mappings = ["Disease"]
+
     def __init__(self, import_directory, database_directory, config_file=None,
                  download=True, skip=True, organisms=["9606", "10090"]) -> None:
         self.database_name = 'HPA'
@@ -53,7 +56,7 @@ class HPAParser(BaseParser):
         first = True
         with fhandler.open(file_name) as f:
             df = pd.read_csv(f, sep='\t', header=None,
-                             low_memory=False)
+                             low_memory=False, nrows=self.sampler.sample)
             df = df.fillna(0)
             first = True
             for index, row in df.iterrows():
@@ -103,11 +106,11 @@ class HPAParser(BaseParser):
         for entity, relationship in relationships:
             hpa_outputfile = os.path.join(self.import_directory,
                                           self.database_name.lower()+"_"+entity.lower()+"_"+relationship.lower()+".tsv")
-            self.write_relationships(relationships[(entity, relationship)],
+            count = self.write_relationships(relationships[(entity, relationship)],
                                      headers[relationship], hpa_outputfile)
             logger.info("Database {} - Number of {} relationships: {}".format(self.database_name,
-                                                                              relationship, len(relationships[(entity, relationship)])))
-            stats.add(self._build_stats(len(relationships[(entity, relationship)]),
+                                                                              relationship, count))
+            stats.add(self._build_stats(count,
                                         "relationships", relationship, self.database_name, hpa_outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
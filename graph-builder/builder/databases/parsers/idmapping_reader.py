@@ -0,0 +1,89 @@
+import verboselogs
+from collections import namedtuple
+
+
+logger = verboselogs.VerboseLogger('root')
+
+# A protein of the UniProt idmapping file, with the lines of its isoforms (e.g. P31946-2).
+# fields: dict of the values of each kept field (e.g. {'Gene_Name': ['YWHAB']}), in file order.
+# synonyms: values of the synonym fields, in file order.
+# isoforms: isoform accessions, in file order.
+UniProtEntry = namedtuple('UniProtEntry', ['accession', 'fields', 'synonyms', 'isoforms'])
+
+
+def _split_accession(identifier):
+    """
+    Returns the canonical accession of an idmapping identifier and whether it is an isoform \
+    (e.g. ('P31946', True) for 'P31946-2').
+    """
+    if '-' in identifier:
+        accession, _, number = identifier.rpartition('-')
+        if number.isdigit():
+            return accession, True
+    return identifier, False
+
+
+def read_entries(lines, fields, synonym_fields, taxids):
+    """
+    Groups the lines of a UniProt idmapping file (accession, field, value) by canonical \
+    accession and yields each protein of the given species once its lines are read.
+
+    The file lists the lines of a protein together, followed by the lines of its isoforms, so \
+    only the protein being read is held in memory, whatever the size of the file. The lines of \
+    an isoform go to its canonical accession, and a protein is kept if it has a UniProtKB-ID \
+    and a NCBI_TaxID in taxids. Blank or truncated lines (e.g. at the end of a cut-off \
+    download) are skipped and counted in a warning.
+
+    :param lines: iterable of the lines of the file (str, with or without line terminators).
+    :param fields: names of the fields kept (e.g. ['UniProtKB-ID', 'Gene_Name', 'PDB']).
+    :param synonym_fields: names of the fields whose values are synonyms of the protein.
+    :param taxids: NCBI taxonomy identifiers (int) of the species kept.
+    :return: Generator of UniProtEntry.
+    """
+    fields = frozenset(fields)
+    synonym_fields = frozenset(synonym_fields)
+    taxids = frozenset(int(taxid) for taxid in taxids)
+    identifier = None
+    accession = None
+    entry = None
+    kept = False
+    skipped = 0
+    for line in lines:
+        try:
+            iid, field, value = line.split('\t', 2)
+        except ValueError:
+            skipped += 1
+            continue
+        if iid == identifier:
+            # Most lines are fields which are not kept (e.g. UniRef100, EMBL), skipped here.
+            if field not in fields or not kept:
+                continue
+        else:
+            identifier = iid
+            canonical, isoform = _split_accession(iid)
+            if canonical != accession:
+                if kept and 'UniProtKB-ID' in entry.fields and 'NCBI_TaxID' in entry.fields:
+                    yield entry
+                accession = canonical
+                entry = UniProtEntry(canonical, {}, [], [])
+                kept = True
+            if isoform and kept and iid not in entry.isoforms:
+                entry.isoforms.append(iid)
+            if not kept or field not in fields:
+                continue
+        value = value.rstrip('\r\n')
+        if field == 'NCBI_TaxID' and (not value.isdigit() or int(value) not in taxids):
+            kept = False
+            continue
+        if field in synonym_fields:
+            entry.synonyms.append(value)
+        values = entry.fields.get(field)
+        if values is None:
+            entry.fields[field] = [value]
+        else:
+            values.append(value)
+    if skipped:
+        logger.warning("Skipped %d lines of the idmapping file without an accession, a field and a value"
+                       % skipped)
+    if kept and entry is not None and 'UniProtKB-ID' in entry.fields and 'NCBI_TaxID' in entry.fields:
+        yield entry
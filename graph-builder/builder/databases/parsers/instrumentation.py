@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import functools
+from contextlib import contextmanager
+from builder.databases.profiles import ResourceMonitor, current_rss
+
+
+# Report of a parse-database run, written in the output directory next to the graph files.
+REPORT_FILE = 'build_report.json'
+# Name of the time of a parser spent outside all measured phases, i.e. parsing the rows.
+UNMEASURED_PHASE = 'parse'
+
+
+def _rate(count, seconds):
+    return round(count / seconds, 1) if count and seconds > 0 else None
+
+
+class Phase:
+    """
+    Measures of a phase of a parser (download, read, mapping-load, write...), summed over all \
+    the times the parser went through it.
+    """
+
+    def __init__(self, name) -> None:
+        self.name = name
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_rss = 0
+        self.rows_in = 0
+        self.rows_out = 0
+
+    def to_dict(self):
+        return {'calls': self.calls,
+                'wall_seconds': round(self.wall_seconds, 3),
+                'cpu_seconds': round(self.cpu_seconds, 3),
+                'peak_rss': self.peak_rss,
+                'rows_in': self.rows_in,
+                'rows_out': self.rows_out,
+                'rows_per_second': _rate(max(self.rows_in, self.rows_out), self.wall_seconds)}
+
+
+class PhaseRecorder:
+    """
+    Records the wall time, CPU time, peak resident memory and rows read/written by the \
+    phases of a parser.
+
+    Phases may be nested (e.g. the write phases of a step of UniProt). The time of the \
+    parser outside all phases is reported as the 'parse' phase.
+
+    Usage::
+
+        with self.phases.phase("download"):
+            self.download_db(url, directory)
+        with self.phases.phase("write") as phase:
+            phase.rows_out += self.write_entities(entities, header, outputfile)
+    """
+
+    def __init__(self) -> None:
+        self.phases = {}
+        self.outer_seconds = 0.0
+        self.outer_cpu_seconds = 0.0
+        self._depth = 0
+
+    def get(self, name):
+        if name not in self.phases:
+            self.phases[name] = Phase(name)
+        return self.phases[name]
+
+    def merge(self, other):
+        """
+        Adds the measures of the phases of another recorder, e.g. the one of a worker process. \
+        The parser waits for its workers inside one of its own phases, so the time outside all \
+        phases does not change.
+
+        :param PhaseRecorder other: recorder whose phases are added.
+        """
+        for name, measures in other.phases.items():
+            phase = self.get(name)
+            phase.calls += measures.calls
+            phase.wall_seconds += measures.wall_seconds
+            phase.cpu_seconds += measures.cpu_seconds
+            phase.peak_rss = max(phase.peak_rss, measures.peak_rss)
+            phase.rows_in += measures.rows_in
+            phase.rows_out += measures.rows_out
+
+    def _record(self, phase, wall_seconds, cpu_seconds, peak_rss=None):
+        phase.wall_seconds += wall_seconds
+        phase.cpu_seconds += cpu_seconds
+        if peak_rss:
+            phase.peak_rss = max(phase.peak_rss, peak_rss)
+        if self._depth == 0:
+            self.outer_seconds += wall_seconds
+            self.outer_cpu_seconds += cpu_seconds
+
+    @contextmanager
+    def phase(self, name, rows_in=0, rows_out=0):
+        """
+        Measures a block of code as a phase.
+
+        :param str name: name of the phase.
+        :param int rows_in: rows read by the phase, also counted with phase.rows_in += n.
+        :param int rows_out: rows written by the phase, also counted with phase.rows_out += n.
+        :return: The Phase, whose rows the block may count.
+        """
+        phase = self.get(name)
+        phase.calls += 1
+        phase.rows_in += rows_in
+        phase.rows_out += rows_out
+        monitor = ResourceMonitor(collect=False)
+        self._depth += 1
+        try:
+            with monitor:
+                yield phase
+        finally:
+            self._depth -= 1
+            self._record(phase, monitor.wall_seconds, monitor.cpu_seconds, monitor.peak_rss)
+
+    def iterate(self, name, iterable, rows=len):
+        """
+        Yields the items of an iterable, measuring as a phase only the time spent producing \
+        them (e.g. decompressing and splitting the lines of a file), not the time the caller \
+        spends on each item.
+
+        :param str name: name of the phase.
+        :param iterable: iterable (e.g. a generator of blocks of rows).
+        :param rows: function returning the number of rows of an item.
+        """
+        phase = self.get(name)
+        phase.calls += 1
+        iterator = iter(iterable)
+        end = object()
+        while True:
+            start, start_cpu = time.perf_counter(), time.process_time()
+            item = next(iterator, end)
+            self._record(phase, time.perf_counter() - start, time.process_time() - start_cpu)
+            if item is end:
+                break
+            phase.rows_in += rows(item)
+            yield item
+        phase.peak_rss = max(phase.peak_rss, current_rss() or 0)
+
+    def report(self, profile=None, stats=None):
+        """
+        Returns the measures of a parser as a json serializable dict.
+
+        :param dict profile: measures of the whole parser (see profiles.ResourceMonitor).
+        :param set stats: stats tuples of the graph files written by the parser.
+        """
+        report = dict(profile or {})
+        report['rows_out'] = stats_rows(stats)
+        phases = {name: phase.to_dict() for name, phase in self.phases.items()}
+        if profile:
+            report['rows_per_second'] = _rate(report['rows_out'], profile['wall_seconds'])
+            parse = Phase(UNMEASURED_PHASE)
+            parse.calls = 1
+            parse.wall_seconds = max(profile['wall_seconds'] - self.outer_seconds, 0.0)
+            parse.cpu_seconds = max(profile['cpu_seconds'] - self.outer_cpu_seconds, 0.0)
+            parse.peak_rss = profile['peak_rss']
+            phases[UNMEASURED_PHASE] = parse.to_dict()
+        report['phases'] = phases
+        return report
+
+
+def measured(name, rows=None):
+    """
+    Decorator measuring a method of a parser as a phase.
+
+    :param str name: name of the phase.
+    :param rows: function returning the number of rows written from the value returned by \
+                the method.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.phases.phase(name) as phase:
+                value = method(self, *args, **kwargs)
+                if rows is not None:
+                    phase.rows_out += rows(value)
+            return value
+        return wrapper
+    return decorator
+
+
+def stats_rows(stats):
+    """
+    Returns the number of entities and relationships in the stats tuples of a parser.
+    """
+    rows = 0
+    for row in stats or []:
+        try:
+            rows += int(row[5])
+        except (IndexError, TypeError, ValueError):
+            continue
+    return rows
+
+
+def write_report(directory, databases, **run):
+    """
+    Writes the report of a parse-database run, with the parsers sorted from the slowest.
+
+    :param str directory: output directory of the graph files.
+    :param dict databases: report of each parser by database name (see PhaseRecorder.report).
+    :param run: measures of the whole run (wall_seconds, n_jobs...).
+    :return: Path to the report.
+    """
+    report = dict(run)
+    report['slowest'] = sorted((db for db in databases if databases[db].get('wall_seconds') is not None),
+                               key=lambda db: -databases[db]['wall_seconds'])
+    report['databases'] = databases
+    filepath = os.path.join(directory, REPORT_FILE)
+    tmp_path = "%s.%s.tmp" % (filepath, os.getpid())
+    with open(tmp_path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, filepath)
+    return filepath
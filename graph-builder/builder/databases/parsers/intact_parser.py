@@ -36,34 +36,28 @@ class IntActParser(BaseParser):
         if self.download:
             self.download_db(url, directory)
 
-        with open(fileName, 'r', encoding="utf-8") as idf:
-            first = True
-            for line in idf:
-                if first:
-                    first = False
-                    continue
-                data = line.rstrip("\r\n").split("\t")
-                intA = data[0].split(":")[1]
-                intB = data[1].split(':')
+        for rows in self.read_tsv_columns(fileName, [0, 1, 6, 8, 9, 10, 11, 12, 14], skiprows=1):
+            for intA, intB, method, publications, taxidA, taxidB, itype, source, score in rows:
+                intA = intA.split(":")[1]
+                intB = intB.split(':')
                 if len(intB) > 1:
                     intB = intB[1]
                 else:
                     continue
-                methodMatch = re.search(regex, data[6])
+                methodMatch = re.search(regex, method)
                 method = methodMatch.group(1) if methodMatch else "unknown"
-                publications = data[8]
-                tAmatch = re.search(taxid_regex, data[9])
-                tBmatch = re.search(taxid_regex, data[10])
+                tAmatch = re.search(taxid_regex, taxidA)
+                tBmatch = re.search(taxid_regex, taxidB)
                 taxidA = ""
                 taxidB = ""
                 if tAmatch and tBmatch:
                     taxidA = tAmatch.group(1)
                     taxidB = tBmatch.group(1)
-                itypeMatch = re.search(regex, data[11])
+                itypeMatch = re.search(regex, itype)
                 itype = itypeMatch.group(1) if itypeMatch else "unknown"
-                sourceMatch = re.search(regex, data[12])
+                sourceMatch = re.search(regex, source)
                 source = sourceMatch.group(1) if sourceMatch else "unknown"
-                score = data[14].split(":")[1]
+                score = score.split(":")[1]
                 if self.is_number(score):
                     score = float(score)
                 else:
@@ -93,10 +87,10 @@ class IntActParser(BaseParser):
         stats = set()
         relationships, header, outputfileName = self.parse()
         outputfile = os.path.join(self.import_directory, outputfileName)
-        self.write_relationships(relationships, header, outputfile)
+        count = self.write_relationships(relationships, header, outputfile)
         logger.info("Database {} - Number of {} relationships: {}".format(
-            self.database_name, "curated_interacts_with", len(relationships)))
-        stats.add(self._build_stats(len(relationships), "relationships", "curated_interacts_with",
+            self.database_name, "curated_interacts_with", count))
+        stats.add(self._build_stats(count, "relationships", "curated_interacts_with",
                                     self.database_name, outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
@@ -38,14 +38,10 @@ class JensenLabParser(BaseParser):
         valid_pubs = self.read_valid_pubs(organisms, ifile)
         entities, header = self.parse_pmc_list(os.path.join(
             directory, "textmining"), valid_pubs=valid_pubs)
-        num_entities = len(entities)
         outputfile = os.path.join(self.import_directory, outputfileName)
-        self.write_entities(entities, header, outputfile)
+        num_entities = self.write_entities(entities, header, outputfile)
         entities = None
 
-        for qtype in self.config['db_mentions_types']:
-            self.parse_mentions(directory, qtype)
-
         # self.remove_directory(os.path.join(directory, "textmining"))
 
         return (num_entities, outputfile)
@@ -80,7 +76,7 @@ class JensenLabParser(BaseParser):
         ifile = os.path.join(directory, os.path.join("integration", ifile))
 
         with open(ifile, 'r') as idbf:
-            for line in idbf:
+            for line in self.limited(idbf):
                 data = line.rstrip("\r\n").split('\t')
                 id1 = "9606."+data[0]
                 id2 = data[2]
@@ -161,7 +157,7 @@ class JensenLabParser(BaseParser):
         with open(outputfile, 'w') as f:
             f.write("START_ID\tEND_ID\tTYPE\n")
             with open(ifile, 'r') as idbf:
-                for line in idbf:
+                for line in self.limited(idbf):
                     data = line.rstrip("\r\n").split('\t')
                     id1 = data[0]
                     pubmedids = data[1].split(" ")
@@ -181,33 +177,49 @@ class JensenLabParser(BaseParser):
 
                     for i in ident:
                         if i not in filters:
+                            kept = [pubmedid for pubmedid in pubmedids
+                                    if self.sampler.keep_row((i, pubmedid), ['START_ID', 'END_ID'])]
+                            if not kept:
+                                continue
                             aux = pd.DataFrame(
-                                data={"Pubmedids": list(pubmedids)})
+                                data={"Pubmedids": kept})
                             aux["START_ID"] = i
                             aux["TYPE"] = "MENTIONED_IN_PUBLICATION"
                             aux.to_csv(path_or_buf=f, sep='\t', header=False, index=False,
                                        quotechar='"', line_terminator='\n', escapechar='\\')
                             aux = None
 
-    def build_stats(self):
-        stats = set()
-        # Parse JensenLabMentions
+    def build_publications_stats(self):
         num_entities, outputfile = self.parse()
         logger.info("Database {} - Number of {} entities: {}".format(
             self.database_name, "Publication", num_entities))
-        stats.add(self._build_stats(num_entities, "entity", "Publication",
-                                    self.database_name, outputfile, self.updated_on))
-        logger.success("Done Parsing database {}".format(self.database_name))
+        return {self._build_stats(num_entities, "entity", "Publication",
+                                  self.database_name, outputfile, self.updated_on)}
 
-        # Parse JensenLab
+    def build_integrated_stats(self):
+        stats = set()
         result = self.parse_jensenlab()
         for qtype in result:
             relationships, header, outputfileName = result[qtype]
             outputfile = os.path.join(self.import_directory, outputfileName)
-            self.write_relationships(relationships, header, outputfile)
+            count = self.write_relationships(relationships, header, outputfile)
             logger.info("Database {} - Number of {} relationships: {}".format(self.database_name,
-                                                                              qtype, len(relationships)))
-            stats.add(self._build_stats(len(relationships), "relationships", qtype,
+                                                                              qtype, count))
+            stats.add(self._build_stats(count, "relationships", qtype,
                                         self.database_name, outputfile, self.updated_on))
-        print("Done Parsing database {}".format(self.database_name))
+        return stats
+
+    def build_stats(self):
+        # Each step replaces its files once it succeeds, a failed build resumes from the
+        # first step it did not complete.
+        # Parse JensenLabMentions
+        stats = self.run_step("publications", self.build_publications_stats)
+        directory = os.path.join(self.database_directory, self.database_name)
+        for qtype in self.config['db_mentions_types']:
+            self.run_step("mentions_%s" % qtype, self.parse_mentions, directory, qtype)
+        logger.info("Done Parsing mentions of database {}".format(self.database_name))
+
+        # Parse JensenLab
+        stats.update(self.run_step("integrated", self.build_integrated_stats))
+        logger.success("Done Parsing database {}".format(self.database_name))
         return stats
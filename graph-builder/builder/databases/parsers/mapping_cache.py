@@ -0,0 +1,88 @@
+import os
+import verboselogs
+from contextlib import contextmanager
+from builder.databases.parsers import mapping_index
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+logger = verboselogs.VerboseLogger('root')
+
+# Indexes opened by this process, by (index path, multiple). A joblib worker runs several
+# parsers in turn and they share the views; the pages of an index file are shared by all
+# processes through the page cache, so the memory of a run grows with the number of distinct
+# mappings, not with the number of workers.
+_indexes = {}
+
+
+@contextmanager
+def _index_lock(path):
+    """
+    Holds an exclusive lock on '<index>.lock', so that a single process compiles an index \
+    while the other ones wait for it and then map the same file.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(path + '.lock', 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def get(mapping_file, variant, pairs, multiple=False):
+    """
+    Returns the shared view of a mapping index, compiling the index first if it is missing or \
+    older than the mapping file.
+
+    :param str mapping_file: path to complete_mapping.tsv.
+    :param str variant: name of the index (e.g. 'alias').
+    :param pairs: function returning the (key, value) pairs of the mapping file, only called \
+                    when the index has to be compiled.
+    :param bool multiple: return all values of a key instead of the last one.
+    :return: MappingIndex.
+    """
+    path = mapping_index.index_path(mapping_file, variant)
+    key = (path, multiple)
+    index = _indexes.get(key)
+    if index is not None and not index.is_stale(mapping_file):
+        return index
+    with _index_lock(path):
+        index = mapping_index.open_index(mapping_file, variant, pairs, multiple=multiple)
+    _indexes[key] = index
+    return index
+
+
+def warm(database_directory, builder_config):
+    """
+    Compiles the missing or stale indexes of the mappings already in a directory, before the \
+    parsers are started in several processes.
+
+    :param str database_directory: folder which contains the database/ontology folders.
+    :param dict builder_config: content of builder/config.yml.
+    """
+    ontologies = set(builder_config["ontology"]["ontologies"].values())
+    sources = set(builder_config["database"]["sources"].values())
+    for name in sorted(ontologies | sources):
+        mapping_file = os.path.join(database_directory, name, "complete_mapping.tsv")
+        if not os.path.isfile(mapping_file):
+            continue
+        if name in ontologies:
+            get(mapping_file, mapping_index.ontology_variant(),
+                lambda: mapping_index.ontology_pairs(mapping_file))
+        else:
+            get(mapping_file, mapping_index.ALIAS,
+                lambda: mapping_index.alias_pairs(mapping_file))
+    logger.info("Mapping indexes ready in %s" % database_directory)
+
+
+def clear():
+    """
+    Forgets the indexes opened by this process.
+    """
+    _indexes.clear()
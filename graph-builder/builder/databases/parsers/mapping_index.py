@@ -0,0 +1,274 @@
+import os
+import re
+import sys
+import mmap
+import struct
+import bisect
+import hashlib
+import verboselogs
+from array import array
+from collections import defaultdict
+from collections.abc import Mapping
+
+
+logger = verboselogs.VerboseLogger('root')
+
+MAGIC = b'GBMIDX01'
+# Index of the (alias, identifier) pairs of an entity mapping file.
+ALIAS = 'alias'
+# magic, byteorder, size and mtime of the tsv file, number of keys, values and distinct values.
+HEADER = struct.Struct('<8s8sqqqqq')
+
+
+class InvalidIndex(Exception):
+    pass
+
+
+def key_hash(key):
+    """
+    Returns the 64 bits hash used to sort and find the keys of an index.
+
+    :param bytes key: utf-8 encoded key.
+    """
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+
+
+def index_path(mapping_file, variant):
+    return "%s.%s.idx" % (os.path.splitext(mapping_file)[0], variant)
+
+
+def ontology_variant(source=None):
+    """
+    Name of the index of an ontology mapping file restricted to the aliases of one source.
+
+    :param str source: name of the source database (e.g. 'OMIM'), all aliases if None.
+    """
+    if source is None:
+        return 'ontology'
+    digest = hashlib.md5(source.encode('utf-8')).hexdigest()[:8]
+    return 'ontology-%s-%s' % (re.sub(r'[^A-Za-z0-9_-]', '_', source)[:32], digest)
+
+
+def alias_pairs(mapping_file):
+    """
+    Pairs (alias, identifier) of an entity mapping file (identifier, alias).
+    """
+    return read_pairs(mapping_file, key_column=1, value_column=0)
+
+
+def ontology_pairs(mapping_file, source=None):
+    """
+    Pairs (lowercased alias, identifier) of an ontology mapping file (identifier, source, alias).
+    """
+    return read_pairs(mapping_file, key_column=2, value_column=0,
+                      source_column=1, source=source, lower=True)
+
+
+def _file_signature(mapping_file):
+    stat = os.stat(mapping_file)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def read_pairs(mapping_file, key_column, value_column, source_column=None, source=None, lower=False):
+    """
+    Reads the (key, value) pairs of a mapping file in file order.
+
+    :param str mapping_file: path to complete_mapping.tsv.
+    :param int key_column: column of the aliases.
+    :param int value_column: column of the identifiers.
+    :param int source_column: column compared to source, no filter if None.
+    :param str source: only keep the lines of this source.
+    :param bool lower: lowercase the keys.
+    """
+    ncolumns = max(key_column, value_column, source_column or 0) + 1
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            data = line.rstrip("\r\n").split("\t")
+            if len(data) < ncolumns:
+                continue
+            if source_column is not None and source is not None and data[source_column] != source:
+                continue
+            key = data[key_column]
+            yield (key.lower() if lower else key), data[value_column]
+
+
+def compile_index(mapping_file, variant, pairs, output=None):
+    """
+    Compiles (key, value) pairs into a binary index file that can be memory-mapped.
+
+    Layout after the header: sorted key hashes, key offsets, offsets of the value lists, \
+    value references, value offsets, key blob and value blob. Every key keeps all its values \
+    in file order, so that an index serves both single (last value wins) and multiple lookups.
+
+    :param str mapping_file: tsv file the pairs come from (its size and mtime are stored \
+                            to detect a stale index).
+    :param str variant: name of the index (e.g. 'alias').
+    :param pairs: iterable of (key, value) strings.
+    :param str output: path of the index, index_path(mapping_file, variant) if None.
+    :return: Path to the index.
+    """
+    if output is None:
+        output = index_path(mapping_file, variant)
+    size, mtime = _file_signature(mapping_file)
+
+    values_by_key = defaultdict(list)
+    value_ids = {}
+    for key, value in pairs:
+        if value not in value_ids:
+            value_ids[value] = len(value_ids)
+        values_by_key[key.encode('utf-8')].append(value_ids[value])
+
+    keys = sorted(values_by_key, key=lambda k: (key_hash(k), k))
+    hashes = array('Q', (key_hash(k) for k in keys))
+    key_offsets = array('Q', [0])
+    value_starts = array('Q', [0])
+    value_refs = array('Q')
+    for k in keys:
+        key_offsets.append(key_offsets[-1] + len(k))
+        value_refs.extend(values_by_key[k])
+        value_starts.append(len(value_refs))
+    value_blob = [v.encode('utf-8') for v in value_ids]
+    value_offsets = array('Q', [0])
+    for v in value_blob:
+        value_offsets.append(value_offsets[-1] + len(v))
+
+    tmp_output = "%s.%s.tmp" % (output, os.getpid())
+    with open(tmp_output, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, sys.byteorder.encode().ljust(8, b'\0'), size, mtime,
+                              len(keys), len(value_refs), len(value_blob)))
+        for table in (hashes, key_offsets, value_starts, value_refs, value_offsets):
+            table.tofile(out)
+        out.write(b''.join(keys))
+        out.write(b''.join(value_blob))
+    os.replace(tmp_output, output)
+    logger.info("Compiled mapping index %s (%s keys)" % (output, len(keys)))
+
+    return output
+
+
+class MappingIndex(Mapping):
+    """
+    Read-only dictionary view over a memory-mapped mapping index.
+
+    With multiple=False a key returns its last value in the mapping file (like building a \
+    dict line by line), with multiple=True it returns the frozenset of all its values.
+    """
+
+    def __init__(self, path, multiple=False) -> None:
+        self.path = path
+        self.multiple = multiple
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm.size() == 0:
+            raise InvalidIndex("Empty index {}".format(path))
+        magic, byteorder, self.size, self.mtime, nkeys, nrefs, nvalues = HEADER.unpack_from(
+            self._mm, 0)
+        if magic != MAGIC or byteorder.rstrip(b'\0').decode() != sys.byteorder:
+            raise InvalidIndex("{} is not a mapping index of this platform.".format(path))
+        self._nkeys = nkeys
+        view = memoryview(self._mm)
+        offset = HEADER.size
+        tables = []
+        for length in (nkeys, nkeys + 1, nkeys + 1, nrefs, nvalues + 1):
+            tables.append(view[offset:offset + 8 * length].cast('Q'))
+            offset += 8 * length
+        self._hashes, self._key_offsets, self._value_starts, self._value_refs, self._value_offsets = tables
+        self._keys_start = offset
+        self._values_start = offset + self._key_offsets[-1]
+
+    def __reduce__(self):
+        # The memory map is reopened by the process that unpickles the view.
+        return (self.__class__, (self.path, self.multiple))
+
+    def is_stale(self, mapping_file):
+        return (self.size, self.mtime) != _file_signature(mapping_file)
+
+    def _key(self, i):
+        start = self._keys_start + self._key_offsets[i]
+        return self._mm[start:self._keys_start + self._key_offsets[i + 1]]
+
+    def _value(self, ref):
+        start = self._values_start + self._value_offsets[ref]
+        return self._mm[start:self._values_start + self._value_offsets[ref + 1]].decode('utf-8')
+
+    def _values(self, i):
+        refs = self._value_refs[self._value_starts[i]:self._value_starts[i + 1]]
+        if self.multiple:
+            return frozenset(self._value(ref) for ref in refs)
+        return self._value(refs[-1])
+
+    def _find(self, key):
+        if not isinstance(key, str):
+            return -1
+        encoded = key.encode('utf-8')
+        h = key_hash(encoded)
+        i = bisect.bisect_left(self._hashes, h)
+        while i < self._nkeys and self._hashes[i] == h:
+            if self._key(i) == encoded:
+                return i
+            i += 1
+        return -1
+
+    def __getitem__(self, key):
+        i = self._find(key)
+        if i < 0:
+            raise KeyError(key)
+        return self._values(i)
+
+    def __contains__(self, key):
+        return self._find(key) >= 0
+
+    def __iter__(self):
+        for i in range(self._nkeys):
+            yield self._key(i).decode('utf-8')
+
+    def __len__(self):
+        return self._nkeys
+
+    def items(self):
+        for i in range(self._nkeys):
+            yield self._key(i).decode('utf-8'), self._values(i)
+
+    def values(self):
+        for i in range(self._nkeys):
+            yield self._values(i)
+
+    def __repr__(self):
+        return "MappingIndex(%r, multiple=%r, keys=%s)" % (self.path, self.multiple, self._nkeys)
+
+
+def open_index(mapping_file, variant, pairs, multiple=False):
+    """
+    Opens the index of a mapping file, compiling it first if it is missing or older than the file.
+
+    :param str mapping_file: path to complete_mapping.tsv.
+    :param str variant: name of the index (e.g. 'alias').
+    :param pairs: function returning the (key, value) pairs of the mapping file, only called \
+                    when the index has to be compiled.
+    :param bool multiple: return all values of a key instead of the last one.
+    :return: MappingIndex.
+    """
+    path = index_path(mapping_file, variant)
+    if os.path.isfile(path):
+        try:
+            index = MappingIndex(path, multiple=multiple)
+            if not index.is_stale(mapping_file):
+                return index
+        except (InvalidIndex, struct.error, ValueError):
+            pass
+    compile_index(mapping_file, variant, pairs())
+    return MappingIndex(path, multiple=multiple)
+
+
+def remove_indexes(mapping_file):
+    """
+    Removes every index compiled from a mapping file.
+
+    :param str mapping_file: path to complete_mapping.tsv.
+    """
+    directory = os.path.dirname(mapping_file) or '.'
+    prefix = os.path.basename(os.path.splitext(mapping_file)[0]) + '.'
+    if os.path.isdir(directory):
+        for f in os.listdir(directory):
+            if f.startswith(prefix) and (f.endswith('.idx') or f.endswith('.idx.lock')):
+                os.remove(os.path.join(directory, f))
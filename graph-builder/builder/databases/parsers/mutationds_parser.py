@@ -32,27 +32,15 @@ class MutationDsParser(BaseParser):
         if self.download:
             self.download_db(url, directory)
 
-        with open(file_name, 'r') as mf:
-            first = True
-            for line in mf:
-                if first:
-                    first = False
-                    continue
-                data = line.rstrip("\r\n").split("\t")
-                if len(data) > 12:
-                    internal_id = data[0]
-                    pvariant = '_'.join(data[1].split(':'))
-                    effect = data[5]
-                    organism = data[10]
-                    interaction = data[11]
-                    evidence = data[12]
-
-                    if organism.startswith("9606"):
-                        matches = re.finditer(regex, interaction)
-                        for matchNum, match in enumerate(matches, start=1):
-                            interactor = match.group(1)
-                            relationships.add((pvariant, interactor, "CURATED_AFFECTS_INTERACTION_WITH",
-                                              effect, interaction, evidence, internal_id, "Intact-MutationDs"))
+        for rows in self.read_tsv_columns(file_name, [0, 1, 5, 10, 11, 12], skiprows=1):
+            for internal_id, pvariant, effect, organism, interaction, evidence in rows:
+                if organism.startswith("9606"):
+                    pvariant = '_'.join(pvariant.split(':'))
+                    matches = re.finditer(regex, interaction)
+                    for matchNum, match in enumerate(matches, start=1):
+                        interactor = match.group(1)
+                        relationships.add((pvariant, interactor, "CURATED_AFFECTS_INTERACTION_WITH",
+                                          effect, interaction, evidence, internal_id, "Intact-MutationDs"))
 
         # self.remove_directory(directory)
 
@@ -62,10 +50,10 @@ class MutationDsParser(BaseParser):
         stats = set()
         relationships, header, outputfileName = self.parse()
         outputfile = os.path.join(self.import_directory, outputfileName)
-        self.write_relationships(relationships, header, outputfile)
+        count = self.write_relationships(relationships, header, outputfile)
         logger.info("Database {} - Number of {} relationships: {}".format(self.database_name,
-                                                                          "curated_affects_interaction_with", len(relationships)))
-        stats.add(self._build_stats(len(relationships), "relationships", "curated_affects_interaction_with",
+                                                                          "curated_affects_interaction_with", count))
+        stats.add(self._build_stats(count, "relationships", "curated_affects_interaction_with",
                                     self.database_name, outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
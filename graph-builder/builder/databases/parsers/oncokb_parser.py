@@ -12,6 +12,9 @@ logger = verboselogs.VerboseLogger('root')
 
 
 class OncoKBParser(BaseParser):
+    entity_mappings = ["Drug", "Protein"]
+    ontology_mappings = ["Disease"]
+
     def __init__(self, import_directory, database_directory, config_file=None,
                  download=True, skip=True, organisms=["9606", "10090"]) -> None:
         self.database_name = 'OncoKB'
@@ -51,7 +54,7 @@ class OncoKBParser(BaseParser):
         variant_regex = r"(\D\d+\D)$"
         with open(anfileName, 'r', errors='replace') as variants:
             first = True
-            for line in variants:
+            for line in self.limited(variants):
                 if line.startswith('#'):
                     continue
                 elif first:
@@ -76,7 +79,7 @@ class OncoKBParser(BaseParser):
 
         with open(acfileName, 'r', errors='replace') as associations:
             first = True
-            for line in associations:
+            for line in self.limited(associations):
                 if line.startswith('#'):
                     continue
                 elif first:
@@ -130,10 +133,10 @@ class OncoKBParser(BaseParser):
         entities, relationships, entities_header,  relationships_headers = self.parse()
         outputfile = os.path.join(
             self.import_directory, "oncokb_Clinically_relevant_variant.tsv")
-        self.write_entities(entities, entities_header, outputfile)
+        count = self.write_entities(entities, entities_header, outputfile)
         logger.info("Database {} - Number of {} entities: {}".format(
-            self.database_name, "Clinically_relevant_variant", len(entities)))
-        stats.add(self._build_stats(len(entities), "entity", "Clinically_relevant_variant",
+            self.database_name, "Clinically_relevant_variant", count))
+        stats.add(self._build_stats(count, "entity", "Clinically_relevant_variant",
                   self.database_name, outputfile, self.updated_on))
         for relationship in relationships:
             oncokb_outputfile = os.path.join(
@@ -142,11 +145,11 @@ class OncoKBParser(BaseParser):
                 header = relationships_headers[relationship]
             else:
                 header = ['START_ID', 'END_ID', 'TYPE']
-            self.write_relationships(
+            count = self.write_relationships(
                 relationships[relationship], header, oncokb_outputfile)
             logger.info("Database {} - Number of {} relationships: {}".format(
-                self.database_name, relationship, len(relationships[relationship])))
-            stats.add(self._build_stats(len(relationships[relationship]), "relationships",
+                self.database_name, relationship, count))
+            stats.add(self._build_stats(count, "relationships",
                                         relationship, self.database_name, outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
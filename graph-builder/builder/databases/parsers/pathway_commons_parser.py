@@ -1,5 +1,4 @@
 # PathwayCommons
-import gzip
 import os.path
 import logging
 import verboselogs
@@ -34,8 +33,8 @@ class PathwayCommonsParser(BaseParser):
         if self.download:
             self.download_db(url, directory)
         f = os.path.join(directory, fileName)
-        associations = gzip.open(f, 'r')
-        for line in associations:
+        associations = self.read_gzipped_file(f, 'rb')
+        for line in self.limited(associations):
             data = line.decode('utf-8').rstrip("\r\n").split("\t")
             linkout = data[0]
             code = data[0].split("/")[-1]
@@ -64,16 +63,16 @@ class PathwayCommonsParser(BaseParser):
         stats = set()
         entities, relationships, entities_header, relationships_header = self.parse()
         entity_outputfile = os.path.join(self.import_directory, "Pathway.tsv")
-        self.write_entities(entities, entities_header, entity_outputfile)
-        stats.add(self._build_stats(len(entities), "entity", "Pathway",
+        count = self.write_entities(entities, entities_header, entity_outputfile)
+        stats.add(self._build_stats(count, "entity", "Pathway",
                   self.database_name, entity_outputfile, self.updated_on))
         pathway_outputfile = os.path.join(
             self.import_directory, "pathwaycommons_protein_associated_with_pathway.tsv")
-        self.write_relationships(
+        count = self.write_relationships(
             relationships, relationships_header, pathway_outputfile)
         logger.info("Database {} - Number of {} relationships: {}".format(
-            self.database_name, "protein_associated_with_pathway", len(relationships)))
-        stats.add(self._build_stats(len(relationships), "relationships",
+            self.database_name, "protein_associated_with_pathway", count))
+        stats.add(self._build_stats(count, "relationships",
                   "protein_associated_with_pathway", self.database_name, pathway_outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
@@ -12,6 +12,8 @@ logger = verboselogs.VerboseLogger('root')
 
 
 class PfamParser(BaseParser):
+    entity_mappings = ["Protein"]
+
     def __init__(self, import_directory, database_directory, config_file=None,
                  download=True, skip=True, organisms=["9606", "10090"]) -> None:
         self.database_name = 'Pfam'
@@ -52,9 +54,9 @@ class PfamParser(BaseParser):
             i = 0
             read_lines = 0
             num_entities = 0
-            num_relationships = {}
+            num_relationships = defaultdict(int)
             try:
-                for line in fhandler:
+                for line in self.limited(fhandler):
                     i += 1
                     read_lines += 1
                     if line.startswith("# STOCKHOLM"):
@@ -64,28 +66,21 @@ class PfamParser(BaseParser):
                             if len(entities) == 100:
                                 outputfile = os.path.join(
                                     self.import_directory, 'Functional_region.tsv')
-                                self.print_files(entities, entity_header,
-                                                 outputfile=outputfile, is_first=is_first)
-                                num_entities += len(entities)
+                                num_entities += self.print_files(entities, entity_header,
+                                                                 outputfile=outputfile, is_first=is_first)
                                 if 'mentioned_in_publication' in relationships:
                                     outputfile = os.path.join(self.import_directory,
                                                               'Functional_region_mentioned_in_publication.tsv')
-                                    self.print_files(relationships['mentioned_in_publication'],
-                                                     relationship_headers['mentioned_in_publication'],
-                                                     outputfile=outputfile, is_first=is_first)
-                                    if 'mentioned_in_publication' not in num_relationships:
-                                        num_relationships['mentioned_in_publication'] = 0
-                                    num_relationships['mentioned_in_publication'] += len(
-                                        relationships['mentioned_in_publication'])
+                                    num_relationships['mentioned_in_publication'] += self.print_files(
+                                        relationships['mentioned_in_publication'],
+                                        relationship_headers['mentioned_in_publication'],
+                                        outputfile=outputfile, is_first=is_first)
                                 if 'found_in_protein' in relationships:
                                     outputfile = os.path.join(self.import_directory,
                                                               'Functional_region_found_in_protein.tsv')
-                                    self.print_files(relationships['found_in_protein'], relationship_headers['found_in_protein'],
-                                                     outputfile=outputfile, is_first=is_first, filter_for=('END_ID', valid_proteins))
-                                    if 'found_in_protein' not in num_relationships:
-                                        num_relationships['found_in_protein'] = 0
-                                    num_relationships['found_in_protein'] += len(
-                                        relationships['found_in_protein'])
+                                    num_relationships['found_in_protein'] += self.print_files(
+                                        relationships['found_in_protein'], relationship_headers['found_in_protein'],
+                                        outputfile=outputfile, is_first=is_first, filter_for=('END_ID', valid_proteins))
                                 entities = set()
                                 relationships = defaultdict(set)
                                 is_first = False
@@ -122,22 +117,18 @@ class PfamParser(BaseParser):
             if len(entities) > 0:
                 outputfile = os.path.join(
                     self.import_directory, 'Functional_region.tsv')
-                self.print_files(entities, entity_header,
-                                 outputfile=outputfile, is_first=is_first)
-                num_entities += len(entities)
+                num_entities += self.print_files(entities, entity_header,
+                                                 outputfile=outputfile, is_first=is_first)
                 outputfile = os.path.join(self.import_directory,
                                           'Functional_region_mentioned_in_publication.tsv')
-                self.print_files(relationships['mentioned_in_publication'],
-                                 relationship_headers['mentioned_in_publication'],
-                                 outputfile=outputfile, is_first=is_first)
-                num_relationships['mentioned_in_publication'] += len(
-                    relationships['mentioned_in_publication'])
+                num_relationships['mentioned_in_publication'] += self.print_files(
+                    relationships['mentioned_in_publication'], relationship_headers['mentioned_in_publication'],
+                    outputfile=outputfile, is_first=is_first)
                 outputfile = os.path.join(
                     self.import_directory, 'Functional_region_found_in_protein.tsv')
-                self.print_files(relationships['found_in_protein'],
-                                 relationship_headers['found_in_protein'], outputfile=outputfile, is_first=is_first)
-                num_relationships['found_in_protein'] += len(
-                    relationships['found_in_protein'])
+                num_relationships['found_in_protein'] += self.print_files(
+                    relationships['found_in_protein'], relationship_headers['found_in_protein'],
+                    outputfile=outputfile, is_first=is_first)
 
             stats.add(self._build_stats(num_entities, "entity",
                       "Functional_region", "Pfam", 'Functional_region.tsv', self.updated_on))
@@ -151,7 +142,7 @@ class PfamParser(BaseParser):
         return stats
 
     def print_files(self, data, header, outputfile, is_first, filter_for=None):
-        df = pd.DataFrame(list(data), columns=header)
+        df = pd.DataFrame(list(self.sampler.filter_rows(data, header)), columns=header)
         if filter_for is not None:
             df = df[df[filter_for[0]].isin(filter_for[1])]
         if not df.empty:
@@ -159,6 +150,7 @@ class PfamParser(BaseParser):
                 df.to_csv(path_or_buf=f, sep='\t',
                           header=is_first, index=False, quotechar='"',
                           line_terminator='\n', escapechar='\\')
+        return len(df)
 
     def build_stats(self):
         stats = self.parse()
@@ -1,5 +1,4 @@
 import os.path
-import gzip
 import logging
 import verboselogs
 from collections import defaultdict
@@ -16,6 +15,8 @@ class NoSuchFiles(Exception):
 
 
 class PhosphoSitePlusParser(BaseParser):
+    ontology_mappings = ["Disease", "Gene_ontology"]
+
     def __init__(self, import_directory, database_directory, config_file=None,
                  download=True, skip=True, organisms=["9606", "10090"]) -> None:
         self.database_name = 'PhosphoSitePlus'
@@ -44,12 +45,16 @@ class PhosphoSitePlusParser(BaseParser):
         return exists
 
     def parse(self):
+        entities, relationships = self.parse_site_files()
+        for er in self.config['annotation_files']:
+            relationships.update(self.parse_annotation_file(er))
+
+        return entities, relationships, self.config['entities_header'], self.config['rel_headers']
+
+    def parse_site_files(self):
         directory = os.path.join(self.database_directory, self.database_name)
         self.check_directory(directory)
         modifications = self.config['modifications']
-        annotation_files = self.config['annotation_files']
-        entities_header = self.config['entities_header']
-        relationships_headers = self.config['rel_headers']
         entities = set()
         relationships = defaultdict(set)
         if not self.check_files(list(self.config['annotation_files'].values()) + self.config['site_files']):
@@ -57,37 +62,42 @@ class PhosphoSitePlusParser(BaseParser):
 
         for site_file in self.config['site_files']:
             file_name = os.path.join(directory, site_file)
-            with gzip.open(file_name, 'r') as f:
+            with self.read_gzipped_file(file_name, 'rb') as f:
                 sites, site_relationships = self.parse_sites(f, modifications)
                 entities.update(sites)
                 for r in site_relationships:
                     relationships[r].update(site_relationships[r])
 
-        for er in annotation_files:
-            entity, relationship_type = er.split('-')
-            file_name = os.path.join(directory, annotation_files[er])
-            with gzip.open(file_name, 'r') as f:
-                if entity == "disease":
-                    mapping = self.get_mapping_from_ontology(ontology="Disease",
-                                                             source=None)
-                    relationships[(entity, relationship_type)].update(
-                        self.parse_disease_annotations(f, mapping))
-                elif entity == "biological_process":
-                    mapping = self.get_mapping_from_ontology(ontology="Gene_ontology",
-                                                             source=None)
-                    relationships[(entity, relationship_type)].update(
-                        self.parse_regulation_annotations(f, mapping))
-                elif entity == "substrate":
-                    relationships[(entity, relationship_type)
-                                  ] = self.parse_kinase_substrates(f)
-
-        return entities, relationships, entities_header, relationships_headers
+        return entities, relationships
+
+    def parse_annotation_file(self, er):
+        directory = os.path.join(self.database_directory, self.database_name)
+        annotation_files = self.config['annotation_files']
+        relationships = defaultdict(set)
+        entity, relationship_type = er.split('-')
+        file_name = os.path.join(directory, annotation_files[er])
+        with self.read_gzipped_file(file_name, 'rb') as f:
+            if entity == "disease":
+                mapping = self.get_mapping_from_ontology(ontology="Disease",
+                                                         source=None)
+                relationships[(entity, relationship_type)].update(
+                    self.parse_disease_annotations(f, mapping))
+            elif entity == "biological_process":
+                mapping = self.get_mapping_from_ontology(ontology="Gene_ontology",
+                                                         source=None)
+                relationships[(entity, relationship_type)].update(
+                    self.parse_regulation_annotations(f, mapping))
+            elif entity == "substrate":
+                relationships[(entity, relationship_type)
+                              ] = self.parse_kinase_substrates(f)
+
+        return relationships
 
     def parse_sites(self, fhandler, modifications):
         entities = set()
         relationships = defaultdict(set)
         i = 0
-        for line in fhandler:
+        for line in self.limited(fhandler):
             if i < 4:
                 i += 1
                 continue
@@ -117,7 +127,7 @@ class PhosphoSitePlusParser(BaseParser):
     def parse_kinase_substrates(self, fhandler):
         relationships = set()
         i = 0
-        for line in fhandler:
+        for line in self.limited(fhandler):
             if i < 4:
                 i += 1
                 continue
@@ -134,7 +144,7 @@ class PhosphoSitePlusParser(BaseParser):
     def parse_regulation_annotations(self, fhandler, mapping):
         relationships = set()
         i = 0
-        for line in fhandler:
+        for line in self.limited(fhandler):
             if i < 4:
                 i += 1
                 continue
@@ -163,7 +173,7 @@ class PhosphoSitePlusParser(BaseParser):
     def parse_disease_annotations(self, fhandler, mapping):
         relationships = set()
         i = 0
-        for line in fhandler:
+        for line in self.limited(fhandler):
             if i < 4:
                 i += 1
                 continue
@@ -185,27 +195,44 @@ class PhosphoSitePlusParser(BaseParser):
                                                "ASSOCIATED_WITH", "CURATED", 5, "PhosphoSitePlus", pmid))
         return relationships
 
-    def build_stats(self):
+    def build_sites_stats(self):
         stats = set()
-        entities, relationships, entities_header, relationships_headers = self.parse()
+        entities, relationships = self.parse_site_files()
         entity_outputfile = os.path.join(
             self.import_directory, "PhosphoSitePlus_Modified_protein.tsv")
-        self.write_entities(entities, entities_header, entity_outputfile)
+        count = self.write_entities(entities, self.config['entities_header'], entity_outputfile)
         logger.info("Database {} - Number of {} entities: {}".format(
-            self.database_name, "Modified_protein", len(entities)))
-        stats.add(self._build_stats(len(entities), "entity", "Modified_protein",
+            self.database_name, "Modified_protein", count))
+        stats.add(self._build_stats(count, "entity", "Modified_protein",
                   self.database_name, entity_outputfile, self.updated_on))
+        stats.update(self.write_relationships_files(relationships))
+        return stats
+
+    def build_annotation_stats(self, er):
+        return self.write_relationships_files(self.parse_annotation_file(er))
+
+    def write_relationships_files(self, relationships):
+        stats = set()
+        relationships_headers = self.config['rel_headers']
         for entity, relationship in relationships:
             rel_header = ["START_ID", "END_ID", "TYPE", "source"]
             if entity in relationships_headers:
                 rel_header = relationships_headers[entity]
             outputfile = os.path.join(self.import_directory,
                                       "PhosphoSitePlus_" + entity.lower() + "_" + relationship.lower() + ".tsv")
-            self.write_relationships(relationships[(entity, relationship)],
+            count = self.write_relationships(relationships[(entity, relationship)],
                                      rel_header, outputfile)
             logger.info("Database {} - Number of {} relationships: {}".format(self.database_name, relationship,
-                                                                              len(relationships[(entity, relationship)])))
-            stats.add(self._build_stats(len(relationships[(entity, relationship)]),
+                                                                              count))
+            stats.add(self._build_stats(count,
                                         "relationships", relationship, self.database_name, outputfile, self.updated_on))
+        return stats
+
+    def build_stats(self):
+        # The sites and each annotation file are steps which replace their files once they
+        # succeed, a failed build resumes from the first step it did not complete.
+        stats = self.run_step("sites", self.build_sites_stats)
+        for er in self.config['annotation_files']:
+            stats.update(self.run_step(er, self.build_annotation_stats, er))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
@@ -12,6 +12,8 @@ logger = verboselogs.VerboseLogger('root')
 
 
 class ReactomeParser(BaseParser):
+    entity_mappings = ["Metabolite"]
+
     def __init__(self, import_directory, database_directory, config_file=None, download=True, skip=True, organisms=["9606", "10090"]) -> None:
         self.database_name = 'Reactome'
         config_dir = os.path.dirname(os.path.abspath(config.__file__))
@@ -38,20 +40,19 @@ class ReactomeParser(BaseParser):
             if self.download:
                 self.download_db(url, directory)
             f = os.path.join(directory, file_name)
-            with open(f, 'r') as rf:
-                if dataset == "pathway":
-                    entities = self.parse_pathways(rf)
-                elif dataset == "hierarchy":
-                    relationships[("pathway", "has_parent")
-                                  ] = self.parse_pathway_hierarchy(rf)
-                elif dataset == "protein":
-                    relationships[(dataset, "annotated_to_pathway")
-                                  ] = self.parse_pathway_relationships(rf)
-                elif dataset == "metabolite":
-                    relationships[(dataset, "annotated_to_pathway")] = self.parse_pathway_relationships(
-                        rf, metabolite_mapping)
-                # elif dataset == "drug":
-                    #relationships[(dataset, "annotated_to_pathway")] = set()
+            if dataset == "pathway":
+                entities = self.parse_pathways(f)
+            elif dataset == "hierarchy":
+                relationships[("pathway", "has_parent")
+                              ] = self.parse_pathway_hierarchy(f)
+            elif dataset == "protein":
+                relationships[(dataset, "annotated_to_pathway")
+                              ] = self.parse_pathway_relationships(f)
+            elif dataset == "metabolite":
+                relationships[(dataset, "annotated_to_pathway")] = self.parse_pathway_relationships(
+                    f, metabolite_mapping)
+            # elif dataset == "drug":
+                #relationships[(dataset, "annotated_to_pathway")] = set()
 
         # self.remove_directory(directory)
 
@@ -62,22 +63,21 @@ class ReactomeParser(BaseParser):
         entities, relationships, entities_header, relationships_header = self.parse()
         entity_outputfile = os.path.join(
             self.import_directory, self.database_name.lower()+"_Pathway.tsv")
-        self.write_entities(entities, entities_header, entity_outputfile)
-        stats.add(self._build_stats(len(entities), "entity", "Pathway",
+        count = self.write_entities(entities, entities_header, entity_outputfile)
+        stats.add(self._build_stats(count, "entity", "Pathway",
                   self.database_name, entity_outputfile, self.updated_on))
         for entity, relationship in relationships:
             reactome_outputfile = os.path.join(self.import_directory,
                                                self.database_name.lower()+"_"+entity.lower()+"_"+relationship.lower()+".tsv")
-            self.write_relationships(relationships[(
+            count = self.write_relationships(relationships[(
                 entity, relationship)], relationships_header[entity], reactome_outputfile)
             logger.info("Database {} - Number of {} {} relationships: {}".format(
-                self.database_name, entity, relationship, len(relationships[(entity, relationship)])))
-            stats.add(self._build_stats(len(relationships[(
-                entity, relationship)]), "relationships", relationship, self.database_name, reactome_outputfile, self.updated_on))
+                self.database_name, entity, relationship, count))
+            stats.add(self._build_stats(count, "relationships", relationship, self.database_name, reactome_outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
 
-    def parse_pathways(self, fhandler):
+    def parse_pathways(self, filepath):
         entities = set()
         organisms = self.config['organisms']
         url = self.config['linkout_url']
@@ -86,58 +86,47 @@ class ReactomeParser(BaseParser):
 
         self.reset_mapping()
         with open(mapping_file, 'w') as mf:
-            for line in fhandler:
-                data = line.rstrip("\r\n").split("\t")
-                identifier = data[0]
-                name = data[1]
-                organism = data[2]
-                linkout = url.replace("PATHWAY", identifier)
-                if organism in organisms:
-                    organism = organisms[organism]
-                    entities.add((identifier, "Pathway", name,
-                                 name, organism, linkout, "Reactome"))
-                    mf.write(identifier+"\t"+name+"\n")
+            for rows in self.read_tsv_columns(filepath, [0, 1, 2], sample=False):
+                for identifier, name, organism in rows:
+                    linkout = url.replace("PATHWAY", identifier)
+                    if organism in organisms:
+                        organism = organisms[organism]
+                        entities.add((identifier, "Pathway", name,
+                                     name, organism, linkout, "Reactome"))
+                        mf.write(identifier+"\t"+name+"\n")
 
         self.mark_complete_mapping()
 
         return entities
 
-    def parse_pathway_hierarchy(self, fhandler):
+    def parse_pathway_hierarchy(self, filepath):
         relationships = set()
-        for line in fhandler:
-            data = line.rstrip("\r\n").split("\t")
-            parent = data[0]
-            child = data[1]
-            relationships.add((child, parent, "HAS_PARENT", "Reactome"))
+        for rows in self.read_tsv_columns(filepath, [0, 1]):
+            relationships.update((child, parent, "HAS_PARENT", "Reactome") for parent, child in rows)
 
         return relationships
 
-    def parse_pathway_relationships(self, fhandler, mapping=None):
+    def parse_pathway_relationships(self, filepath, mapping=None):
         relationships = set()
         regex = r"(.+)\s\[(.+)\]"
         organisms = self.config['organisms']
-        for line in fhandler:
-            data = line.rstrip("\r\n").split("\t")
-            identifier = data[0]
-            id_loc = data[2]
-            pathway = data[3]
-            evidence = data[6]
-            organism = data[7]
-            match = re.search(regex, id_loc)
-            loc = "unspecified"
-            if match:
-                name = match.group(1)
-                loc = match.group(2)
-                if organism in organisms:
-                    organism = organisms[organism]
-                    if mapping is not None:
-                        if identifier in mapping:
-                            identifier = mapping[identifier]
-                        elif name in mapping:
-                            identifier = mapping[name]
-                        else:
-                            continue
-                    relationships.add(
-                        (identifier, pathway, "ANNOTATED_TO_PATHWAY", evidence, organism, loc, "Reactome"))
+        for rows in self.read_tsv_columns(filepath, [0, 2, 3, 6, 7]):
+            for identifier, id_loc, pathway, evidence, organism in rows:
+                match = re.search(regex, id_loc)
+                loc = "unspecified"
+                if match:
+                    name = match.group(1)
+                    loc = match.group(2)
+                    if organism in organisms:
+                        organism = organisms[organism]
+                        if mapping is not None:
+                            if identifier in mapping:
+                                identifier = mapping[identifier]
+                            elif name in mapping:
+                                identifier = mapping[name]
+                            else:
+                                continue
+                        relationships.add(
+                            (identifier, pathway, "ANNOTATED_TO_PATHWAY", evidence, organism, loc, "Reactome"))
 
         return relationships
@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import socket
+import verboselogs
+
+
+logger = verboselogs.VerboseLogger('root')
+
+# Markers written next to complete_mapping.tsv by the parser which builds it.
+BUILDING_MARKER = 'mapping.building'
+FAILED_MARKER = 'mapping.failed'
+
+
+class MappingNotReady(Exception):
+    pass
+
+
+class MappingFailed(MappingNotReady):
+    pass
+
+
+def _write_marker(path, content):
+    tmp_path = "%s.%s.tmp" % (path, os.getpid())
+    with open(tmp_path, 'w') as f:
+        json.dump(content, f)
+    os.replace(tmp_path, path)
+
+
+def _read_marker(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def start(directory):
+    """
+    Announces that the mapping of a directory is being built by the current process.
+
+    :param str directory: folder of the database/ontology which builds complete_mapping.tsv.
+    """
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    _remove(os.path.join(directory, FAILED_MARKER))
+    _write_marker(os.path.join(directory, BUILDING_MARKER),
+                  {'pid': os.getpid(), 'host': socket.gethostname(), 'started': time.time()})
+
+
+def complete(directory):
+    """
+    Removes the markers once complete_mapping.tsv is in place.
+
+    :param str directory: folder of the database/ontology which builds complete_mapping.tsv.
+    """
+    _remove(os.path.join(directory, BUILDING_MARKER))
+    _remove(os.path.join(directory, FAILED_MARKER))
+
+
+def fail(directory, reason):
+    """
+    Tells the waiting parsers that the mapping will not be built, if the current process was building it.
+
+    :param str directory: folder of the database/ontology which builds complete_mapping.tsv.
+    :param reason: error which stopped the build.
+    """
+    building = _read_marker(os.path.join(directory, BUILDING_MARKER))
+    if building is None or building.get('pid') != os.getpid():
+        return
+    _write_marker(os.path.join(directory, FAILED_MARKER),
+                  {'pid': os.getpid(), 'host': socket.gethostname(), 'reason': str(reason)})
+    _remove(os.path.join(directory, BUILDING_MARKER))
+
+
+def clear_stale(directory):
+    """
+    Removes the markers left by previous runs in the subfolders of a directory: failures, and \
+    builds whose process is gone. Called when a run starts, so that its parsers do not fail \
+    because of an old error before the parser building the mapping starts again.
+
+    :param str directory: folder which contains the database/ontology folders.
+    """
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        subdirectory = os.path.join(directory, name)
+        if not os.path.isdir(subdirectory):
+            continue
+        _remove(os.path.join(subdirectory, FAILED_MARKER))
+        building = _read_marker(os.path.join(subdirectory, BUILDING_MARKER))
+        if building is not None and _producer_died(building):
+            _remove(os.path.join(subdirectory, BUILDING_MARKER))
+
+
+def _producer_died(building):
+    if building.get('host') != socket.gethostname():
+        return False
+    try:
+        os.kill(building['pid'], 0)
+    except ProcessLookupError:
+        return True
+    except (PermissionError, KeyError, TypeError):
+        return False
+    return False
+
+
+def status(directory):
+    """
+    Returns the state of the mapping of a directory: 'failed', 'building', 'complete' or 'missing'.
+
+    A build whose process is gone is 'failed'.
+
+    :param str directory: folder of the database/ontology which builds complete_mapping.tsv.
+    """
+    if os.path.isfile(os.path.join(directory, FAILED_MARKER)):
+        return 'failed'
+    building = _read_marker(os.path.join(directory, BUILDING_MARKER))
+    if building is not None:
+        return 'failed' if _producer_died(building) else 'building'
+    if os.path.isfile(os.path.join(directory, 'complete_mapping.tsv')):
+        return 'complete'
+    return 'missing'
+
+
+def wait(mapping_file, name, timeout=21600, max_interval=0.5):
+    """
+    Blocks until a mapping file exists, by polling.
+
+    The file is checked with an interval growing from 50 ms up to max_interval seconds, so the \
+    waiting parser starts at most max_interval seconds after the mapping is complete (no file \
+    system events are watched, to stay portable without extra dependencies). It fails fast when \
+    the parser building the mapping reported an error or died, and after timeout seconds otherwise.
+
+    :param str mapping_file: path to complete_mapping.tsv.
+    :param str name: database/ontology which builds the mapping (for the messages).
+    :param int timeout: maximum number of seconds to wait.
+    :param float max_interval: maximum number of seconds between two checks.
+    """
+    directory = os.path.dirname(mapping_file)
+    interval = 0.05
+    waited = 0
+    last_log = None
+    while not os.path.isfile(mapping_file):
+        failed = _read_marker(os.path.join(directory, FAILED_MARKER))
+        if failed is not None:
+            raise MappingFailed("The mapping of {} could not be built: {}".format(
+                name, failed.get('reason')))
+        building = _read_marker(os.path.join(directory, BUILDING_MARKER))
+        if building is not None and _producer_died(building):
+            raise MappingFailed("The process building the mapping of {} (pid {}) is gone.".format(
+                name, building.get('pid')))
+        if waited >= timeout:
+            raise MappingNotReady("No such file {} after {} seconds, build {} firstly.".format(
+                mapping_file, int(waited), name))
+        if last_log is None or waited - last_log >= 60:
+            logger.warn("No such file %s, wait for %s to build it." % (mapping_file, name))
+            last_log = waited
+        time.sleep(interval)
+        waited += interval
+        interval = min(interval * 2, max_interval)
@@ -40,44 +40,27 @@ class RefSeqParser(BaseParser):
             fileName = os.path.join(directory, new_file)
 
         if os.path.isfile(fileName):
-            df = self.read_gzipped_file(fileName)
-            first = True
-            for line in df:
-                if first:
-                    first = False
-                    continue
-                data = line.rstrip("\r\n").split("\t")
-                tclass = data[1]
-                assembly = data[2]
-                chrom = data[5]
-                geneAcc = data[6]
-                start = data[7]
-                end = data[8]
-                strand = data[9]
-                protAcc = data[10]
-                name = data[13]
-                symbol = data[14]
-
-                if protAcc != "":
-                    entities["Transcript"].add(
-                        (protAcc, "Transcript", name, tclass, assembly, taxid))
-                    if chrom != "":
-                        entities["Chromosome"].add(
-                            (chrom, "Chromosome", chrom, taxid))
-                        relationships["LOCATED_IN"].add(
-                            (protAcc, chrom, "LOCATED_IN", start, end, strand, "RefSeq"))
-                    if symbol != "":
-                        relationships["TRANSCRIBED_INTO"].add(
-                            (symbol, protAcc, "TRANSCRIBED_INTO", "RefSeq"))
-                elif geneAcc != "":
-                    entities["Transcript"].add(
-                        (geneAcc, "Transcript", name, tclass, assembly, taxid))
-                    if chrom != "":
-                        entities["Chromosome"].add(
-                            (chrom, "Chromosome", chrom, taxid))
-                        relationships["LOCATED_IN"].add(
-                            (protAcc, chrom, "LOCATED_IN", start, end, strand, "RefSeq"))
-            df.close()
+            for rows in self.read_tsv_columns(fileName, [1, 2, 5, 6, 7, 8, 9, 10, 13, 14], skiprows=1):
+                for tclass, assembly, chrom, geneAcc, start, end, strand, protAcc, name, symbol in rows:
+                    if protAcc != "":
+                        entities["Transcript"].add(
+                            (protAcc, "Transcript", name, tclass, assembly, taxid))
+                        if chrom != "":
+                            entities["Chromosome"].add(
+                                (chrom, "Chromosome", chrom, taxid))
+                            relationships["LOCATED_IN"].add(
+                                (protAcc, chrom, "LOCATED_IN", start, end, strand, "RefSeq"))
+                        if symbol != "":
+                            relationships["TRANSCRIBED_INTO"].add(
+                                (symbol, protAcc, "TRANSCRIBED_INTO", "RefSeq"))
+                    elif geneAcc != "":
+                        entities["Transcript"].add(
+                            (geneAcc, "Transcript", name, tclass, assembly, taxid))
+                        if chrom != "":
+                            entities["Chromosome"].add(
+                                (chrom, "Chromosome", chrom, taxid))
+                            relationships["LOCATED_IN"].add(
+                                (protAcc, chrom, "LOCATED_IN", start, end, strand, "RefSeq"))
 
         # self.remove_directory(directory)
 
@@ -89,21 +72,21 @@ class RefSeqParser(BaseParser):
         for entity in entities:
             header = headers[entity]
             outputfile = os.path.join(self.import_directory, entity+".tsv")
-            self.write_entities(entities[entity], header, outputfile)
+            count = self.write_entities(entities[entity], header, outputfile)
             logger.info("Database {} - Number of {} entities: {}".format(
-                self.database_name, entity, len(entities[entity])))
-            stats.add(self._build_stats(len(entities[entity]), "entity", entity,
+                self.database_name, entity, count))
+            stats.add(self._build_stats(count, "entity", entity,
                                         self.database_name, outputfile, self.updated_on))
 
         for rel in relationships:
             header = headers[rel]
             outputfile = os.path.join(
                 self.import_directory, "refseq_"+rel.lower()+".tsv")
-            self.write_relationships(
+            count = self.write_relationships(
                 relationships[rel], header, outputfile)
             logger.info("Database {} - Number of {} relationships: {}".format(
-                self.database_name, rel, len(relationships[rel])))
-            stats.add(self._build_stats(len(relationships[rel]), "relationships",
+                self.database_name, rel, count))
+            stats.add(self._build_stats(count, "relationships",
                                         rel, self.database_name, outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
@@ -0,0 +1,137 @@
+import os
+import hashlib
+import itertools
+
+
+class Sampler:
+    """
+    Samples the records read and the graph rows written by a parser, for fast partial builds.
+
+    With sample=N, each input file of the parser is read up to its N-th record (the files \
+    building complete_mapping.tsv are always read in full, so that the mappings used by the \
+    other databases stay complete). With fraction=p, a node is kept if the hash of its \
+    identifier falls in the first p of the hash range, and an edge if both of its nodes are \
+    kept: the same identifiers are kept by every database and ontology, so the edges between \
+    sampled nodes survive.
+
+    Usage::
+
+        sampler = Sampler(sample=10000, fraction=0.1)
+        for line in sampler.limit(f):
+            ...
+        if sampler.keep_row(row, header):
+            writer.writerow(row)
+    """
+
+    def __init__(self, sample=None, fraction=None, seed=0) -> None:
+        """
+        :param int sample: number of records read from each input file, all if None.
+        :param float fraction: fraction (0 < p <= 1) of the node identifiers kept, all if None.
+        :param int seed: changes the sampled identifiers.
+        """
+        if fraction is not None and not 0 < fraction <= 1:
+            raise ValueError("The sampled fraction must be in (0, 1], not {}.".format(fraction))
+        if sample is not None and sample < 0:
+            raise ValueError("The sample size must be positive, not {}.".format(sample))
+        self.sample = sample
+        self.fraction = fraction if fraction != 1 else None
+        self.seed = seed
+        self._threshold = int(self.fraction * 2 ** 64) if self.fraction is not None else None
+        self._kept = {}
+
+    @property
+    def active(self):
+        return self.sample is not None or self.fraction is not None
+
+    def describe(self):
+        """
+        Returns the sampling as a json serializable dict (None without sampling), e.g. for the \
+        fingerprint of the build.
+        """
+        if not self.active:
+            return None
+        return {'sample': self.sample, 'fraction': self.fraction, 'seed': self.seed}
+
+    def limit(self, records):
+        """
+        Returns the first records of an iterable (e.g. the lines of a file) with sample=N, \
+        all of them otherwise.
+        """
+        if self.sample is None:
+            return records
+        return itertools.islice(records, self.sample)
+
+    def keep(self, identifier):
+        """
+        Returns True if a node identifier is in the sample, the same for every parser and run.
+        """
+        if self._threshold is None:
+            return True
+        kept = self._kept.get(identifier)
+        if kept is None:
+            digest = hashlib.blake2b(("%s:%s" % (self.seed, identifier)).encode('utf-8'), digest_size=8).digest()
+            kept = int.from_bytes(digest, 'big') < self._threshold
+            if len(self._kept) < 1000000:
+                self._kept[identifier] = kept
+        return kept
+
+    def keep_row(self, row, header=None):
+        """
+        Returns True if a row of a graph file is in the sample: an entity (header starting \
+        with ID) whose identifier is kept, or a relationship (header starting with START_ID, \
+        END_ID) whose nodes are both kept.
+
+        :param row: tuple or list of values.
+        :param list header: column names of the graph file.
+        """
+        if self._threshold is None:
+            return True
+        if header is not None and len(header) > 1 and header[0] == 'START_ID' and header[1] == 'END_ID':
+            return self.keep(row[0]) and self.keep(row[1])
+        return self.keep(row[0])
+
+    def filter_rows(self, rows, header=None):
+        """
+        Yields the rows of a graph file which are in the sample.
+        """
+        if self._threshold is None:
+            return rows
+        return (row for row in rows if self.keep_row(row, header))
+
+
+def output_directory(output_dir, sample=None, fraction=None):
+    """
+    Returns the folder of the graph files of a build: the output directory itself for a full \
+    build, and a subfolder named after the sampling for a sampled one (e.g. \
+    sample_1000_fraction_0.1), so that a sampled build never replaces the graph files, the \
+    build cache or the checkpoints of a full build, nor is reused as one.
+
+    :param str output_dir: output directory given to the command.
+    :param int sample: records read from each input file, all if None.
+    :param float fraction: fraction of the node identifiers kept, all if None.
+    """
+    if fraction == 1:
+        fraction = None
+    if sample is None and fraction is None:
+        return output_dir
+    parts = []
+    if sample is not None:
+        parts.append("sample_%d" % sample)
+    if fraction is not None:
+        parts.append("fraction_%s" % fraction)
+    directory = os.path.join(output_dir, "_".join(parts))
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def add_options(command):
+    """
+    Adds the --sample and --fraction options to a click command.
+    """
+    import click
+    command = click.option('--fraction', required=False, type=click.FloatRange(0, 1, min_open=True), default=None,
+                           help="Keep this fraction of the node identifiers (the same in all databases and "
+                                "ontologies) and the relationships between them?")(command)
+    command = click.option('--sample', required=False, type=click.IntRange(min=0), default=None,
+                           help="Read only the first N records of each input file?")(command)
+    return command
@@ -1,5 +1,4 @@
 import os.path
-import gzip
 import re
 import logging
 import verboselogs
@@ -12,6 +11,8 @@ logger = verboselogs.VerboseLogger('root')
 
 
 class SIDERParser(BaseParser):
+    ontology_mappings = ["Phenotype"]
+
     def __init__(self, import_directory, database_directory, config_file=None, 
                  download=True, skip=True, organisms=["9606", "10090"]) -> None:
         self.database_name = 'SIDER'
@@ -40,8 +41,8 @@ class SIDERParser(BaseParser):
         fileName = os.path.join(directory, url.split('/')[-1])
         if self.download:
             self.download_db(url, directory)
-        associations = gzip.open(fileName, 'r')
-        for line in associations:
+        associations = self.read_gzipped_file(fileName, 'rb')
+        for line in self.limited(associations):
             data = line.decode('utf-8').rstrip("\r\n").split("\t")
             drug = re.sub(r'CID\d', 'CIDm', data[0])
             se = data[2]
@@ -69,8 +70,8 @@ class SIDERParser(BaseParser):
         fileName = os.path.join(directory, url.split('/')[-1])
         if self.download:
             self.download_db(url, directory)
-        associations = gzip.open(fileName, 'r')
-        for line in associations:
+        associations = self.read_gzipped_file(fileName, 'rb')
+        for line in self.limited(associations):
             data = line.decode('utf-8').rstrip("\r\n").split("\t")
             drug = re.sub(r'CID\d', 'CIDm', data[0])
             se = data[1]
@@ -92,17 +93,17 @@ class SIDERParser(BaseParser):
         source = self.builder_config["database"]["sources"]["Drug"]
         relationships,header, outputfileName, drugMapping, phenotypeMapping = self.parse(source)
         outputfile = os.path.join(self.import_directory, outputfileName)
-        self.write_relationships(relationships, header, outputfile)
+        count = self.write_relationships(relationships, header, outputfile)
         logger.info("Database {} - Number of {} relationships: {}".format(self.database_name, 
-                                                                          "has_side_effect", len(relationships)))
-        stats.add(self._build_stats(len(relationships), "relationships", "has_side_effect", 
+                                                                          "has_side_effect", count))
+        stats.add(self._build_stats(count, "relationships", "has_side_effect", 
                                     self.database_name, outputfile, self.updated_on))
         relationships, header, outputfileName = self.parse_indications(drugMapping, phenotypeMapping)
         outputfile = os.path.join(self.import_directory, outputfileName)
-        self.write_relationships(relationships, header, outputfile)
+        count = self.write_relationships(relationships, header, outputfile)
         logger.info("Database {} - Number of {} relationships: {}".format(self.database_name, 
-                                                                          "indicated_for", len(relationships)))
-        stats.add(self._build_stats(len(relationships), "relationships", "indicated_for", 
+                                                                          "indicated_for", count))
+        stats.add(self._build_stats(count, "relationships", "indicated_for", 
                                            self.database_name, outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
@@ -46,22 +46,8 @@ class SIGNORParser(BaseParser):
     def parse_substrates(self, filename, modifications, accronyms, amino_acids):
         entities = set()
         relationships = defaultdict(set)
-        first = True
-        with open(filename, 'r', encoding="utf-8") as fhandler:
-            for line in fhandler:
-                if first:
-                    first = False
-                    continue
-
-                data = line.rstrip("\r\n").split("\t")
-                source = data[2]
-                target = data[6]
-                regulation = data[8]
-                mechanism = data[9]
-                residue_mod = data[10]
-                seq_window = data[11]
-                organism = data[12]
-                pubmedid = data[21]
+        for rows in self.read_tsv_columns(filename, [2, 6, 8, 9, 10, 11, 12, 21], skiprows=1):
+            for source, target, regulation, mechanism, residue_mod, seq_window, organism, pubmedid in rows:
                 if organism in self.organisms and mechanism in modifications and residue_mod != '':
                     if len(residue_mod) > 3:
                         residue = ''.join(residue_mod[0:3])
@@ -92,10 +78,10 @@ class SIGNORParser(BaseParser):
         entities, relationships, entities_header, relationships_headers = self.parse()
         entity_outputfile = os.path.join(
             self.import_directory, "SIGNOR_Modified_protein.tsv")
-        self.write_entities(entities, entities_header, entity_outputfile)
+        count = self.write_entities(entities, entities_header, entity_outputfile)
         logger.info("Database {} - Number of {} entities: {}".format(
-            self.database_name, "Modified_protein", len(entities)))
-        stats.add(self._build_stats(len(entities), "entity", "Modified_protein",
+            self.database_name, "Modified_protein", count))
+        stats.add(self._build_stats(count, "entity", "Modified_protein",
                                     self.database_name, entity_outputfile, self.updated_on))
         for entity, relationship in relationships:
             rel_header = ["START_ID", "END_ID", "TYPE", "source"]
@@ -106,11 +92,11 @@ class SIGNORParser(BaseParser):
                 prefix = entity
             outputfile = os.path.join(
                 self.import_directory, prefix+"_"+relationship.lower()+".tsv")
-            self.write_relationships(relationships[(entity, relationship)],
+            count = self.write_relationships(relationships[(entity, relationship)],
                                      rel_header, outputfile)
             logger.info("Database {} - Number of {} relationships: {}".format(self.database_name,
-                                                                              relationship, len(relationships[(entity, relationship)])))
-            stats.add(self._build_stats(len(relationships[(entity, relationship)]),
+                                                                              relationship, count))
+            stats.add(self._build_stats(count,
                                         "relationships", relationship, self.database_name, outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
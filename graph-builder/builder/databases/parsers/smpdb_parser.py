@@ -59,7 +59,7 @@ class SMPDBParser(BaseParser):
             if not os.path.isdir(filename):
                 with fhandler.open(filename) as f:
                     df = pd.read_csv(
-                        f, sep=',', low_memory=False)
+                        f, sep=',', low_memory=False, nrows=self.sampler.sample)
                     for index, row in df.iterrows():
                         identifier = row[0]
                         name = row[2]
@@ -78,7 +78,7 @@ class SMPDBParser(BaseParser):
         for filename in fhandler.namelist():
             if not os.path.isdir(filename):
                 with fhandler.open(filename) as f:
-                    df = pd.read_csv(f, sep=',', low_memory=False)
+                    df = pd.read_csv(f, sep=',', low_memory=False, nrows=self.sampler.sample)
                     for index, row in df.iterrows():
                         identifier = row[0]
                         protein = row[3]
@@ -97,7 +97,7 @@ class SMPDBParser(BaseParser):
             if not os.path.isdir(filename):
                 with fhandler.open(filename) as f:
                     df = pd.read_csv(
-                        f, sep=',', low_memory=False)
+                        f, sep=',', low_memory=False, nrows=self.sampler.sample)
                     for index, row in df.iterrows():
                         identifier = row[0]
                         metabolite = row[5]
@@ -116,17 +116,17 @@ class SMPDBParser(BaseParser):
         entities, relationships, entities_header, relationships_header = self.parse()
         entity_outputfile = os.path.join(
             self.import_directory, self.database_name.lower()+"_Pathway.tsv")
-        self.write_entities(entities, entities_header, entity_outputfile)
-        stats.add(self._build_stats(len(entities), "entity", "Pathway",
+        count = self.write_entities(entities, entities_header, entity_outputfile)
+        stats.add(self._build_stats(count, "entity", "Pathway",
                                     self.database_name, entity_outputfile, self.updated_on))
         for entity, relationship in relationships:
             smpdb_outputfile = os.path.join(self.import_directory,
                                             self.database_name.lower()+"_"+entity.lower()+"_"+relationship.lower()+".tsv")
-            self.write_relationships(relationships[(entity, relationship)],
+            count = self.write_relationships(relationships[(entity, relationship)],
                                      relationships_header[entity], smpdb_outputfile)
             logger.info("Database {} - Number of {} {} relationships: {}".format(self.database_name,
-                                                                                 entity, relationship, len(relationships[(entity, relationship)])))
-            stats.add(self._build_stats(len(relationships[(entity, relationship)]),
+                                                                                 entity, relationship, count))
+            stats.add(self._build_stats(count,
                                         "relationships", relationship, self.database_name, smpdb_outputfile, self.updated_on))
         logger.success("Done Parsing database {}".format(self.database_name))
         return stats
@@ -1,5 +1,4 @@
 import os.path
-import gzip
 import csv
 import logging
 import verboselogs
@@ -45,13 +44,13 @@ class STITCHParser(BaseParser):
             self.download_db(url, directory)
 
         f = os.path.join(directory, fileName)
-        associations = gzip.open(f, 'r')
+        associations = self.read_gzipped_file(f, 'rb')
         first = True
         with open(outputfile, 'w') as csvfile:
             writer = csv.writer(
                 csvfile, delimiter='\t', escapechar='\\', quotechar='"', quoting=csv.QUOTE_ALL)
             writer.writerow(header)
-            for line in associations:
+            for line in self.limited(associations):
                 if first:
                     first = False
                     continue
@@ -69,7 +68,8 @@ class STITCHParser(BaseParser):
                                        self.database_name, ",".join(evidences), ",".join(fscores[0:-1]), fscores[-1])
                                 stored.add((aliasA, aliasB))
                                 stored.add((aliasB, aliasB))
-                                writer.writerow(row)
+                                if self.sampler.keep_row(row, header):
+                                    writer.writerow(row)
         associations.close()
 
         return mapping, drugmapping
@@ -90,13 +90,13 @@ class STITCHParser(BaseParser):
             self.download_db(url, directory)
 
         f = os.path.join(directory, fileName)
-        associations = gzip.open(f, 'r')
+        associations = self.read_gzipped_file(f, 'rb')
         first = True
         with open(outputfile, 'w') as csvfile:
             writer = csv.writer(
                 csvfile, delimiter='\t', escapechar='\\', quotechar='"', quoting=csv.QUOTE_ALL)
             writer.writerow(header)
-            for line in associations:
+            for line in self.limited(associations):
                 if first:
                     first = False
                     continue
@@ -118,7 +118,8 @@ class STITCHParser(BaseParser):
                             if (aliasA, aliasB, action) not in stored:
                                 row = (aliasA, aliasB, relationship,
                                        action, directionality, score, self.database_name)
-                                writer.writerow(row)
+                                if self.sampler.keep_row(row, header):
+                                    writer.writerow(row)
                                 stored.add((aliasA, aliasB, action))
                                 stored.add((aliasB, aliasA, action))
         associations.close()
@@ -151,7 +152,7 @@ class STITCHParser(BaseParser):
 
         f = os.path.join(directory, file_name)
         first = True
-        with gzip.open(f, 'rb') as mf:
+        with self.read_gzipped_file(f, 'rb') as mf:
             for line in mf:
                 if first:
                     first = False
@@ -160,7 +161,8 @@ class STITCHParser(BaseParser):
                 stringID = data[0]
                 alias = data[2]
                 sources = data[3].split(' ')
-                if not alias.startswith('DB'):
+                # The DrugBank aliases also hold drug names, only the identifiers are kept.
+                if source == 'DrugBank' and not alias.startswith('DB'):
                     continue
 
                 if source in sources:
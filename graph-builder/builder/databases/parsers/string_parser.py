@@ -1,5 +1,4 @@
 import os.path
-import gzip
 import csv
 import logging
 import verboselogs
@@ -43,13 +42,13 @@ class STRINGParser(BaseParser):
             self.download_db(url, directory)
 
         f = os.path.join(directory, fileName)
-        associations = gzip.open(f, 'r')
+        associations = self.read_gzipped_file(f, 'rb')
         first = True
         with open(outputfile, 'w') as csvfile:
             writer = csv.writer(csvfile, delimiter='\t', escapechar='\\',
                                 quotechar='"', quoting=csv.QUOTE_ALL)
             writer.writerow(header)
-            for line in associations:
+            for line in self.limited(associations):
                 if first:
                     first = False
                     continue
@@ -67,7 +66,8 @@ class STRINGParser(BaseParser):
                                        self.database_name, ",".join(evidences), ",".join(fscores[0:-1]), fscores[-1])
                                 stored.add((aliasA, aliasB))
                                 stored.add((aliasB, aliasB))
-                                writer.writerow(row)
+                                if self.sampler.keep_row(row, header):
+                                    writer.writerow(row)
         associations.close()
 
         return mapping, drugmapping
@@ -90,13 +90,13 @@ class STRINGParser(BaseParser):
             self.download_db(url, directory)
 
         f = os.path.join(directory, fileName)
-        associations = gzip.open(f, 'r')
+        associations = self.read_gzipped_file(f, 'rb')
         first = True
         with open(outputfile, 'w') as csvfile:
             writer = csv.writer(
                 csvfile, delimiter='\t', escapechar='\\', quotechar='"', quoting=csv.QUOTE_ALL)
             writer.writerow(header)
-            for line in associations:
+            for line in self.limited(associations):
                 if first:
                     first = False
                     continue
@@ -118,7 +118,8 @@ class STRINGParser(BaseParser):
                             if (aliasA, aliasB, action) not in stored:
                                 row = (aliasA, aliasB, relationship,
                                        action, directionality, score, self.database_name)
-                                writer.writerow(row)
+                                if self.sampler.keep_row(row, header):
+                                    writer.writerow(row)
                                 stored.add((aliasA, aliasB, action))
                                 stored.add((aliasB, aliasA, action))
         associations.close()
@@ -151,7 +152,7 @@ class STRINGParser(BaseParser):
 
         f = os.path.join(directory, file_name)
         first = True
-        with gzip.open(f, 'rb') as mf:
+        with self.read_gzipped_file(f, 'rb') as mf:
             for line in mf:
                 if first:
                     first = False
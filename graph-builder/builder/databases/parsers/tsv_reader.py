@@ -0,0 +1,134 @@
+import io
+from operator import itemgetter
+
+
+# Approximate number of characters of the lines read at once.
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def count_columns(handle, encoding='utf-8'):
+    """
+    Returns the number of tab separated fields of the first line of a file.
+
+    :param handle: path to the file or opened text stream (read from its start).
+    """
+    if isinstance(handle, str):
+        with open(handle, 'r', encoding=encoding, errors='replace') as f:
+            return count_columns(f)
+    return handle.readline().rstrip("\r\n").count("\t") + 1
+
+
+def _row_getter(columns):
+    if len(columns) == 1:
+        column = columns[0]
+        return lambda data: (data[column],)
+    return itemgetter(*columns)
+
+
+def read_columns(handle, columns, skiprows=0, comment=None, block_size=DEFAULT_BLOCK_SIZE,
+                 encoding='utf-8', encoding_errors='strict', ncolumns=None):
+    """
+    Reads the needed columns of a tab separated file in large blocks of lines.
+
+    Fields are the ones of line.rstrip("\\r\\n").split("\\t"), but every line is only split up \
+    to the last needed column (the rest of a wide line stays one string) and a whole block \
+    is turned into rows at once. Missing fields of short lines are '' and empty lines are skipped.
+
+    Usage::
+
+        for rows in read_columns(filepath, [0, 3, 8], skiprows=1):
+            relationships.update((drug, gene, "TARGETS") for gene, source, drug in rows if drug != '')
+
+    :param handle: path to the file or opened (binary or text) stream.
+    :param list columns: positions of the columns to read, negative positions count from \
+                        the last column (ncolumns).
+    :param int skiprows: number of lines skipped at the start of the file (e.g. 1 for a header).
+    :param comment: prefix (str or tuple of str) of the lines to skip.
+    :param int block_size: approximate number of characters read at once.
+    :param str encoding: encoding of the file.
+    :param str encoding_errors: how decoding errors are handled, as in open().
+    :param int ncolumns: number of columns, needed for negative positions.
+    :return: Generator of lists of tuples, one tuple per line with the fields of columns.
+    """
+    if any(c < 0 for c in columns):
+        if ncolumns is None:
+            raise ValueError("Negative column positions need the number of columns.")
+        columns = [c + ncolumns if c < 0 else c for c in columns]
+    maxsplit = max(columns) + 1
+    getter = _row_getter(columns)
+    padding = '\t' * maxsplit
+
+    if isinstance(handle, str):
+        stream = open(handle, 'r', encoding=encoding, errors=encoding_errors)
+    elif isinstance(handle, io.TextIOBase):
+        stream = handle
+    else:
+        stream = io.TextIOWrapper(handle, encoding=encoding, errors=encoding_errors)
+    try:
+        for _ in range(skiprows):
+            if not stream.readline():
+                return
+        while True:
+            lines = stream.readlines(block_size)
+            if not lines:
+                break
+            # Empty lines are dropped first, so that no block depends on its other lines.
+            if comment:
+                lines = [line for line in lines if line.rstrip("\r\n") and not line.startswith(comment)]
+            else:
+                lines = [line for line in lines if line.rstrip("\r\n")]
+            try:
+                rows = [getter(line.rstrip("\r\n").split("\t", maxsplit)) for line in lines]
+            except IndexError:
+                # Short lines in the block.
+                rows = [getter((line.rstrip("\r\n") + padding).split("\t", maxsplit)) for line in lines]
+            if rows:
+                yield rows
+    finally:
+        if stream is not handle:
+            stream.close()
+
+
+def limit_rows(blocks, count):
+    """
+    Yields the blocks of rows of read_columns up to the count-th row, and closes the file.
+
+    :param blocks: generator of lists of rows (see read_columns).
+    :param int count: number of rows.
+    """
+    try:
+        for rows in blocks:
+            if count <= 0:
+                break
+            if len(rows) > count:
+                rows = rows[:count]
+            count -= len(rows)
+            yield rows
+    finally:
+        blocks.close()
+
+
+def read_chunks(stream, chunk_size=DEFAULT_BLOCK_SIZE):
+    """
+    Reads a text stream in chunks of whole lines, e.g. to parse them in a process pool \
+    (a chunk is one string, cheap to send to another process, unlike a list of lines).
+
+    :param stream: opened text stream.
+    :param int chunk_size: approximate number of characters of a chunk.
+    :return: Generator of str, each ending with a line terminator except maybe the last one.
+    """
+    rest = ''
+    while True:
+        block = stream.read(chunk_size)
+        if not block:
+            break
+        if rest:
+            block = rest + block
+        cut = block.rfind('\n') + 1
+        if cut == 0:
+            rest = block
+            continue
+        rest = block[cut:]
+        yield block[:cut]
+    if rest:
+        yield rest
@@ -0,0 +1,263 @@
+import io
+import os
+import csv
+import heapq
+import itertools
+import re
+import shutil
+import tempfile
+
+
+# Characters which make csv quote or escape a field (the delimiter and the line terminator are counted).
+_QUOTED = re.compile(r'["\\\r]')
+# Rows buffered by a clean sink before they are written.
+BATCH_SIZE = 10000
+# Lines sorted in memory at once by sort_unique, and sorted runs merged at once.
+SORT_RUN_LINES = 1000000
+MAX_MERGED_RUNS = 64
+
+
+class TsvSink:
+    """
+    Writes the rows of an entities/relationships file as they are produced, without \
+    building the whole table in memory first.
+
+    The output is the same as DataFrame.to_csv with the options used by the parsers \
+    (tab separated, minimal quoting with '"', '\\' as escape character, '\\n' as line \
+    terminator, None and NaN written as empty fields), except that the values are written \
+    as they are: to_csv writes the integers of a column with missing values as floats (1.0).
+
+    Usage::
+
+        with TsvSink(outputfile, header, dedupe=True) as sink:
+            for row in rows:
+                sink.write(row)
+        stats.add(self._build_stats(sink.count, ...))
+    """
+
+    def __init__(self, outputfile, header=None, dedupe=False, mode='w', sampler=None, clean=False) -> None:
+        """
+        :param str outputfile: path to file to be saved (including filename and extention).
+        :param list header: list of column names, no header line if None.
+        :param bool dedupe: skip the rows which have already been written.
+        :param str mode: 'w' to overwrite the file, 'a' to append to it.
+        :param sampler: sampling.Sampler, skip the rows whose nodes are not sampled.
+        :param bool clean: the rows only hold str and int values (no None or NaN) and have at \
+                        least two columns, so write and write_rows buffer them and write them in batches \
+                        of BATCH_SIZE rows joined as text, only falling back to csv if a value has \
+                        to be quoted.
+        """
+        self.outputfile = outputfile
+        self.header = header
+        self.sampler = sampler if sampler is not None and sampler.fraction is not None else None
+        self.count = 0
+        self.clean = clean
+        self._pending = []
+        self._seen = set() if dedupe else None
+        self._handle = open(outputfile, mode, encoding='utf-8', newline='')
+        self._writer = _writer(self._handle)
+        if header is not None:
+            self._writer.writerow(header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, row):
+        """
+        Writes one row.
+
+        :param row: tuple or list of values.
+        :return: True if the row was written, False if it was a duplicate or not sampled.
+        """
+        if self.sampler is not None and not self.sampler.keep_row(row, self.header):
+            return False
+        if self._seen is not None:
+            try:
+                key = tuple(row)
+                hash(key)
+            except TypeError:
+                key = tuple(str(value) for value in row)
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+        if self.clean:
+            self._pending.append(row)
+            self.count += 1
+            if len(self._pending) >= BATCH_SIZE:
+                self._flush()
+            return True
+        if self._pending:
+            self._flush()
+        self._writer.writerow(
+            ['' if value != value else value for value in row] if _has_nan(row) else row)
+        self.count += 1
+        return True
+
+    def write_rows(self, rows):
+        """
+        Writes several rows (any iterable, e.g. a set, a list or a generator).
+
+        :param rows: iterable of tuples or lists.
+        :return: Number of rows written.
+        """
+        if self.clean and self.sampler is None and self._seen is None:
+            written = len(self._pending)
+            self._pending.extend(rows)
+            written = len(self._pending) - written
+            self.count += written
+            if len(self._pending) >= BATCH_SIZE:
+                self._flush()
+            return written
+        written = 0
+        for row in rows:
+            written += self.write(row)
+        return written
+
+    def _flush(self):
+        rows = self._pending
+        self._pending = []
+        if not rows:
+            return
+        self._handle.write(format_rows(rows))
+
+    def close(self):
+        if not self._handle.closed:
+            self._flush()
+            self._handle.close()
+        self._seen = None
+
+
+def _writer(handle):
+    return csv.writer(handle, delimiter='\t', quotechar='"', escapechar='\\', doublequote=True,
+                      quoting=csv.QUOTE_MINIMAL, lineterminator='\n')
+
+
+def format_rows(rows):
+    """
+    Returns the lines of rows of str and int values (at least two per row) as written by \
+    TsvSink, e.g. to write in the main process the rows produced by a worker process.
+
+    :param list rows: list of tuples or lists.
+    :return: The text of the lines.
+    """
+    if not rows:
+        return ''
+    text = '\n'.join(['\t'.join(map(str, row)) for row in rows]) + '\n'
+    if (_QUOTED.search(text) is None and text.count('\n') == len(rows)
+            and text.count('\t') == sum(map(len, rows)) - len(rows)):
+        return text
+    # A value has to be quoted or escaped.
+    buffer = io.StringIO()
+    _writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+def _has_nan(row):
+    for value in row:
+        if isinstance(value, float) and value != value:
+            return True
+    return False
+
+
+def concatenate(sources, outputfile, header=True, unique_ids=False):
+    """
+    Concatenates graph files written in parts (e.g. one per organism) into one file, with the \
+    header of the first part.
+
+    :param list sources: paths to the parts, in order.
+    :param str outputfile: path to the merged file.
+    :param bool header: the parts start with a header line.
+    :param bool unique_ids: skip the rows whose first column was already written (the rows \
+                        must be on a single line, e.g. entities shared by several parts).
+    :return: Number of rows skipped as duplicates.
+    """
+    seen = set()
+    skipped = 0
+    with open(outputfile, 'w', encoding='utf-8', newline='') as out:
+        for i, source in enumerate(sources):
+            with open(source, 'r', encoding='utf-8', newline='') as part:
+                if header:
+                    first = part.readline()
+                    if i == 0:
+                        out.write(first)
+                if not unique_ids:
+                    shutil.copyfileobj(part, out, 1024 * 1024)
+                    continue
+                for line in part:
+                    identifier = line.split('\t', 1)[0]
+                    if identifier in seen:
+                        skipped += 1
+                        continue
+                    seen.add(identifier)
+                    out.write(line)
+    return skipped
+
+
+def sort_unique(filepath, header=True, run_lines=SORT_RUN_LINES):
+    """
+    Sorts the lines of a graph file and removes the repeated ones, holding at most run_lines \
+    lines in memory: the sorted runs of lines are written to temporary files next to the file \
+    and merged (the rows must be on a single line).
+
+    :param str filepath: path to the file, replaced by the sorted file.
+    :param bool header: the file starts with a header line, kept first.
+    :param int run_lines: lines sorted in memory at once.
+    :return: Number of rows of the sorted file.
+    """
+    directory = os.path.dirname(os.path.abspath(filepath))
+    runs = []
+    try:
+        with open(filepath, 'r', encoding='utf-8', newline='') as f:
+            first = f.readline() if header else ''
+            while True:
+                lines = list(itertools.islice(f, run_lines))
+                if not lines:
+                    break
+                runs.append(_write_run(directory, sorted(set(lines))))
+        while len(runs) > MAX_MERGED_RUNS:
+            merged = _merge_runs(directory, runs[:MAX_MERGED_RUNS])
+            for run in runs[:MAX_MERGED_RUNS]:
+                os.remove(run)
+            runs = runs[MAX_MERGED_RUNS:] + [merged]
+        tmp_path = filepath + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as out:
+            out.write(first)
+            count = _write_unique(runs, out)
+        os.replace(tmp_path, filepath)
+    finally:
+        for run in runs:
+            os.remove(run)
+    return count
+
+
+def _write_run(directory, lines):
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='', dir=directory,
+                                     prefix='.sort-', suffix='.tmp', delete=False) as run:
+        run.writelines(lines)
+    return run.name
+
+
+def _merge_runs(directory, runs):
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='', dir=directory,
+                                     prefix='.sort-', suffix='.tmp', delete=False) as merged:
+        _write_unique(runs, merged)
+    return merged.name
+
+
+def _write_unique(runs, out):
+    handles = [open(run, 'r', encoding='utf-8', newline='') for run in runs]
+    count = 0
+    previous = None
+    try:
+        for line in heapq.merge(*handles):
+            if line != previous:
+                out.write(line)
+                count += 1
+                previous = line
+    finally:
+        for handle in handles:
+            handle.close()
+    return count
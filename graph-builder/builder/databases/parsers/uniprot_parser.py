@@ -2,14 +2,120 @@ import pandas as pd
 import re
 import logging
 import os.path
+import shutil
 import verboselogs
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from builder.databases import config
 from builder.databases.parsers.base_parser import BaseParser
+from builder.databases.parsers.sampling import Sampler
+from builder.databases.parsers import tsv_sink, tsv_reader
+from builder.databases.parsers.tsv_sink import TsvSink
+from builder.databases.parsers import idmapping_reader
+from builder.databases.parsers import fasta_reader
+from builder.databases.parsers.instrumentation import stats_rows
 
 
 logger = verboselogs.VerboseLogger('root')
 
+# Folder of the import directory where each organism writes its files before they are merged.
+ORGANISMS_DIRECTORY = '.organisms'
+# Entities which several organisms may share, written once in the merged file.
+SHARED_ENTITY_FILES = {'Protein_structures.tsv'}
+
+# Genomic location and chromosome of a variant of the variants file.
+VARIANT_REGEX = re.compile(r"(g\.\w+>\w)")
+CHROMOSOME_REGEX = re.compile(r"(\w+)[p|q]")
+# Relationship files of the variants.
+VARIANT_RELATIONSHIPS = [('Chromosome', 'known_variant_found_in_chromosome'),
+                         ('Gene', 'known_variant_found_in_gene'),
+                         ('Protein', 'known_variant_found_in_protein')]
+
+
+def parse_variant_chunk(chunk, amino_acids, sampler=None, headers=None):
+    """
+    Parses a chunk of lines of the UniProt variants file, in a worker process of \
+    UniProtParser.parse_uniprot_variants.
+
+    :param str chunk: lines of the file.
+    :param dict amino_acids: one letter code of the three letter code of each amino acid.
+    :param sampler: sampling.Sampler keeping the rows of the sample, all rows if None.
+    :param dict headers: header of the file of each output, for the sampler.
+    :return: Dictionary of the lines of each output ('Known_variant' or an (entity, \
+            relationship) of VARIANT_RELATIONSHIPS) and of their number: {output: (text, count)}. \
+            The rows repeated in the chunk are written once.
+    """
+    # dict instead of set: the rows keep the order of the file.
+    entities = {}
+    relationships = {key: {} for key in VARIANT_RELATIONSHIPS}
+    chromosomes, genes, proteins = [relationships[key] for key in VARIANT_RELATIONSHIPS]
+    search_variant = VARIANT_REGEX.search
+    search_chromosome = CHROMOSOME_REGEX.search
+    for line in chunk.split('\n'):
+        data = line.rstrip('\r').split('\t')
+        if len(data) > 9:
+            gene = data[0]
+            protein = data[1]
+            pvariant = data[2]
+            externalID = data[3]
+            chromosome_coord = data[8]
+            var_matches = search_variant(data[9])
+            chr_matches = search_chromosome(chromosome_coord)
+            if var_matches and chr_matches:
+                chromosome = 'chr'+chr_matches.group(1)
+                ident = chromosome+":"+var_matches.group(1)
+                altName = [externalID, data[5], pvariant, chromosome_coord]
+                ref = pvariant[2:5]
+                alt = pvariant[-3:]
+                if ref in amino_acids and alt in amino_acids:
+                    altName.append(amino_acids[ref]+pvariant[5:-3]+amino_acids[alt])
+                entities[(ident, "Known_variant", protein+"_"+pvariant, externalID, ",".join(altName),
+                          data[4], data[5], data[6], data[13], "UniProt")] = None
+                if chromosome != 'chr-':
+                    chromosomes[(ident, chromosome.replace('chr', ''), "VARIANT_FOUND_IN_CHROMOSOME", "UniProt")] = None
+                if gene != "":
+                    genes[(ident, gene, "VARIANT_FOUND_IN_GENE", "UniProt")] = None
+                if protein != "":
+                    proteins[(ident, protein, "VARIANT_FOUND_IN_PROTEIN", "UniProt")] = None
+
+    outputs = {'Known_variant': list(entities)}
+    outputs.update((key, list(rows)) for key, rows in relationships.items())
+    if sampler is not None:
+        outputs = {key: list(sampler.filter_rows(rows, headers[key])) for key, rows in outputs.items()}
+    return {key: (tsv_sink.format_rows(rows), len(rows)) for key, rows in outputs.items()}
+
+
+def parse_organism_file(step, taxid, directory, database_directory, config_file=None, download=True, skip=True,
+                        sampler=None):
+    """
+    Parses the idmapping or fasta file of an organism into its own folder, in a worker \
+    process of UniProtParser.parse_organisms.
+
+    :param str step: 'idmapping' or 'fasta'.
+    :param str taxid: NCBI taxonomy identifier of the organism.
+    :param str directory: folder of the files of the organism.
+    :param str database_directory: directory of the downloaded database files.
+    :param str config_file: customized config file used instead of the default one.
+    :param bool download: whether download the file.
+    :param bool skip: whether skip the existing file.
+    :param sampler: sampling.Sampler keeping the rows of the sample, all rows if None.
+    :return: Tuple with the stats of the files, the versions of the downloaded files and the \
+            instrumentation.PhaseRecorder of the parsing.
+    """
+    # The parser of the worker writes in the folder of the organism, which is removed once merged.
+    parser = UniProtParser(os.path.dirname(directory), database_directory, config_file=config_file,
+                           download=download, skip=skip)
+    if sampler is not None:
+        parser.sampler = sampler
+    parser.import_directory = directory
+    with parser.phases.phase("organism-%s" % step) as phase:
+        if step == "idmapping":
+            stats = parser.parse_idmapping_file(taxid, os.path.join(directory, "mapping.tsv"))
+        else:
+            stats = parser.parse_fasta(taxid)
+        phase.rows_out += stats_rows(stats)
+    return stats, parser.source_versions, parser.phases
+
 
 class UniProtParser(BaseParser):
     def __init__(self, import_directory, database_directory, config_file=None,
@@ -25,44 +131,47 @@ class UniProtParser(BaseParser):
     def build_stats(self):
         logger.info("Config file(%s): %s" % (self.config_fpath, self.config))
         stats = set()
-        relationships_header = self.config['relationships_header']
         logger.info("Download release notes")
         self.parse_release_notes()
-        logger.info("Download and parse fasta file...")
-        stats = self.parse_fasta()
-
-        # Proteins
-        logger.info("Parse id mapping file...")
-        stats.update(self.parse_idmapping_file())
+        # Each step replaces its files once it succeeds, a failed build resumes from the
+        # first step it did not complete.
+        # Proteins and sequences
+        logger.info("Parse id mapping and fasta files of each organism...")
+        stats = self.run_step("organisms", self.parse_organisms)
         # Peptides
         logger.info("Parse uniprot peptides...")
-        entities, relationships = self.parse_uniprot_peptides()
-        entities_header = self.config['peptides_header']
-        output_file = os.path.join(self.import_directory, "Peptide.tsv")
-        logger.info("Generate file %s" % output_file)
-        stats.update(self.print_single_file(entities, entities_header, output_file,
-                     "entity", "Peptide", is_first=True, updated_on=self.updated_on))
-        logger.info("Generate multiple files about relationships...")
-        stats.update(self.print_multiple_relationships_files(
-            relationships, relationships_header, self.import_directory, is_first=True, updated_on=self.updated_on))
+        stats.update(self.run_step("peptides", self.build_peptides_stats))
 
         # Variants
         logger.info("Parse uniprot variants...")
-        stats.update(self.parse_uniprot_variants())
+        stats.update(self.run_step("variants", self.parse_uniprot_variants))
 
         # Gene ontology annotation
         logger.info("Parse uniprot annotations for gene ontology...")
-        relationships = self.parse_uniprot_annotations()
-        relationships_header = self.config['go_header']
-        logger.info("Generate multiple files about relationships...")
-        stats.update(self.print_multiple_relationships_files(
-            relationships, relationships_header, self.import_directory, is_first=True, updated_on=self.updated_on))
+        stats.update(self.run_step("annotations", self.build_annotations_stats))
 
         # directory = os.path.join(self.database_directory, "UniProt")
         # self.remove_directory(directory)
 
         return stats
 
+    def build_peptides_stats(self):
+        stats = set()
+        entities, relationships = self.parse_uniprot_peptides()
+        entities_header = self.config['peptides_header']
+        output_file = os.path.join(self.import_directory, "Peptide.tsv")
+        logger.info("Generate file %s" % output_file)
+        stats.update(self.print_single_file(entities, entities_header, output_file,
+                     "entity", "Peptide", is_first=True, updated_on=self.updated_on))
+        logger.info("Generate multiple files about relationships...")
+        stats.update(self.print_multiple_relationships_files(
+            relationships, self.config['relationships_header'], self.import_directory, is_first=True, updated_on=self.updated_on))
+        return stats
+
+    def build_annotations_stats(self):
+        logger.info("Generate multiple files about relationships...")
+        return self.parse_uniprot_annotations()
+
     def parse_release_notes(self):
         release_notes_url = self.config['release_notes']
         directory = os.path.join(self.database_directory, "UniProt")
@@ -70,13 +179,142 @@ class UniProtParser(BaseParser):
         if self.download:
             self.download_db(release_notes_url, directory)
 
-    def parse_fasta(self):
+    def organism_url(self, key, taxid):
+        """
+        Returns the url of the file of an organism from the url template of the config \
+        (e.g. key='uniprot_id_url') and the names of the organism in its 'organisms' section.
+
+        :param str key: config key of the url template.
+        :param taxid: NCBI taxonomy identifier of the organism.
+        """
+        names = self.config['organisms'].get(int(taxid))
+        if names is None:
+            raise ValueError("The organism {} of the species list has no entry in the 'organisms' "
+                             "section of {}.".format(taxid, self.config_fpath))
+        return self.config[key].format(taxid=taxid, **names)
+
+    def parse_organisms(self):
+        """
+        Parses the idmapping and fasta files of each organism of the species list in a process \
+        pool, then merges the files of the organisms into the graph files and complete_mapping.tsv.
+        """
+        taxids = [str(taxid) for taxid in self.config['species']]
+        self.reset_mapping()
+        organisms_directory = os.path.join(self.import_directory, ORGANISMS_DIRECTORY)
+        directories = [os.path.join(organisms_directory, taxid) for taxid in taxids]
+        for directory in directories:
+            self.check_directory(directory)
+        # The mapping is complete once the idmapping files are parsed: the other parsers read
+        # it while the fasta files are still being parsed.
+        worker_args = (self.database_directory, self.config_fpath if self._custom_config else None,
+                       self.download, self.skip, self.sampler)
+        n_jobs = min(2 * len(taxids), self.config.get('organism_jobs', 4), os.cpu_count() or 1)
+        if n_jobs > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                futures = {step: [executor.submit(parse_organism_file, step, taxid, directory, *worker_args)
+                                  for taxid, directory in zip(taxids, directories)]
+                           for step in ("idmapping", "fasta")}
+                organism_stats = self.merge_organism_results(future.result() for future in futures["idmapping"])
+                self.complete_organism_mapping(directories)
+                organism_stats.update(self.merge_organism_results(future.result() for future in futures["fasta"]))
+        else:
+            organism_stats = self.merge_organism_results(
+                parse_organism_file("idmapping", taxid, directory, *worker_args)
+                for taxid, directory in zip(taxids, directories))
+            self.complete_organism_mapping(directories)
+            organism_stats.update(self.merge_organism_results(
+                parse_organism_file("fasta", taxid, directory, *worker_args)
+                for taxid, directory in zip(taxids, directories)))
+
+        if self.source_versions:
+            self.updated_on = max(self.source_versions.values())
+        stats = self.merge_organism_files(directories, organism_stats)
+        shutil.rmtree(organisms_directory)
+
+        return stats
+
+    def merge_organism_results(self, results):
+        """
+        Keeps the versions of the files downloaded by the workers of parse_organisms and the \
+        measures of their phases.
+
+        :param results: iterable of the tuples returned by parse_organism_file.
+        :return: Set of the stats of the files of the organisms.
+        """
+        stats = set()
+        for organism_stats, source_versions, phases in results:
+            stats.update(organism_stats)
+            self.source_versions.update(source_versions)
+            self.phases.merge(phases)
+        return stats
+
+    def complete_organism_mapping(self, directories):
+        """
+        Concatenates the mappings of the organisms into mapping.tsv and marks it complete.
+
+        :param list directories: folders of the files of the organisms, in order.
+        """
+        mapping_file = os.path.join(self.database_directory, "UniProt", "mapping.tsv")
+        tsv_sink.concatenate([os.path.join(directory, "mapping.tsv") for directory in directories],
+                             mapping_file, header=False)
+        self.mark_complete_mapping()
+
+    def merge_organism_files(self, directories, organism_stats):
+        """
+        Concatenates the graph files of the organisms into self.import_directory, with the \
+        entities shared by several organisms (SHARED_ENTITY_FILES) once.
+
+        :param list directories: folders of the files of the organisms, in order.
+        :param set organism_stats: stats of the files of the organisms.
+        :return: Stats of the merged files.
+        """
+        counts = defaultdict(int)
+        kinds = {}
+        for row in organism_stats:
+            counts[row[3]] += row[5]
+            kinds[row[3]] = (row[6], row[7])
+        stats = set()
+        for file_name in sorted(kinds):
+            sources = [os.path.join(directory, file_name) for directory in directories
+                       if os.path.isfile(os.path.join(directory, file_name))]
+            output_file = os.path.join(self.import_directory, file_name)
+            count = counts[file_name]
+            if len(sources) == 1:
+                os.replace(sources[0], output_file)
+            else:
+                count -= tsv_sink.concatenate(sources, output_file,
+                                              unique_ids=file_name in SHARED_ENTITY_FILES)
+            otype, name = kinds[file_name]
+            stats.add(self._build_stats(count, otype, name, "UniProt", output_file, self.updated_on))
+        # The other files of the organisms (e.g. the sequence files) have their own names.
+        for directory in directories:
+            for file_name in sorted(os.listdir(directory)):
+                if file_name not in kinds and file_name != "mapping.tsv":
+                    os.replace(os.path.join(directory, file_name),
+                               os.path.join(self.import_directory, file_name))
+
+        return stats
+
+    def parse_fasta(self, taxid):
+        """
+        Reads the fasta file of an organism with fasta_reader and writes the sequences and \
+        their HAS_SEQUENCE relationships. With sequence_sidecar in the config, the sequences \
+        go to a compressed Amino_acid_sequence.<taxid>.seq.bgz file and Amino_acid_sequence.tsv \
+        only gets their size and offset (see fasta_reader.read_sequence).
+
+        :param str taxid: NCBI taxonomy identifier of the organism.
+        """
         stats = set()
-        url = self.config['uniprot_fasta_file']
+        url = self.organism_url('uniprot_fasta_file', taxid)
         entities_output_file = os.path.join(
             self.import_directory, "Amino_acid_sequence.tsv")
         rel_output_file = os.path.join(
             self.import_directory, "Protein_HAS_Sequence_Amino_acid_sequence.tsv")
+        sidecar = None
+        if self.config.get('sequence_sidecar'):
+            sidecar = fasta_reader.SequenceSidecar(os.path.join(
+                self.import_directory, "Amino_acid_sequence.%s.seq.bgz" % taxid))
+            sidecar_name = os.path.basename(sidecar.filepath).encode()
 
         directory = os.path.join(self.database_directory, "UniProt")
         self.check_directory(directory)
@@ -85,26 +323,33 @@ class UniProtParser(BaseParser):
         if self.download:
             self.download_db(url, directory)
 
-        ff = self.read_gzipped_file(file_name)
-        records = self._parse_fasta(ff)
         num_entities = 0
-        with open(entities_output_file, 'w', encoding='utf-8') as ef:
-            logger.info("Generate entity file %s" % entities_output_file)
-            ef.write('ID\theader\tsequence\tsize\tsource\n')
-            with open(rel_output_file, 'w', encoding='utf-8') as rf:
-                logger.info("Generate relationship file %s" % rel_output_file)
-                rf.write('START_ID\tEND_ID\tTYPE\tsource\n')
-                for i, batch in enumerate(self.batch_iterator(records, 1000)):
-                    for record in batch:
-                        identifier = record.id.split('|')[1]
-                        header = record.id
-                        sequence = str(record.seq)
-                        sequence_len = len(str(sequence))
-                        ef.write(identifier+"\t"+header+'\t'+sequence +
-                                 '\t'+str(sequence_len)+'\tUniProt\n')
-                        rf.write(identifier+'\t'+identifier +
-                                 '\tHAS_SEQUENCE\tUniProt\n')
+        try:
+            with self.read_gzipped_file(file_name, 'rb') as ff, open(entities_output_file, 'wb') as ef:
+                logger.info("Generate entity file %s" % entities_output_file)
+                if sidecar is None:
+                    ef.write(b'ID\theader\tsequence\tsize\tsource\n')
+                else:
+                    logger.info("Generate sequence file %s" % sidecar.filepath)
+                    ef.write(b'ID\theader\tsize\tsequence_file\toffset\tsource\n')
+                with open(rel_output_file, 'wb') as rf:
+                    logger.info("Generate relationship file %s" % rel_output_file)
+                    rf.write(b'START_ID\tEND_ID\tTYPE\tsource\n')
+                    for header, sequence in self.limited(fasta_reader.read_records(ff)):
+                        identifier = header.split(b'|')[1]
+                        if not self.sampler.keep(identifier.decode()):
+                            continue
+                        size = str(len(sequence)).encode()
+                        if sidecar is None:
+                            ef.write(b'\t'.join((identifier, header, sequence, size, b'UniProt\n')))
+                        else:
+                            offset = str(sidecar.write(identifier, sequence)).encode()
+                            ef.write(b'\t'.join((identifier, header, size, sidecar_name, offset, b'UniProt\n')))
+                        rf.write(identifier+b'\t'+identifier+b'\tHAS_SEQUENCE\tUniProt\n')
                         num_entities += 1
+        finally:
+            if sidecar is not None:
+                sidecar.close()
 
         stats.add(self._build_stats(num_entities, "entity",
                   "Amino_acid_sequence", "UniProt", entities_output_file, self.updated_on))
@@ -113,166 +358,115 @@ class UniProtParser(BaseParser):
 
         return stats
 
-    def parse_idmapping_file(self):
-        regex_transcript = r"(-\d+$)"
-        taxids = self.config['species']
+    def parse_idmapping_file(self, taxid, mapping_file):
+        """
+        Streams the idmapping file of an organism protein by protein (see \
+        idmapping_reader.read_entries) and writes the proteins, their structures and \
+        relationships, and the mapping of their synonyms, to files kept open during the whole \
+        parsing. The memory used does not grow with the number of proteins.
 
+        :param str taxid: NCBI taxonomy identifier of the organism.
+        :param str mapping_file: path to the mapping file of the organism.
+        """
         proteins_output_file = os.path.join(
             self.import_directory, "Protein.tsv")
         pdbs_output_file = os.path.join(
             self.import_directory, "Protein_structures.tsv")
-        proteins = {}
 
-        url = self.config['uniprot_id_url']
+        url = self.organism_url('uniprot_id_url', taxid)
         directory = os.path.join(self.database_directory, "UniProt")
         self.check_directory(directory)
         file_name = os.path.join(directory, url.split('/')[-1])
-        mapping_file = os.path.join(directory, 'mapping.tsv')
         if self.download:
             self.download_db(url, directory)
 
-        fields = self.config['uniprot_ids']
-        synonymFields = self.config['uniprot_synonyms']
-
-        identifier = None
-        transcripts = set()
-        skip = set()
-        is_first = True
-        uf = self.read_gzipped_file(file_name)
-        aux = {}
         stats = set()
-        self.reset_mapping()
-        with open(mapping_file, 'w', encoding='utf-8') as out:
-            logger.info("Generate file %s" % proteins_output_file)
-            logger.info("Generate file %s" % pdbs_output_file)
-            logger.info("Generate multiple files about relationships...")
-            for line in uf:
-                data = line.rstrip("\r\n").split("\t")
-                iid = data[0]
-                if 'UniParc' in data:
-                    if re.search(regex_transcript, iid):
-                        transcripts.add(iid)
-                    continue
-                # data = line.decode('utf-8').rstrip("\r\n").split("\t")
-                # iid = data[0]
-                field = data[1]
-                alias = data[2]
-
-                if iid not in skip:
-                    skip = set()
-                    if re.search(regex_transcript, iid):
-                        transcripts.add(iid)
-                    if iid not in aux and iid.split('-')[0] not in aux:
-                        if identifier is not None:
-                            prot_info["synonyms"] = synonyms
-                            aux[identifier].update(prot_info)
-                            if "UniProtKB-ID" in aux[identifier] and "NCBI_TaxID" in aux[identifier]:
-                                for synonym in synonyms:
-                                    out.write(identifier+"\t"+synonym+"\n")
-                                proteins[identifier] = aux[identifier]
-                                for t in transcripts:
-                                    proteins[t] = aux[identifier]
-                                    for synonym in synonyms:
-                                        out.write(t+"\t"+synonym+"\n")
-                                if len(transcripts) > 0:
-                                    proteins[identifier].update(
-                                        {"isoforms": transcripts})
-                                    transcripts = set()
-                                aux.pop(identifier, None)
-                                if len(proteins) >= 1000:
-                                    entities, relationships, pdb_entities = self.format_output(
-                                        proteins)
-                                    stats.update(self.print_single_file(
-                                        entities, self.config['proteins_header'], proteins_output_file, "entity", "Protein", is_first, self.updated_on))
-                                    stats.update(self.print_single_file(
-                                        pdb_entities, self.config['pdb_header'], pdbs_output_file, "entity", "Protein_structure", is_first, self.updated_on))
-                                    stats.update(self.print_multiple_relationships_files(
-                                        relationships, self.config['relationships_header'], self.import_directory, is_first, self.updated_on))
-                                    is_first = False
-                                    proteins = {}
-                        identifier = iid
-                        transcripts = set()
-                        aux[identifier] = {}
-                        prot_info = {}
-                        synonyms = []
-                    if field in fields:
-                        if field == 'NCBI_TaxID':
-                            if int(alias) not in taxids:
-                                skip.add(identifier)
-                                aux.pop(identifier, None)
-                                identifier = None
-                        if field in synonymFields:
-                            synonyms.append(alias)
-                        prot_info.setdefault(field, [])
-                        prot_info[field].append(alias)
-
+        logger.info("Generate file %s" % proteins_output_file)
+        logger.info("Generate file %s" % pdbs_output_file)
+        logger.info("Generate multiple files about relationships...")
+        proteins = TsvSink(proteins_output_file, self.config['proteins_header'], sampler=self.sampler, clean=True)
+        structures = TsvSink(pdbs_output_file, self.config['pdb_header'], sampler=self.sampler, clean=True)
+        relationships = {}
+        # The structures shared by several proteins are written once.
+        pdb_ids = set()
+        uf = self.read_gzipped_file(file_name)
+        try:
+            with open(mapping_file, 'w', encoding='utf-8') as out:
+                for entry in idmapping_reader.read_entries(uf, self.config['uniprot_ids'],
+                                                           self.config['uniprot_synonyms'],
+                                                           [taxid]):
+                    self.write_protein(entry, out, proteins, structures, relationships, pdb_ids)
+        finally:
             uf.close()
+            for sink in [proteins, structures] + list(relationships.values()):
+                sink.close()
 
-        if len(proteins) > 0:
-            entities, relationships, pdb_entities = self.format_output(
-                proteins)
-            stats.update(self.print_single_file(
-                entities, self.config['proteins_header'], proteins_output_file, "entity", "Protein", is_first, self.updated_on))
-            stats.update(self.print_single_file(
-                pdb_entities, self.config['pdb_header'], pdbs_output_file, "entity", "Protein_structure", is_first, self.updated_on))
-            stats.update(self.print_multiple_relationships_files(
-                relationships, self.config['relationships_header'], self.import_directory, is_first, self.updated_on))
-
-        self.mark_complete_mapping()
+        stats.add(self._build_stats(proteins.count, "entity", "Protein",
+                                    "UniProt", proteins_output_file, self.updated_on))
+        stats.add(self._build_stats(structures.count, "entity", "Protein_structure",
+                                    "UniProt", pdbs_output_file, self.updated_on))
+        for (entity, relationship), sink in relationships.items():
+            stats.add(self._build_stats(sink.count, 'relationships', relationship, "UniProt",
+                                        sink.outputfile, self.updated_on))
 
         return stats
 
-    def format_output(self, proteins):
-        entities = set()
-        relationships = defaultdict(set)
-        pdb_entities = set()
-        for protein in proteins:
-            accession = ""
-            name = ""
-            synonyms = []
-            description = ""
-            taxid = None
-            pdb = []
-            if "UniProtKB-ID" in proteins[protein]:
-                accession = proteins[protein]["UniProtKB-ID"][0]
-            if "Gene_Name" in proteins[protein]:
-                name = proteins[protein]["Gene_Name"][0]
-                for i in proteins[protein]["Gene_Name"]:
-                    relationships[("Protein", "GENE_TRANSLATED_INTO")].add(
-                        (i, protein, "GENE_TRANSLATED_INTO", 'UniProt'))
-            if "RefSeq" in proteins[protein]:
-                for i in proteins[protein]["RefSeq"]:
-                    relationships[("Protein", "TRANSCRIPT_TRANSLATED_INTO")].add(
-                        (i, protein, "TRANSCRIPT_TRANSLATED_INTO", 'UniProt'))
-            if "synonyms" in proteins[protein]:
-                synonyms = proteins[protein]["synonyms"]
-            if "NCBI_TaxID" in proteins[protein]:
-                taxid = proteins[protein]["NCBI_TaxID"][0]
-                relationships[("Protein", "BELONGS_TO_TAXONOMY")].add(
-                    (protein, int(taxid), "BELONGS_TO_TAXONOMY", 'UniProt'))
-            if 'PDB' in proteins[protein]:
-                pdb = proteins[protein]['PDB']
-                for i in pdb:
-                    pdb_entities.add(
-                        (i, 'Protein_structure', 'Uniprot', 'http://www.rcsb.org/structure/{}'.format(i)))
-                    relationships[("Protein", "HAS_STRUCTURE")].add(
-                        (protein, i, "HAS_STRUCTURE", 'UniProt'))
-            if "description" in proteins[protein]:
-                description = proteins[protein]["description"]
-            if "isoforms" in proteins[protein]:
-                for i in proteins[protein]['isoforms']:
-                    relationships[('Transcript', 'IS_ISOFORM')].add(
-                        (i, protein, 'IS_ISOFORM', 'UniProt'))
-
-            entities.add((protein, "Protein", accession, name,
-                         ",".join(synonyms), description, int(taxid)))
-
-        return entities, relationships, pdb_entities
+    def write_protein(self, entry, mapping, proteins, structures, relationships, pdb_ids):
+        """
+        Writes a protein of the idmapping file and its isoforms, which get the same names, \
+        synonyms and relationships.
+
+        :param entry: idmapping_reader.UniProtEntry.
+        :param mapping: open mapping.tsv file.
+        :param proteins: TsvSink of Protein.tsv.
+        :param structures: TsvSink of Protein_structures.tsv.
+        :param dict relationships: TsvSink of each (entity, relationship), opened at its first row.
+        :param set pdb_ids: structures already written.
+        """
+        fields = entry.fields
+        accession = fields["UniProtKB-ID"][0]
+        taxid = int(fields["NCBI_TaxID"][0])
+        genes = list(dict.fromkeys(fields.get("Gene_Name", [])))
+        refseqs = list(dict.fromkeys(fields.get("RefSeq", [])))
+        pdbs = list(dict.fromkeys(fields.get("PDB", [])))
+        name = genes[0] if genes else ""
+        synonyms = ",".join(entry.synonyms)
+        new_pdbs = [pdb for pdb in pdbs if pdb not in pdb_ids]
+        if new_pdbs:
+            pdb_ids.update(new_pdbs)
+            structures.write_rows([(pdb, 'Protein_structure', 'Uniprot', 'http://www.rcsb.org/structure/{}'.format(pdb))
+                                   for pdb in new_pdbs])
+
+        members = [entry.accession] + entry.isoforms
+        mapping.write("".join(protein+"\t"+synonym+"\n" for protein in members for synonym in entry.synonyms))
+        proteins.write_rows([(protein, "Protein", accession, name, synonyms, "", taxid) for protein in members])
+        if genes:
+            self._relationship_sink(relationships, "Protein", "GENE_TRANSLATED_INTO").write_rows(
+                [(gene, protein, "GENE_TRANSLATED_INTO", 'UniProt') for protein in members for gene in genes])
+        if refseqs:
+            self._relationship_sink(relationships, "Protein", "TRANSCRIPT_TRANSLATED_INTO").write_rows(
+                [(refseq, protein, "TRANSCRIPT_TRANSLATED_INTO", 'UniProt') for protein in members for refseq in refseqs])
+        self._relationship_sink(relationships, "Protein", "BELONGS_TO_TAXONOMY").write_rows(
+            [(protein, taxid, "BELONGS_TO_TAXONOMY", 'UniProt') for protein in members])
+        if pdbs:
+            self._relationship_sink(relationships, "Protein", "HAS_STRUCTURE").write_rows(
+                [(protein, pdb, "HAS_STRUCTURE", 'UniProt') for protein in members for pdb in pdbs])
+        if entry.isoforms:
+            self._relationship_sink(relationships, "Transcript", "IS_ISOFORM").write_rows(
+                [(isoform, protein, 'IS_ISOFORM', 'UniProt') for protein in members for isoform in entry.isoforms])
+
+    def _relationship_sink(self, sinks, entity, relationship):
+        sink = sinks.get((entity, relationship))
+        if sink is None:
+            output_file = os.path.join(self.import_directory, entity+"_"+relationship.lower() + ".tsv")
+            sink = TsvSink(output_file, self.config['relationships_header'], sampler=self.sampler, clean=True)
+            sinks[(entity, relationship)] = sink
+        return sink
 
     def print_single_file(self, data, header, output_file, data_type, data_object, is_first, updated_on):
         stats = set()
-        df = pd.DataFrame(list(data), columns=header)
-        stats.add(self._build_stats(len(data), data_type,
+        df = pd.DataFrame(list(self.sampler.filter_rows(data, header)), columns=header)
+        stats.add(self._build_stats(len(df), data_type,
                   data_object, "UniProt", output_file, updated_on))
         with open(output_file, 'a', encoding='utf-8') as ef:
             df.to_csv(path_or_buf=ef, sep='\t',
@@ -285,10 +479,10 @@ class UniProtParser(BaseParser):
         stats = set()
         for entity, relationship in data:
             df = pd.DataFrame(
-                list(data[(entity, relationship)]), columns=header)
+                list(self.sampler.filter_rows(data[(entity, relationship)], header)), columns=header)
             output_file = os.path.join(
                 output_dir, entity+"_"+relationship.lower() + ".tsv")
-            stats.add(self._build_stats(len(data[(entity, relationship)]),
+            stats.add(self._build_stats(len(df),
                                         'relationships', relationship, "UniProt",
                                         output_file, updated_on))
             with open(output_file, 'a', encoding='utf-8') as ef:
@@ -310,13 +504,12 @@ class UniProtParser(BaseParser):
                     proteins[protein].update({"description": function})
 
     def parse_uniprot_variants(self):
-        data = defaultdict()
-        variant_regex = r"(g\.\w+>\w)"
-        chromosome_regex = r"(\w+)[p|q]"
+        """
+        Parses the variants file in chunks of lines (see parse_variant_chunk), in a pool of \
+        variant_jobs processes (one per CPU by default), and writes the rows of the chunks in \
+        the order of the file, so that the files do not depend on the number of processes.
+        """
         url = self.config['uniprot_variant_file']
-        aa = self.config['amino_acids']
-        entities = set()
-        relationships = defaultdict(set)
         directory = os.path.join(self.database_directory, "UniProt")
         self.check_directory(directory)
         fileName = os.path.join(directory, url.split('/')[-1])
@@ -325,104 +518,128 @@ class UniProtParser(BaseParser):
 
         known_variants = os.path.join(
             self.import_directory, "Known_variant.tsv")
+        output_files = {'Known_variant': known_variants}
+        headers = {'Known_variant': self.config['variants_header']}
+        for entity, relationship in VARIANT_RELATIONSHIPS:
+            output_files[(entity, relationship)] = os.path.join(
+                self.import_directory, entity+"_"+relationship.lower() + ".tsv")
+            headers[(entity, relationship)] = self.config['relationships_header']
         logger.info("Generate file %s" % known_variants)
         logger.info("Generate multiple files about relationships...")
 
-        vf = self.read_gzipped_file(fileName)
-        din = False
-        i = 0
+        # The workers get a sampler of their own, without the identifiers cached by the other steps.
+        sampler = None
+        if self.sampler.fraction is not None:
+            sampler = Sampler(fraction=self.sampler.fraction, seed=self.sampler.seed)
+        n_jobs = self.config.get('variant_jobs') or os.cpu_count() or 1
+        counts = dict.fromkeys(output_files, 0)
+        handles = {}
+        try:
+            for key, output_file in output_files.items():
+                handles[key] = open(output_file, 'w', encoding='utf-8', newline='')
+                handles[key].write(tsv_sink.format_rows([headers[key]]))
+            with self.read_gzipped_file(fileName) as vf:
+                # The variants follow the header line, which starts with '#'.
+                for line in vf:
+                    if line.startswith('#'):
+                        break
+                if self.sampler.sample is not None:
+                    chunks = [''.join(self.limited(vf))]
+                else:
+                    chunks = tsv_reader.read_chunks(vf)
+                for outputs in self.map_chunks(parse_variant_chunk, chunks, self.config['amino_acids'],
+                                               sampler, headers, n_jobs=n_jobs):
+                    for key, (text, count) in outputs.items():
+                        handles[key].write(text)
+                        counts[key] += count
+        finally:
+            for handle in handles.values():
+                handle.close()
+
         stats = set()
-        is_first = True
-        for line in vf:
-            line = line
-            if not line.startswith('#') and not din:
-                continue
-            elif i <= 2:
-                din = True
-                i += 1
-                continue
-            data = line.rstrip("\r\n").split("\t")
-            if len(data) > 9:
-                gene = data[0]
-                protein = data[1]
-                pvariant = data[2]
-                externalID = data[3]
-                impact = data[4]
-                clin_relevance = data[5]
-                disease = data[6]
-                chromosome_coord = data[8]
-                original_source = data[13]
-                ref = pvariant[2:5]
-                pos = pvariant[5:-3]
-                alt = pvariant[-3:]
-                var_matches = re.search(variant_regex, data[9])
-                chr_matches = re.search(chromosome_regex, chromosome_coord)
-                if var_matches and chr_matches:
-                    chromosome = 'chr'+chr_matches.group(1)
-                    ident = chromosome+":"+var_matches.group(1)
-                    altName = [externalID, data[5], pvariant, chromosome_coord]
-                    if ref in aa and alt in aa:
-                        altName.append(aa[ref]+pos+aa[alt])
-                    pvariant = protein+"_"+pvariant
-                    entities.add((ident, "Known_variant", pvariant, externalID, ",".join(
-                        altName), impact, clin_relevance, disease, original_source, "UniProt"))
-                    if chromosome != 'chr-':
-                        relationships[('Chromosome', 'known_variant_found_in_chromosome')].add(
-                            (ident, chromosome.replace('chr', ''), "VARIANT_FOUND_IN_CHROMOSOME", "UniProt"))
-                    if gene != "":
-                        relationships[('Gene', 'known_variant_found_in_gene')].add(
-                            (ident, gene, "VARIANT_FOUND_IN_GENE", "UniProt"))
-                    if protein != "":
-                        relationships[('Protein', 'known_variant_found_in_protein')].add(
-                            (ident, protein, "VARIANT_FOUND_IN_PROTEIN", "UniProt"))
-
-                    if len(entities) >= 1000:
-                        stats.update(self.print_single_file(entities, self.config['variants_header'],
-                                                            known_variants, "entity", "Known_variant", is_first, self.updated_on))
-                        stats.update(self.print_multiple_relationships_files(
-                            relationships, self.config['relationships_header'], self.import_directory, is_first, self.updated_on))
-                        entities = set()
-                        relationships = defaultdict(set)
-
-                        is_first = False
-
-        if len(entities) > 0:
-            stats.update(self.print_single_file(entities, self.config['variants_header'], known_variants,
-                                                "entity", "Known_variant", is_first, self.updated_on))
-            stats.update(self.print_multiple_relationships_files(
-                relationships, self.config['relationships_header'], self.import_directory, is_first, self.updated_on))
-            del (entities)
-            del (relationships)
+        stats.add(self._build_stats(counts['Known_variant'], "entity", "Known_variant", "UniProt",
+                                    known_variants, self.updated_on))
+        for entity, relationship in VARIANT_RELATIONSHIPS:
+            stats.add(self._build_stats(counts[(entity, relationship)], "relationships", relationship, "UniProt",
+                                        output_files[(entity, relationship)], self.updated_on))
 
         return stats
 
     def parse_uniprot_annotations(self):
+        """
+        Writes the GO annotations of the GAF file to one file per GO root as they are read.
+
+        Each file has every distinct row once, as when all rows were collected in a set: \
+        the identifier, GO term and evidence of a row are unique across all databases of the \
+        file. The GAF file lists the annotations of each protein together, so the repeated \
+        rows are removed within each protein and only its rows (and the identifiers already \
+        read) are held in memory. The protein being read is kept for each database of the \
+        file, whose rows may be interleaved (e.g. UniProtKB and ComplexPortal). If an \
+        identifier appears again after other proteins, or in two databases, the files are \
+        sorted and their repeated rows removed once written (tsv_sink.sort_unique).
+        """
         roots = {'F': 'Molecular_function',
                  'C': 'Cellular_component', 'P': 'Biological_process'}
         url = self.config['uniprot_go_annotations']
-        relationships = defaultdict(set)
+        header = self.config['go_header']
         directory = os.path.join(self.database_directory, "UniProt")
         self.check_directory(directory)
         fileName = os.path.join(directory, url.split('/')[-1])
         if self.download:
             self.download_db(url, directory)
 
-        af = self.read_gzipped_file(fileName)
-        for line in af:
-            line = line
-            if line.startswith('!'):
-                continue
-            data = line.rstrip("\r\n").split("\t")
-            identifier = data[1]
-            go = data[4]
-            evidence = data[6]
-            root = data[8]
-            if root in roots:
-                root = roots[root]
-                relationships[(root, 'associated_with')].add(
-                    (identifier, go, "ASSOCIATED_WITH", evidence, 5, "UniProt"))
-
-        return relationships
+        sinks = {}
+        # Protein being read and its rows written, by database of the file.
+        groups = {}
+        identifiers = set()
+        grouped = True
+        try:
+            with self.read_gzipped_file(fileName) as af:
+                for line in self.limited(af):
+                    if line.startswith('!'):
+                        continue
+                    data = line.rstrip("\r\n").split("\t")
+                    identifier = data[1]
+                    group = groups.get(data[0])
+                    if group is None or group[0] != identifier:
+                        if grouped:
+                            if identifier in identifiers:
+                                # Its rows may repeat rows written before, sort_unique removes them.
+                                grouped = False
+                                identifiers.clear()
+                            else:
+                                identifiers.add(identifier)
+                        group = groups[data[0]] = (identifier, set())
+                    seen = group[1]
+                    root = roots.get(data[8])
+                    if root is None:
+                        continue
+                    go = data[4]
+                    evidence = data[6]
+                    key = (root, go, evidence)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    sink = sinks.get(root)
+                    if sink is None:
+                        output_file = os.path.join(self.import_directory, root + "_associated_with.tsv")
+                        sink = sinks[root] = TsvSink(output_file, header, sampler=self.sampler, clean=True)
+                    sink.write((identifier, go, "ASSOCIATED_WITH", evidence, 5, "UniProt"))
+        finally:
+            for sink in sinks.values():
+                sink.close()
+
+        stats = set()
+        for root, sink in sinks.items():
+            count = sink.count
+            if not grouped:
+                logger.info("Remove the repeated rows of %s" % sink.outputfile)
+                count = tsv_sink.sort_unique(sink.outputfile, run_lines=self.config.get('go_sort_run_lines')
+                                             or tsv_sink.SORT_RUN_LINES)
+            stats.add(self._build_stats(count, 'relationships', 'associated_with', "UniProt",
+                                        sink.outputfile, self.updated_on))
+
+        return stats
 
     def parse_uniprot_peptides(self):
         file_urls = self.config['uniprot_peptides_files']
@@ -436,7 +653,7 @@ class UniProtParser(BaseParser):
                 self.download_db(url, directory)
             first = True
             with open(fileName, 'r', encoding='utf-8') as f:
-                for line in f:
+                for line in self.limited(f):
                     if first:
                         first = False
                         continue
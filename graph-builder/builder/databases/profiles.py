@@ -0,0 +1,193 @@
+import os
+import gc
+import sys
+import json
+import time
+import threading
+import multiprocessing
+import verboselogs
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+logger = verboselogs.VerboseLogger('root')
+
+# Resource profiles of the parsers, written in the output directory next to the graph files.
+PROFILES_FILE = 'parser_profiles.json'
+
+
+def total_memory():
+    """
+    Returns the physical memory of the machine in bytes, None if unknown.
+    """
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def current_rss(pid='self'):
+    """
+    Returns the resident memory of the current process (or of the process pid) in bytes, None \
+    if unknown.
+    """
+    try:
+        with open('/proc/%s/statm' % pid, 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None and pid == 'self':
+        # Peak instead of current memory (kilobytes on Linux, bytes on macOS).
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == 'darwin' else rss * 1024
+    return None
+
+
+def children_rss():
+    """
+    Returns the resident memory in bytes of the live child processes started by multiprocessing \
+    (e.g. the process pool of a parser).
+    """
+    return sum(current_rss(child.pid) or 0 for child in multiprocessing.active_children())
+
+
+def children_cpu():
+    """
+    Returns the CPU seconds used by the child processes which ended.
+    """
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+class ResourceMonitor:
+    """
+    Measures the peak resident memory, the CPU time and the duration of a block of code, \
+    including the child processes it starts (e.g. the process pool of UniProtParser).
+
+    The memory is sampled by a thread, so that the peak of a parser is known even when the \
+    worker process already reached a higher peak for a previous parser.
+
+    Usage::
+
+        with ResourceMonitor() as monitor:
+            stats = parser.build_stats()
+        profile = monitor.profile()
+    """
+
+    def __init__(self, interval=0.2, collect=True) -> None:
+        """
+        :param float interval: seconds between two memory samples.
+        :param bool collect: run the garbage collector before the first sample.
+        """
+        self.interval = interval
+        self.collect = collect
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        rss = current_rss()
+        if rss is not None:
+            rss += children_rss()
+        if rss is not None and rss > self.peak_rss:
+            self.peak_rss = rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        # Drop the garbage left by the previous job of the worker before the first sample.
+        if self.collect:
+            gc.collect()
+        self._start = time.time()
+        self._start_cpu = time.process_time() + children_cpu()
+        self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        self.wall_seconds = time.time() - self._start
+        self.cpu_seconds = time.process_time() + children_cpu() - self._start_cpu
+        return False
+
+    def profile(self):
+        """
+        Returns the measures as a dict: peak_rss (bytes), cpu_seconds, wall_seconds and cpu \
+        (average number of busy cores).
+        """
+        return {'peak_rss': self.peak_rss,
+                'cpu_seconds': round(self.cpu_seconds, 3),
+                'wall_seconds': round(self.wall_seconds, 3),
+                'cpu': round(self.cpu_seconds / self.wall_seconds, 3) if self.wall_seconds > 0 else 0.0,
+                'measured_on': time.strftime('%Y-%m-%d %H:%M:%S')}
+
+
+def load(directory):
+    """
+    Reads the profiles of the parsers measured by previous runs.
+
+    :param str directory: output directory of the graph files.
+    :return: Dictionary of profiles by database name.
+    """
+    filepath = os.path.join(directory, PROFILES_FILE)
+    try:
+        with open(filepath, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as err:
+        logger.warn("Could not read the parser profiles %s: %s" % (filepath, err))
+        return {}
+
+
+def save(directory, measured):
+    """
+    Adds the profiles measured by a run to the ones of the previous runs.
+
+    :param str directory: output directory of the graph files.
+    :param dict measured: profiles by database name.
+    """
+    profiles = load(directory)
+    profiles.update(measured)
+    filepath = os.path.join(directory, PROFILES_FILE)
+    tmp_path = "%s.%s.tmp" % (filepath, os.getpid())
+    with open(tmp_path, 'w') as f:
+        json.dump(profiles, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, filepath)
+
+
+def memory_budget(config, budget=None):
+    """
+    Returns the memory in bytes the parsers running at the same time may use.
+
+    :param dict config: database section of builder/config.yml.
+    :param float budget: budget in GB given on the command line, overrides the config.
+    """
+    if budget is not None:
+        return int(budget * 1024 ** 3)
+    if config.get('memory_budget'):
+        return int(config['memory_budget'] * 1024 ** 3)
+    total = total_memory()
+    if total is None:
+        return None
+    return int(total * config.get('memory_budget_fraction', 0.8))
+
+
+def expected_memory(profile, config):
+    """
+    Returns the memory in bytes a parser is expected to need.
+
+    :param dict profile: profile measured by a previous run, None if there is none.
+    :param dict config: database section of builder/config.yml.
+    """
+    if not profile or not profile.get('peak_rss'):
+        return int(config.get('default_peak_rss', 4) * 1024 ** 3)
+    return int(profile['peak_rss'] * config.get('memory_margin', 1.2))
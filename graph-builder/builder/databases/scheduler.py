@@ -0,0 +1,319 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import wait, FIRST_COMPLETED
+from builder.databases.parsers import readiness
+
+
+logger = logging.getLogger('root')
+
+
+class DependencyError(Exception):
+    pass
+
+
+class CyclicDependencies(DependencyError):
+    pass
+
+
+def estimate_cost(directory, profile=None, bytes_per_second=20 * 1024 ** 2):
+    """
+    Returns the expected duration in seconds of the parsing of a database: the one measured by \
+    a previous run, or else an estimate from the size of its files.
+
+    :param str directory: folder of the downloaded database files.
+    :param dict profile: profile measured by a previous run (see builder.databases.profiles).
+    :param int bytes_per_second: parsing speed assumed for the estimate.
+    """
+    if profile and profile.get('wall_seconds'):
+        return profile['wall_seconds']
+    size = 0
+    for root, _, files in os.walk(directory):
+        for f in files:
+            try:
+                size += os.path.getsize(os.path.join(root, f))
+            except OSError:
+                pass
+    return max(size / bytes_per_second, 1)
+
+
+class DagScheduler:
+    """
+    Runs parsers in a process pool in the order of their mapping dependencies.
+
+    A parser is submitted once the complete_mapping.tsv files it reads are ready: the ones \
+    built by parsers of the same run once these parsers rename them (usually before they \
+    finish), at most poll_interval seconds later as the mappings are polled, the others \
+    (ontologies, databases parsed by earlier runs) when they exist. \
+    Waiting parsers never hold a worker. Among the parsers which can start, the one with the \
+    longest chain of dependent work (its critical path) starts first.
+
+    With a memory budget, a parser only starts if the expected memory of the running parsers \
+    and its own fit in the budget, so n_jobs is an upper bound: a few large parsers run \
+    alone while many small ones share the machine. A parser larger than the budget runs \
+    when nothing else does. While the parser of highest priority which can start does not \
+    fit, no parser of lower priority starts, so that a large parser is not starved by small ones.
+
+    Jobs which are not parsers (e.g. importing graph files) wait for other jobs to finish \
+    (after) instead of a mapping, and jobs sharing a resource (e.g. the graph database) are \
+    limited by resource_limits.
+
+    Usage::
+
+        scheduler = DagScheduler(run, n_jobs=16, database_directory=db_dir, memory_budget=64 * 1024 ** 3)
+        scheduler.add("UniProt", [], cost=10, memory=40 * 1024 ** 3)
+        scheduler.add("Pfam", ["UniProt"], cost=1, memory=2 * 1024 ** 3)
+        results = scheduler.run()
+    """
+
+    def __init__(self, function, n_jobs=4, database_directory=None, memory_budget=None,
+                 poll_interval=0.5, resource_limits=None, executor=None) -> None:
+        """
+        :param function: picklable function called with the name of a job in a worker process.
+        :param int n_jobs: number of worker processes.
+        :param str database_directory: folder which contains the database/ontology folders.
+        :param int memory_budget: bytes the running jobs may use together, no limit if None.
+        :param float poll_interval: seconds between two checks of the mappings being built.
+        :param dict resource_limits: number of jobs which may use a resource at the same time, \
+                                    by resource name (e.g. {'neo4j': 1}).
+        :param executor: concurrent.futures executor running the jobs, a reusable loky process \
+                        pool of n_jobs workers if None.
+        """
+        self.function = function
+        self.n_jobs = n_jobs
+        self.database_directory = database_directory
+        self.memory_budget = memory_budget
+        self.poll_interval = poll_interval
+        self.resource_limits = resource_limits or {}
+        self.executor = executor
+        self.dependencies = {}
+        self.after = {}
+        self.costs = {}
+        self.memory = {}
+        self.resources = {}
+        self.held = set()
+        self.rejected = {}
+        self.results = {}
+        self.errors = {}
+        self.durations = {}
+        self.timeline = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, dependencies, cost=1, memory=0, held=False, after=(), resource=None):
+        """
+        Adds a job.
+
+        :param str name: database name, also the folder of the mapping it builds.
+        :param list dependencies: databases/ontologies whose mapping the job reads.
+        :param cost: expected duration (any unit, the same for all jobs).
+        :param int memory: expected peak memory in bytes.
+        :param bool held: the job waits for release(name) (e.g. until its files are downloaded).
+        :param list after: jobs of the run which must have finished before the job starts.
+        :param str resource: resource used by the job, see resource_limits.
+        """
+        self.dependencies[name] = [d for d in dependencies if d != name]
+        self.after[name] = [a for a in after if a != name]
+        self.costs[name] = cost
+        self.memory[name] = memory
+        self.resources[name] = resource
+        if held:
+            self.held.add(name)
+
+    def release(self, name):
+        """
+        Lets a held job start once its dependencies are ready. Can be called from another thread.
+        """
+        with self._lock:
+            self.held.discard(name)
+
+    def reject(self, name, error):
+        """
+        Fails a held job without running it (e.g. if its files cannot be downloaded), so that \
+        the jobs depending on it are not run either. Can be called from another thread.
+        """
+        with self._lock:
+            self.held.discard(name)
+            self.rejected[name] = error
+
+    def priorities(self):
+        """
+        Returns the length of the critical path starting at each job: its cost plus the \
+        largest priority of the jobs which depend on it.
+        """
+        dependents = {name: [] for name in self.dependencies}
+        for name, dependencies in self.dependencies.items():
+            for dependency in dependencies + self.after.get(name, []):
+                if dependency in dependents:
+                    dependents[dependency].append(name)
+
+        priorities = {}
+        visiting = set()
+
+        def visit(name):
+            if name in priorities:
+                return priorities[name]
+            if name in visiting:
+                raise CyclicDependencies("Cyclic mapping dependencies around {}.".format(name))
+            visiting.add(name)
+            priorities[name] = self.costs[name] + max(
+                [visit(dependent) for dependent in dependents[name]], default=0)
+            visiting.discard(name)
+            return priorities[name]
+
+        for name in self.dependencies:
+            visit(name)
+        return priorities
+
+    def _dependency_state(self, dependency, started, finished, failed):
+        """
+        Returns 'ready', 'waiting' or 'failed' for a database/ontology whose mapping is needed.
+        """
+        if dependency in failed:
+            return 'failed'
+        directory = os.path.join(self.database_directory, dependency)
+        state = readiness.status(directory)
+        if dependency in self.dependencies:
+            if dependency in finished:
+                return 'ready' if state == 'complete' else 'failed'
+            if dependency not in started or state != 'complete':
+                return 'waiting'
+            # A mapping left by an earlier run is older than the job which rebuilds it.
+            mapping_file = os.path.join(directory, "complete_mapping.tsv")
+            try:
+                fresh = os.stat(mapping_file).st_mtime >= started[dependency]
+            except OSError:
+                fresh = False
+            return 'ready' if fresh else 'waiting'
+        if state == 'complete':
+            return 'ready'
+        if state == 'building':
+            return 'waiting'
+        return 'failed'
+
+    def _resource_available(self, name, running):
+        """
+        Returns True if a job fits in the resource limits next to the running jobs.
+        """
+        resource = self.resources.get(name)
+        return resource not in self.resource_limits or \
+            sum(self.resources.get(other) == resource for other in running) < self.resource_limits[resource]
+
+    def _fits(self, name, running):
+        """
+        Returns True if a job fits in the memory budget next to the running jobs.
+        """
+        if self.memory_budget is None or not running:
+            return True
+        used = sum(self.memory[other] for other in running)
+        return used + self.memory[name] <= self.memory_budget
+
+    def run(self):
+        """
+        Runs all jobs and returns their results by name (also in self.results, with the \
+        results of the jobs which finished when an error is raised, the errors of the \
+        others in self.errors and the seconds each job ran in self.durations).
+
+        A job whose dependency failed, or is neither built by this run nor already on disk, \
+        is not started. The other jobs go on, then the first error is raised.
+        """
+        priorities = self.priorities()
+        pending = set(self.dependencies)
+        started = {}
+        finished = set()
+        failed = self.errors
+        results = self.results
+        running = {}
+        executor = self.executor
+        if executor is None:
+            from joblib.externals.loky import get_reusable_executor
+            executor = get_reusable_executor(max_workers=self.n_jobs)
+
+        while pending or running:
+            with self._lock:
+                held = set(self.held)
+                rejected = dict(self.rejected)
+                self.rejected.clear()
+            for name, err in rejected.items():
+                if name in pending:
+                    pending.discard(name)
+                    failed[name] = err
+                    logger.error("Parsing %s is not run: %s" % (name, err))
+            blocked = []
+            ready = []
+            for name in pending:
+                states = [self._dependency_state(d, started, finished, failed)
+                          for d in self.dependencies[name]]
+                after = self.after.get(name, [])
+                if 'failed' in states:
+                    blocked.append((name, [d for d, s in zip(self.dependencies[name], states)
+                                           if s == 'failed']))
+                elif any(a in failed for a in after):
+                    blocked.append((name, [a for a in after if a in failed]))
+                elif name not in held and all(s == 'ready' for s in states) and \
+                        all(a in finished for a in after if a in self.dependencies):
+                    ready.append(name)
+            for name, dependencies in blocked:
+                pending.discard(name)
+                failed[name] = DependencyError("{} is not run, {} failed or is not available (build it first).".format(
+                    name, ", ".join(dependencies)))
+                logger.error(str(failed[name]))
+            ready.sort(key=lambda name: (-priorities[name], name))
+            for name in ready:
+                if len(running) >= self.n_jobs:
+                    break
+                if not self._resource_available(name, running.values()):
+                    continue
+                if not self._fits(name, running.values()):
+                    # Smaller jobs of lower priority would keep using the memory it waits for:
+                    # start nothing else until it fits.
+                    break
+                pending.discard(name)
+                started[name] = time.time()
+                running[executor.submit(self.function, name)] = name
+                logger.info("Start parsing %s (critical path %s, expected memory %.1f GB)" % (
+                    name, priorities[name], self.memory[name] / 1024 ** 3))
+
+            if not running:
+                if pending:
+                    time.sleep(self.poll_interval)
+                continue
+            done, _ = wait(list(running), timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                self.durations[name] = time.time() - started[name]
+                self.timeline[name] = (started[name], started[name] + self.durations[name])
+                err = future.exception()
+                if err is None:
+                    results[name] = future.result()
+                    finished.add(name)
+                    logger.info("Done parsing %s in %.1f seconds" % (name, self.durations[name]))
+                else:
+                    failed[name] = err
+                    logger.error("Parsing %s failed: %s" % (name, err))
+
+        if failed:
+            raise next(iter(failed.values()))
+        return results
+
+    def critical_path(self):
+        """
+        Returns the chain of jobs which set the end of the run: the job which finished last, \
+        the dependency it waited for last, and so on.
+
+        :return: List of (name, start, end) tuples from the first job of the chain, with the \
+                times in seconds since the first job started.
+        """
+        if not self.timeline:
+            return []
+        origin = min(start for start, _ in self.timeline.values())
+        name = max(self.timeline, key=lambda job: self.timeline[job][1])
+        path = []
+        while name is not None:
+            start, end = self.timeline[name]
+            path.append((name, round(start - origin, 3), round(end - origin, 3)))
+            # A job waits for a mapping or for another job, whichever came last.
+            predecessors = [job for job in self.dependencies[name] + self.after.get(name, [])
+                            if job in self.timeline and self.timeline[job][0] <= start]
+            name = max(predecessors, key=lambda job: min(self.timeline[job][1], start), default=None)
+        return list(reversed(path))
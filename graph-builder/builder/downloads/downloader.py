@@ -0,0 +1,152 @@
+import os
+import ftplib
+import datetime
+import verboselogs
+from builder.downloads import ftp_pool
+from builder.downloads.manifest import SourceManifest, release_date
+from builder.downloads.http_downloader import HTTPDownloader, file_digest
+
+
+logger = verboselogs.VerboseLogger('root')
+
+
+def file_name_from_url(url):
+    """
+    Returns the local file name used for a remote file when none is given explicitly.
+
+    :param str url: link to the remote file.
+    :return: Last component of the url, '?' and '=' replaced by '_'.
+    """
+    return url.split('/')[-1].replace('?', '_').replace('=', '_')
+
+
+def download_from_ftp(ftp_url, user, password, to, file_name, download_config=None):
+    """
+    Downloads a file from a ftp server reusing the logged-in sessions of the process pool.
+
+    :param str ftp_url: link to the remote file.
+    :param str user: username to access ftp server if required.
+    :param str password: password to access ftp server if required.
+    :param str to: folder where the file is saved.
+    :param str file_name: name of the saved file.
+    :param dict download_config: 'download' section of builder/config.yml.
+    """
+    try:
+        pool = ftp_pool.get_pool(download_config)
+        pool.retrieve(ftp_url, os.path.join(to, file_name), user=user, password=password)
+    except ftplib.error_reply as err:
+        raise ftplib.error_reply(
+            "Exception raised when an unexpected reply is received from the server. {}.\nURL:{}".format(err, ftp_url))
+    except ftplib.error_temp as err:
+        raise ftplib.error_temp(
+            "Exception raised when an error code signifying a temporary error. {}.\nURL:{}".format(err, ftp_url))
+    except ftplib.error_perm as err:
+        raise ftplib.error_perm(
+            "Exception raised when an error code signifying a permanent error. {}.\nURL:{}".format(err, ftp_url))
+    except ftplib.error_proto as err:
+        raise ftplib.error_proto(
+            "Exception raised when a reply is received from the server that does not fit the response specifications of the File Transfer Protocol. {}.\nURL:{}".format(err, ftp_url))
+
+
+def download_file(database_url, directory, file_name=None, user="", password="",
+                  skip=True, download_config=None, checksum=None):
+    """
+    Downloads a raw file from a biomedical database server (HTTP(S) or FTP).
+
+    :param str database_url: link to access biomedical database server.
+    :param str directory: folder where the file is saved.
+    :param file_name: name of the file to dowload. If None, 'database_url' must contain \
+                        filename after the last '/'.
+    :type file_name: str or None
+    :param str user: username to access biomedical database server if required.
+    :param str password: password to access biomedical database server if required.
+    :param bool skip: don't download the file if it already exists. Otherwise the file is \
+                        downloaded again only if it changed upstream since the version recorded \
+                        in the manifest of the directory.
+    :param dict download_config: 'download' section of builder/config.yml.
+    :param str checksum: expected digest of the file as "<algorithm>:<hexdigest>".
+    :return: Path to the file.
+    """
+    if file_name is None:
+        file_name = file_name_from_url(database_url)
+
+    filepath = os.path.join(directory, file_name)
+    manifest = SourceManifest(directory)
+    logger.info("Download file from %s into %s" % (database_url, filepath))
+    is_ftp = database_url.startswith('ftp:')
+    info = None
+    if os.path.exists(filepath) and skip:
+        logger.info("%s exists, don't need to download it." % filepath)
+        return filepath
+    try:
+        entry = None
+        if os.path.exists(filepath):
+            entry = manifest.is_current(file_name, database_url, file_digest)
+        if entry is not None:
+            if is_ftp:
+                modified = _is_modified_ftp(database_url, entry, user, password, download_config)
+            else:
+                http = HTTPDownloader.from_config(download_config)
+                modified, info = http.is_modified(database_url, etag=entry.get('etag'),
+                                                  last_modified=entry.get('last_modified'),
+                                                  size=entry.get('size'))
+            if not modified:
+                logger.info("%s has not changed upstream (released on %s), don't need to download it." %
+                            (database_url, entry.get('released_on')))
+                return filepath
+        if is_ftp:
+            _, mdtm = ftp_pool.get_pool(download_config).remote_info(
+                database_url, user=user, password=password)
+            download_from_ftp(database_url, user, password, directory,
+                              file_name, download_config=download_config)
+            entry = {'mdtm': mdtm}
+        else:
+            http = HTTPDownloader.from_config(download_config)
+            if info is None:
+                info = http.probe(database_url)
+            http.download(database_url, filepath, checksum=checksum, info=info)
+            entry = {'etag': info.etag, 'last_modified': info.last_modified}
+    except Exception as err:
+        raise Exception(
+            "Something went wrong. {}.\nURL:{}".format(err, database_url))
+
+    stat = os.stat(filepath)
+    entry.update({'url': database_url,
+                  'size': stat.st_size,
+                  'mtime': stat.st_mtime,
+                  'sha256': file_digest(filepath),
+                  'downloaded_on': str(datetime.date.today())})
+    entry['released_on'] = release_date(entry.get('last_modified'), entry.get('mdtm')) or \
+        entry['downloaded_on']
+    manifest.update(file_name, entry)
+
+    return filepath
+
+
+def _is_modified_ftp(ftp_url, entry, user, password, download_config):
+    size, mdtm = ftp_pool.get_pool(download_config).remote_info(
+        ftp_url, user=user, password=password)
+    if mdtm is None and entry.get('mdtm') is None:
+        # Without MDTM we cannot tell, so the file is downloaded again.
+        return True
+    return mdtm != entry.get('mdtm') or (size is not None and size != entry.get('size'))
+
+
+def list_ftp_directory(ftp_url, user='', password='', download_config=None):
+    """
+    Lists all files present in folder from FTP server.
+
+    :param str ftp_url: link to access ftp server.
+    :param str user: username to access ftp server if required.
+    :param str password: password to access ftp server if required.
+    :param dict download_config: 'download' section of builder/config.yml.
+    :return: List of files contained in ftp server folder provided with ftp_url.
+    """
+    try:
+        files = ftp_pool.get_pool(download_config).nlst(
+            ftp_url, user=user, password=password)
+    except ftplib.error_perm as err:
+        raise Exception(
+            "builder_utils - Problem listing file at {} ftp directory > {}.".format(ftp_url, err))
+
+    return files
@@ -0,0 +1,63 @@
+import logging
+import coloredlogs
+import verboselogs
+import click
+from builder.databases.parsers import parsers
+
+
+verboselogs.install()
+coloredlogs.install(fmt='%(asctime)s - %(module)s:%(lineno)d - %(levelname)s - %(message)s')
+logger = logging.getLogger('root')
+
+
+@click.group()
+def downloads():
+    pass
+
+
+@downloads.command(help="Download the source files of databases and ontologies.")
+@click.option('--db-dir', '-d', required=True,
+              type=click.Path(exists=True, dir_okay=True),
+              help="The directory which saved the downloaded database files.")
+@click.option('--ontology-dir', required=False,
+              type=click.Path(exists=True, dir_okay=True),
+              help="The directory which saved the downloaded ontology files (default: --db-dir).")
+@click.option('--database', required=False, type=click.Choice(parsers.keys()),
+              help="Which databases (you can specify the --database argument multiple times, default: all)?", multiple=True)
+@click.option('--ontology/--no-ontology', default=True, help="Whether download the ontology file(s)?")
+@click.option('--n-jobs', '-n', required=False,
+              help="How many files are downloaded at the same time?", default=4)
+@click.option('--skip/--no-skip', default=True, help="Whether skip the existing file(s)?")
+def fetch(db_dir, ontology_dir, database, ontology, n_jobs, skip):
+    from builder.downloads import prefetch
+    databases = list(database) if database else list(parsers.keys())
+    logger.info("Fetch files with (db_dir: %s, ontology_dir: %s, databases: %s, ontology: %s, skip: %s)" %
+                (db_dir, ontology_dir, databases, ontology, skip))
+    prefetcher = prefetch.Prefetcher(n_jobs=n_jobs, skip=skip)
+    try:
+        for db in databases:
+            prefetcher.add(db, prefetch.get_database_targets(db, db_dir))
+        if ontology:
+            targets = prefetch.get_ontology_targets(ontology_dir or db_dir)
+            for name in targets:
+                prefetcher.add(name, targets[name])
+
+        failed = {}
+        for name, failed_urls in prefetcher.ready():
+            if failed_urls:
+                failed[name] = failed_urls
+    finally:
+        prefetcher.shutdown()
+
+    if failed:
+        logger.error("Cannot download all files of %s databases/ontologies: %s" %
+                     (len(failed), failed))
+    else:
+        logger.info("Done fetching %s databases/ontologies." %
+                    len(prefetcher.groups))
+    return failed
+
+
+if __name__ == "__main__":
+    main = click.CommandCollection(sources=[downloads])
+    main()
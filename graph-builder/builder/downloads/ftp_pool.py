@@ -0,0 +1,264 @@
+import os
+import time
+import socket
+import ftplib
+import atexit
+import threading
+import verboselogs
+from contextlib import contextmanager
+
+
+logger = verboselogs.VerboseLogger('root')
+
+# Errors after which a connection cannot be trusted anymore and must be dropped.
+CONNECTION_ERRORS = (EOFError, OSError, socket.timeout,
+                     ftplib.error_reply, ftplib.error_proto)
+# Errors worth retrying: temporary replies (4xx) and broken connections.
+TRANSIENT_ERRORS = (ftplib.error_temp,) + CONNECTION_ERRORS
+
+
+def split_ftp_url(ftp_url):
+    """
+    Splits a ftp url into host and path.
+
+    :param str ftp_url: link to a file or folder in a ftp server (ftp://host/path).
+    :return: Tuple (host, path).
+    """
+    parts = ftp_url.split('/')
+    host = parts[2]
+    path = '/'.join(parts[3:]) if len(parts) > 3 else ''
+    return host, path
+
+
+class FTPPool:
+    """
+    Keeps logged-in FTP sessions open and reuses them across files and parsers.
+
+    Sessions are keyed by (host, user, password). A session is borrowed for one command \
+    (RETR, NLST...) and returned to the pool afterwards, so that several threads can share \
+    the pool. Temporary errors are retried with exponential backoff and interrupted \
+    transfers are resumed with REST.
+    """
+
+    def __init__(self, max_idle=4, retries=5, backoff=2, timeout=60, block_size=1024*1024) -> None:
+        self.max_idle = max_idle
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.block_size = block_size
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Builds a pool from the 'download' section of builder/config.yml.
+
+        :param dict config: download settings (ftp_max_idle, retries, backoff, timeout, chunk_size).
+        """
+        config = config or {}
+        kwargs = {}
+        for key, arg in [('ftp_max_idle', 'max_idle'), ('retries', 'retries'), ('backoff', 'backoff'),
+                         ('timeout', 'timeout'), ('chunk_size', 'block_size')]:
+            if key in config:
+                kwargs[arg] = config[key]
+        return cls(**kwargs)
+
+    def _connect(self, host, user, password):
+        logger.debug("Open FTP connection to %s" % host)
+        address, _, port = host.partition(':')
+        ftp = ftplib.FTP(timeout=self.timeout)
+        ftp.connect(address, int(port) if port else 21)
+        ftp.login(user=user, passwd=password)
+        return ftp
+
+    def _is_alive(self, ftp):
+        try:
+            ftp.voidcmd('NOOP')
+            return True
+        except Exception:
+            self._close(ftp)
+            return False
+
+    def _close(self, ftp):
+        try:
+            ftp.quit()
+        except Exception:
+            ftp.close()
+
+    @contextmanager
+    def session(self, host, user='', password=''):
+        """
+        Borrows a logged-in session to host, opening a new one if no idle session is alive.
+
+        :param str host: ftp server.
+        :param str user: username to access ftp server if required.
+        :param str password: password to access ftp server if required.
+        """
+        key = (host, user, password)
+        ftp = None
+        while ftp is None:
+            with self._lock:
+                idle = self._idle.get(key, [])
+                candidate = idle.pop() if idle else None
+            if candidate is None:
+                ftp = self._connect(host, user, password)
+            elif self._is_alive(candidate):
+                ftp = candidate
+
+        try:
+            yield ftp
+        except CONNECTION_ERRORS:
+            self._close(ftp)
+            raise
+        except BaseException:
+            # Permanent errors leave the session usable, anything else may have
+            # interrupted a transfer half way.
+            if not self._is_alive(ftp):
+                raise
+            self._release(key, ftp)
+            raise
+        else:
+            self._release(key, ftp)
+
+    def _release(self, key, ftp):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(ftp)
+                return
+        self._close(ftp)
+
+    def _retry(self, ftp_url, attempt, err):
+        if attempt >= self.retries:
+            raise ftplib.error_temp(
+                "Failed to access {} after {} attempts. {}".format(ftp_url, attempt + 1, err))
+        wait = self.backoff ** attempt
+        logger.warn("FTP transfer of %s interrupted (%s), retry in %s seconds." %
+                    (ftp_url, err, wait))
+        time.sleep(wait)
+
+    def retrieve(self, ftp_url, filepath, user='', password=''):
+        """
+        Downloads a file from a ftp server into filepath.
+
+        The file is written into <filepath>.part and the transfer is restarted from the \
+        size of this partial file (REST) after an interruption, also across runs.
+
+        :param str ftp_url: link to the remote file.
+        :param str filepath: path where the file is saved (including file name).
+        :param str user: username to access ftp server if required.
+        :param str password: password to access ftp server if required.
+        :return: Path to the downloaded file.
+        """
+        host, path = split_ftp_url(ftp_url)
+        part_file = filepath + '.part'
+        for attempt in range(self.retries + 1):
+            offset = os.path.getsize(part_file) if os.path.exists(part_file) else 0
+            try:
+                with self.session(host, user, password) as ftp:
+                    ftp.voidcmd('TYPE I')
+                    size = self._remote_size(ftp, path)
+                    if size is not None and offset > size:
+                        offset = 0
+                    if size is None or offset < size:
+                        self._retrbinary(ftp, path, part_file, offset)
+                    if size is not None and os.path.getsize(part_file) < size:
+                        raise EOFError("Transfer of {} is incomplete.".format(ftp_url))
+                os.replace(part_file, filepath)
+                return filepath
+            except TRANSIENT_ERRORS as err:
+                self._retry(ftp_url, attempt, err)
+            except ftplib.error_perm:
+                if os.path.exists(part_file) and os.path.getsize(part_file) == 0:
+                    os.remove(part_file)
+                raise
+
+    def _remote_size(self, ftp, path):
+        try:
+            return ftp.size(path)
+        except ftplib.error_perm:
+            return None
+
+    def _retrbinary(self, ftp, path, part_file, offset):
+        mode = 'ab' if offset > 0 else 'wb'
+        try:
+            with open(part_file, mode) as fp:
+                ftp.retrbinary("RETR " + path, fp.write, blocksize=self.block_size,
+                               rest=offset if offset > 0 else None)
+        except ftplib.error_perm as err:
+            # 500/501/502/504 are replies to REST, the file itself (550) is fine.
+            if offset == 0 or str(err)[:3] not in ('500', '501', '502', '504'):
+                raise
+            logger.warn(
+                "FTP server does not resume transfers, restart %s from the beginning." % path)
+            with open(part_file, 'wb') as fp:
+                ftp.retrbinary("RETR " + path, fp.write, blocksize=self.block_size)
+
+    def remote_info(self, ftp_url, user='', password=''):
+        """
+        Returns the size (SIZE) and the modification time (MDTM) of a remote file.
+
+        :param str ftp_url: link to the remote file.
+        :param str user: username to access ftp server if required.
+        :param str password: password to access ftp server if required.
+        :return: Tuple (size, mdtm), each of them None if the server does not support the command.
+        """
+        host, path = split_ftp_url(ftp_url)
+        for attempt in range(self.retries + 1):
+            try:
+                with self.session(host, user, password) as ftp:
+                    ftp.voidcmd('TYPE I')
+                    size = self._remote_size(ftp, path)
+                    try:
+                        mdtm = ftp.sendcmd('MDTM ' + path).split()[-1]
+                    except ftplib.error_perm:
+                        mdtm = None
+                    return size, mdtm
+            except TRANSIENT_ERRORS as err:
+                self._retry(ftp_url, attempt, err)
+
+    def nlst(self, ftp_url, user='', password=''):
+        """
+        Lists the files present in a ftp folder.
+
+        :param str ftp_url: link to the ftp folder.
+        :param str user: username to access ftp server if required.
+        :param str password: password to access ftp server if required.
+        :return: List of files contained in the folder.
+        """
+        host, path = split_ftp_url(ftp_url)
+        for attempt in range(self.retries + 1):
+            try:
+                with self.session(host, user, password) as ftp:
+                    return ftp.nlst(path)
+            except TRANSIENT_ERRORS as err:
+                self._retry(ftp_url, attempt, err)
+
+    def close_all(self):
+        """
+        Logs out of every idle session.
+        """
+        with self._lock:
+            idle = [ftp for sessions in self._idle.values() for ftp in sessions]
+            self._idle = {}
+        for ftp in idle:
+            self._close(ftp)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(config=None):
+    """
+    Returns the FTP pool of the current process, created on first use.
+
+    :param dict config: 'download' section of builder/config.yml, only used to create the pool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = FTPPool.from_config(config)
+            atexit.register(_pool.close_all)
+    return _pool
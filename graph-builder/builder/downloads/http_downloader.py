@@ -0,0 +1,383 @@
+import os
+import json
+import glob
+import time
+import hashlib
+import requests
+import verboselogs
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+
+logger = verboselogs.VerboseLogger('root')
+
+DEFAULT_HEADERS = {
+    'user-agent': 'Mozilla/5.0 (Windows NT 10.0; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/51.0.2704.103 Safari/537.36',
+    # We want the bytes as they are stored on the server, otherwise the Content-Length
+    # and the Range offsets do not match what we write to disk.
+    'accept-encoding': 'identity'
+}
+
+RemoteInfo = namedtuple(
+    'RemoteInfo', ['size', 'accept_ranges', 'etag', 'last_modified'])
+
+
+class DownloadError(Exception):
+    pass
+
+
+class ChecksumMismatch(DownloadError):
+    pass
+
+
+class RangeNotSupported(DownloadError):
+    pass
+
+
+class HTTPDownloader:
+    """
+    Streams files from a HTTP(S) server to disk.
+
+    The file is written in chunks into a partial file (<file_name>.part) which is renamed \
+    once the download is complete and verified. An interrupted or truncated download is \
+    resumed with a HTTP Range request, and large files are split into several range segments \
+    that are fetched in parallel when the server supports it, each written at its offset of \
+    the partial file (so the download needs no more disk than the file).
+    """
+
+    def __init__(self, chunk_size=1024*1024, segments=4, segment_threshold=64*1024*1024,
+                 retries=5, backoff=2, timeout=60, headers=None) -> None:
+        self.chunk_size = chunk_size
+        self.segments = segments
+        self.segment_threshold = segment_threshold
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.headers = dict(DEFAULT_HEADERS)
+        if headers:
+            self.headers.update(headers)
+
+    @classmethod
+    def from_config(cls, config, headers=None):
+        """
+        Builds a downloader from the 'download' section of builder/config.yml.
+
+        :param dict config: download settings (chunk_size, segments, segment_threshold, retries, backoff, timeout).
+        :param dict headers: extra headers sent with every request.
+        """
+        config = config or {}
+        keys = ['chunk_size', 'segments', 'segment_threshold',
+                'retries', 'backoff', 'timeout']
+        kwargs = {key: config[key] for key in keys if key in config}
+        return cls(headers=headers, **kwargs)
+
+    def probe(self, url, headers=None):
+        """
+        Asks the server for the size of a file and whether it accepts range requests.
+
+        :param str url: link to the remote file.
+        :param dict headers: extra headers sent with the request (e.g. conditional headers).
+        :return: RemoteInfo namedtuple (size, accept_ranges, etag, last_modified), \
+                or None if the server answered 304 Not Modified.
+        """
+        request_headers = dict(self.headers)
+        if headers:
+            request_headers.update(headers)
+        try:
+            r = requests.head(url, headers=request_headers,
+                              allow_redirects=True, timeout=self.timeout)
+            if r.status_code >= 400:
+                # Some servers do not implement HEAD, ask for the body and drop it.
+                r = requests.get(url, headers=request_headers, stream=True,
+                                 allow_redirects=True, timeout=self.timeout)
+                r.close()
+            if r.status_code == 304:
+                return None
+            r.raise_for_status()
+        except requests.exceptions.RequestException as err:
+            logger.warn("Cannot probe %s: %s" % (url, err))
+            return RemoteInfo(None, False, None, None)
+
+        size = r.headers.get('content-length')
+        size = int(size) if size is not None and size.isdigit() else None
+        accept_ranges = r.headers.get('accept-ranges', '').lower() == 'bytes'
+        return RemoteInfo(size, accept_ranges, r.headers.get('etag'), r.headers.get('last-modified'))
+
+    def is_modified(self, url, etag=None, last_modified=None, size=None):
+        """
+        Checks whether a remote file changed since it was downloaded, with a conditional request \
+        (If-None-Match / If-Modified-Since) and by comparing the validators the server returns.
+
+        :param str url: link to the remote file.
+        :param str etag: ETag of the downloaded version.
+        :param str last_modified: Last-Modified of the downloaded version.
+        :param int size: size in bytes of the downloaded version.
+        :return: Tuple (modified, info). info is the RemoteInfo of the remote file or None if not modified.
+        """
+        headers = {}
+        if etag:
+            headers['if-none-match'] = etag
+        if last_modified:
+            headers['if-modified-since'] = last_modified
+        info = self.probe(url, headers=headers)
+        if info is None:
+            return False, None
+        if etag and info.etag:
+            modified = etag != info.etag
+        elif last_modified and info.last_modified:
+            modified = last_modified != info.last_modified
+        else:
+            # Without validators we cannot tell, so the file is downloaded again.
+            return True, info
+        if not modified and size is not None and info.size is not None:
+            modified = size != info.size
+        return modified, info
+
+    def download(self, url, filepath, expected_size=None, checksum=None, info=None):
+        """
+        Downloads a file, resuming any partial download left by a previous run.
+
+        :param str url: link to the remote file.
+        :param str filepath: path where the file is saved (including file name).
+        :param int expected_size: size in bytes of the file, if None the Content-Length is used.
+        :param str checksum: expected digest as "<algorithm>:<hexdigest>" (e.g. "md5:d41d8c...") \
+                            or a bare sha256 hexdigest.
+        :param RemoteInfo info: result of a previous probe of url, probed again if None.
+        :return: Path to the downloaded file.
+        """
+        if info is None:
+            info = self.probe(url)
+        size = expected_size if expected_size is not None else info.size
+        self._check_partial_state(url, filepath, info)
+
+        # A partial file without segments is the one of a single stream, resumed as such.
+        use_segments = size is not None and info.accept_ranges and \
+            self.segments > 1 and size >= self.segment_threshold and \
+            (not os.path.exists(filepath + '.part') or self._has_segments(filepath))
+        if use_segments:
+            try:
+                self._download_segmented(url, filepath, size)
+            except RangeNotSupported:
+                logger.warn(
+                    "%s ignores range requests, fall back to a single stream." % url)
+                self._remove_partial_files(filepath)
+                self._save_partial_state(url, filepath, info)
+                self._download_single(url, filepath, size)
+        else:
+            self._download_single(url, filepath, size)
+
+        try:
+            self.verify(filepath + '.part', expected_size=size, checksum=checksum)
+        except ChecksumMismatch:
+            # A corrupted partial file must not be resumed by the next run.
+            self._remove_partial_files(filepath)
+            raise
+        except DownloadError:
+            # A truncated partial file is resumed by the next run, a larger one cannot be.
+            if os.path.getsize(filepath + '.part') > size:
+                self._remove_partial_files(filepath)
+            raise
+        os.replace(filepath + '.part', filepath)
+        self._remove_partial_files(filepath)
+        return filepath
+
+    def verify(self, filepath, expected_size=None, checksum=None):
+        """
+        Checks the size and the checksum of a downloaded file.
+
+        :param str filepath: path to file.
+        :param int expected_size: size in bytes, skipped if None.
+        :param str checksum: "<algorithm>:<hexdigest>" or a bare sha256 hexdigest, skipped if None.
+        """
+        if expected_size is not None:
+            size = os.path.getsize(filepath)
+            if size != expected_size:
+                raise DownloadError(
+                    "Size of {} is {} bytes, expected {} bytes.".format(filepath, size, expected_size))
+        if checksum:
+            algorithm, _, digest = checksum.rpartition(':')
+            algorithm = algorithm or 'sha256'
+            computed = file_digest(filepath, algorithm, self.chunk_size)
+            if computed.lower() != digest.lower():
+                raise ChecksumMismatch(
+                    "{} checksum of {} is {}, expected {}.".format(algorithm, filepath, computed, digest))
+
+    def _download_single(self, url, filepath, size=None):
+        part_file = filepath + '.part'
+        for attempt in range(self.retries + 1):
+            offset = os.path.getsize(part_file) if os.path.exists(part_file) else 0
+            if size is not None and offset == size:
+                return
+            headers = dict(self.headers)
+            if offset > 0:
+                headers['range'] = 'bytes=%s-' % offset
+            try:
+                with requests.get(url, headers=headers, stream=True,
+                                  allow_redirects=True, timeout=self.timeout) as r:
+                    if r.status_code == 416 and offset > 0:
+                        # The partial file is already complete.
+                        return
+                    r.raise_for_status()
+                    mode = 'ab' if offset > 0 and r.status_code == 206 else 'wb'
+                    if offset > 0 and mode == 'wb':
+                        logger.warn(
+                            "%s does not resume downloads, restart from the beginning." % url)
+                    with open(part_file, mode) as out:
+                        for chunk in r.iter_content(chunk_size=self.chunk_size):
+                            out.write(chunk)
+                if size is not None and os.path.getsize(part_file) < size:
+                    # The connection was closed before the end of the body.
+                    raise requests.exceptions.ChunkedEncodingError(
+                        "Download of {} is incomplete.".format(url))
+                return
+            except requests.exceptions.RequestException as err:
+                self._wait_or_raise(url, attempt, err)
+
+    def _download_segmented(self, url, filepath, size):
+        nsegments = min(self.segments, max(1, size // self.chunk_size))
+        step = size // nsegments
+        ranges = [(i, i * step, size - 1 if i == nsegments - 1 else (i + 1) * step - 1)
+                  for i in range(nsegments)]
+        logger.info("Download %s in %s segments" % (url, nsegments))
+        part_file = filepath + '.part'
+        if not os.path.exists(part_file):
+            # The segments are recorded first, so that the partial file is always resumed by segments.
+            for i, _, _ in ranges:
+                self._save_segment_progress(filepath, i, 0)
+            with open(part_file, 'wb') as out:
+                _preallocate(out, size)
+        with ThreadPoolExecutor(max_workers=nsegments) as executor:
+            futures = [executor.submit(self._download_segment, url, filepath, *r)
+                       for r in ranges]
+            for future in futures:
+                future.result()
+        for i, _, _ in ranges:
+            os.remove(self._segment_file(filepath, i))
+
+    def _download_segment(self, url, filepath, index, start, end):
+        length = end - start + 1
+        for attempt in range(self.retries + 1):
+            offset = self._segment_progress(filepath, index)
+            if offset >= length:
+                return
+            headers = dict(self.headers)
+            headers['range'] = 'bytes=%s-%s' % (start + offset, end)
+            try:
+                with requests.get(url, headers=headers, stream=True,
+                                  allow_redirects=True, timeout=self.timeout) as r:
+                    r.raise_for_status()
+                    if r.status_code != 206:
+                        raise RangeNotSupported(
+                            "Range request is not supported by {}".format(url))
+                    with open(filepath + '.part', 'r+b') as out:
+                        out.seek(start + offset)
+                        for chunk in r.iter_content(chunk_size=self.chunk_size):
+                            chunk = chunk[:length - offset]
+                            out.write(chunk)
+                            out.flush()
+                            offset += len(chunk)
+                            self._save_segment_progress(filepath, index, offset)
+                if offset >= length:
+                    return
+                raise requests.exceptions.ChunkedEncodingError(
+                    "Segment {} of {} is incomplete.".format(index, url))
+            except requests.exceptions.RequestException as err:
+                self._wait_or_raise(url, attempt, err)
+
+    def _wait_or_raise(self, url, attempt, err):
+        response = getattr(err, 'response', None)
+        if response is not None and 400 <= response.status_code < 500 and \
+                response.status_code not in (408, 429):
+            # Client errors (e.g. 404) will not go away by retrying.
+            raise DownloadError(
+                "Failed to download {}. {}".format(url, err))
+        if attempt >= self.retries:
+            raise DownloadError(
+                "Failed to download {} after {} attempts. {}".format(url, attempt + 1, err))
+        wait = self.backoff ** attempt
+        logger.warn("Download of %s interrupted (%s), retry in %s seconds." %
+                    (url, err, wait))
+        time.sleep(wait)
+
+    def _segment_file(self, filepath, index):
+        """
+        Path to the file recording how many bytes of a segment are in the partial file.
+        """
+        return '%s.part.%s' % (filepath, index)
+
+    def _has_segments(self, filepath):
+        return any(os.path.exists(self._segment_file(filepath, i)) for i in range(self.segments))
+
+    def _segment_progress(self, filepath, index):
+        try:
+            with open(self._segment_file(filepath, index), 'r') as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _save_segment_progress(self, filepath, index, offset):
+        segment_file = self._segment_file(filepath, index)
+        tmp_path = segment_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(str(offset))
+        os.replace(tmp_path, segment_file)
+
+    def _check_partial_state(self, url, filepath, info):
+        """
+        Discards the partial files of a previous run when the remote file has changed since.
+        """
+        state_file = filepath + '.part.json'
+        if os.path.exists(state_file):
+            with open(state_file, 'r') as f:
+                try:
+                    state = json.load(f)
+                except ValueError:
+                    state = {}
+            if state != self._state(url, info):
+                logger.info(
+                    "Remote file %s has changed, discard the partial download." % url)
+                self._remove_partial_files(filepath)
+        elif glob.glob(glob.escape(filepath) + '.part*'):
+            self._remove_partial_files(filepath)
+        self._save_partial_state(url, filepath, info)
+
+    def _save_partial_state(self, url, filepath, info):
+        with open(filepath + '.part.json', 'w') as f:
+            json.dump(self._state(url, info), f)
+
+    def _state(self, url, info):
+        return {'url': url, 'size': info.size,
+                'etag': info.etag, 'last_modified': info.last_modified}
+
+    def _remove_partial_files(self, filepath):
+        for partial in glob.glob(glob.escape(filepath) + '.part*'):
+            os.remove(partial)
+
+
+def _preallocate(handle, size):
+    """
+    Reserves the disk space of a file of size bytes, or at least extends it (as a sparse file) \
+    where the file system cannot reserve it.
+    """
+    try:
+        os.posix_fallocate(handle.fileno(), 0, size)
+    except (AttributeError, OSError):
+        handle.truncate(size)
+
+
+def file_digest(filepath, algorithm='sha256', chunk_size=1024*1024):
+    """
+    Computes the hexdigest of a file without loading it in memory.
+
+    :param str filepath: path to file.
+    :param str algorithm: any algorithm supported by hashlib (md5, sha1, sha256...).
+    :return: Hexadecimal digest.
+    """
+    digest = hashlib.new(algorithm)
+    with open(filepath, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
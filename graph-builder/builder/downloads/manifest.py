@@ -0,0 +1,137 @@
+import os
+import json
+import datetime
+import threading
+import verboselogs
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+logger = verboselogs.VerboseLogger('root')
+
+MANIFEST_FILE = '.manifest.json'
+
+_lock = threading.Lock()
+
+
+@contextmanager
+def _manifest_lock(path):
+    """
+    Holds an exclusive lock on '<manifest>.lock' (and the lock of this process), so that the \
+    threads and processes downloading in the same directory update the manifest one at a time.
+    """
+    with _lock:
+        if fcntl is None:
+            yield
+            return
+        with open(path + '.lock', 'a') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class SourceManifest:
+    """
+    Records where each file of a download directory comes from and which upstream version it is.
+
+    The manifest is a json file (.manifest.json) in the download directory, with one entry per \
+    file name: url, etag, last_modified (HTTP) or mdtm (FTP), size, sha256, the modification \
+    time of the local file and the upstream release date (released_on).
+    """
+
+    def __init__(self, directory) -> None:
+        self.directory = directory
+        self.path = os.path.join(directory, MANIFEST_FILE)
+
+    def load(self):
+        if not os.path.isfile(self.path):
+            return {}
+        with open(self.path, 'r') as f:
+            try:
+                return json.load(f)
+            except ValueError:
+                logger.warn("Ignore the corrupted manifest %s" % self.path)
+                return {}
+
+    def get(self, file_name):
+        """
+        Returns the entry of a file or None if the file is not in the manifest.
+
+        :param str file_name: name of the file in the directory.
+        """
+        return self.load().get(file_name)
+
+    def update(self, file_name, entry):
+        """
+        Adds or replaces the entry of a file.
+
+        :param str file_name: name of the file in the directory.
+        :param dict entry: url, etag, last_modified, mdtm, size, sha256, mtime, released_on.
+        """
+        with _manifest_lock(self.path):
+            content = self.load()
+            content[file_name] = entry
+            tmp_path = "%s.%s.tmp" % (self.path, os.getpid())
+            with open(tmp_path, 'w') as f:
+                json.dump(content, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def is_current(self, file_name, url, digest):
+        """
+        Checks that the local file is still the one recorded in the manifest.
+
+        The sha256 is only recomputed when the size or the modification time changed.
+
+        :param str file_name: name of the file in the directory.
+        :param str url: link to the remote file.
+        :param digest: function returning the sha256 hexdigest of a file path.
+        :return: The entry of the file if it matches, otherwise None.
+        """
+        entry = self.get(file_name)
+        filepath = os.path.join(self.directory, file_name)
+        if entry is None or entry.get('url') != url or not os.path.isfile(filepath):
+            return None
+        stat = os.stat(filepath)
+        if stat.st_size != entry.get('size'):
+            return None
+        if stat.st_mtime != entry.get('mtime') and digest(filepath) != entry.get('sha256'):
+            return None
+        return entry
+
+
+def release_date(last_modified=None, mdtm=None):
+    """
+    Converts the upstream modification time of a file into a date (Year-Month-Day).
+
+    :param str last_modified: HTTP Last-Modified header (e.g. 'Wed, 21 Oct 2015 07:28:00 GMT').
+    :param str mdtm: FTP MDTM reply timestamp (e.g. '20151021072800').
+    :return: Date string or None if the upstream time is unknown.
+    """
+    try:
+        if last_modified:
+            return parsedate_to_datetime(last_modified).date().isoformat()
+        if mdtm:
+            return datetime.datetime.strptime(mdtm[:14], '%Y%m%d%H%M%S').date().isoformat()
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def get_source_version(filepath):
+    """
+    Returns the upstream release date of a downloaded file, as recorded in its manifest.
+
+    :param str filepath: path to the downloaded file.
+    :return: Date string (Year-Month-Day) or None.
+    """
+    entry = SourceManifest(os.path.dirname(filepath)).get(os.path.basename(filepath))
+    if entry:
+        return entry.get('released_on')
+    return None
@@ -0,0 +1,250 @@
+import os
+import verboselogs
+from collections import namedtuple, OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from builder.databases.parsers import config_registry
+from builder.downloads import downloader
+from builder.downloads.http_downloader import DownloadError
+
+
+logger = verboselogs.VerboseLogger('root')
+
+Target = namedtuple('Target', ['url', 'directory', 'file_name'])
+
+# These files are read by the parser of another database (e.g. JensenLab maps
+# STRING identifiers with the STRING aliases), so they are inputs of both.
+SHARED_INPUTS = {
+    "JensenLab": [("STRING", "STRING_mapping_url"), ("STITCH", "STITCH_mapping_url")],
+    "SIDER": [("STITCH", "STITCH_mapping_url")],
+}
+
+
+def read_yaml(yaml_file):
+    return config_registry.load(yaml_file)
+
+
+def get_builder_config():
+    return config_registry.get_builder_config()
+
+
+def get_database_config(database, config_file=None):
+    return config_registry.get_database_config(database, config_file)
+
+
+def _is_url(value):
+    return isinstance(value, str) and value.split(':')[0] in ('http', 'https', 'ftp')
+
+
+def _generic_urls(config):
+    """
+    Collects every url of a database config, except linkout templates and ftp folders.
+    """
+    urls = []
+    if isinstance(config, dict):
+        for key, value in config.items():
+            if 'linkout' in str(key):
+                continue
+            urls.extend(_generic_urls(value))
+    elif isinstance(config, list):
+        for value in config:
+            urls.extend(_generic_urls(value))
+    elif _is_url(config) and not config.endswith('/'):
+        urls.append(config)
+    return urls
+
+
+def _jensenlab_urls(config, directory):
+    url = config['db_url']
+    textmining = os.path.join(directory, "textmining")
+    integration = os.path.join(directory, "integration")
+    urls = [(url.replace("FILE", config['organisms_file']), textmining),
+            (config['PMC_db_url'], textmining)]
+    urls.extend((url.replace("FILE", f), integration)
+                for f in config['db_files'].values())
+    urls.extend((url.replace("FILE", f), textmining)
+                for f in config['db_mentions_files'].values())
+    return urls
+
+
+def _disgenet_urls(config, directory):
+    url = config['disgenet_url']
+    files = list(config['disgenet_files'].values()) + \
+        list(config['disgenet_mapping_files'].values())
+    return [(url + f, directory) for f in files]
+
+
+def _pfam_urls(config, directory):
+    return [(config['ftp_url'] + config['full_uniprot_file'], directory)]
+
+
+def _uniprot_urls(config, directory):
+    # The idmapping and fasta urls are templates filled for each organism of the species list.
+    templates = ('uniprot_id_url', 'uniprot_fasta_file')
+    urls = [(url, directory) for url in _generic_urls(
+        {key: value for key, value in config.items() if key not in templates})]
+    for taxid in config['species']:
+        names = config['organisms'][taxid]
+        urls.extend((config[key].format(taxid=taxid, **names), directory) for key in templates)
+    return urls
+
+
+def _no_urls(config, directory):
+    # DrugBank needs a login and RefSeq resolves the latest assembly on the FTP server
+    # when it is parsed, so their files are not prefetched.
+    return []
+
+
+URL_RESOLVERS = {
+    "JensenLab": _jensenlab_urls,
+    "DisGEnet": _disgenet_urls,
+    "Pfam": _pfam_urls,
+    "UniProt": _uniprot_urls,
+    "DrugBank": _no_urls,
+    "RefSeq": _no_urls,
+}
+
+
+def get_database_targets(database, database_directory, config_file=None):
+    """
+    Lists the files a database parser downloads, as declared in builder/databases/config/<database>.yml.
+
+    :param str database: database name (key of builder.databases.parsers.parsers).
+    :param str database_directory: directory which saves the downloaded database files.
+    :param str config_file: customized config file used instead of the default one.
+    :return: List of Target namedtuples (url, directory, file_name).
+    """
+    config = get_database_config(database, config_file)
+    directory = os.path.join(database_directory, database)
+    if database in URL_RESOLVERS:
+        urls = URL_RESOLVERS[database](config, directory)
+    else:
+        urls = [(url, directory) for url in _generic_urls(config)]
+
+    for other, key in SHARED_INPUTS.get(database, []):
+        url = get_database_config(other)[key]
+        urls.append((url, os.path.join(database_directory, other)))
+
+    targets = []
+    for url, target_directory in urls:
+        target = Target(url, target_directory,
+                        downloader.file_name_from_url(url))
+        if target not in targets:
+            targets.append(target)
+    return targets
+
+
+def get_ontology_targets(ontology_directory, ontologies=None):
+    """
+    Lists the ontology files declared in the 'urls' section of builder/config.yml.
+
+    :param str ontology_directory: directory which saves the downloaded ontology files.
+    :param list ontologies: ontology acronyms (e.g. DO, GO), all of them if None.
+    :return: Dictionary of ontology acronyms (keys) and lists of Target namedtuples (values).
+    """
+    config = get_builder_config()["ontology"]
+    if ontologies is None:
+        ontologies = list(config["ontologies"].values())
+
+    targets = OrderedDict()
+    for ontology in ontologies:
+        otype = config["ontology_types"].get(ontology)
+        urls = config.get("urls", {}).get(otype, [])
+        directory = os.path.join(ontology_directory, ontology)
+        targets[ontology] = [Target(url, directory, downloader.file_name_from_url(url))
+                             for url in urls]
+    return targets
+
+
+class Prefetcher:
+    """
+    Downloads the input files of several parsers with a bounded thread pool.
+
+    Every file is downloaded once even if several parsers need it, and ready() yields each \
+    parser as soon as all of its own files are on disk, so that parsing can start while \
+    the remaining downloads are still running.
+    """
+
+    def __init__(self, n_jobs=4, skip=True, download_config=None) -> None:
+        self.skip = skip
+        if download_config is None:
+            download_config = get_builder_config().get("download")
+        self.download_config = download_config
+        self.executor = ThreadPoolExecutor(max_workers=n_jobs)
+        self.futures = OrderedDict()
+        self.groups = OrderedDict()
+
+    def add(self, name, targets):
+        """
+        Schedules the download of the files needed by a parser.
+
+        :param str name: database or ontology name.
+        :param list targets: list of Target namedtuples.
+        """
+        self.groups[name] = list(targets)
+        for target in targets:
+            if target not in self.futures:
+                self.futures[target] = self.executor.submit(
+                    self._fetch, target)
+
+    def _fetch(self, target):
+        if not os.path.exists(target.directory):
+            os.makedirs(target.directory)
+        return downloader.download_file(target.url, target.directory, file_name=target.file_name,
+                                        skip=self.skip, download_config=self.download_config)
+
+    def ready(self):
+        """
+        Yields the name of each parser and the list of its failed urls, as soon as all \
+        its downloads are finished.
+        """
+        pending = {}
+        waiting = defaultdict(list)
+        failed = defaultdict(list)
+        for name, targets in self.groups.items():
+            pending[name] = set(targets)
+            if not targets:
+                yield name, []
+            for target in set(targets):
+                waiting[target].append(name)
+
+        future_targets = {self.futures[target]: target for target in waiting}
+        for future in as_completed(future_targets):
+            target = future_targets[future]
+            err = future.exception()
+            if err is not None:
+                logger.error("Cannot download %s: %s" % (target.url, err))
+            for name in waiting[target]:
+                if err is not None:
+                    failed[name].append(target.url)
+                pending[name].discard(target)
+                if not pending[name]:
+                    logger.info("All files of %s are downloaded." % name)
+                    yield name, failed[name]
+
+    def release_ready(self, scheduler):
+        """
+        Releases the held job of each parser of a DagScheduler as soon as its files are \
+        downloaded, and rejects the ones with a failed download. Meant to run in a thread next \
+        to scheduler.run(): whatever happens, the jobs still held are released at the end so \
+        that the run ends.
+
+        :param scheduler: builder.databases.scheduler.DagScheduler whose jobs are the parsers.
+        """
+        released = set()
+        try:
+            for name, failed_urls in self.ready():
+                released.add(name)
+                if failed_urls:
+                    scheduler.reject(name, DownloadError("Cannot download {} file(s) of {}: {}".format(
+                        len(failed_urls), name, ", ".join(failed_urls))))
+                else:
+                    scheduler.release(name)
+        except Exception as err:
+            logger.error("Cannot follow the downloads: %s" % err)
+        finally:
+            for name in self.groups:
+                if name not in released:
+                    scheduler.release(name)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
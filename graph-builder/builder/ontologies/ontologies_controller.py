@@ -4,24 +4,14 @@ import logging
 import re
 import click
 import os.path
-import pandas as pd
 import csv
 import sys
-import builder
-import yaml
-import ftplib
-import wget
-import requests
 import datetime
 import coloredlogs
 import verboselogs
 from collections import defaultdict
-from builder.ontologies.parsers import snomedParser
-from builder.ontologies.parsers import icdParser
-from builder.ontologies.parsers import oboParser
-from builder.ontologies.parsers import reflectParser
-from builder.ontologies.parsers import efoParser
-from builder.ontologies.parsers import exoParser
+from builder.downloads import manifest
+from builder.databases.parsers import mapping_index, readiness, build_cache, sampling, config_registry
 
 
 verboselogs.install()
@@ -34,28 +24,24 @@ class Ontology:
         self.import_directory = import_directory
         self.ontology_directory = ontology_directory
 
-        config_dir = os.path.dirname(os.path.abspath(builder.__file__))
-        self.config_fpath = os.path.join(config_dir, "config.yml")
+        self.config_fpath = config_registry.builder_config_path()
         logger.info("Load config file %s" % self.config_fpath)
-        builder_config = self.read_yaml(self.config_fpath)
+        builder_config = config_registry.get_builder_config()
 
         self.config = builder_config["ontology"]
+        self.download_config = builder_config.get("download")
         self.download = download
         self.skip = skip
         if self.download:
             self.updated_on = str(datetime.date.today())
         else:
             self.updated_on = None
+        self.source_versions = {}
+        # Sampled builds write a part of the terms (see sampling.Sampler), the mappings are complete.
+        self.sampler = sampling.Sampler()
 
     def read_yaml(self, yaml_file):
-        content = None
-        with open(yaml_file, 'r') as stream:
-            try:
-                content = yaml.safe_load(stream)
-            except yaml.YAMLError as err:
-                raise yaml.YAMLError(
-                    "The yaml file {} could not be parsed. {}".format(yaml_file, err))
-        return content
+        return config_registry.load(yaml_file)
 
     def entries_to_remove(self, entries, the_dict):
         """
@@ -100,27 +86,11 @@ class Ontology:
             os.makedirs(directory)
 
     def download_from_ftp(self, ftp_url, user, password, to, file_name):
-        try:
-            domain = ftp_url.split('/')[2]
-            ftp_file = '/'.join(ftp_url.split('/')[3:])
-            with ftplib.FTP(domain) as ftp:
-                ftp.login(user=user, passwd=password)
-                with open(os.path.join(to, file_name), 'wb') as fp:
-                    ftp.retrbinary("RETR " + ftp_file,  fp.write)
-        except ftplib.error_reply as err:
-            raise ftplib.error_reply(
-                "Exception raised when an unexpected reply is received from the server. {}.\nURL:{}".format(err, ftp_url))
-        except ftplib.error_temp as err:
-            raise ftplib.error_temp(
-                "Exception raised when an error code signifying a temporary error. {}.\nURL:{}".format(err, ftp_url))
-        except ftplib.error_perm as err:
-            raise ftplib.error_perm(
-                "Exception raised when an error code signifying a permanent error. {}.\nURL:{}".format(err, ftp_url))
-        except ftplib.error_proto:
-            raise ftplib.error_proto(
-                "Exception raised when a reply is received from the server that does not fit the response specifications of the File Transfer Protocol. {}.\nURL:{}".format(err, ftp_url))
-
-    def download_db(self, database_url, directory, file_name=None, user="", password="", avoid_wget=False):
+        from builder.downloads import downloader
+        downloader.download_from_ftp(ftp_url, user, password, to, file_name,
+                                     download_config=self.download_config)
+
+    def download_db(self, database_url, directory, file_name=None, user="", password="", avoid_wget=False, checksum=None):
         """
         This function downloads the raw files from a biomedical database server when a link is provided.
 
@@ -132,42 +102,27 @@ class Ontology:
         :type file_name: str or None
         :param str user: username to access biomedical database server if required.
         :param str password: password to access biomedical database server if required.
+        :param bool avoid_wget: kept for backward compatibility, HTTP downloads are always streamed.
+        :param str checksum: expected digest of the file as "<algorithm>:<hexdigest>".
         """
-        if file_name is None:
-            file_name = database_url.split(
-                '/')[-1].replace('?', '_').replace('=', '_')
-
-        header = {
-            'user-agent': 'Mozilla/5.0 (Windows NT 10.0; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/51.0.2704.103 Safari/537.36'}
-
-        filepath = os.path.join(directory, file_name)
-        logger.info("Download file %s" % filepath)
-        if os.path.exists(filepath):
-            if self.skip:
-                logger.info("%s exists, don't need to download it." % filepath)
-                return None
-            else:
-                os.remove(filepath)
-        try:
-            if database_url.startswith('ftp:'):
-                self.download_from_ftp(
-                    database_url, user, password, directory, file_name)
-            else:
-                try:
-                    if not avoid_wget:
-                        wget.download(database_url, os.path.join(
-                            directory, file_name))
-                    else:
-                        r = requests.get(database_url, headers=header)
-                        with open(os.path.join(directory, file_name), 'wb') as out:
-                            out.write(r.content)
-                except Exception:
-                    r = requests.get(database_url, headers=header)
-                    with open(os.path.join(directory, file_name), 'wb') as out:
-                        out.write(r.content)
-        except Exception as err:
-            raise Exception(
-                "Something went wrong. {}.\nURL:{}".format(err, database_url))
+        from builder.downloads import downloader
+        filepath = downloader.download_file(database_url, directory, file_name=file_name,
+                                            user=user, password=password, skip=self.skip,
+                                            download_config=self.download_config,
+                                            checksum=checksum)
+        self.track_source_version(filepath)
+        return filepath
+
+    def track_source_version(self, filepath):
+        """
+        Sets updated_on to the latest upstream release date of the downloaded files.
+
+        :param str filepath: path to a downloaded file.
+        """
+        version = manifest.get_source_version(filepath)
+        if version is not None:
+            self.source_versions[filepath] = version
+            self.updated_on = max(self.source_versions.values())
 
     def get_current_time(self):
         """
@@ -208,18 +163,56 @@ class Ontology:
 
         return (str(y), str(t), dataset, filename, size, count, otype, name, updated_on)
 
-    def parse_ontology(self, ontology):
+    def download_ontology(self, ontology):
+        """
+        Downloads the files of an ontology which has urls in the config.
+
+        :param str ontology: acronym of the ontology (e.g. Disease Ontology:'DO').
+        """
+        ontology_directory = os.path.join(self.ontology_directory, ontology)
+        self.check_directory(ontology_directory)
+        # Each ontology has its own upstream release.
+        self.source_versions = {}
+        self.updated_on = str(datetime.date.today())
+        otype = self.config["ontology_types"].get(ontology)
+        for url in self.config.get('urls', {}).get(otype, []):
+            f = url.split('/')[-1].replace('?', '_').replace('=', '_')
+            self.download_db(url, directory=ontology_directory, file_name=f)
+
+    def build_fingerprint(self, ontology):
+        """
+        Returns the fingerprint of the inputs of an ontology: its files, the ontology config, \
+        the code of the parsers and the sampling of the build.
+
+        :param str ontology: acronym of the ontology (e.g. Disease Ontology:'DO').
+        """
+        from builder.ontologies.parsers import snomedParser, icdParser, oboParser, efoParser, exoParser
+        inputs = {'files': build_cache.directory_fingerprint(os.path.join(self.ontology_directory, ontology)),
+                  'config': self.config,
+                  'code': build_cache.source_digest(sys.modules[__name__], snomedParser, icdParser,
+                                                    oboParser, efoParser, exoParser),
+                  'sampling': self.sampler.describe()}
+        return build_cache.fingerprint(inputs)
+
+    def parse_ontology(self, ontology, download=None):
         """
         Parses and extracts data from a given ontology file(s), and returns a tuple with multiple dictionaries.
 
         :param str ontology: acronym of the ontology to be parsed (e.g. Disease Ontology:'DO').
-        :param bool download: wether database is to be downloaded.
+        :param bool download: wether database is to be downloaded (self.download if None).
         :return: Tuple with three nested dictionaries: terms, relationships between terms, and definitions of the terms.\
                 For more information on the returned dictionaries, see the documentation for any ontology parser.
         """
+        # The parsers need obonet and networkx, only imported when an ontology is parsed.
+        from builder.ontologies.parsers import snomedParser, icdParser, oboParser, efoParser, exoParser
+        download = self.download if download is None else download
         directory = self.ontology_directory
         ontology_directory = os.path.join(directory, ontology)
         self.check_directory(ontology_directory)
+        if download:
+            # Each ontology has its own upstream release.
+            self.source_versions = {}
+            self.updated_on = str(datetime.date.today())
         ontology_files = []
         ontologyData = None
         mappings = None
@@ -235,7 +228,7 @@ class Ontology:
                                                        '_').replace('=', '_')
                         ontology_files.append(
                             os.path.join(ontology_directory, f))
-                        if self.download:
+                        if download:
                             self.download_db(
                                 url, directory=ontology_directory, file_name=f)
                 elif otype in self.config["files"]:
@@ -292,6 +285,8 @@ class Ontology:
 
         if os.path.exists(cmapping_file):
             os.remove(cmapping_file)
+        mapping_index.remove_indexes(cmapping_file)
+        readiness.start(outputDir)
 
         with open(oboFile, 'r') as f:
             for line in f:
@@ -316,9 +311,14 @@ class Ontology:
                 for source, ref in identifiers[ident]:
                     out.write(ident+"\t"+source+"\t"+ref+"\n")
 
+        # The index is in place before complete_mapping.tsv, which is what the parsers wait for.
+        mapping_index.compile_index(mapping_file, mapping_index.ontology_variant(),
+                                    mapping_index.ontology_pairs(mapping_file),
+                                    output=mapping_index.index_path(cmapping_file, mapping_index.ontology_variant()))
         os.rename(mapping_file, cmapping_file)
+        readiness.complete(outputDir)
 
-    def generate_graph_files(self, ontologies=None):
+    def generate_graph_files(self, ontologies=None, rebuild=False):
         """
         This function parses and extracts data from a given list of ontologies. If no ontologies are provided, \
         all availables ontologies are used. Terms, relationships and definitions are saved as .tsv files to be loaded into \
@@ -328,9 +328,11 @@ class Ontology:
         :param ontologies: list of ontologies to be imported. If None, all available ontologies are imported.
         :type ontologies: list or None
         :param bool download: wether database is to be downloaded.
+        :param bool rebuild: parse the ontologies whose inputs did not change since the last build too.
         :return: Dictionary of tuples. Each tuple corresponds to a unique label/relationship type, date, time, \
                 database, and number of nodes and relationships.
         """
+        import pandas as pd
         entities = self.config["ontologies"]
         if ontologies is not None:
             entities = {}
@@ -341,13 +343,25 @@ class Ontology:
                         {ontology: self.config["ontologies"][ontology]})
 
         stats = set()
+        cache = build_cache.BuildCache(self.import_directory)
         for entity in entities:
             ontology = self.config["ontologies"][entity]
             if ontology in self.config["ontology_types"]:
                 ontologyType = self.config["ontology_types"][ontology]
             try:
+                if self.download:
+                    self.download_ontology(ontology)
+                # Ontologies whose files, config and parsers did not change keep their graph files.
+                key = self.build_fingerprint(ontology)
+                cached = None if rebuild else cache.lookup("ontology-" + ontology, key)
+                if cached is not None:
+                    logger.info("Ontology {} - Inputs unchanged, reuse the graph files".format(ontology))
+                    stats.update(cached)
+                    continue
+                cache.invalidate("ontology-" + ontology)
+                ontology_stats = set()
                 result, mappings, extra_entities, extra_rels = self.parse_ontology(
-                    ontology)
+                    ontology, download=False)
                 if result is not None:
                     terms, relationships, definitions = result
                     for namespace in terms:
@@ -361,34 +375,34 @@ class Ontology:
                                 writer.writerow(
                                     ['ID', ':LABEL', 'name', 'description', 'type', 'synonyms'])
                                 num_terms = 0
-                                for term in terms[namespace]:
+                                for term in self.sampler.limit(terms[namespace]):
+                                    if not self.sampler.keep(term):
+                                        continue
                                     writer.writerow([term, entity, list(terms[namespace][term])[
                                                     0], definitions[term], ontologyType, ",".join(terms[namespace][term])])
                                     num_terms += 1
-                                for extra_entity in extra_entities:
+                                for extra_entity in self.sampler.filter_rows(extra_entities):
                                     writer.writerow(list(extra_entity))
                                     num_terms += 1
                             logger.info(
                                 "Ontology {} - Number of {} entities: {}".format(ontology, name, num_terms))
-                            stats.add(self._build_stats(
+                            ontology_stats.add(self._build_stats(
                                 num_terms, "entity", name, ontology, entity_outputfile, self.updated_on))
                             if namespace in relationships:
                                 relationships_outputfile = os.path.join(
                                     self.import_directory, name+"_has_parent.tsv")
                                 relationships[namespace].update(extra_rels)
-                                relationshipsDf = pd.DataFrame(
-                                    list(relationships[namespace]))
-                                relationshipsDf.columns = [
-                                    'START_ID', 'END_ID', 'TYPE']
+                                rows = list(self.sampler.filter_rows(relationships[namespace], ['START_ID', 'END_ID']))
+                                relationshipsDf = pd.DataFrame(rows, columns=['START_ID', 'END_ID', 'TYPE'])
                                 relationshipsDf.to_csv(path_or_buf=relationships_outputfile,
                                                        sep='\t',
                                                        header=True, index=False, quotechar='"',
                                                        quoting=csv.QUOTE_ALL,
                                                        line_terminator='\n', escapechar='\\')
                                 logger.info("Ontology {} - Number of {} relationships: {}".format(
-                                    ontology, name+"_has_parent", len(relationships[namespace])))
-                                stats.add(self._build_stats(len(
-                                    relationships[namespace]), "relationships", name+"_has_parent", ontology, relationships_outputfile, self.updated_on))
+                                    ontology, name+"_has_parent", len(rows)))
+                                ontology_stats.add(self._build_stats(len(
+                                    rows), "relationships", name+"_has_parent", ontology, relationships_outputfile, self.updated_on))
                 else:
                     logger.warning(
                         "Ontology {} - The parsing did not work".format(ontology))
@@ -396,18 +410,24 @@ class Ontology:
                     for name in mappings:
                         mappings_outputfile = os.path.join(
                             self.import_directory, name + ".tsv")
-                        mappingsDf = pd.DataFrame(list(mappings[name]))
-                        mappingsDf.columns = ['START_ID', 'END_ID', 'TYPE']
+                        rows = list(self.sampler.filter_rows(mappings[name], ['START_ID', 'END_ID']))
+                        mappingsDf = pd.DataFrame(rows, columns=['START_ID', 'END_ID', 'TYPE'])
                         mappingsDf.to_csv(path_or_buf=mappings_outputfile,
                                           sep='\t',
                                           header=True, index=False, quotechar='"',
                                           quoting=csv.QUOTE_ALL,
                                           line_terminator='\n', escapechar='\\')
                         logger.info(
-                            "Ontology {} - Number of {} relationships: {}".format(ontology, name, len(mappings[name])))
-                        stats.add(self._build_stats(len(
-                            mappings[name]), "relationships", name, ontology, mappings_outputfile, self.updated_on))
+                            "Ontology {} - Number of {} relationships: {}".format(ontology, name, len(rows)))
+                        ontology_stats.add(self._build_stats(len(
+                            rows), "relationships", name, ontology, mappings_outputfile, self.updated_on))
+                stats.update(ontology_stats)
+                if result is not None:
+                    outputs = [os.path.join(self.import_directory, row[3]) for row in ontology_stats]
+                    outputs.append(os.path.join(self.ontology_directory, ontology, "complete_mapping.tsv"))
+                    cache.store("ontology-" + ontology, key, ontology_stats, outputs)
             except Exception as err:
+                readiness.fail(os.path.join(self.ontology_directory, ontology), err)
                 exc_type, exc_obj, exc_tb = sys.exc_info()
                 fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
                 logger.error("Error: {}. Ontology {}: {}, file: {},line: {}".format(
@@ -415,6 +435,37 @@ class Ontology:
         return stats
 
 
+class OntologyNotParsed(Exception):
+    pass
+
+
+def _parse_ontology(import_directory, ontology_directory, ontology, download=True, skip=True, rebuild=False,
+                    sample=None, fraction=None):
+    """
+    Parses a single ontology, e.g. as a job of the build pipeline.
+
+    :param str ontology: ontology acronym (e.g. 'DO').
+    :return: Tuple with the stats of the graph files, the profile of the parsing (None if the \
+            graph files were reused) and its report.
+    """
+    from builder.databases import profiles
+    from builder.databases.parsers import instrumentation
+    parser = Ontology(import_directory, ontology_directory, download, skip)
+    parser.sampler = sampling.Sampler(sample, fraction)
+    entity = [entity for entity, acronym in parser.config["ontologies"].items() if acronym == ontology][0]
+    cache = build_cache.BuildCache(import_directory)
+    cached = None if rebuild or download else cache.lookup("ontology-" + ontology, parser.build_fingerprint(ontology))
+    with profiles.ResourceMonitor() as monitor:
+        stats = parser.generate_graph_files(ontologies=[entity], rebuild=rebuild)
+    # generate_graph_files logs the errors of the ontologies and goes on with the others.
+    if not stats:
+        raise OntologyNotParsed("Ontology {} wrote no graph files, see the errors above.".format(ontology))
+    if cached is not None:
+        return stats, None, {'status': 'cached', 'rows_out': instrumentation.stats_rows(stats)}
+    profile = monitor.profile()
+    return stats, profile, dict(profile, status='built', rows_out=instrumentation.stats_rows(stats))
+
+
 @click.group()
 def ontology():
     pass
@@ -429,9 +480,14 @@ def ontology():
               help="The directory which saved the graph files.")
 @click.option('--download/--no-download', default=False, help="Whether download the source file(s)?")
 @click.option('--skip/--no-skip', default=True, help="Whether skip the existing file(s)?")
-def parse_ontology(ontology_dir, output_dir, download, skip):
-    ontology_parser = Ontology(output_dir, ontology_dir, download, skip)
-    ontology_parser.generate_graph_files()
+@click.option('--rebuild/--incremental', default=False,
+              help="Whether parse again the ontologies whose inputs did not change?")
+@sampling.add_options
+def parse_ontology(ontology_dir, output_dir, download, skip, rebuild, sample, fraction):
+    readiness.clear_stale(ontology_dir)
+    ontology_parser = Ontology(sampling.output_directory(output_dir, sample, fraction), ontology_dir, download, skip)
+    ontology_parser.sampler = sampling.Sampler(sample, fraction)
+    ontology_parser.generate_graph_files(rebuild=rebuild)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 # Diagnose entity - ICD
 from collections import defaultdict
+from builder.databases.parsers.tsv_reader import read_columns
 
 
 def parser(ICDfile):
@@ -19,20 +20,8 @@ def parser(ICDfile):
     definitions = defaultdict()
     ICDfile = ICDfile[0]
     #version = ICDfile.split('/')[1].split('_')[1]
-    first = True
-    with open(ICDfile, 'r') as fh:
-        for line in fh:
-            if first:
-                first = False
-                continue
-            data = line.rstrip("\r\n").split("\t")
-            icdCode = data[0]
-            icdTerm = data[1]
-            chapter = data[2]
-            chapId = data[3]
-            block = data[4]
-            blockId = data[5]
-
+    for rows in read_columns(ICDfile, [0, 1, 2, 3, 4, 5], skiprows=1):
+        for icdCode, icdTerm, chapter, chapId, block, blockId in rows:
             terms[icdCode].add(icdTerm)
             definitions[icdCode] = "term"
             terms[chapId].add(chapter)
@@ -1,6 +1,7 @@
 # Clinical_variable - SNOMED-CT
 import glob
 from collections import defaultdict
+from builder.databases.parsers.tsv_reader import read_columns
 
 
 def get_files_by_pattern(regex_path):
@@ -39,44 +40,29 @@ def parser(files, filters):
             full_path_files.append(f)
 
     for f in full_path_files:
-        first = True
         with open(f, 'r', encoding='utf-8') as fh:
             if "Description" in f:
-                for line in fh:
-                    if first:
-                        first = False
-                        continue
-                    data = line.rstrip("\r\n").split("\t")
-                    if int(data[2]) == 1:
-                        conceptID = data[4]
-                        term = data[7]
-                        if conceptID not in inactive_terms:
-                            terms["SNOMED-CT"][conceptID].append(term)
-                            definitions[conceptID] = term
+                for rows in read_columns(fh, [2, 4, 7], skiprows=1):
+                    for active, conceptID, term in rows:
+                        if int(active) == 1:
+                            if conceptID not in inactive_terms:
+                                terms["SNOMED-CT"][conceptID].append(term)
+                                definitions[conceptID] = term
             elif "Relationship" in f:
-                for line in fh:
-                    if first:
-                        first = False
-                        continue
-                    data = line.rstrip("\r\n").split("\t")
-                    if int(data[2]) == 1:
-                        sourceID = data[4]
-                        destinationID = data[5]
-                        if sourceID not in inactive_terms and destinationID not in inactive_terms:
-                            relationships["SNOMED-CT"].add(
-                                (sourceID, destinationID, "HAS_PARENT"))
+                for rows in read_columns(fh, [2, 4, 5], skiprows=1):
+                    for active, sourceID, destinationID in rows:
+                        if int(active) == 1:
+                            if sourceID not in inactive_terms and destinationID not in inactive_terms:
+                                relationships["SNOMED-CT"].add(
+                                    (sourceID, destinationID, "HAS_PARENT"))
             elif "Definition" in f:
-                for line in fh:
-                    if first:
-                        first = False
-                        continue
-                    data = line.rstrip("\r\n").split("\t")
-                    if int(data[2]) == 1:
-                        conceptID = data[4]
-                        if conceptID not in inactive_terms:
-                            definition = data[7].replace('\n', ' ').replace(
-                                '"', '').replace('\\', '')
-                            definitions[conceptID] = definition
+                for rows in read_columns(fh, [2, 4, 7], skiprows=1):
+                    for active, conceptID, definition in rows:
+                        if int(active) == 1:
+                            if conceptID not in inactive_terms:
+                                definition = definition.replace('\n', ' ').replace(
+                                    '"', '').replace('\\', '')
+                                definitions[conceptID] = definition
 
     return terms, relationships, definitions
 
@@ -87,15 +73,9 @@ def get_inactive_terms(concept_file):
     :return set inactive_terms: inactive terms
     """
     inactive_terms = set()
-    first = True
-    with open(concept_file, 'r', encoding='utf-8') as cf:
-        for line in cf:
-            if first:
-                first = False
-                continue
-            data = line.rstrip('\r\n').split('\t')
-            concept = data[0]
-            is_active = bool(data[2])
+    for rows in read_columns(concept_file, [0, 2], skiprows=1):
+        for concept, active in rows:
+            is_active = bool(active)
 
             if not is_active:
                 inactive_terms.add(concept)
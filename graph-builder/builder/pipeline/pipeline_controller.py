@@ -0,0 +1,221 @@
+import os
+import time
+import logging
+import threading
+import coloredlogs
+import verboselogs
+import click
+from functools import partial
+from builder.databases import profiles
+from builder.databases.parsers import parsers, sampling
+
+
+verboselogs.install()
+coloredlogs.install(fmt='%(asctime)s - %(module)s:%(lineno)d - %(levelname)s - %(message)s')
+logger = logging.getLogger('root')
+
+# Subfolders of the output directory, the layout expected by graph-importer.
+ONTOLOGIES_DIR = 'Ontologies'
+DATABASES_DIR = 'Databases'
+# Prefix of the import jobs, e.g. 'import-Protein'.
+IMPORT_PREFIX = 'import-'
+# Imports run one at a time, they write to the same graph database.
+IMPORT_RESOURCE = 'neo4j'
+
+
+@click.group()
+def pipeline():
+    pass
+
+
+def import_plan(ontologies, databases):
+    """
+    Returns the import jobs of the graph files built by a run: an import of each ontology \
+    entity and of each entity group whose files are built, and of the mappings between \
+    ontologies, each after the jobs building its files and the imports of the nodes it links to.
+
+    :param list ontologies: ontologies parsed by the run (e.g. ['DO', 'GO']).
+    :param list databases: databases parsed by the run (e.g. ['UniProt']).
+    :return: Dictionary of (what, entities, mappings, after) by job name, with what being \
+            'ontology' or 'database'.
+    """
+    import importer
+    _, importers = importer.read_config()
+    sources = importers["ontology_sources"]
+    plan = {}
+    imported = set()
+    for entity in importers["ontology_entities"]:
+        if sources.get(entity) in ontologies:
+            plan[IMPORT_PREFIX + entity] = ('ontology', [entity], {}, [sources[entity]])
+            imported.add(entity)
+    for entity, targets in importers["ontology_mappings"].items():
+        if entity not in imported:
+            continue
+        for target in targets:
+            name = "%s%s_maps_to_%s" % (IMPORT_PREFIX, entity, target)
+            after = [sources[entity], IMPORT_PREFIX + entity] + \
+                ([IMPORT_PREFIX + target] if target in imported else [])
+            plan[name] = ('ontology', [], {entity: [target]}, after)
+    for entity, entity_databases in importer.ENTITY_DATABASES.items():
+        built = [db for db in entity_databases if db in databases]
+        if not built:
+            continue
+        plan[IMPORT_PREFIX + entity] = ('database', [entity], {}, built)
+        imported.add(entity)
+    # Relationships to other nodes are only created once these nodes exist.
+    for entity, dependencies in importer.ENTITY_DEPENDENCIES.items():
+        if IMPORT_PREFIX + entity in plan:
+            plan[IMPORT_PREFIX + entity][3].extend(IMPORT_PREFIX + d for d in dependencies if d in imported)
+    return plan
+
+
+def _import(output_dir, plan, db_url, db_username, db_password, name):
+    import importer
+    what, entities, mappings, _ = plan[name]
+    with profiles.ResourceMonitor() as monitor:
+        if what == 'ontology':
+            codes = importer.ontology_codes(os.path.abspath(os.path.join(output_dir, ONTOLOGIES_DIR)),
+                                            entities, mappings)
+        else:
+            codes = importer.database_codes(os.path.abspath(os.path.join(output_dir, DATABASES_DIR)), entities[0])
+        importer.import_codes(codes, name[len(IMPORT_PREFIX):], db_url, db_username, db_password)
+    profile = monitor.profile()
+    return set(), profile, dict(profile, status='imported', queries=len(codes))
+
+
+def _run_job(output_dir, db_dir, ontologies, plan, name, config_file=None, download=True, skip=True,
+             rebuild=False, db_url=None, db_username=None, db_password=None, sample=None, fraction=None):
+    """
+    Runs a job of the build pipeline in a worker: the parsing of an ontology or of a database, \
+    or the import of graph files.
+    """
+    if name in plan:
+        return _import(output_dir, plan, db_url, db_username, db_password, name)
+    if name in ontologies:
+        from builder.ontologies.ontologies_controller import _parse_ontology
+        return _parse_ontology(os.path.join(output_dir, ONTOLOGIES_DIR), db_dir, name,
+                               download=download, skip=skip, rebuild=rebuild, sample=sample, fraction=fraction)
+    from builder.databases.databases_controller import _parse_database
+    return _parse_database(os.path.join(output_dir, DATABASES_DIR), db_dir, name, config_file=config_file,
+                           download=download, skip=skip, rebuild=rebuild, sample=sample, fraction=fraction)
+
+
+def _write_report(output_dir, scheduler, start, **run):
+    """
+    Writes the time, memory and rows of every job in build_report.json, with the critical path.
+    """
+    from builder.databases.parsers import instrumentation
+    jobs = {}
+    for name, (_, _, report) in scheduler.results.items():
+        jobs[name] = dict(report or {}, scheduled_seconds=round(scheduler.durations.get(name, 0), 3))
+    for name, err in scheduler.errors.items():
+        jobs[name] = {'status': 'failed', 'error': str(err)}
+    path = scheduler.critical_path()
+    filepath = instrumentation.write_report(
+        output_dir, jobs, started_on=time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start)),
+        wall_seconds=round(time.time() - start, 3),
+        critical_path=[{'job': name, 'start': begin, 'end': end} for name, begin, end in path], **run)
+    if path:
+        logger.info("Critical path (%.1f s): %s" % (path[-1][2], " -> ".join(
+            "%s (%.1f-%.1f s)" % (name, begin, end) for name, begin, end in path)))
+    logger.info("Build report: %s" % filepath)
+
+
+@pipeline.command(help="Parse ontologies and databases, and import the graph files, as a single scheduled build.")
+@click.option('--db-dir', '-d', required=True,
+              type=click.Path(exists=True, dir_okay=True),
+              help="The directory which saved the downloaded database and ontology files.")
+@click.option('--output-dir', '-o', required=True,
+              type=click.Path(exists=True, dir_okay=True),
+              help="The directory which saved the graph files (in its Ontologies and Databases subdirectories).")
+@click.option('--database', required=False, type=click.Choice(parsers.keys()), multiple=True,
+              help="Which databases (default: all)?")
+@click.option('--ontology', required=False, multiple=True,
+              help="Which ontologies, e.g. DO (default: all)?")
+@click.option('--n-jobs', '-n', required=False, type=int,
+              help="How many jobs at most (default: number of CPUs)?", default=None)
+@click.option('--memory-budget', required=False, type=float, default=None,
+              help="How much memory (GB) the jobs running at the same time may use?")
+@click.option('--n-downloads', required=False,
+              help="How many files are downloaded at the same time (with --download)?", default=4)
+@click.option('--download/--no-download', default=False, help="Whether download the source file(s)?")
+@click.option('--skip/--no-skip', default=True, help="Whether skip the existing file(s)?")
+@click.option('--rebuild/--incremental', default=False,
+              help="Whether parse again the ontologies and databases whose inputs did not change?")
+@click.option('--db-url', '-D', required=False, default=None,
+              help="Neo4j database url, such as localhost:7687/default. Without it, the graph files are not imported.")
+@click.option('--db-username', '-U', default="neo4j", help="Neo4j database username.")
+@click.option('--db-password', '-P', default="NeO4J", help="Neo4j database password.")
+@sampling.add_options
+def build(db_dir, output_dir, database, ontology, n_jobs, memory_budget, n_downloads, download, skip, rebuild,
+          db_url, db_username, db_password, sample, fraction):
+    # Imported here so that the command line starts without the download and scheduling modules.
+    from builder.databases.parsers import readiness, mapping_cache
+    from builder.databases.scheduler import DagScheduler, estimate_cost
+    from builder.downloads import prefetch
+    start = time.time()
+    builder_config = prefetch.get_builder_config()
+    all_ontologies = list(dict.fromkeys(builder_config["ontology"]["ontologies"].values()))
+    invalid_ontologies = [o for o in ontology if o not in all_ontologies]
+    if invalid_ontologies:
+        raise click.BadParameter("Unknown ontologies %s, choose among %s." % (invalid_ontologies, all_ontologies),
+                                 param_hint='--ontology')
+    ontologies = list(ontology) or all_ontologies
+    databases = list(database) or list(parsers.keys())
+    # A sampled build writes its graph files, caches and report in a subfolder of its own.
+    graph_dir = sampling.output_directory(output_dir, sample, fraction)
+    for directory in (ONTOLOGIES_DIR, DATABASES_DIR):
+        os.makedirs(os.path.join(graph_dir, directory), exist_ok=True)
+    plan = import_plan(ontologies, databases) if db_url else {}
+    logger.info("Build (output_dir: %s, db_dir: %s, ontologies: %s, databases: %s, imports: %s)" %
+                (graph_dir, db_dir, ontologies, databases, list(plan)))
+
+    readiness.clear_stale(db_dir)
+    mapping_cache.warm(db_dir, builder_config)
+    database_config = builder_config["database"]
+    measured = profiles.load(output_dir)
+    budget = profiles.memory_budget(database_config, memory_budget)
+    # Ontologies, databases and imports are jobs of the same graph: a parser starts once the
+    # mappings it reads are ready, whether an ontology or a database builds them, and an
+    # entity group is imported as soon as its files are written, while the others are parsed.
+    scheduler = DagScheduler(partial(_run_job, graph_dir, db_dir, ontologies, plan,
+                                     download=download, skip=skip or download, rebuild=rebuild,
+                                     db_url=db_url, db_username=db_username, db_password=db_password,
+                                     sample=sample, fraction=fraction),
+                             n_jobs=n_jobs or os.cpu_count() or 4, database_directory=db_dir,
+                             memory_budget=budget, resource_limits={IMPORT_RESOURCE: 1})
+    for name in ontologies:
+        scheduler.add(name, [], cost=estimate_cost(os.path.join(db_dir, name), measured.get(name)),
+                      memory=profiles.expected_memory(measured.get(name), database_config))
+    for name in databases:
+        scheduler.add(name, parsers[name].mapping_dependencies(builder_config),
+                      cost=estimate_cost(os.path.join(db_dir, name), measured.get(name)),
+                      memory=profiles.expected_memory(measured.get(name), database_config),
+                      held=download)
+    for name, (_, _, _, after) in plan.items():
+        previous = measured.get(name)
+        scheduler.add(name, [], cost=previous['wall_seconds'] if previous else 1, after=after,
+                      resource=IMPORT_RESOURCE)
+    if download:
+        prefetcher = prefetch.Prefetcher(n_jobs=n_downloads, skip=skip)
+        for name in databases:
+            prefetcher.add(name, prefetch.get_database_targets(name, db_dir))
+        releaser = threading.Thread(target=prefetcher.release_ready, args=(scheduler,), daemon=True)
+        releaser.start()
+    else:
+        prefetcher = None
+    try:
+        scheduler.run()
+    finally:
+        if prefetcher is not None:
+            prefetcher.shutdown()
+        # A sampled build says nothing of the memory of a full one.
+        if sample is None and fraction is None:
+            profiles.save(output_dir, {name: profile for name, (_, profile, _) in scheduler.results.items() if profile})
+        _write_report(graph_dir, scheduler, start, n_jobs=scheduler.n_jobs, memory_budget=budget,
+                      sample=sample, fraction=fraction)
+
+
+if __name__ == "__main__":
+    main = click.CommandCollection(sources=[pipeline])
+    main()
@@ -99,52 +99,69 @@ def importer():
     pass
 
 
-@importer.command(help="Import ontology files into graph database.")
-@click.option('--ontology-dir', '-d', required=True,
-              type=click.Path(exists=True, dir_okay=True),
-              help="The directory which saved the parsed ontology files.")
-@click.option('--db-url', '-D', required=True, help="Neo4j database url. Please contain database name, such as localhost:7687/default.")
-@click.option('--db-username', '-U', default="neo4j", help="Neo4j database username.")
-@click.option('--db-password', '-P', default="NeO4J", help="Neo4j database password.")
-@click.option('--delete', is_flag=True, default=False, help="Import or delete data.")
-def ontology(ontology_dir, db_url, db_username, db_password, delete):
-    # TODO: how to notice user that the ontologies files need to be imported firstly.
-    config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)),
-                               "config", "cypher.yml")
-    importer_config = os.path.join(os.path.dirname(os.path.abspath(__file__)),
-                                   "config", "importers.yml")
-    queries = read_yaml(config_file)
-    importers = read_yaml(importer_config)
+def read_config():
+    """
+    Returns the cypher queries (cypher.yml) and the importers config (importers.yml).
+    """
+    config_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config")
+    return read_yaml(os.path.join(config_dir, "cypher.yml")), read_yaml(os.path.join(config_dir, "importers.yml"))
 
-    entities = [e.lower() for e in importers["ontology_entities"]]
 
+def ontology_codes(ontology_dir, entities, mappings, delete=False):
+    """
+    Returns the cypher statements importing (or removing) ontology entities and the mappings \
+    between them.
+
+    :param str ontology_dir: directory which saved the parsed ontology files.
+    :param list entities: ontology entities (e.g. ['Disease', 'Phenotype']).
+    :param dict mappings: entities mapped to by each entity (e.g. {'Experimental_factor': ['Disease']}).
+    :param bool delete: remove the data instead of importing it.
+    :return: List of cypher statements.
+    """
+    queries, _ = read_config()
     formated_codes = []
     if delete:
-        mappings = importers["ontology_mappings"]
         mapping_import_code = queries["REMOVE_ONTOLOGY_MAPPING_DATA"]['query']
         for m in mappings:
-            if m.lower() in entities:
-                for r in mappings[m]:
-                    formated_codes.extend(mapping_import_code.replace("ENTITY1", m).replace(
-                        "ENTITY2", r).split(";")[0:-1])
+            for r in mappings[m]:
+                formated_codes.extend(mapping_import_code.replace("ENTITY1", m).replace(
+                    "ENTITY2", r).split(";")[0:-1])
 
         ontology_data_import_code = queries["REMOVE_ONTOLOGY_DATA"]['query']
         for entity in entities:
             formated_codes.extend(ontology_data_import_code.replace(
                 "ENTITY", entity.capitalize()).split(";")[0:-1])
-        print("Done removing ontologies.")
     else:
         ontology_data_import_code = queries["IMPORT_ONTOLOGY_DATA"]['query']
         for entity in entities:
             formated_codes.extend(ontology_data_import_code.replace(
                 "ENTITY", entity.capitalize()).replace("IMPORTDIR", ontology_dir).split(";")[0:-1])
-        mappings = importers["ontology_mappings"]
         mapping_import_code = queries["IMPORT_ONTOLOGY_MAPPING_DATA"]['query']
         for m in mappings:
-            if m.lower() in entities:
-                for r in mappings[m]:
-                    formated_codes.extend(mapping_import_code.replace("ENTITY1", m).replace(
-                        "ENTITY2", r).replace("IMPORTDIR", ontology_dir).split(";")[0:-1])
+            for r in mappings[m]:
+                formated_codes.extend(mapping_import_code.replace("ENTITY1", m).replace(
+                    "ENTITY2", r).replace("IMPORTDIR", ontology_dir).split(";")[0:-1])
+    return formated_codes
+
+
+@importer.command(help="Import ontology files into graph database.")
+@click.option('--ontology-dir', '-d', required=True,
+              type=click.Path(exists=True, dir_okay=True),
+              help="The directory which saved the parsed ontology files.")
+@click.option('--db-url', '-D', required=True, help="Neo4j database url. Please contain database name, such as localhost:7687/default.")
+@click.option('--db-username', '-U', default="neo4j", help="Neo4j database username.")
+@click.option('--db-password', '-P', default="NeO4J", help="Neo4j database password.")
+@click.option('--delete', is_flag=True, default=False, help="Import or delete data.")
+def ontology(ontology_dir, db_url, db_username, db_password, delete):
+    # TODO: how to notice user that the ontologies files need to be imported firstly.
+    _, importers = read_config()
+
+    entities = [e.lower() for e in importers["ontology_entities"]]
+    mappings = {m: r for m, r in importers["ontology_mappings"].items() if m.lower() in entities}
+    formated_codes = ontology_codes(ontology_dir, entities, mappings, delete=delete)
+    if delete:
+        print("Done removing ontologies.")
+    else:
         print("Done loading ontologies.")
 
     driver = connect_neo4j(
@@ -167,21 +184,34 @@ DATABASE_ENTITY_MAP = {
 }
 
 
-@importer.command(help="Import database files into graph database.")
-@click.option('--database-dir', '-d', required=True,
-              type=click.Path(exists=True, dir_okay=True),
-              help="The directory which saved the parsed database files.")
-@click.option('--which-entity', '-w', required=True, type=click.Choice(ENTITY_MAP.keys()), help="Which database you want to import.")
-@click.option('--db-url', '-D', required=True, help="Neo4j database url. Please contain database name, such as localhost:7687/default.")
-@click.option('--db-username', '-U', default="neo4j", help="Neo4j database username.")
-@click.option('--db-password', '-P', default="NeO4J", help="Neo4j database password.")
-@click.option('--delete', is_flag=True, default=False, help="Import or delete data.")
-def database(database_dir, which_entity, db_url, db_username, db_password, delete):
-    # TODO: how to notice user that the ontologies files need to be imported firstly.
-    config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)),
-                               "config", "cypher.yml")
-    queries = read_yaml(config_file)
+# Databases whose graph files each entity group reads.
+ENTITY_DATABASES = {
+    "Gene": ["HGNC_MGI"],
+    "Chromosome": ["RefSeq"],
+    "Transcript": ["RefSeq"],
+    "Protein": ["UniProt", "SIGNOR", "PhosphoSitePlus"],
+}
 
+# Nodes (entity groups or ontology entities) each entity group links to, imported first.
+ENTITY_DEPENDENCIES = {
+    "Gene": [],
+    "Chromosome": [],
+    "Transcript": ["Chromosome", "Gene"],
+    "Protein": ["Gene", "Transcript", "Modification", "Disease", "Biological_process",
+                "Molecular_function", "Cellular_component"],
+}
+
+
+def database_codes(database_dir, which_entity, delete=False):
+    """
+    Returns the cypher statements importing (or removing) an entity group of the database files.
+
+    :param str database_dir: directory which saved the parsed database files.
+    :param str which_entity: entity group (see ENTITY_MAP).
+    :param bool delete: remove the data instead of importing it.
+    :return: List of cypher statements.
+    """
+    queries, _ = read_config()
     importers = ENTITY_MAP.get(which_entity)
     formated_codes = []
     for importer in importers:
@@ -208,6 +238,38 @@ def database(database_dir, which_entity, db_url, db_username, db_password, delet
             else:
                 formated_codes.extend(import_code.split(";")[0:-1])
             logger.info("Removing %s (%s)..." % (which_entity, remover))
+    return formated_codes
+
+
+def import_codes(formated_codes, requester, db_url, db_username="neo4j", db_password="NeO4J"):
+    """
+    Runs cypher statements in the graph database with a new connection.
+
+    :param list formated_codes: cypher statements (see ontology_codes and database_codes).
+    :param str requester: identifier of the statements in the logs.
+    :param str db_url: Neo4j database url.
+    """
+    driver = connect_neo4j(
+        db_url=db_url, user=db_username, password=db_password)
+    try:
+        load_into_database(driver=driver, queries=formated_codes,
+                           requester=requester)
+    finally:
+        driver.close()
+
+
+@importer.command(help="Import database files into graph database.")
+@click.option('--database-dir', '-d', required=True,
+              type=click.Path(exists=True, dir_okay=True),
+              help="The directory which saved the parsed database files.")
+@click.option('--which-entity', '-w', required=True, type=click.Choice(ENTITY_MAP.keys()), help="Which database you want to import.")
+@click.option('--db-url', '-D', required=True, help="Neo4j database url. Please contain database name, such as localhost:7687/default.")
+@click.option('--db-username', '-U', default="neo4j", help="Neo4j database username.")
+@click.option('--db-password', '-P', default="NeO4J", help="Neo4j database password.")
+@click.option('--delete', is_flag=True, default=False, help="Import or delete data.")
+def database(database_dir, which_entity, db_url, db_username, db_password, delete):
+    # TODO: how to notice user that the ontologies files need to be imported firstly.
+    formated_codes = database_codes(database_dir, which_entity, delete=delete)
 
     driver = connect_neo4j(
         db_url=db_url, user=db_username, password=db_password)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The tests import the builder package of this checkout, installed or not.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
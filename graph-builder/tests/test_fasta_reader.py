@@ -0,0 +1,75 @@
+import io
+import gzip
+import random
+import pytest
+from Bio import SeqIO
+from builder.databases.parsers import fasta_reader
+from builder.databases.parsers.fasta_reader import SequenceSidecar
+
+
+AMINO_ACIDS = 'ACDEFGHIKLMNPQRSTVWY'
+
+
+def _fasta(count=50, seed=0, width=60, newline='\n'):
+    generator = random.Random(seed)
+    text = []
+    for i in range(count):
+        sequence = ''.join(generator.choice(AMINO_ACIDS) for _ in range(generator.randrange(0, 400)))
+        text.append('>sp|P%05d|PROT%d_HUMAN Protein %d OS=Homo sapiens%s' % (i, i, i, newline))
+        text.extend(sequence[start:start + width] + newline for start in range(0, len(sequence), width))
+    return ''.join(text)
+
+
+def _records(text, **kwargs):
+    return list(fasta_reader.read_records(io.BytesIO(text.encode()), **kwargs))
+
+
+def _seqio(text):
+    return [(record.id.encode(), str(record.seq).encode()) for record in SeqIO.parse(io.StringIO(text), 'fasta')]
+
+
+@pytest.mark.parametrize('block_size', [1, 7, 64, 1000, fasta_reader.DEFAULT_BLOCK_SIZE])
+def test_read_records_as_seqio(block_size):
+    text = _fasta()
+    assert _records(text, block_size=block_size) == _seqio(text)
+
+
+def test_read_records_crlf_and_spaces():
+    text = _fasta(count=5, newline='\r\n').replace('ACD', 'A CD')
+    records = _records(text, block_size=16)
+    assert records == [(identifier, sequence.replace(b' ', b'')) for identifier, sequence in _seqio(text)]
+    assert all(b'\r' not in sequence and b' ' not in sequence for _, sequence in records)
+
+
+def test_read_records_edge_cases():
+    assert _records('') == []
+    # Text before the first header, an empty header and an empty sequence.
+    text = 'comment line\n>\nAC\n>P1 desc\n>P2\nDE\nFG'
+    assert _records(text, block_size=3) == [(b'', b'AC'), (b'P1', b''), (b'P2', b'DEFG')]
+
+
+def test_read_records_gzipped(tmp_path):
+    text = _fasta(count=10)
+    filepath = tmp_path / 'sequences.fasta.gz'
+    with gzip.open(filepath, 'wt') as f:
+        f.write(text)
+    with gzip.open(filepath, 'rb') as f:
+        assert list(fasta_reader.read_records(f, block_size=100)) == _seqio(text)
+
+
+def test_sidecar_round_trip(tmp_path):
+    filepath = str(tmp_path / 'Amino_acid_sequence.9606.seq.bgz')
+    generator = random.Random(1)
+    # Enough sequences to fill several BGZF blocks (64 KB each).
+    sequences = [(b'P%05d' % i, ''.join(generator.choice(AMINO_ACIDS)
+                                        for _ in range(generator.randrange(0, 2000))).encode())
+                 for i in range(300)]
+    with SequenceSidecar(filepath) as sidecar:
+        offsets = [sidecar.write(accession, sequence) for accession, sequence in sequences]
+    assert len(set(offsets)) == len(offsets)
+    for (accession, sequence), offset in reversed(list(zip(sequences, offsets))):
+        assert fasta_reader.read_sequence(filepath, offset, len(sequence)) == sequence.decode()
+        assert fasta_reader.read_sequence(filepath, str(offset), str(len(sequence))) == sequence.decode()
+    # The file is a FASTA file for the usual tools.
+    with gzip.open(filepath, 'rb') as f:
+        assert list(fasta_reader.read_records(f)) == sequences
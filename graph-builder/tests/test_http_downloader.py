@@ -0,0 +1,250 @@
+import io
+import os
+import glob
+import hashlib
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from builder.downloads.http_downloader import HTTPDownloader, DownloadError, ChecksumMismatch
+
+
+CONTENT = os.urandom(100 * 1024)
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Serves the files of a folder. The stdlib handler answers every request with 200 and the \
+    whole file, this one answers the Range requests with 206 if the server accepts them.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def end_headers(self):
+        if self.server.advertise_ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        super().end_headers()
+
+    def send_head(self):
+        range_header = self.headers.get('Range')
+        self.server.requests.append((self.command, range_header))
+        if self.command == 'GET' and self.server.truncate:
+            # Closes the connection after a part of the body, without error.
+            with open(self.translate_path(self.path), 'rb') as f:
+                data = f.read()
+            start = int(range_header.split('=', 1)[1].partition('-')[0]) if range_header else 0
+            self.send_response(206 if range_header else 200)
+            if range_header:
+                self.send_header('Content-Range', 'bytes %d-%d/%d' % (start, len(data) - 1, len(data)))
+            self.end_headers()
+            body = data[start:start + self.server.truncate.pop(0)]
+            return io.BytesIO(body)
+        if not self.server.ranges or range_header is None:
+            return super().send_head()
+        with open(self.translate_path(self.path), 'rb') as f:
+            data = f.read()
+        start, _, end = range_header.split('=', 1)[1].partition('-')
+        start = int(start)
+        end = int(end) if end else len(data) - 1
+        if start >= len(data):
+            self.send_error(416)
+            return None
+        body = data[start:end + 1]
+        self.send_response(206)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Range', 'bytes %d-%d/%d' % (start, start + len(body) - 1, len(data)))
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        return io.BytesIO(body)
+
+
+@pytest.fixture
+def http_server(tmp_path):
+    """
+    Starts a local HTTP server of a folder with file.bin, e.g. http_server(ranges=False) for \
+    a server ignoring the Range requests like the stdlib one, or http_server(truncate=[10]) \
+    for a server sending only 10 bytes of the body of the next GET request.
+    """
+    served = tmp_path / 'served'
+    served.mkdir()
+    (served / 'file.bin').write_bytes(CONTENT)
+    servers = []
+
+    def start(ranges=True, advertise_ranges=None, truncate=None):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), partial(RangeRequestHandler, directory=str(served)))
+        server.ranges = ranges
+        server.advertise_ranges = ranges if advertise_ranges is None else advertise_ranges
+        server.requests = []
+        server.truncate = list(truncate or [])
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, 'http://127.0.0.1:%d/file.bin' % server.server_address[1]
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _downloader(**kwargs):
+    return HTTPDownloader(chunk_size=4096, retries=0, backoff=0, timeout=5, **kwargs)
+
+
+def _checksum(data):
+    return 'sha256:' + hashlib.sha256(data).hexdigest()
+
+
+def _interrupted_download(downloader, url, filepath, size):
+    """
+    Leaves the partial file and state of a download stopped after size bytes.
+    """
+    with open(filepath + '.part', 'wb') as f:
+        f.write(CONTENT[:size])
+    downloader._save_partial_state(url, filepath, downloader.probe(url))
+
+
+def test_download(http_server, tmp_path):
+    server, url = http_server()
+    filepath = str(tmp_path / 'file.bin')
+    assert _downloader().download(url, filepath, checksum=_checksum(CONTENT)) == filepath
+    with open(filepath, 'rb') as f:
+        assert f.read() == CONTENT
+    assert glob.glob(filepath + '.part*') == []
+
+
+def test_resume_partial_download(http_server, tmp_path):
+    server, url = http_server()
+    filepath = str(tmp_path / 'file.bin')
+    downloader = _downloader()
+    _interrupted_download(downloader, url, filepath, 30000)
+    downloader.download(url, filepath, checksum=_checksum(CONTENT))
+    with open(filepath, 'rb') as f:
+        assert f.read() == CONTENT
+    assert ('GET', 'bytes=30000-') in server.requests
+    assert glob.glob(filepath + '.part*') == []
+
+
+def test_resume_restarts_if_range_ignored(http_server, tmp_path):
+    server, url = http_server(ranges=False)
+    filepath = str(tmp_path / 'file.bin')
+    downloader = _downloader()
+    _interrupted_download(downloader, url, filepath, 30000)
+    downloader.download(url, filepath, checksum=_checksum(CONTENT))
+    with open(filepath, 'rb') as f:
+        assert f.read() == CONTENT
+    assert ('GET', 'bytes=30000-') in server.requests
+
+
+def test_segmented_download(http_server, tmp_path):
+    server, url = http_server()
+    filepath = str(tmp_path / 'file.bin')
+    _downloader(segments=4, segment_threshold=1024).download(url, filepath, checksum=_checksum(CONTENT))
+    with open(filepath, 'rb') as f:
+        assert f.read() == CONTENT
+    ranges = sorted(header for command, header in server.requests if command == 'GET')
+    assert len(ranges) == 4
+    assert all(header.startswith('bytes=') for header in ranges)
+    assert glob.glob(filepath + '.part*') == []
+
+
+def test_segmented_download_falls_back_to_single_stream(http_server, tmp_path):
+    # The server says it accepts ranges but answers them with 200 and the whole file.
+    server, url = http_server(ranges=False, advertise_ranges=True)
+    filepath = str(tmp_path / 'file.bin')
+    _downloader(segments=4, segment_threshold=1024).download(url, filepath, checksum=_checksum(CONTENT))
+    with open(filepath, 'rb') as f:
+        assert f.read() == CONTENT
+    assert ('GET', None) in server.requests
+    assert glob.glob(filepath + '.part*') == []
+
+
+def test_segments_are_written_in_place(http_server, tmp_path, monkeypatch):
+    server, url = http_server()
+    filepath = str(tmp_path / 'file.bin')
+    sizes = []
+    downloader = _downloader(segments=4, segment_threshold=1024)
+    download_segment = downloader._download_segment
+
+    def segment(*args):
+        download_segment(*args)
+        # Only the partial file holds data, the segment files hold their progress.
+        sizes.append((os.path.getsize(filepath + '.part'),
+                      max(os.path.getsize(path) for path in glob.glob(filepath + '.part.[0-9]'))))
+
+    monkeypatch.setattr(downloader, '_download_segment', segment)
+    downloader.download(url, filepath, checksum=_checksum(CONTENT))
+    assert len(sizes) == 4
+    assert all(part == len(CONTENT) and segment < 10 for part, segment in sizes)
+
+
+def test_resume_segmented_download(http_server, tmp_path):
+    server, url = http_server()
+    filepath = str(tmp_path / 'file.bin')
+    downloader = _downloader(segments=4, segment_threshold=1024)
+    # A previous run wrote the first segment and the start of the third one.
+    step = len(CONTENT) // 4
+    with open(filepath + '.part', 'wb') as f:
+        f.write(CONTENT[:step] + b'\0' * step + CONTENT[2 * step:2 * step + 100])
+        f.truncate(len(CONTENT))
+    for index, progress in enumerate([step, 0, 100, 0]):
+        downloader._save_segment_progress(filepath, index, progress)
+    downloader._save_partial_state(url, filepath, downloader.probe(url))
+    downloader.download(url, filepath, checksum=_checksum(CONTENT))
+    with open(filepath, 'rb') as f:
+        assert f.read() == CONTENT
+    ranges = sorted(header for command, header in server.requests if command == 'GET')
+    assert ranges == sorted(['bytes=%d-%d' % (step, 2 * step - 1), 'bytes=%d-%d' % (2 * step + 100, 3 * step - 1),
+                             'bytes=%d-%d' % (3 * step, len(CONTENT) - 1)])
+    assert glob.glob(filepath + '.part*') == []
+
+
+def test_truncated_download_is_resumed(http_server, tmp_path):
+    server, url = http_server(truncate=[30000])
+    filepath = str(tmp_path / 'file.bin')
+    HTTPDownloader(chunk_size=4096, retries=1, backoff=0, timeout=5).download(
+        url, filepath, checksum=_checksum(CONTENT))
+    with open(filepath, 'rb') as f:
+        assert f.read() == CONTENT
+    assert [request for request in server.requests if request[0] == 'GET'] == \
+        [('GET', None), ('GET', 'bytes=30000-')]
+
+
+def test_truncated_download_keeps_partial_file(http_server, tmp_path):
+    server, url = http_server(truncate=[30000])
+    filepath = str(tmp_path / 'file.bin')
+    with pytest.raises(DownloadError):
+        _downloader().download(url, filepath, checksum=_checksum(CONTENT))
+    assert os.path.getsize(filepath + '.part') == 30000
+    # The next run resumes the partial file.
+    _downloader().download(url, filepath, checksum=_checksum(CONTENT))
+    with open(filepath, 'rb') as f:
+        assert f.read() == CONTENT
+    assert ('GET', 'bytes=30000-') in server.requests
+
+
+def test_smaller_expected_size_keeps_partial_file(http_server, tmp_path):
+    server, url = http_server()
+    filepath = str(tmp_path / 'file.bin')
+    with pytest.raises(DownloadError):
+        _downloader().download(url, filepath, expected_size=len(CONTENT) + 1)
+    assert not os.path.exists(filepath)
+    assert os.path.getsize(filepath + '.part') == len(CONTENT)
+
+
+def test_size_mismatch_removes_larger_partial_file(http_server, tmp_path):
+    server, url = http_server()
+    filepath = str(tmp_path / 'file.bin')
+    with pytest.raises(DownloadError):
+        _downloader().download(url, filepath, expected_size=len(CONTENT) - 1)
+    assert not os.path.exists(filepath)
+    assert glob.glob(filepath + '.part*') == []
+
+
+def test_checksum_mismatch_removes_partial_file(http_server, tmp_path):
+    server, url = http_server()
+    filepath = str(tmp_path / 'file.bin')
+    with pytest.raises(ChecksumMismatch):
+        _downloader().download(url, filepath, checksum=_checksum(b'other content'))
+    assert not os.path.exists(filepath)
+    assert glob.glob(filepath + '.part*') == []
@@ -0,0 +1,81 @@
+import logging
+import pytest
+from builder.databases.parsers import idmapping_reader
+
+
+FIELDS = ['UniProtKB-ID', 'NCBI_TaxID', 'Gene_Name', 'PDB']
+SYNONYM_FIELDS = ['UniProtKB-ID', 'Gene_Name']
+
+# Lines of an idmapping file: the isoform lines of P31946 are interleaved with its own lines,
+# a truncated line falls in the middle of a protein, and the file ends with a cut-off line.
+IDMAPPING = """P31946\tUniProtKB-ID\t1433B_HUMAN
+P31946\tGene_Name\tYWHAB
+P31946\tUniRef100\tUniRef100_P31946
+P31946-2\tGene_Name\tYWHAB-2
+P31946\tNCBI_TaxID\t9606
+P31946-2\tPDB\t2BQ0
+P31946\tPDB\t1A4O
+P31946-3\tUniRef100\tUniRef100_P31946-3
+P62258\tUniProtKB-ID\t1433E_HUMAN
+P62258\tGene_Name
+P62258\tNCBI_TaxID\t9606\r
+P62258\tGene_Name\tYWHAE
+
+Q04917\tUniProtKB-ID\t1433F_MOUSE
+Q04917\tNCBI_TaxID\t10090
+Q04917\tGene_Name\tYwhah
+Q9XYZ1\tGene_Name\tNOID
+Q9XYZ1\tNCBI_TaxID\t9606
+Q9XYZ2\tUniProtKB-ID\tBADTAX_HUMAN
+Q9XYZ2\tNCBI_TaxID\t96 06
+Q9XYZ3-1\tUniProtKB-ID\tISO_HUMAN
+Q9XYZ3-1\tNCBI_TaxID\t9606
+Q9XYZ3
+A0A0\tUniProtKB-ID"""
+
+
+def _entries(text, taxids=(9606,)):
+    return list(idmapping_reader.read_entries(text.splitlines(True), FIELDS, SYNONYM_FIELDS, taxids))
+
+
+def test_entries_are_grouped_by_protein():
+    entries = _entries(IDMAPPING)
+    assert [entry.accession for entry in entries] == ['P31946', 'P62258', 'Q9XYZ3']
+    p31946 = entries[0]
+    # The lines of the isoforms go to the canonical accession, in file order.
+    assert p31946.fields == {'UniProtKB-ID': ['1433B_HUMAN'], 'Gene_Name': ['YWHAB', 'YWHAB-2'],
+                             'NCBI_TaxID': ['9606'], 'PDB': ['2BQ0', '1A4O']}
+    assert p31946.synonyms == ['1433B_HUMAN', 'YWHAB', 'YWHAB-2']
+    assert p31946.isoforms == ['P31946-2', 'P31946-3']
+    # The truncated and blank lines are skipped, the protein goes on after them.
+    p62258 = entries[1]
+    assert p62258.fields == {'UniProtKB-ID': ['1433E_HUMAN'], 'NCBI_TaxID': ['9606'], 'Gene_Name': ['YWHAE']}
+    assert entries[2].isoforms == ['Q9XYZ3-1']
+
+
+def test_truncated_lines_are_counted(caplog):
+    with caplog.at_level(logging.WARNING, logger='root'):
+        _entries(IDMAPPING)
+    assert "Skipped 4 lines" in caplog.text
+
+
+def test_species_filter():
+    assert [entry.accession for entry in _entries(IDMAPPING, taxids=['10090'])] == ['Q04917']
+    assert [entry.accession for entry in _entries(IDMAPPING, taxids=[9606, 10090])] == \
+        ['P31946', 'P62258', 'Q04917', 'Q9XYZ3']
+
+
+@pytest.mark.parametrize('cut', range(1, len(IDMAPPING.splitlines())))
+def test_cut_off_file(cut):
+    # A file cut after any line yields the complete proteins read so far, without error.
+    lines = IDMAPPING.splitlines(True)[:cut]
+    lines[-1] = lines[-1][:len(lines[-1]) // 2]
+    accessions = [entry.accession for entry in _entries(''.join(lines))]
+    assert accessions == [accession for accession in ['P31946', 'P62258', 'Q9XYZ3']
+                          if accession in accessions]
+
+
+def test_split_accession():
+    assert idmapping_reader._split_accession('P31946-2') == ('P31946', True)
+    assert idmapping_reader._split_accession('P31946') == ('P31946', False)
+    assert idmapping_reader._split_accession('A0A-B') == ('A0A-B', False)
@@ -0,0 +1,127 @@
+import os
+import pickle
+import random
+from collections import defaultdict
+import pytest
+from builder.databases.parsers import mapping_index
+from builder.databases.parsers.mapping_index import MappingIndex
+
+
+def _write_mapping(directory, lines):
+    mapping_file = os.path.join(str(directory), 'complete_mapping.tsv')
+    with open(mapping_file, 'w', encoding='utf-8') as f:
+        f.write(''.join(lines))
+    return mapping_file
+
+
+def _dict_mapping(mapping_file):
+    # The dictionaries the parsers built from complete_mapping.tsv before the indexes.
+    mapping = {}
+    multiple = defaultdict(set)
+    with open(mapping_file, 'r', encoding='utf-8') as mf:
+        for line in mf:
+            data = line.rstrip("\r\n").split("\t")
+            if len(data) > 1:
+                mapping[data[1]] = data[0]
+                multiple[data[1]].add(data[0])
+    return mapping, multiple
+
+
+def _random_lines(seed, count=2000):
+    generator = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        identifier = 'P%05d' % generator.randrange(500)
+        alias = generator.choice(['alias%d' % generator.randrange(1500), 'ÄlIäs %d' % generator.randrange(50)])
+        lines.append('%s\t%s\tsource\n' % (identifier, alias))
+    # A short line and an empty alias, as in the real files.
+    return lines + ['P00001\n', 'P00002\t\n']
+
+
+def _open(mapping_file, multiple=False):
+    return mapping_index.open_index(mapping_file, mapping_index.ALIAS,
+                                    lambda: mapping_index.alias_pairs(mapping_file), multiple=multiple)
+
+
+def _assert_same(index, mapping, missing=('missing', 'alias-1', '', 'P00001')):
+    assert len(index) == len(mapping)
+    assert set(index) == set(mapping)
+    for key, value in mapping.items():
+        assert key in index
+        assert index[key] == value
+        assert index.get(key) == value
+    for key in missing:
+        if key not in mapping:
+            assert key not in index
+            assert index.get(key) is None
+            with pytest.raises(KeyError):
+                index[key]
+    assert 1 not in index
+    assert dict(index.items()) == mapping
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_index_as_dict(tmp_path, seed):
+    mapping_file = _write_mapping(tmp_path, _random_lines(seed))
+    mapping, multiple = _dict_mapping(mapping_file)
+    _assert_same(_open(mapping_file), mapping)
+    _assert_same(_open(mapping_file, multiple=True), dict(multiple))
+
+
+def test_multi_valued_aliases(tmp_path):
+    mapping_file = _write_mapping(tmp_path, ['P1\tgene\n', 'P2\tgene\n', 'P1\tgene\n', 'P3\tother\n',
+                                             'P3\tgene\n', 'P2\tgene\n'])
+    # The last identifier of an alias, as a dict built line by line.
+    assert _open(mapping_file)['gene'] == 'P2'
+    assert _open(mapping_file, multiple=True)['gene'] == frozenset({'P1', 'P2', 'P3'})
+    assert _open(mapping_file, multiple=True)['other'] == frozenset({'P3'})
+
+
+def test_hash_collisions(tmp_path, monkeypatch):
+    # Every key has one of two hashes, so the lookups go through runs of equal hashes.
+    monkeypatch.setattr(mapping_index, 'key_hash', lambda key: len(key) % 2)
+    mapping_file = _write_mapping(tmp_path, _random_lines(2, count=300))
+    mapping, multiple = _dict_mapping(mapping_file)
+    index = _open(mapping_file)
+    assert len(set(index._hashes)) == 2
+    _assert_same(index, mapping)
+    _assert_same(_open(mapping_file, multiple=True), dict(multiple))
+
+
+def test_stale_index_is_compiled_again(tmp_path):
+    mapping_file = _write_mapping(tmp_path, ['P1\ta\n'])
+    index = _open(mapping_file)
+    assert not index.is_stale(mapping_file)
+    _write_mapping(tmp_path, ['P1\ta\n', 'P2\tb\n'])
+    assert index.is_stale(mapping_file)
+    assert dict(_open(mapping_file).items()) == {'a': 'P1', 'b': 'P2'}
+
+
+def test_invalid_index_is_compiled_again(tmp_path):
+    mapping_file = _write_mapping(tmp_path, ['P1\ta\n'])
+    path = mapping_index.index_path(mapping_file, mapping_index.ALIAS)
+    with open(path, 'wb') as f:
+        f.write(b'not an index')
+    assert dict(_open(mapping_file).items()) == {'a': 'P1'}
+
+
+def test_pickled_index(tmp_path):
+    mapping_file = _write_mapping(tmp_path, ['P1\ta\n', 'P2\ta\n'])
+    index = pickle.loads(pickle.dumps(_open(mapping_file, multiple=True)))
+    assert isinstance(index, MappingIndex)
+    assert index['a'] == frozenset({'P1', 'P2'})
+
+
+def test_ontology_pairs(tmp_path):
+    mapping_file = _write_mapping(tmp_path, ['DOID:1\tOMIM\tFoo\n', 'DOID:2\tMESH\tBar\n', 'DOID:3\tOMIM\n'])
+    assert list(mapping_index.ontology_pairs(mapping_file)) == [('foo', 'DOID:1'), ('bar', 'DOID:2')]
+    assert list(mapping_index.ontology_pairs(mapping_file, source='OMIM')) == [('foo', 'DOID:1')]
+    assert mapping_index.ontology_variant('OMIM') != mapping_index.ontology_variant('MESH')
+
+
+def test_remove_indexes(tmp_path):
+    mapping_file = _write_mapping(tmp_path, ['P1\ta\n'])
+    _open(mapping_file)
+    open(mapping_index.index_path(mapping_file, mapping_index.ALIAS) + '.lock', 'w').close()
+    mapping_index.remove_indexes(mapping_file)
+    assert os.listdir(str(tmp_path)) == ['complete_mapping.tsv']
@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import socket
+import subprocess
+import sys
+import threading
+import pytest
+from builder.databases.parsers import readiness
+
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def _write_building(directory, pid, host=None):
+    with open(os.path.join(str(directory), readiness.BUILDING_MARKER), 'w') as f:
+        json.dump({'pid': pid, 'host': host or socket.gethostname(), 'started': time.time()}, f)
+
+
+@pytest.fixture
+def mapping_file(tmp_path):
+    directory = tmp_path / 'UniProt'
+    directory.mkdir()
+    return str(directory / 'complete_mapping.tsv')
+
+
+def test_status(mapping_file):
+    directory = os.path.dirname(mapping_file)
+    assert readiness.status(directory) == 'missing'
+    readiness.start(directory)
+    assert readiness.status(directory) == 'building'
+    open(mapping_file, 'w').close()
+    readiness.complete(directory)
+    assert readiness.status(directory) == 'complete'
+    readiness.start(directory)
+    readiness.fail(directory, "error")
+    assert readiness.status(directory) == 'failed'
+    _write_building(directory, _dead_pid())
+    os.remove(os.path.join(directory, readiness.FAILED_MARKER))
+    assert readiness.status(directory) == 'failed'
+
+
+def test_fail_only_by_the_building_process(mapping_file):
+    directory = os.path.dirname(mapping_file)
+    _write_building(directory, os.getppid())
+    readiness.fail(directory, "error")
+    assert readiness.status(directory) == 'building'
+
+
+def test_wait_returns_once_the_mapping_is_complete(mapping_file):
+    directory = os.path.dirname(mapping_file)
+    readiness.start(directory)
+
+    def build():
+        time.sleep(0.2)
+        open(mapping_file, 'w').close()
+        readiness.complete(directory)
+
+    thread = threading.Thread(target=build)
+    thread.start()
+    start = time.time()
+    readiness.wait(mapping_file, 'UniProt', timeout=10, max_interval=0.05)
+    thread.join()
+    assert time.time() - start < 5
+
+
+def test_wait_times_out(mapping_file):
+    readiness.start(os.path.dirname(mapping_file))
+    start = time.time()
+    with pytest.raises(readiness.MappingNotReady) as err:
+        readiness.wait(mapping_file, 'UniProt', timeout=0.3, max_interval=0.05)
+    assert not isinstance(err.value, readiness.MappingFailed)
+    assert 0.3 <= time.time() - start < 5
+
+
+def test_wait_fails_fast_on_failed_mapping(mapping_file):
+    directory = os.path.dirname(mapping_file)
+    readiness.start(directory)
+
+    def build():
+        time.sleep(0.1)
+        readiness.fail(directory, "cannot download")
+
+    thread = threading.Thread(target=build)
+    thread.start()
+    start = time.time()
+    with pytest.raises(readiness.MappingFailed, match="cannot download"):
+        readiness.wait(mapping_file, 'UniProt', timeout=60, max_interval=0.05)
+    thread.join()
+    assert time.time() - start < 5
+
+
+def test_wait_fails_fast_if_the_building_process_died(mapping_file):
+    _write_building(os.path.dirname(mapping_file), _dead_pid())
+    start = time.time()
+    with pytest.raises(readiness.MappingFailed, match="is gone"):
+        readiness.wait(mapping_file, 'UniProt', timeout=60, max_interval=0.05)
+    assert time.time() - start < 5
+
+
+def test_clear_stale(tmp_path):
+    failed, dead, alive, remote = [tmp_path / name for name in ('failed', 'dead', 'alive', 'remote')]
+    for directory in (failed, dead, alive, remote):
+        directory.mkdir()
+    (failed / readiness.FAILED_MARKER).write_text('{"reason": "old error"}')
+    _write_building(dead, _dead_pid())
+    _write_building(alive, os.getpid())
+    _write_building(remote, _dead_pid(), host='another-host')
+    (tmp_path / 'file.txt').write_text('not a folder')
+    readiness.clear_stale(str(tmp_path))
+    assert readiness.status(str(failed)) == 'missing'
+    assert readiness.status(str(dead)) == 'missing'
+    assert readiness.status(str(alive)) == 'building'
+    assert readiness.status(str(remote)) == 'building'
+    readiness.clear_stale(str(tmp_path / 'missing'))
@@ -0,0 +1,192 @@
+import os
+import threading
+from concurrent.futures import Future
+import pytest
+from builder.databases.parsers import readiness
+from builder.databases.scheduler import DagScheduler, DependencyError, CyclicDependencies
+
+
+class FakeExecutor:
+    """
+    Runs each submitted job in the calling thread, or delay seconds later in another thread \
+    (delay may be a dict of seconds by job), and records the order of the jobs and the jobs \
+    running when each one starts.
+    """
+
+    def __init__(self, delay=0) -> None:
+        self.delay = delay
+        self.submitted = []
+        self.together = []
+        self.running = set()
+        self._lock = threading.Lock()
+
+    def submit(self, function, name):
+        with self._lock:
+            self.submitted.append(name)
+            self.running.add(name)
+            self.together.append(set(self.running))
+        future = Future()
+
+        def run():
+            try:
+                result = function(name)
+            except Exception as err:
+                with self._lock:
+                    self.running.discard(name)
+                future.set_exception(err)
+            else:
+                with self._lock:
+                    self.running.discard(name)
+                future.set_result(result)
+
+        delay = self.delay.get(name, 0) if isinstance(self.delay, dict) else self.delay
+        if delay:
+            threading.Timer(delay, run).start()
+        else:
+            run()
+        return future
+
+
+class Parser:
+    """
+    Job building the complete_mapping.tsv of its database folder, or failing.
+    """
+
+    def __init__(self, directory, failing=()) -> None:
+        self.directory = directory
+        self.failing = failing
+
+    def __call__(self, name):
+        folder = os.path.join(self.directory, name)
+        readiness.start(folder)
+        if name in self.failing:
+            readiness.fail(folder, "cannot parse")
+            raise ValueError("cannot parse %s" % name)
+        open(os.path.join(folder, 'complete_mapping.tsv'), 'w').close()
+        readiness.complete(folder)
+        return name
+
+
+def _scheduler(tmp_path, failing=(), delay=0, **kwargs):
+    executor = FakeExecutor(delay)
+    scheduler = DagScheduler(Parser(str(tmp_path), failing), database_directory=str(tmp_path),
+                             poll_interval=0.01, executor=executor, **kwargs)
+    return scheduler, executor
+
+
+def test_priorities_are_critical_paths(tmp_path):
+    scheduler, _ = _scheduler(tmp_path)
+    scheduler.add("UniProt", [], cost=10)
+    scheduler.add("Pfam", ["UniProt"], cost=1)
+    scheduler.add("IntAct", ["UniProt"], cost=5)
+    scheduler.add("Import", [], cost=2, after=["IntAct"])
+    scheduler.add("HGNC", [], cost=3)
+    assert scheduler.priorities() == {"UniProt": 17, "Pfam": 1, "IntAct": 7, "Import": 2, "HGNC": 3}
+
+
+def test_cyclic_dependencies(tmp_path):
+    scheduler, _ = _scheduler(tmp_path)
+    scheduler.add("A", ["B"])
+    scheduler.add("B", ["A"])
+    with pytest.raises(CyclicDependencies):
+        scheduler.priorities()
+
+
+def test_critical_path_first_and_dependencies_released(tmp_path):
+    scheduler, executor = _scheduler(tmp_path, n_jobs=1)
+    scheduler.add("Small", [], cost=1)
+    scheduler.add("UniProt", [], cost=10)
+    scheduler.add("Pfam", ["UniProt"], cost=1)
+    scheduler.add("Medium", [], cost=5)
+    results = scheduler.run()
+    assert results == {name: name for name in ("Small", "UniProt", "Pfam", "Medium")}
+    # UniProt and its dependent Pfam make the longest path, Pfam waits until UniProt is done and
+    # then starts by its own priority.
+    assert executor.submitted == ["UniProt", "Medium", "Pfam", "Small"]
+
+
+def test_dependency_not_built_by_the_run(tmp_path):
+    (tmp_path / "DO").mkdir()
+    (tmp_path / "DO" / "complete_mapping.tsv").write_text('')
+    scheduler, executor = _scheduler(tmp_path)
+    scheduler.add("DisGEnet", ["DO"])
+    scheduler.add("SIDER", ["STITCH"])
+    with pytest.raises(DependencyError):
+        scheduler.run()
+    assert executor.submitted == ["DisGEnet"]
+    assert "SIDER" in scheduler.errors
+
+
+def test_failure_propagates_to_dependents(tmp_path):
+    scheduler, executor = _scheduler(tmp_path, failing=("UniProt",))
+    scheduler.add("UniProt", [], cost=10)
+    scheduler.add("Pfam", ["UniProt"])
+    scheduler.add("Import", [], after=["Pfam"])
+    scheduler.add("HGNC", [])
+    with pytest.raises(ValueError, match="cannot parse UniProt"):
+        scheduler.run()
+    assert executor.submitted == ["UniProt", "HGNC"]
+    assert scheduler.results == {"HGNC": "HGNC"}
+    assert isinstance(scheduler.errors["Pfam"], DependencyError)
+    assert isinstance(scheduler.errors["Import"], DependencyError)
+
+
+def test_held_jobs(tmp_path):
+    scheduler, executor = _scheduler(tmp_path)
+    scheduler.add("UniProt", [], held=True)
+    scheduler.add("Pfam", ["UniProt"], held=True)
+    scheduler.add("HGNC", [], held=True)
+    scheduler.release("UniProt")
+    scheduler.release("Pfam")
+    scheduler.reject("HGNC", IOError("cannot download"))
+    with pytest.raises(IOError, match="cannot download"):
+        scheduler.run()
+    assert executor.submitted == ["UniProt", "Pfam"]
+    assert set(scheduler.results) == {"UniProt", "Pfam"}
+
+
+def test_resource_limits(tmp_path):
+    scheduler, executor = _scheduler(tmp_path, delay=0.05, n_jobs=4, resource_limits={'neo4j': 1})
+    scheduler.add("A", [], cost=2, resource='neo4j')
+    scheduler.add("B", [], cost=1)
+    scheduler.add("C", [], cost=3, resource='neo4j')
+    scheduler.run()
+    assert executor.submitted == ["C", "B", "A"]
+    assert not any({"A", "C"} <= running for running in executor.together)
+
+
+def test_memory_budget(tmp_path):
+    scheduler, executor = _scheduler(tmp_path, delay=0.05, n_jobs=4, memory_budget=10)
+    scheduler.add("A", [], cost=3, memory=6)
+    scheduler.add("B", [], cost=2, memory=6)
+    scheduler.add("C", [], cost=1, memory=4)
+    scheduler.add("Huge", [], cost=0.5, memory=20)
+    scheduler.run()
+    assert executor.submitted == ["A", "B", "C", "Huge"]
+    assert all(sum(scheduler.memory[name] for name in running) <= 10 or running == {"Huge"}
+               for running in executor.together)
+
+
+def test_large_job_is_not_starved_by_smaller_ones(tmp_path):
+    # The small jobs end one after the other, so some memory is always used while they run.
+    delay = {"Mapping": 0.02, "Small0": 0.1, "UniProt": 0.02}
+    delay.update(("Small%d" % i, 0.2) for i in range(1, 6))
+    scheduler, executor = _scheduler(tmp_path, delay=delay, n_jobs=4, memory_budget=10)
+    scheduler.add("Mapping", [], cost=1, memory=2)
+    scheduler.add("UniProt", ["Mapping"], cost=20, memory=8)
+    for i in range(6):
+        scheduler.add("Small%d" % i, [], cost=1, memory=4)
+    scheduler.run()
+    # Once UniProt can start, the small jobs wait until it fits instead of taking the memory.
+    assert executor.submitted[:4] == ["Mapping", "Small0", "Small1", "UniProt"]
+    assert executor.together[3] == {"UniProt"}
+
+
+def test_resource_limit_does_not_block_the_other_jobs(tmp_path):
+    scheduler, executor = _scheduler(tmp_path, delay=0.05, n_jobs=4, memory_budget=10,
+                                     resource_limits={'neo4j': 1})
+    scheduler.add("Import", [], cost=5, memory=2, resource='neo4j')
+    scheduler.add("Import2", [], cost=4, memory=2, resource='neo4j')
+    scheduler.add("Parser", [], cost=1, memory=2)
+    scheduler.run()
+    assert executor.submitted == ["Import", "Parser", "Import2"]
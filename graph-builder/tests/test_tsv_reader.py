@@ -0,0 +1,53 @@
+import io
+from builder.databases.parsers import tsv_reader
+
+
+def _rows(text, columns, **kwargs):
+    return [row for rows in tsv_reader.read_columns(io.StringIO(text), columns, **kwargs) for row in rows]
+
+
+def test_read_columns():
+    text = "a\tb\tc\td\n1\t2\t3\t4\n"
+    assert _rows(text, [0, 2]) == [('a', 'c'), ('1', '3')]
+    assert _rows(text, [1], skiprows=1) == [('2',)]
+    assert _rows(text, [-1], ncolumns=4) == [('d',), ('4',)]
+
+
+def test_read_columns_keeps_the_rest_of_wide_lines():
+    assert _rows("a\tb\tc\td\n", [0, 1]) == [('a', 'b')]
+    assert _rows("a\tb\tc\td\n", [1]) == [('b',)]
+
+
+def test_read_columns_pads_short_lines():
+    assert _rows("a\tb\tc\nd\n", [0, 2]) == [('a', 'c'), ('d', '')]
+
+
+def test_read_columns_skips_blank_lines_in_full_width_blocks():
+    # Every non-blank line of the block has all the columns, so the block is split at once.
+    text = "a\tb\tc\n\n1\t2\t3\r\n\r\nx\ty\tz\n"
+    assert _rows(text, [0, 2]) == [('a', 'c'), ('1', '3'), ('x', 'z')]
+    assert _rows(text, [1]) == [('b',), ('2',), ('y',)]
+    assert _rows(text, [0]) == [('a',), ('1',), ('x',)]
+
+
+def test_read_columns_skips_blank_lines_in_blocks_with_short_lines():
+    assert _rows("a\tb\tc\n\nd\n", [0, 2]) == [('a', 'c'), ('d', '')]
+
+
+def test_read_columns_skips_comments():
+    text = "#header\na\tb\n# other\nc\td\n"
+    assert _rows(text, [1], comment='#') == [('b',), ('d',)]
+
+
+def test_read_columns_in_small_blocks():
+    lines = ["%d\t%d\n" % (i, i * 2) for i in range(1000)]
+    blocks = list(tsv_reader.read_columns(io.StringIO(''.join(lines)), [1], block_size=64))
+    assert len(blocks) > 1
+    assert [row for rows in blocks for row in rows] == [(str(i * 2),) for i in range(1000)]
+
+
+def test_read_chunks():
+    text = ''.join("line %d\n" % i for i in range(100)) + "last"
+    chunks = list(tsv_reader.read_chunks(io.StringIO(text), chunk_size=50))
+    assert ''.join(chunks) == text
+    assert all(chunk.endswith('\n') for chunk in chunks[:-1])
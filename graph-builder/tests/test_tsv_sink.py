@@ -0,0 +1,125 @@
+import random
+import pandas as pd
+import pytest
+from builder.databases.parsers import tsv_sink
+from builder.databases.parsers.tsv_sink import TsvSink
+
+
+HEADER = ['ID', 'name', 'score']
+# Fields with the delimiter, quotes, escape characters and line terminators, empty and
+# missing values, numbers and non-ASCII text.
+TRICKY_ROWS = [('a', 'b\tc', 1),
+               ('q"uote', 'back\\slash', 2),
+               ('new\nline', 'carriage\rreturn', 3),
+               ('crlf\r\nline', '\\"', 4),
+               (None, float('nan'), 5),
+               ('', 'x', 6),
+               ('trailing ', ' leading', -1),
+               ('é ü ß', '"', 0),
+               ('1.5', 2.5, True),
+               ('a,b', "it's", 10 ** 20),
+               ('"', '\t', '\n')]
+
+
+def _to_csv(rows, header, filepath):
+    # The way the parsers wrote their files before TsvSink.
+    pd.DataFrame(list(rows), columns=header).to_csv(path_or_buf=filepath, sep='\t',
+                                                    header=True, index=False, quotechar='"',
+                                                    line_terminator='\n', escapechar='\\')
+    with open(filepath, 'rb') as f:
+        return f.read()
+
+
+def _sink(rows, header, filepath, **kwargs):
+    with TsvSink(filepath, header, **kwargs) as sink:
+        for row in rows:
+            sink.write(row)
+    with open(filepath, 'rb') as f:
+        return f.read(), sink.count
+
+
+@pytest.mark.parametrize('row', TRICKY_ROWS)
+def test_row_as_to_csv(tmp_path, row):
+    expected = _to_csv([row], HEADER, tmp_path / 'expected.tsv')
+    assert _sink([row], HEADER, tmp_path / 'sink.tsv')[0] == expected
+
+
+def test_rows_as_to_csv(tmp_path):
+    expected = _to_csv(TRICKY_ROWS, HEADER, tmp_path / 'expected.tsv')
+    assert _sink(TRICKY_ROWS, HEADER, tmp_path / 'sink.tsv') == (expected, len(TRICKY_ROWS))
+
+
+def test_clean_rows_as_to_csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(tsv_sink, 'BATCH_SIZE', 3)
+    rows = [row for row in TRICKY_ROWS if all(isinstance(value, (str, int)) for value in row)]
+    rows += [('id%d' % i, 'name %d' % i, i) for i in range(10)]
+    expected = _to_csv(rows, HEADER, tmp_path / 'expected.tsv')
+    assert _sink(rows, HEADER, tmp_path / 'sink.tsv', clean=True) == (expected, len(rows))
+    with TsvSink(tmp_path / 'rows.tsv', HEADER, clean=True) as sink:
+        assert sink.write_rows(iter(rows)) == len(rows)
+    assert (tmp_path / 'rows.tsv').read_bytes() == expected
+
+
+def test_format_rows_as_to_csv(tmp_path):
+    rows = [('a', 'b'), ('tab\there', 'quote"'), ('x', 1)]
+    expected = _to_csv(rows, ['A', 'B'], tmp_path / 'expected.tsv')
+    assert (b'A\tB\n' + tsv_sink.format_rows(rows).encode()) == expected
+
+
+def test_integers_of_columns_with_missing_values(tmp_path):
+    # to_csv turns a column of integers with a missing value into floats (1.0), TsvSink writes
+    # every value as it is.
+    rows = [(1, 'a', 2), (None, 'b', 3)]
+    assert _sink(rows, HEADER, tmp_path / 'sink.tsv')[0] == b'ID\tname\tscore\n1\ta\t2\n\tb\t3\n'
+
+
+def test_no_header_and_append(tmp_path):
+    filepath = tmp_path / 'sink.tsv'
+    with TsvSink(filepath) as sink:
+        sink.write(('a', 1))
+    with TsvSink(filepath, mode='a') as sink:
+        sink.write(('b', 2))
+    assert filepath.read_text() == 'a\t1\nb\t2\n'
+
+
+def test_dedupe(tmp_path, monkeypatch):
+    monkeypatch.setattr(tsv_sink, 'BATCH_SIZE', 4)
+    rows = [('a', 1), ('b', 2), ('a', 1), ['b', 2], ('c', ['unhashable']), ('c', ['unhashable'])]
+    filepath = tmp_path / 'sink.tsv'
+    with TsvSink(filepath, ['ID', 'value'], dedupe=True, clean=True) as sink:
+        written = [sink.write(row) for row in rows]
+    assert written == [True, True, False, False, True, False]
+    assert sink.count == 3
+    assert filepath.read_text() == "ID\tvalue\na\t1\nb\t2\nc\t['unhashable']\n"
+
+
+def test_concatenate(tmp_path):
+    first, second = tmp_path / 'first.tsv', tmp_path / 'second.tsv'
+    first.write_text('ID\tname\na\tA\nb\tB\n')
+    second.write_text('ID\tname\nb\tB\nc\tC\n')
+    output = tmp_path / 'merged.tsv'
+    assert tsv_sink.concatenate([first, second], output) == 0
+    assert output.read_text() == 'ID\tname\na\tA\nb\tB\nb\tB\nc\tC\n'
+    assert tsv_sink.concatenate([first, second], output, unique_ids=True) == 1
+    assert output.read_text() == 'ID\tname\na\tA\nb\tB\nc\tC\n'
+
+
+@pytest.mark.parametrize('run_lines', [1, 7, 50, 10000])
+def test_sort_unique(tmp_path, monkeypatch, run_lines):
+    # Few runs per merge, so that the runs are also merged in several rounds.
+    monkeypatch.setattr(tsv_sink, 'MAX_MERGED_RUNS', 3)
+    generator = random.Random(run_lines)
+    lines = ['%d\tname %d\n' % (value, value) for value in
+             (generator.randrange(60) for _ in range(200))]
+    filepath = tmp_path / 'sort.tsv'
+    filepath.write_text('ID\tname\n' + ''.join(lines))
+    assert tsv_sink.sort_unique(str(filepath), run_lines=run_lines) == len(set(lines))
+    assert filepath.read_text() == 'ID\tname\n' + ''.join(sorted(set(lines)))
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['sort.tsv']
+
+
+def test_sort_unique_without_header(tmp_path):
+    filepath = tmp_path / 'sort.tsv'
+    filepath.write_text('b\t2\na\t1\nb\t2\n')
+    assert tsv_sink.sort_unique(str(filepath), header=False, run_lines=1) == 2
+    assert filepath.read_text() == 'a\t1\nb\t2\n'
@@ -0,0 +1,107 @@
+import os
+import gzip
+import random
+import pytest
+from builder.databases.parsers.uniprot_parser import UniProtParser
+
+
+ROOTS = {'F': 'Molecular_function', 'C': 'Cellular_component', 'P': 'Biological_process'}
+
+
+def _gaf_line(db, identifier, go, evidence, aspect):
+    return '\t'.join([db, identifier, 'SYMBOL', '', go, 'PMID:1', evidence, '', aspect,
+                      'name', '', 'protein', 'taxon:9606', '20200101', db]) + '\n'
+
+
+def _parse(tmp_path, lines, run_lines=None):
+    parser = UniProtParser(str(tmp_path / 'imports'), str(tmp_path / 'databases'), download=False)
+    if run_lines is not None:
+        parser.config = dict(parser.config, go_sort_run_lines=run_lines)
+    directory = tmp_path / 'databases' / 'UniProt'
+    directory.mkdir(parents=True, exist_ok=True)
+    with gzip.open(directory / parser.config['uniprot_go_annotations'].split('/')[-1], 'wt') as f:
+        f.write('!gaf-version: 2.2\n')
+        f.writelines(lines)
+    stats = parser.parse_uniprot_annotations()
+    files = {}
+    for root in ROOTS.values():
+        filepath = os.path.join(parser.import_directory, root + '_associated_with.tsv')
+        if os.path.isfile(filepath):
+            with open(filepath, 'r', encoding='utf-8') as f:
+                files[root] = f.read().splitlines()
+    return files, {row[3]: row[5] for row in stats}
+
+
+def _baseline(lines):
+    # The rows of each root collected in a set, as the parser did before streaming them.
+    relationships = {}
+    for line in lines:
+        data = line.rstrip('\r\n').split('\t')
+        if data[8] in ROOTS:
+            relationships.setdefault(ROOTS[data[8]], set()).add(
+                '\t'.join([data[1], data[4], 'ASSOCIATED_WITH', data[6], '5', 'UniProt']))
+    return relationships
+
+
+def _assert_baseline(files, counts, lines):
+    expected = _baseline(lines)
+    assert set(files) == set(expected)
+    for root, rows in files.items():
+        assert rows[0] == 'START_ID\tEND_ID\tTYPE\tevidence_type\tscore\tsource'
+        assert len(rows[1:]) == len(set(rows[1:]))
+        assert set(rows[1:]) == expected[root]
+        assert counts[root + '_associated_with.tsv'] == len(expected[root])
+
+
+def _annotations(generator, identifier, db):
+    return [_gaf_line(db, identifier, 'GO:%07d' % generator.randrange(20), generator.choice(['IEA', 'IDA']),
+                      generator.choice('FCP'))
+            for _ in range(generator.randrange(1, 8))]
+
+
+def test_grouped_proteins_keep_file_order(tmp_path):
+    lines = [_gaf_line('UniProtKB', 'P2', 'GO:1', 'IEA', 'F'), _gaf_line('UniProtKB', 'P2', 'GO:1', 'IEA', 'F'),
+             _gaf_line('UniProtKB', 'P1', 'GO:2', 'IDA', 'F'), _gaf_line('UniProtKB', 'P1', 'GO:2', 'IEA', 'F'),
+             _gaf_line('UniProtKB', 'P1', 'GO:2', 'IDA', 'F'), _gaf_line('UniProtKB', 'P1', 'GO:3', 'IDA', 'X')]
+    files, counts = _parse(tmp_path, lines)
+    # The identifiers do not need to be sorted, only grouped.
+    assert files['Molecular_function'][1:] == ['P2\tGO:1\tASSOCIATED_WITH\tIEA\t5\tUniProt',
+                                               'P1\tGO:2\tASSOCIATED_WITH\tIDA\t5\tUniProt',
+                                               'P1\tGO:2\tASSOCIATED_WITH\tIEA\t5\tUniProt']
+    _assert_baseline(files, counts, lines)
+
+
+def test_interleaved_databases(tmp_path):
+    generator = random.Random(0)
+    # The proteins of each database are grouped, the databases are interleaved line by line.
+    streams = {db: [line for i in range(30) for line in _annotations(generator, '%s%03d' % (prefix, i), db)]
+               for db, prefix in (('UniProtKB', 'P'), ('ComplexPortal', 'CPX-'), ('RNAcentral', 'URS'))}
+    lines = []
+    while any(streams.values()):
+        db = generator.choice([db for db in streams if streams[db]])
+        lines.append(streams[db].pop(0))
+    files, counts = _parse(tmp_path, lines)
+    _assert_baseline(files, counts, lines)
+
+
+@pytest.mark.parametrize('revisit', ['same database', 'other database'])
+def test_revisited_protein(tmp_path, revisit):
+    generator = random.Random(1)
+    lines = [line for i in range(20) for line in _annotations(generator, 'P%03d' % i, 'UniProtKB')]
+    # A protein appears again after other proteins, or under another database, with repeated rows.
+    db = 'UniProtKB' if revisit == 'same database' else 'ComplexPortal'
+    lines += [line.replace('UniProtKB', db) for line in lines[:10]]
+    lines += _annotations(generator, 'P100', 'UniProtKB')
+    files, counts = _parse(tmp_path, lines, run_lines=7)
+    _assert_baseline(files, counts, lines)
+    # The repeated rows are removed by sorting the files.
+    assert all(rows[1:] == sorted(rows[1:]) for rows in files.values())
+
+
+def test_shuffled_annotations(tmp_path):
+    generator = random.Random(2)
+    lines = [line for i in range(40) for db in ('UniProtKB', 'ComplexPortal')
+             for line in _annotations(generator, 'P%03d' % (i % 25), db)]
+    generator.shuffle(lines)
+    files, counts = _parse(tmp_path, lines, run_lines=11)
+    _assert_baseline(files, counts, lines)